@@ -67,6 +67,25 @@ class MapData:
         self.zones[zone_key] = zone_data
         self.logger.debug(f"Zone {zone_key} updated/added.")
 
+    def is_valid_position(self, position: Tuple[float, float, float], epsilon: float = 0.0001) -> bool:
+        """
+        Same bounds and wall test the server's CollisionManager applies to moves,
+        minus the occupancy checks (other entities are only known approximately here).
+        """
+        x_min, x_max, y_min, y_max, z_min, z_max = self.map_size
+        x, y, z = position
+        if not (x_min - epsilon <= x <= x_max + epsilon and
+                y_min - epsilon <= y <= y_max + epsilon and
+                z_min - epsilon <= z <= z_max + epsilon):
+            return False
+        for tile in self.tiles.values():
+            if not tile.get("is_wall"):
+                continue
+            x1, x2, y1, y2, z1, z2 = tile["tile_position"]
+            if (x1 <= x <= x2) and (y1 <= y <= y2) and (z1 <= z <= z2):
+                return False
+        return True
+
     def remove_zone(self, zone_key: str):
         """
         Remove a zone by key if it exists.
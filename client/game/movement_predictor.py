@@ -0,0 +1,122 @@
+# game/movement_predictor.py
+import logging
+from collections import deque
+from typing import Any, Deque, Dict, Optional, Tuple
+
+from game.map_data import MapData
+
+Vector = Tuple[float, float, float]
+
+
+class MovementPredictor:
+    """
+    Client-side prediction of the player's own movement.
+
+    A move is applied locally right away, checked against the local MapData the
+    same way the server checks it, and sent tagged with an increasing input_seq.
+    Moves the server hasn't answered yet stay in a pending queue. When a
+    user_move_ok or user_move_fail arrives with last_processed_seq, everything up
+    to that sequence is dropped and the remaining moves are replayed on top of
+    the server's position. If that lands somewhere other than where the player
+    was predicted to be, the result is a correction.
+
+    A move that fails locally is not sent, because the server would refuse it too.
+
+    Sequence numbers only start over at login, when the server forgets the last
+    one it processed too. A map change keeps counting, so moves sent just before
+    it can't make the server drop the ones after it as duplicates; their replies
+    are ignored instead.
+    """
+
+    def __init__(self, map_data: MapData, max_pending: int = 256):
+        self.logger = logging.getLogger("MovementPredictor")
+        self.map_data = map_data
+        self.max_pending = max_pending
+        self.position: Vector = (0.0, 0.0, 0.0)
+        self.next_seq = 1
+        self.pending: Deque[Tuple[int, Vector]] = deque()
+        # Replies up to this sequence belong to moves made before the last reset().
+        self.reset_seq = 0
+        self.corrections = 0
+        self.last_correction = 0.0
+
+    def start_session(self) -> None:
+        """
+        Number moves from 1 again. Call on login, when the server starts a new sequence as well.
+        """
+        self.pending.clear()
+        self.next_seq = 1
+        self.reset_seq = 0
+
+    def reset(self, position: Vector) -> None:
+        """
+        Forget unacknowledged moves and start from position. Call on map change.
+        """
+        self.position = tuple(float(v) for v in position)
+        self.pending.clear()
+        self.reset_seq = self.next_seq - 1
+
+    def _step(self, position: Vector, direction: Vector) -> Optional[Vector]:
+        moved = (position[0] + direction[0], position[1] + direction[1], position[2] + direction[2])
+        return moved if self.map_data.is_valid_position(moved) else None
+
+    def predict(self, direction: Vector, username: str, token: str) -> Optional[Dict[str, Any]]:
+        """
+        Apply a move locally.
+
+        :return: The user_move_request to send, or None if the move is blocked locally.
+        """
+        direction = tuple(float(v) for v in direction)
+        moved = self._step(self.position, direction)
+        if moved is None:
+            return None
+        if len(self.pending) >= self.max_pending:
+            # The server has stopped answering; keep the newest moves to replay.
+            self.pending.popleft()
+        seq = self.next_seq
+        self.next_seq += 1
+        self.pending.append((seq, direction))
+        self.position = moved
+        return {
+            "message_type": "user_move_request",
+            "username": username,
+            "token": token,
+            "direction": direction,
+            "input_seq": seq
+        }
+
+    def reconcile(self, last_processed_seq: int, position: Vector) -> bool:
+        """
+        Take the server's position after move last_processed_seq and replay the moves it hasn't processed.
+
+        :return: True if the predicted position had to be corrected.
+        """
+        if last_processed_seq <= self.reset_seq:
+            # A reply to a move from before the map change; its position is on the old map.
+            return False
+        while self.pending and self.pending[0][0] <= last_processed_seq:
+            self.pending.popleft()
+        replayed = tuple(float(v) for v in position)
+        for _, direction in self.pending:
+            # A move that no longer fits is dropped here; the server will refuse it as well.
+            replayed = self._step(replayed, direction) or replayed
+        error = sum((a - b) ** 2 for a, b in zip(replayed, self.position)) ** 0.5
+        self.position = replayed
+        if error > 1e-6:
+            self.corrections += 1
+            self.last_correction = error
+            self.logger.debug(f"Corrected predicted position by {error:.3f} after move {last_processed_seq}.")
+            return True
+        return False
+
+    def accept_authoritative(self, position: Vector) -> bool:
+        """
+        Position from a world snapshot, which carries no input_seq. Used only while no
+        moves are pending, to follow what the server does on its own (falling, landing).
+
+        :return: True if it was applied.
+        """
+        if self.pending:
+            return False
+        self.position = tuple(float(v) for v in position)
+        return True
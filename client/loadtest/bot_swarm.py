@@ -0,0 +1,275 @@
+# loadtest/bot_swarm.py
+"""
+Headless load generator: N simulated players built on net/async_client.py,
+without Tk, OpenAL or TTS.
+
+Each bot logs in (creating its account the first time), joins a map, then walks
+between random waypoints, turns and chats at the configured rates until its
+session length is up, and finally leaves the map and logs out. Like the game
+client, it predicts its own position with MovementPredictor and steers by the
+prediction rather than the last user_move_ok, which lags by the moves in flight.
+Response latency is measured from each *_request to its *_ok / *_fail reply.
+
+Run from the client directory, e.g. against a local server:
+    python loadtest/bot_swarm.py --bots 2000 --ramp 200 --duration 120
+    python loadtest/bot_swarm.py --bots 50 --move-hz 10 --chat-per-minute 6 --no-ssl
+
+Every bot holds one connection, so for thousands of bots raise the open file limit
+(ulimit -n) for both the swarm and the server. Accounts are created on the first
+run only; later runs with the same --prefix log straight in.
+"""
+import argparse
+import asyncio
+import logging
+import os
+import random
+import sys
+import time
+from collections import defaultdict, deque
+from typing import Deque, Dict, List, Optional
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from game.map_data import MapData
+from game.movement_predictor import MovementPredictor
+from net.async_client import AsyncClient
+
+
+def percentile(sorted_values: List[float], p: float) -> float:
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, max(0, int(round(p / 100.0 * len(sorted_values))) - 1))
+    return sorted_values[index]
+
+
+class SwarmStats:
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.sent = 0
+        self.received = 0
+        self.active_bots = 0
+        self.connect_errors = 0
+        self.disconnects = 0
+        self.unanswered = 0
+        self.latencies: Dict[str, List[float]] = defaultdict(list)
+        self.failures: Dict[str, int] = defaultdict(int)
+        self.fail_reasons: Dict[str, int] = defaultdict(int)
+
+    def report(self, final: bool = False) -> str:
+        elapsed = time.perf_counter() - self.started
+        responses = sum(len(v) for v in self.latencies.values())
+        failures = sum(self.failures.values())
+        lines = [
+            f"[{elapsed:7.1f}s] bots={self.active_bots} sent={self.sent} ({self.sent / elapsed:.0f}/s) "
+            f"received={self.received} ({self.received / elapsed:.0f}/s) responses={responses} "
+            f"errors={failures} ({(failures / responses * 100) if responses else 0:.2f}%) "
+            f"connect_errors={self.connect_errors} disconnects={self.disconnects}"
+        ]
+        if final:
+            lines[0] += f" unanswered={self.unanswered}"
+        for request_type in sorted(self.latencies):
+            ms = sorted(v * 1000 for v in self.latencies[request_type])
+            lines.append(
+                f"    {request_type:<30} n={len(ms):<7} p50={percentile(ms, 50):7.2f}ms "
+                f"p95={percentile(ms, 95):7.2f}ms p99={percentile(ms, 99):7.2f}ms fail={self.failures.get(request_type, 0)}"
+            )
+        if final and self.fail_reasons:
+            lines.append("  Failure reasons:")
+            for reason, count in sorted(self.fail_reasons.items(), key=lambda item: -item[1])[:10]:
+                lines.append(f"    {count:>7}  {reason}")
+        return "\n".join(lines)
+
+
+class Bot:
+    def __init__(self, index: int, args, stats: SwarmStats):
+        self.username = f"{args.prefix}{index}"
+        self.args = args
+        self.stats = stats
+        self.rng = random.Random(args.seed + index)
+        self.client = AsyncClient(args.host, args.port, use_ssl=not args.no_ssl)
+        self.pending: Dict[str, Deque[float]] = defaultdict(deque)
+        self.waiters: Dict[str, asyncio.Future] = {}
+        self.token: Optional[str] = None
+        self.map_data = MapData()
+        self.movement = MovementPredictor(self.map_data)
+        self.connected = False
+
+    async def send(self, message: dict) -> None:
+        message_type = message["message_type"]
+        if message_type.endswith("_request"):
+            self.pending[message_type[:-len("_request")]].append(time.perf_counter())
+        await self.client.send_message({"client_id": "", "message": message})
+        self.stats.sent += 1
+
+    async def request(self, message: dict, timeout: float = 30.0) -> dict:
+        """
+        Send a request and wait for its *_ok / *_fail reply.
+        """
+        base = message["message_type"][:-len("_request")]
+        future = asyncio.get_running_loop().create_future()
+        self.waiters[base] = future
+        await self.send(message)
+        try:
+            return await asyncio.wait_for(future, timeout)
+        finally:
+            self.waiters.pop(base, None)
+
+    async def _receive_loop(self) -> None:
+        while self.connected:
+            envelope = await self.client.receive_message()
+            if envelope is None:
+                if self.client.reader.at_eof():
+                    if self.connected:
+                        self.stats.disconnects += 1
+                    self.connected = False
+                    return
+                continue
+            self.stats.received += 1
+            inner = envelope.get("message", {})
+            message_type = inner.get("message_type", "")
+            if message_type == "ping":
+                await self.client.send_message({"client_id": "", "message": {"message_type": "pong", "ping_id": inner.get("ping_id")}})
+                continue
+            if message_type == "world_snapshot":
+                # Acknowledge like a real client, so the server keeps sending deltas rather than full snapshots.
+                await self.client.send_message({"client_id": "", "message": {"message_type": "world_snapshot_ack", "seq": inner.get("seq")}})
+                continue
+            if message_type == "map_state":
+                self.map_data.load_from_dict(inner)
+                me = next((p for p in inner.get("players", []) if p.get("username") == self.username), None)
+                self.movement.reset(me["position"] if me else inner.get("start_position", (0.0, 0.0, 0.0)))
+                continue
+            for suffix in ("_ok", "_fail"):
+                if message_type.endswith(suffix):
+                    base = message_type[:-len(suffix)]
+                    waiting = self.pending.get(base)
+                    if waiting:
+                        self.stats.latencies[base + "_request"].append(time.perf_counter() - waiting.popleft())
+                    if suffix == "_fail":
+                        self.stats.failures[base + "_request"] += 1
+                        self.stats.fail_reasons[f"{message_type}: {inner.get('reason')}"] += 1
+                    if base == "user_move" and inner.get("last_processed_seq") is not None and inner.get("position") is not None:
+                        self.movement.reconcile(inner["last_processed_seq"], inner["position"])
+                    future = self.waiters.get(base)
+                    if future and not future.done():
+                        future.set_result(inner)
+
+    async def run(self) -> None:
+        try:
+            await self.client.connect()
+        except OSError:
+            self.stats.connect_errors += 1
+            return
+        self.connected = True
+        self.stats.active_bots += 1
+        receiver = asyncio.create_task(self._receive_loop())
+        try:
+            await self._session()
+        except (asyncio.TimeoutError, ConnectionError):
+            pass
+        finally:
+            self.stats.unanswered += sum(len(q) for q in self.pending.values())
+            self.stats.active_bots -= 1
+            self.connected = False
+            receiver.cancel()
+            try:
+                await self.client.close()
+            except Exception:
+                pass
+
+    async def _session(self) -> None:
+        args = self.args
+        credentials = {"username": self.username, "password": args.password}
+        reply = await self.request({"message_type": "user_account_login_request", **credentials})
+        if reply.get("message_type") != "user_account_login_ok":
+            await self.request({"message_type": "user_account_create_request", **credentials, "current_map": args.map})
+            reply = await self.request({"message_type": "user_account_login_request", **credentials})
+            if reply.get("message_type") != "user_account_login_ok":
+                return
+        self.token = reply.get("token")
+        self.movement.start_session()
+        auth = {"username": self.username, "token": self.token}
+
+        await self.request({"message_type": "map_join_request", **auth, "map_name": args.map})
+
+        session_end = time.perf_counter() + self.rng.uniform(args.duration * 0.5, args.duration) if args.leave_early else time.perf_counter() + args.duration
+        next_move = next_turn = next_chat = time.perf_counter()
+        waypoint = None
+        while self.connected and time.perf_counter() < session_end:
+            now = time.perf_counter()
+            if args.move_hz > 0 and now >= next_move:
+                waypoint = self._step_towards(waypoint)
+                move = self.movement.predict(self._direction(waypoint), self.username, self.token)
+                if move is None:
+                    # Blocked by a wall (or no map_state yet); head somewhere else.
+                    waypoint = None
+                else:
+                    await self.send(move)
+                next_move = now + 1.0 / args.move_hz
+            if args.turn_hz > 0 and now >= next_turn:
+                await self.send({"message_type": "user_turn_request", **auth, "yaw_change": self.rng.uniform(-15, 15), "pitch_change": 0.0})
+                next_turn = now + 1.0 / args.turn_hz
+            if args.chat_per_minute > 0 and now >= next_chat:
+                await self.send({"message_type": "chat_message", **auth, "chat_category": "map", "map_name": args.map, "text": f"hello from {self.username}"})
+                next_chat = now + self.rng.expovariate(args.chat_per_minute / 60.0)
+            await asyncio.sleep(max(0.0, min(next_move, next_turn, next_chat, session_end) - time.perf_counter()))
+
+        if self.connected:
+            await self.request({"message_type": "map_leave_request", **auth})
+            await self.request({"message_type": "user_account_logout_request", **auth})
+
+    def _step_towards(self, waypoint):
+        position = self.movement.position
+        if waypoint is None or (abs(waypoint[0] - position[0]) < 1 and abs(waypoint[1] - position[1]) < 1):
+            size = self.args.area
+            waypoint = (float(self.rng.randint(0, size)), float(self.rng.randint(0, size)))
+        return waypoint
+
+    def _direction(self, waypoint):
+        dx = waypoint[0] - self.movement.position[0]
+        dy = waypoint[1] - self.movement.position[1]
+        step = self.args.step
+        return [max(-step, min(step, dx)), max(-step, min(step, dy)), 0.0]
+
+
+async def report_loop(stats: SwarmStats, interval: float) -> None:
+    while True:
+        await asyncio.sleep(interval)
+        print(stats.report(), flush=True)
+
+
+async def main(args) -> None:
+    stats = SwarmStats()
+    reporter = asyncio.create_task(report_loop(stats, args.report_interval))
+    bots = []
+    for i in range(args.bots):
+        bots.append(asyncio.create_task(Bot(i, args, stats).run()))
+        if args.ramp > 0:
+            await asyncio.sleep(1.0 / args.ramp)
+    await asyncio.gather(*bots)
+    reporter.cancel()
+    print(stats.report(final=True))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Headless bot swarm load generator.")
+    parser.add_argument("--host", default="localhost")
+    parser.add_argument("--port", type=int, default=33288)
+    parser.add_argument("--no-ssl", action="store_true", help="Connect without TLS.")
+    parser.add_argument("--bots", type=int, default=100, help="Number of simulated players.")
+    parser.add_argument("--ramp", type=float, default=50.0, help="Bots started per second; 0 starts all at once.")
+    parser.add_argument("--duration", type=float, default=60.0, help="Seconds each bot stays in the map.")
+    parser.add_argument("--leave-early", action="store_true", help="Give each bot a random session length between half and all of --duration.")
+    parser.add_argument("--move-hz", type=float, default=5.0, help="Move requests per second per bot.")
+    parser.add_argument("--turn-hz", type=float, default=1.0, help="Turn requests per second per bot.")
+    parser.add_argument("--chat-per-minute", type=float, default=2.0, help="Average map chat messages per minute per bot.")
+    parser.add_argument("--step", type=float, default=1.0, help="Largest per-axis step of a move request.")
+    parser.add_argument("--area", type=int, default=99, help="Waypoints are picked in [0, area] on x and y.")
+    parser.add_argument("--map", default="Main")
+    parser.add_argument("--prefix", default="bot", help="Username prefix; accounts are reused across runs.")
+    parser.add_argument("--password", default="botpass")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--report-interval", type=float, default=5.0)
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.WARNING)
+    asyncio.run(main(args))
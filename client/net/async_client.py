@@ -11,8 +11,12 @@ class AsyncClient:
     Sends and receives JSON messages.
     """
 
-    def __init__(self, host: str, port: int, use_ssl: bool = True, ssl_certfile: Optional[str] = None):
+    # map_state for a large map easily exceeds StreamReader's default 64 KiB line limit.
+    DEFAULT_MAX_MESSAGE_BYTES = 8 * 1024 * 1024
+
+    def __init__(self, host: str, port: int, use_ssl: bool = True, ssl_certfile: Optional[str] = None, max_message_bytes: int = DEFAULT_MAX_MESSAGE_BYTES):
         self.logger = logging.getLogger("AsyncClient")
+        self.max_message_bytes = max_message_bytes
         self.host = host
         self.port = port
         self.use_ssl = use_ssl
@@ -33,7 +37,7 @@ class AsyncClient:
             ssl_context.verify_mode = ssl.CERT_NONE
 
         self.logger.info(f"Connecting to {self.host}:{self.port} with SSL={self.use_ssl}")
-        self.reader, self.writer = await asyncio.open_connection(self.host, self.port, ssl=ssl_context)
+        self.reader, self.writer = await asyncio.open_connection(self.host, self.port, ssl=ssl_context, limit=self.max_message_bytes)
         self.logger.info("Connected to server.")
 
     async def send_message(self, message: Dict[str, Any]):
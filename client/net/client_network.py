@@ -3,6 +3,7 @@ import asyncio
 import logging
 from typing import Optional, Dict, Any
 from net.async_client import AsyncClient
+from net.datagram_client import DatagramClient
 from net.message_schemas import MESSAGE_TYPE_TO_SCHEMA
 from pydantic import ValidationError
 
@@ -17,6 +18,11 @@ class ClientNetwork:
     def __init__(self, host: str, port: int, use_ssl: bool = True, ssl_certfile: Optional[str] = None):
         self.logger = logging.getLogger("ClientNetwork")
         self.client = AsyncClient(host, port, use_ssl, ssl_certfile)
+        self.datagram: Optional[DatagramClient] = None
+        # Session resume state: the token from user_account_login_ok and the last reliable seq seen.
+        self.username: Optional[str] = None
+        self.resume_token: Optional[str] = None
+        self.last_seq = 0
         self.running = False
         self.incoming_queue = asyncio.Queue()
         self.receive_task = None
@@ -35,6 +41,9 @@ class ClientNetwork:
                 await self.receive_task
             except asyncio.CancelledError:
                 pass
+        if self.datagram:
+            self.datagram.close()
+            self.datagram = None
         await self.client.close()
         self.logger.info("ClientNetwork stopped.")
 
@@ -43,18 +52,96 @@ class ClientNetwork:
         while self.running:
             msg = await self.client.receive_message()
             if msg is None:
+                if self.client.reader and not self.client.reader.at_eof():
+                    continue  # blank or undecodable line, the connection is still up
+                if self.resume_token and await self._resume_session():
+                    continue
                 self.logger.warning("No message or server disconnected.")
                 self.running = False
                 break
+            seq = msg.get("seq")
+            inner = msg.get("message", {})
+            if inner.get("message_type") == "user_account_login_ok":
+                self.last_seq = 0  # a fresh login starts a new server-side sequence
+            if isinstance(seq, int):
+                if seq <= self.last_seq:
+                    continue  # already seen before a reconnect
+                self.last_seq = seq
+            if inner.get("message_type") == "ping":
+                # Answer heartbeats right away so the server's RTT and idle tracking stay accurate.
+                await self.client.send_message({
+                    "client_id": msg.get("client_id", ""),
+                    "message": {"message_type": "pong", "ping_id": inner.get("ping_id")}
+                })
+                continue
             await self.incoming_queue.put(msg)
         self.logger.info("Receive loop ended.")
 
+    def set_session(self, username: str, resume_token: Optional[str]):
+        self.username = username
+        self.resume_token = resume_token
+
+    async def _resume_session(self, attempts: int = 5) -> bool:
+        """
+        Reconnect and ask the server to resume our session. The server answers with
+        session_resume_ok followed by only the messages we missed.
+        """
+        delay = 0.5
+        for attempt in range(attempts):
+            await asyncio.sleep(delay)
+            try:
+                await self.client.close()
+            except Exception:
+                pass
+            try:
+                await self.client.connect()
+            except OSError as e:
+                self.logger.info(f"Reconnect attempt {attempt + 1} failed: {e}")
+                delay = min(delay * 2, 8.0)
+                continue
+            await self.client.send_message({
+                "client_id": "",
+                "message": {
+                    "message_type": "session_resume_request",
+                    "username": self.username,
+                    "resume_token": self.resume_token,
+                    "last_seq": self.last_seq
+                }
+            })
+            self.logger.info(f"Reconnected, resuming session from seq {self.last_seq}.")
+            return True
+        return False
+
     async def send_request(self, message: Dict[str, Any]):
         if not self.running:
             self.logger.warning("Not running, cannot send request.")
             return
         await self.client.send_message(message)
 
+    async def enable_datagram(self, datagram_info: Dict[str, Any]):
+        """
+        Open the UDP side channel using the session details from user_account_login_ok.
+        """
+        if self.datagram:
+            self.datagram.close()
+        self.datagram = DatagramClient(
+            self.client.host,
+            datagram_info["port"],
+            datagram_info["session_id"],
+            datagram_info["session_key"],
+            on_message=self.incoming_queue.put_nowait
+        )
+        await self.datagram.connect()
+
+    async def send_unreliable(self, message: Dict[str, Any]):
+        """
+        Send loss-tolerant input (movement, turning) over UDP once bound, otherwise over TCP.
+        """
+        if self.datagram and self.datagram.bound:
+            self.datagram.send_message(message["message"])
+            return
+        await self.send_request(message)
+
     async def get_incoming_message(self) -> Optional[Dict[str, Any]]:
         if not self.running and self.incoming_queue.empty():
             return None
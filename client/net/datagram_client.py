@@ -0,0 +1,138 @@
+# net/datagram_client.py
+import asyncio
+import hashlib
+import hmac
+import json
+import logging
+import struct
+from typing import Any, Callable, Dict, Optional
+
+# Must match the server's DatagramChannel wire format:
+# session_id (8 bytes) | seq (uint32, big endian) | tag (16 bytes) | JSON payload
+HEADER = struct.Struct("!8sI")
+TAG_SIZE = 16
+SEQ_MODULO = 1 << 32
+
+
+def _sign(key: bytes, header: bytes, payload: bytes) -> bytes:
+    return hmac.new(key, header + payload, hashlib.sha256).digest()[:TAG_SIZE]
+
+
+def _is_newer_seq(seq: int, last_seq: Optional[int]) -> bool:
+    if last_seq is None:
+        return True
+    diff = (seq - last_seq) % SEQ_MODULO
+    return 0 < diff < SEQ_MODULO // 2
+
+
+class _ClientDatagramProtocol(asyncio.DatagramProtocol):
+    def __init__(self, owner: "DatagramClient"):
+        self.owner = owner
+
+    def datagram_received(self, data: bytes, addr):
+        self.owner._on_datagram(data)
+
+    def error_received(self, exc: Exception):
+        self.owner.logger.debug(f"Datagram socket error: {exc}")
+
+
+class DatagramClient:
+    """
+    Client side of the server's optional UDP channel.
+    Sends movement input with sequence numbers and an HMAC tag using the session key
+    handed out in user_account_login_ok, and receives position snapshots.
+    Snapshots arriving out of order are dropped as late.
+
+    datagram_bind is resent every bind_interval seconds until datagram_bind_ok
+    arrives, since either may be lost; after bind_timeout seconds without an
+    answer the channel stays unbound and input keeps going over TCP.
+    """
+
+    def __init__(
+        self,
+        host: str,
+        port: int,
+        session_id: str,
+        session_key: str,
+        on_message: Callable[[Dict[str, Any]], None],
+        bind_interval: float = 0.5,
+        bind_timeout: float = 5.0
+    ):
+        self.logger = logging.getLogger("DatagramClient")
+        self.host = host
+        self.port = port
+        self.session_id = bytes.fromhex(session_id)
+        self.session_key = bytes.fromhex(session_key)
+        self.on_message = on_message
+        self.transport: Optional[asyncio.DatagramTransport] = None
+        self.next_send_seq = 0
+        self.last_recv_seq: Optional[int] = None
+        self.bound = False
+        self.bind_interval = bind_interval
+        self.bind_timeout = bind_timeout
+        self._bind_task: Optional[asyncio.Task] = None
+
+    async def connect(self):
+        loop = asyncio.get_running_loop()
+        self.transport, _ = await loop.create_datagram_endpoint(
+            lambda: _ClientDatagramProtocol(self),
+            remote_addr=(self.host, self.port)
+        )
+        # Register our address with the server; it answers with datagram_bind_ok.
+        self._bind_task = asyncio.create_task(self._bind())
+        self.logger.info(f"Datagram channel opened to {self.host}:{self.port}.")
+
+    async def _bind(self):
+        loop = asyncio.get_running_loop()
+        give_up = loop.time() + self.bind_timeout
+        while not self.bound and self.transport:
+            if loop.time() >= give_up:
+                self.logger.warning(f"No datagram_bind_ok from {self.host}:{self.port} after {self.bind_timeout}s, staying on TCP.")
+                return
+            self.send_message({"message_type": "datagram_bind"})
+            await asyncio.sleep(self.bind_interval)
+
+    def send_message(self, message: Dict[str, Any]) -> bool:
+        if not self.transport:
+            return False
+        header = HEADER.pack(self.session_id, self.next_send_seq)
+        payload = json.dumps(message, separators=(",", ":")).encode("utf-8")
+        self.transport.sendto(header + _sign(self.session_key, header, payload) + payload)
+        self.next_send_seq = (self.next_send_seq + 1) % SEQ_MODULO
+        return True
+
+    def _on_datagram(self, data: bytes):
+        if len(data) < HEADER.size + TAG_SIZE:
+            return
+        header = data[:HEADER.size]
+        session_id, seq = HEADER.unpack(header)
+        if session_id != self.session_id:
+            return
+        tag = data[HEADER.size:HEADER.size + TAG_SIZE]
+        payload = data[HEADER.size + TAG_SIZE:]
+        if not hmac.compare_digest(tag, _sign(self.session_key, header, payload)):
+            return
+        if not _is_newer_seq(seq, self.last_recv_seq):
+            self.logger.debug(f"Dropping late datagram seq={seq}.")
+            return
+        self.last_recv_seq = seq
+
+        try:
+            msg = json.loads(payload)
+        except (json.JSONDecodeError, UnicodeDecodeError):
+            return
+
+        if msg.get("message", {}).get("message_type") == "datagram_bind_ok":
+            self.bound = True
+            self.logger.debug("Datagram channel bound.")
+            return
+        self.on_message(msg)
+
+    def close(self):
+        if self._bind_task:
+            self._bind_task.cancel()
+            self._bind_task = None
+        if self.transport:
+            self.transport.close()
+            self.transport = None
+        self.bound = False
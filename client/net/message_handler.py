@@ -5,6 +5,9 @@ from typing import Any
 from net.client_network import ClientNetwork
 from speech.tts_manager import TTSManager
 from audio.sound_manager import SoundManager
+from net.world_replica import WorldReplica
+from game.map_data import MapData
+from game.movement_predictor import MovementPredictor
 
 class MessageHandler:
     """
@@ -21,6 +24,9 @@ class MessageHandler:
         self.tts = tts
         self.sound = sound
         self.game_state = game_state
+        self.world = WorldReplica()
+        self.map_data = MapData()
+        self.movement = MovementPredictor(self.map_data)
         self.running = True
 
     async def run(self):
@@ -52,6 +58,14 @@ class MessageHandler:
             username = validated.username
             token = validated.token
             self.game_state["token"] = token
+            self.client_network.set_session(username, validated.resume_token)
+            self.movement.start_session()
+            self.world.reset()
+            if validated.datagram:
+                try:
+                    await self.client_network.enable_datagram(validated.datagram)
+                except OSError as e:
+                    self.logger.warning(f"Datagram channel unavailable, staying on TCP: {e}")
             await self.tts.speak(f"Login successful for {username}.")
             self.sound.play_menu_sound("menu_click.wav")
             # Possibly trigger UI changes in a thread-safe manner
@@ -63,10 +77,83 @@ class MessageHandler:
             await self.tts.speak(f"Account created for {username} with role {role}. You can now log in.")
             self.sound.play_menu_sound("menu_click.wav")
 
+        elif message_type == "session_resume_ok":
+            # Map and player state are still valid; only missed messages follow.
+            # The new connection starts a new snapshot chain.
+            self.world.reset()
+            if validated.datagram:
+                try:
+                    await self.client_network.enable_datagram(validated.datagram)
+                except OSError as e:
+                    self.logger.warning(f"Datagram channel unavailable, staying on TCP: {e}")
+            await self.tts.speak("Reconnected.")
+
+        elif message_type == "session_resume_fail":
+            self.client_network.set_session("", None)
+            await self.tts.speak(f"Connection lost. {validated.reason}")
+
+        elif message_type == "world_snapshot":
+            if not self.world.apply(validated.seq, validated.base, validated.q, validated.entities, validated.removed):
+                self.logger.debug(f"Snapshot {validated.seq} (base {validated.base}) is out of order or has an unknown base, skipped.")
+                return
+            await self.client_network.send_unreliable({
+                "client_id": "",
+                "message": {"message_type": "world_snapshot_ack", "seq": validated.seq}
+            })
+            self.game_state["players"] = self.world.by_name()
+            me = self.world.find(self.client_network.username)
+            # Our own position comes from prediction while moves are in flight.
+            if me and self.movement.accept_authoritative(me["position"]):
+                self.game_state["player_position"] = me["position"]
+
+        elif message_type == "map_state":
+            self.map_data.load_from_dict(validated.dict())
+            me = next((p for p in validated.players if p.get("username") == self.client_network.username), None)
+            self.movement.reset(me["position"] if me else validated.start_position)
+            self.game_state["player_position"] = self.movement.position
+
+        elif message_type in ("user_move_ok", "user_move_fail"):
+            if validated.last_processed_seq is None or validated.position is None:
+                if message_type == "user_move_fail":
+                    await self.tts.speak(validated.reason)
+                return
+            if self.movement.reconcile(validated.last_processed_seq, validated.position):
+                self.logger.debug(f"Position corrected to {self.movement.position}.")
+            self.game_state["player_position"] = self.movement.position
+
+        elif message_type == "user_jump_fail":
+            await self.tts.speak(validated.reason)
+
         # Add more elif cases for other message types
 
         else:
             self.logger.debug(f"No handler for {message_type}.")
 
+    async def move(self, direction) -> bool:
+        """
+        Move the player now and tell the server; see MovementPredictor.
+
+        :return: False if the move is blocked locally and was not sent.
+        """
+        request = self.movement.predict(direction, self.client_network.username, self.game_state.get("token", ""))
+        if request is None:
+            return False
+        self.game_state["player_position"] = self.movement.position
+        await self.client_network.send_unreliable({"client_id": "", "message": request})
+        return True
+
+    async def jump(self):
+        """
+        Ask the server to jump; the fall back down arrives like any other.
+        """
+        await self.client_network.send_request({
+            "client_id": "",
+            "message": {
+                "message_type": "user_jump_request",
+                "username": self.client_network.username,
+                "token": self.game_state.get("token", "")
+            }
+        })
+
     def stop(self):
         self.running = False
@@ -1,6 +1,6 @@
 # net/message_schemas.py
 from pydantic import BaseModel, Field
-from typing import Literal, Optional, Dict, Any, Tuple
+from typing import Literal, Optional, Dict, Any, List, Tuple
 
 class BaseClientMessage(BaseModel):
     client_id: str
@@ -29,6 +29,59 @@ class UserAccountLoginOk(BaseModel):
     message_type: Literal["user_account_login_ok"] = "user_account_login_ok"
     username: str
     token: str
+    datagram: Optional[Dict[str, Any]] = None
+    resume_token: Optional[str] = None
+
+class SessionResumeOk(BaseModel):
+    message_type: Literal["session_resume_ok"] = "session_resume_ok"
+    username: str
+    replayed: int = 0
+    datagram: Optional[Dict[str, Any]] = None
+
+class SessionResumeFail(BaseModel):
+    message_type: Literal["session_resume_fail"] = "session_resume_fail"
+    reason: str
+
+class WorldSnapshot(BaseModel):
+    message_type: Literal["world_snapshot"] = "world_snapshot"
+    seq: int
+    base: int = 0
+    q: Tuple[float, float] = (100, 10)
+    entities: List[Dict[str, Any]] = []
+    removed: List[int] = []
+
+class MapState(BaseModel):
+    message_type: Literal["map_state"] = "map_state"
+    map_name: str
+    map_size: Tuple[float, float, float, float, float, float]
+    start_position: Tuple[float, float, float] = (0.0, 0.0, 0.0)
+    is_public: bool = True
+    owners: List[str] = []
+    tiles: Dict[str, Dict[str, Any]] = {}
+    zones: Dict[str, Dict[str, Any]] = {}
+    players: List[Dict[str, Any]] = []
+
+class UserMoveOk(BaseModel):
+    message_type: Literal["user_move_ok"] = "user_move_ok"
+    username: str
+    position: Tuple[float, float, float]
+    last_processed_seq: Optional[int] = None
+
+class UserMoveFail(BaseModel):
+    message_type: Literal["user_move_fail"] = "user_move_fail"
+    reason: str
+    position: Optional[Tuple[float, float, float]] = None
+    last_processed_seq: Optional[int] = None
+
+class UserJumpOk(BaseModel):
+    message_type: Literal["user_jump_ok"] = "user_jump_ok"
+    username: str
+    position: Tuple[float, float, float]
+    velocity: Tuple[float, float, float]
+
+class UserJumpFail(BaseModel):
+    message_type: Literal["user_jump_fail"] = "user_jump_fail"
+    reason: str
 
 # Add more schemas as needed for map_create_request, map_create_ok, etc.
 
@@ -38,5 +91,13 @@ MESSAGE_TYPE_TO_SCHEMA = {
     "user_account_login_request": UserAccountLoginRequest,
     "user_account_create_ok": UserAccountCreateOk,
     "user_account_login_ok": UserAccountLoginOk,
+    "session_resume_ok": SessionResumeOk,
+    "session_resume_fail": SessionResumeFail,
+    "world_snapshot": WorldSnapshot,
+    "map_state": MapState,
+    "user_move_ok": UserMoveOk,
+    "user_move_fail": UserMoveFail,
+    "user_jump_ok": UserJumpOk,
+    "user_jump_fail": UserJumpFail,
     # Add more as implemented
 }
@@ -0,0 +1,84 @@
+# net/world_replica.py
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+
+class WorldReplica:
+    """
+    Client copy of the replicated world, rebuilt from the server's world_snapshot deltas.
+
+    Each snapshot is a delta against an earlier snapshot (its "base") that this
+    client acknowledged, or a full snapshot when base is 0. The replica keeps the
+    recent snapshots it built so it can apply any delta whose base it still has;
+    a delta against an unknown base is ignored and not acknowledged, and the server
+    keeps encoding against the last acknowledged one. A full snapshot that is not
+    newer than the latest one applied arrived out of order and is ignored too.
+    Snapshot numbers only restart with the server, so the replica is reset() on
+    login and session resume.
+
+    entities maps entity id -> {"name", "kind" ("user" or "ai"), "position", "yaw", "pitch"}
+    for the newest snapshot applied.
+    """
+
+    def __init__(self, history_size: int = 32):
+        self.history_size = history_size
+        self.history: "OrderedDict[int, Dict[int, dict]]" = OrderedDict()
+        self.latest_seq = 0
+        self.entities: Dict[int, dict] = {}
+
+    def reset(self) -> None:
+        self.history.clear()
+        self.latest_seq = 0
+        self.entities = {}
+
+    def apply(self, seq: int, base: int, scale, entities: list, removed: list) -> bool:
+        """
+        :return: True if the snapshot was applied and should be acknowledged.
+        """
+        if base:
+            baseline = self.history.get(base)
+            if baseline is None:
+                return False
+        elif seq <= self.latest_seq:
+            return False
+        else:
+            baseline = {}
+        position_scale, angle_scale = scale
+
+        state = {entity_id: dict(entity) for entity_id, entity in baseline.items()}
+        for entity_id in removed:
+            state.pop(entity_id, None)
+        for delta in entities:
+            entity = state.setdefault(delta["i"], {"name": None, "kind": None, "position": (0.0, 0.0, 0.0), "yaw": 0.0, "pitch": 0.0})
+            if "u" in delta:
+                entity["name"], entity["kind"] = delta["u"], "user"
+            elif "a" in delta:
+                entity["name"], entity["kind"] = delta["a"], "ai"
+            if "p" in delta:
+                entity["position"] = tuple(v / position_scale for v in delta["p"])
+            if "o" in delta:
+                entity["yaw"], entity["pitch"] = (v / angle_scale for v in delta["o"])
+
+        if base == 0:
+            # A full snapshot restarts the chain, e.g. after the server lost our acks.
+            self.history.clear()
+        else:
+            # The server never encodes against a base older than the one it just used.
+            for old in [s for s in self.history if s < base]:
+                del self.history[old]
+        self.history[seq] = state
+        while len(self.history) > self.history_size:
+            self.history.popitem(last=False)
+        if seq > self.latest_seq:
+            self.latest_seq = seq
+            self.entities = state
+        return True
+
+    def find(self, name: str, kind: str = "user") -> Optional[dict]:
+        for entity in self.entities.values():
+            if entity["name"] == name and entity["kind"] == kind:
+                return entity
+        return None
+
+    def by_name(self) -> Dict[str, Dict[str, Any]]:
+        return {entity["name"]: entity for entity in self.entities.values() if entity["kind"] == "user"}
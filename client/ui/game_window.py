@@ -1,9 +1,19 @@
 # ui/game_window.py
+import asyncio
+import math
 import tkinter as tk
 import logging
 from typing import Dict, Any
 from utils.keybinding_manager import KeybindingManager
 
+# Step per move action, relative to the player's facing (forward, left, up).
+MOVE_STEPS = {
+    "move_forward": (1.0, 0.0, 0.0),
+    "move_backward": (-1.0, 0.0, 0.0),
+    "move_left": (0.0, 1.0, 0.0),
+    "move_right": (0.0, -1.0, 0.0),
+}
+
 class GameWindow(tk.Frame):
     """
     The main in-game UI after the user logs in.
@@ -19,6 +29,8 @@ class GameWindow(tk.Frame):
         self.sound = sound_manager
         self.settings = settings
         self.keybinds = keybinding_manager
+        # Set to the MessageHandler once connected; moves are then predicted and sent.
+        self.message_handler = None
 
         self.master = master
         self.master.title("Game Window")
@@ -44,16 +56,38 @@ class GameWindow(tk.Frame):
     def handle_action(self, action: str):
         """
         Handle actions triggered by key presses.
-        For now, we just TTS the action. In the future:
-        - Send move requests to server
-        - Update player position
+        Moves are predicted locally and sent to the server once a message handler
+        is set, and so are jumps; other actions are only announced for now. In the future:
         - Interact with items, etc.
         """
-        # Simple feedback for now
-        self.tts.speak(f"Action: {action}")
         if action.startswith("move_"):
-            self.sound.play_menu_sound("footsteps.wav")
-            # In future: send user_move_request to server, update status
+            if self.message_handler and action in MOVE_STEPS:
+                # Tk events are processed on the asyncio loop (see main.py), so the move can be scheduled here.
+                asyncio.ensure_future(self._move(MOVE_STEPS[action]))
+            else:
+                self.tts.speak(f"Action: {action}")
+                self.sound.play_menu_sound("footsteps.wav")
+        elif action == "jump" and self.message_handler:
+            asyncio.ensure_future(self.message_handler.jump())
         else:
-            # For other actions like jump, interact, etc.
+            self.tts.speak(f"Action: {action}")
+            # For other actions like interact, etc.
             pass
+
+    async def _move(self, step):
+        """
+        Turn a facing-relative step into a world direction and move without waiting for the server.
+        """
+        yaw = math.radians(self.message_handler.game_state.get("yaw", 0.0))
+        forward, left, up = step
+        direction = (
+            forward * math.cos(yaw) - left * math.sin(yaw),
+            forward * math.sin(yaw) + left * math.cos(yaw),
+            up
+        )
+        if await self.message_handler.move(direction):
+            self.sound.play_menu_sound("footsteps.wav")
+            x, y, z = self.message_handler.movement.position
+            self.status_label.config(text=f"Position {x:.1f}, {y:.1f}, {z:.1f}")
+        else:
+            self.tts.speak("Blocked.")
@@ -0,0 +1,115 @@
+# benchmarks/bench_dispatch.py
+"""
+Microbenchmark for EventDispatcher.dispatch.
+
+Compares the current dispatcher against the previous implementation (lock per
+dispatch, list copy, asyncio.gather even for one listener, eager INFO f-string
+logging of the event payload) for one and for three listeners per event.
+
+Run from the server directory:
+    python benchmarks/bench_dispatch.py [--events 200000]
+"""
+import argparse
+import asyncio
+import logging
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from interfaces.dispatch_metrics import DispatchMetrics
+from interfaces.event_dispatcher import EventDispatcher
+
+
+class LegacyEventDispatcher:
+    """
+    The dispatch path as it was before the copy-on-write rework, kept here for comparison.
+    """
+
+    def __init__(self, logger: logging.Logger):
+        self.logger = logger
+        self._listeners = {}
+        self._lock = asyncio.Lock()
+        self.metrics = DispatchMetrics()
+
+    async def subscribe(self, event_type, listener):
+        async with self._lock:
+            self._listeners.setdefault(event_type, []).append(listener)
+
+    async def dispatch(self, event_type, event_data):
+        self.logger.info(f"Dispatching event '{event_type}' with data: {event_data}")
+        stats = self.metrics.event(event_type)
+        stats.begin()
+        started = time.perf_counter()
+        failed = False
+        try:
+            async with self._lock:
+                listeners = self._listeners.get(event_type, [])[:]
+            results = await asyncio.gather(
+                *[self._notify_listener(listener, event_type, event_data, stats) for listener in listeners],
+                return_exceptions=True
+            )
+            for res in results:
+                if isinstance(res, Exception) or res is False:
+                    failed = True
+        finally:
+            stats.end(time.perf_counter() - started, failed)
+
+    async def _notify_listener(self, listener, event_type, event_data, stats):
+        lstats = stats.listener(getattr(listener, "__qualname__", listener.__name__))
+        lstats.begin()
+        started = time.perf_counter()
+        ok = True
+        try:
+            await listener(event_data)
+            self.logger.debug(f"Listener '{listener.__name__}' handled event '{event_type}' successfully.")
+        except Exception as e:
+            ok = False
+            self.logger.exception(f"Error notifying listener '{listener.__name__}' for event '{event_type}': {e}")
+        finally:
+            lstats.end(time.perf_counter() - started, not ok)
+        return ok
+
+
+def make_logger() -> logging.Logger:
+    # INFO level like production, but with no output so I/O does not drown the measurement.
+    logger = logging.getLogger("bench_dispatch")
+    logger.handlers = [logging.NullHandler()]
+    logger.propagate = False
+    logger.setLevel(logging.INFO)
+    return logger
+
+
+async def run(dispatcher_cls, listener_count: int, events: int) -> float:
+    dispatcher = dispatcher_cls(logger=make_logger())
+
+    async def listener(event_data):
+        return None
+
+    for _ in range(listener_count):
+        await dispatcher.subscribe("user_move_request", listener)
+
+    event = {
+        "client_id": "bench",
+        "message": {"message_type": "user_move_request", "username": "bench", "token": "t", "direction": [1, 0, 0], "distance": 1.0}
+    }
+    started = time.perf_counter()
+    for _ in range(events):
+        await dispatcher.dispatch("user_move_request", event)
+    return events / (time.perf_counter() - started)
+
+
+async def main(events: int):
+    print(f"{'listeners':>9} {'legacy/s':>12} {'current/s':>12} {'speedup':>8}")
+    for listener_count in (1, 3):
+        legacy = await run(LegacyEventDispatcher, listener_count, events)
+        current = await run(EventDispatcher, listener_count, events)
+        print(f"{listener_count:>9} {legacy:>12,.0f} {current:>12,.0f} {current / legacy:>7.2f}x")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="EventDispatcher dispatch throughput.")
+    parser.add_argument("--events", type=int, default=200000)
+    args = parser.parse_args()
+    asyncio.run(main(args.events))
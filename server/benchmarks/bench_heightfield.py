@@ -0,0 +1,112 @@
+# benchmarks/bench_heightfield.py
+"""
+Ground lookups through a map's Heightfield against the TileSurfaces scan over
+every tile, at increasing tile counts. The map has a floor, raised platforms and
+bridges over some of them, and a fifth of the entities stand under a bridge so
+the stacked layers (and the scan for cells with more surfaces) are exercised.
+Also times building the grid and applying one tile edit with sync(), and counts
+lookups where the two disagree (only at tile edges, where the heightfield is as
+fine as its resolution).
+
+Run from the server directory:
+    python benchmarks/bench_heightfield.py [--tiles 100 1000 5000] [--entities 1000] [--resolution 1.0] [--layers 4]
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+
+from domain.maps.map import Map
+from domain.maps.tile import Tile
+from domain.physics.batch_physics_engine import TileSurfaces
+from domain.physics.heightfield import Heightfield
+
+SIZE = 500.0
+
+
+def build_map(tiles: int, rng: random.Random) -> Map:
+    game_map = Map("bench", (0.0, SIZE, 0.0, SIZE, 0.0, 50.0))
+    game_map.tiles["floor"] = Tile("grass", (0.0, SIZE, 0.0, SIZE, 0.0, 1.0), False)
+    for i in range(tiles):
+        x, y = rng.uniform(0, SIZE - 20), rng.uniform(0, SIZE - 20)
+        w, d = rng.uniform(2, 20), rng.uniform(2, 20)
+        if i % 4 == 0:
+            # A bridge high over whatever is below it.
+            game_map.tiles[f"t{i}"] = Tile("wood", (x, x + w, y, y + 2.0, 8.0, 8.5), False)
+        elif i % 4 == 1:
+            game_map.tiles[f"t{i}"] = Tile("brick", (x, x + 1.0, y, y + d, 0.0, rng.uniform(1, 4)), True)
+        else:
+            game_map.tiles[f"t{i}"] = Tile(rng.choice(("concrete", "dirt", "mud")), (x, x + w, y, y + d, rng.uniform(1, 5), 6.0), False)
+    return game_map
+
+
+def positions_for(game_map: Map, count: int, rng: random.Random) -> np.ndarray:
+    bridges = [t.tile_position for t in game_map.tiles.values() if t.tile_type == "wood"]
+    rows = []
+    for i in range(count):
+        if bridges and i % 5 == 0:
+            x1, x2, y1, y2, z1, _ = rng.choice(bridges)
+            rows.append((rng.uniform(x1, x2), rng.uniform(y1, y2), rng.uniform(0, z1 - 1)))
+        else:
+            rows.append((rng.uniform(0, SIZE), rng.uniform(0, SIZE), rng.uniform(0, 12)))
+    return np.array(rows)
+
+
+def timed(func, repeat: int) -> float:
+    started = time.perf_counter()
+    for _ in range(repeat):
+        func()
+    return (time.perf_counter() - started) / repeat
+
+
+def main(tile_counts, entity_count: int, resolution: float, layers: int, repeat: int):
+    print(f"{entity_count} entities on a {SIZE:g}x{SIZE:g} map, heightfield resolution {resolution}, {layers} layers")
+    print(f"{'tiles':>6} {'scan ms':>9} {'field ms':>9} {'speedup':>8} {'build ms':>9} {'edit ms':>8} "
+          f"{'memory':>9} {'fallbacks':>10} {'edge diffs':>11}")
+    for tiles in tile_counts:
+        rng = random.Random(tiles)
+        game_map = build_map(tiles, rng)
+        positions = positions_for(game_map, entity_count, rng)
+        surfaces = TileSurfaces(game_map)
+
+        started = time.perf_counter()
+        heightfield = Heightfield(game_map, resolution, layers)
+        build = time.perf_counter() - started
+
+        scan = timed(lambda: surfaces.heights(positions), repeat)
+        before = heightfield.fallbacks
+        field = timed(lambda: heightfield.heights(positions), repeat)
+        fallbacks = (heightfield.fallbacks - before) // repeat
+
+        # One platform moved up and back, as a map editor would.
+        key = f"t{2 if tiles > 2 else 0}"
+        tile = game_map.tiles[key]
+        moved = Tile(tile.tile_type, tile.tile_position[:4] + (tile.tile_position[4] + 1, tile.tile_position[5] + 1), tile.is_wall)
+        started = time.perf_counter()
+        for i in range(repeat):
+            game_map.tiles[key] = moved if i % 2 == 0 else tile
+            heightfield.sync(game_map)
+        edit = (time.perf_counter() - started) / repeat
+        game_map.tiles[key] = tile
+        heightfield.sync(game_map)
+
+        diffs = int(np.count_nonzero(np.abs(surfaces.heights(positions) - heightfield.heights(positions)) > 1e-9))
+        memory = heightfield.memory_bytes / 1024
+        print(f"{tiles:>6} {scan * 1000:>9.3f} {field * 1000:>9.3f} {scan / field:>7.1f}x {build * 1000:>9.2f} "
+              f"{edit * 1000:>8.3f} {memory:>7.0f}KiB {fallbacks:>10} {diffs:>11}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Heightfield vs per-tile ground lookups.")
+    parser.add_argument("--tiles", type=int, nargs="+", default=[100, 1000, 5000])
+    parser.add_argument("--entities", type=int, default=1000)
+    parser.add_argument("--resolution", type=float, default=1.0)
+    parser.add_argument("--layers", type=int, default=4)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+    main(args.tiles, args.entities, args.resolution, args.layers, args.repeat)
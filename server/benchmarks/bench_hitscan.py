@@ -0,0 +1,124 @@
+# benchmarks/bench_hitscan.py
+"""
+Hitscan resolution in a map with 500 entities and scattered wall tiles: the
+grid-indexed cast_ray() against the naive way of testing every entity and every
+wall for each shot. Also checks that both agree on what every shot hits.
+
+Run from the server directory:
+    python benchmarks/bench_hitscan.py [--entities 500] [--walls 2000] [--shots 5000]
+"""
+import argparse
+import math
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+
+from domain.maps.map import Map
+from domain.maps.tile import Tile
+from domain.weapons.hitscan import BoxGrid, aim_direction, cast_ray, entity_boxes, wall_boxes
+
+SIZE = 200.0
+RADIUS, HEIGHT, EYE = 0.4, 1.8, 1.6
+
+
+def build_map(walls: int, rng: random.Random) -> Map:
+    game_map = Map("bench", (0.0, SIZE, 0.0, SIZE, 0.0, 10.0))
+    game_map.tiles["floor"] = Tile("grass", (0.0, SIZE, 0.0, SIZE, 0.0, 0.0), False)
+    for i in range(walls):
+        x, y = rng.uniform(0, SIZE - 4), rng.uniform(0, SIZE - 4)
+        if rng.random() < 0.5:
+            position = (x, x + rng.uniform(1, 4), y, y + 0.3, 0.0, 3.0)
+        else:
+            position = (x, x + 0.3, y, y + rng.uniform(1, 4), 0.0, 3.0)
+        game_map.tiles[f"wall{i}"] = Tile("brick", position, True)
+    return game_map
+
+
+def slab(lo, hi, origin, direction, max_distance):
+    enter, leave = 0.0, max_distance
+    for axis in range(3):
+        if direction[axis] == 0.0:
+            if not lo[axis] <= origin[axis] <= hi[axis]:
+                return math.inf
+            continue
+        a = (lo[axis] - origin[axis]) / direction[axis]
+        b = (hi[axis] - origin[axis]) / direction[axis]
+        enter, leave = max(enter, min(a, b)), min(leave, max(a, b))
+        if enter > leave:
+            return math.inf
+    return enter
+
+
+def naive(origin, direction, max_distance, walls, entities, skip):
+    """Every wall and every entity, one at a time."""
+    nearest_wall = min((slab(lo, hi, origin, direction, max_distance) for lo, hi in walls), default=math.inf)
+    best, best_distance = None, math.inf
+    for i, (lo, hi) in enumerate(entities):
+        if i == skip:
+            continue
+        distance = slab(lo, hi, origin, direction, max_distance)
+        if distance < best_distance:
+            best, best_distance = i, distance
+    return best if best_distance < nearest_wall else None
+
+
+def main(entity_count: int, wall_count: int, shots: int, cell_size: float, weapon_range: float):
+    rng = random.Random(7)
+    game_map = build_map(wall_count, rng)
+    positions = np.array([(rng.uniform(0, SIZE), rng.uniform(0, SIZE), 0.0) for _ in range(entity_count)])
+    wall_lo, wall_hi = wall_boxes(game_map)
+    entity_lo, entity_hi = entity_boxes(positions, RADIUS, HEIGHT)
+    # Shots come from random entities, aimed at another entity (mostly) or anywhere.
+    plans = []
+    for _ in range(shots):
+        shooter = rng.randrange(entity_count)
+        origin = positions[shooter] + (0.0, 0.0, EYE)
+        if rng.random() < 0.7:
+            dx, dy, dz = positions[rng.randrange(entity_count)] + (0.0, 0.0, 1.0) - origin
+            yaw, pitch = math.degrees(math.atan2(dy, dx)), math.degrees(math.atan2(dz, math.hypot(dx, dy)))
+        else:
+            yaw, pitch = rng.uniform(-180, 180), rng.uniform(-10, 10)
+        plans.append((shooter, tuple(origin), aim_direction(yaw, pitch)))
+
+    started = time.perf_counter()
+    wall_grid = BoxGrid(wall_lo, wall_hi, cell_size)
+    wall_build = time.perf_counter() - started
+    started = time.perf_counter()
+    entity_grid = BoxGrid(entity_lo, entity_hi, cell_size)
+    entity_build = time.perf_counter() - started
+
+    started = time.perf_counter()
+    indexed = [cast_ray(origin, direction, weapon_range, wall_grid, entity_grid, skip=shooter).entity
+               for shooter, origin, direction in plans]
+    indexed_time = time.perf_counter() - started
+
+    walls = list(zip(wall_lo.tolist(), wall_hi.tolist()))
+    entities = list(zip(entity_lo.tolist(), entity_hi.tolist()))
+    started = time.perf_counter()
+    expected = [naive(origin, direction, weapon_range, walls, entities, shooter) for shooter, origin, direction in plans]
+    naive_time = time.perf_counter() - started
+
+    mismatches = sum(1 for a, b in zip(indexed, expected) if a != b)
+    hits = sum(1 for a in indexed if a is not None)
+    print(f"{entity_count} entities, {wall_count} walls, {shots} shots, range {weapon_range}, {cell_size} unit cells")
+    print(f"grid build: walls {wall_build * 1000:.2f}ms, entities {entity_build * 1000:.2f}ms")
+    print(f"{'method':<10} {'us/shot':>10} {'shots/s':>12}")
+    print(f"{'naive':<10} {naive_time / shots * 1e6:>10.1f} {shots / naive_time:>12,.0f}")
+    print(f"{'indexed':<10} {indexed_time / shots * 1e6:>10.1f} {shots / indexed_time:>12,.0f}")
+    print(f"speedup {naive_time / indexed_time:.1f}x, hits {hits}/{shots}, mismatches {mismatches}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Hitscan resolution throughput.")
+    parser.add_argument("--entities", type=int, default=500)
+    parser.add_argument("--walls", type=int, default=2000)
+    parser.add_argument("--shots", type=int, default=5000)
+    parser.add_argument("--cell-size", type=float, default=4.0)
+    parser.add_argument("--range", type=float, default=100.0)
+    args = parser.parse_args()
+    main(args.entities, args.walls, args.shots, args.cell_size, args.range)
@@ -0,0 +1,97 @@
+# benchmarks/bench_physics.py
+"""
+Per-tick cost of BatchPhysicsEngine (ground lookup + one vectorized step) at
+1k, 10k and 100k entities, next to the per-entity PhysicsEngine loop the
+simulation used before. Half the entities start airborne; the map has a floor
+and a grid of raised platforms.
+
+Run from the server directory:
+    python benchmarks/bench_physics.py [--entities 1000 10000 100000] [--ticks 100] [--platforms 64]
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from domain.maps.map import Map
+from domain.maps.tile import Tile
+from domain.physics.batch_physics_engine import BatchPhysicsEngine, TileSurfaces
+from domain.physics.physics_engine import PhysicsEngine
+
+# The scalar loop is only run up to this many entities; beyond it one tick takes seconds.
+SCALAR_LIMIT = 10000
+
+
+def build_map(platforms: int) -> Map:
+    game_map = Map("bench", (0, 999, 0, 999, 0, 50), (0, 0, 0))
+    game_map.physics.air_resistance = 0.1
+    game_map.physics.friction = 0.5
+    game_map.tiles["floor"] = Tile("grass", (0, 999, 0, 999, 0, 1), False)
+    side = max(1, int(platforms ** 0.5))
+    for i in range(platforms):
+        x, y = (i % side) * 40.0, (i // side) * 40.0
+        game_map.tiles[f"p{i}"] = Tile("wood", (x, x + 20, y, y + 20, 3, 4), False)
+    return game_map
+
+
+def start_positions(count: int, seed: int = 1) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    positions = np.column_stack([rng.uniform(0, 999, count), rng.uniform(0, 999, count), np.zeros(count)])
+    positions[::2, 2] = rng.uniform(5, 40, len(positions[::2]))
+    return positions
+
+
+def run_batch(game_map: Map, positions: np.ndarray, ticks: int, dt: float) -> float:
+    engine = BatchPhysicsEngine(capacity=len(positions))
+    rng = np.random.default_rng(2)
+    for i, position in enumerate(positions):
+        engine.add(i, position, velocity=(rng.uniform(-2, 2), rng.uniform(-2, 2), 0.0))
+    surfaces = TileSurfaces(game_map)
+    started = time.perf_counter()
+    for _ in range(ticks):
+        ground = surfaces.heights(engine.positions[:engine.count])
+        engine.step(game_map.physics, dt, ground)
+    return (time.perf_counter() - started) / ticks
+
+
+def run_scalar(game_map: Map, positions: np.ndarray, ticks: int, dt: float) -> float:
+    engine = PhysicsEngine()
+    states = [(tuple(p), (0.0, 0.0, 0.0)) for p in positions.tolist()]
+    started = time.perf_counter()
+    for _ in range(ticks):
+        for i, (position, velocity) in enumerate(states):
+            ground = engine.ground_height(game_map, position)
+            position, velocity = engine.apply_gravity(position, velocity, game_map.physics, dt)
+            position, velocity, _ = engine.resolve_ground_contact(position, velocity, ground)
+            states[i] = (position, velocity)
+    return (time.perf_counter() - started) / ticks
+
+
+def main(entity_counts, ticks: int, platforms: int, tick_rate: float):
+    game_map = build_map(platforms)
+    dt = 1.0 / tick_rate
+    budget_ms = 1000.0 / tick_rate
+    print(f"{len(game_map.tiles)} tiles, {ticks} ticks at {tick_rate:g} Hz (budget {budget_ms:.1f} ms/tick)")
+    print(f"{'entities':>9} {'batch ms/tick':>14} {'scalar ms/tick':>15} {'speedup':>8}")
+    for count in entity_counts:
+        positions = start_positions(count)
+        batch = run_batch(game_map, positions, ticks, dt) * 1000
+        if count <= SCALAR_LIMIT:
+            scalar = run_scalar(game_map, positions, max(1, ticks // 10), dt) * 1000
+            print(f"{count:>9,} {batch:>14.3f} {scalar:>15.3f} {scalar / batch:>7.1f}x")
+        else:
+            print(f"{count:>9,} {batch:>14.3f} {'-':>15} {'-':>8}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Batched vs per-entity physics tick cost.")
+    parser.add_argument("--entities", type=int, nargs="+", default=[1000, 10000, 100000])
+    parser.add_argument("--ticks", type=int, default=100)
+    parser.add_argument("--platforms", type=int, default=64)
+    parser.add_argument("--tick-rate", type=float, default=30.0)
+    args = parser.parse_args()
+    main(args.entities, args.ticks, args.platforms, args.tick_rate)
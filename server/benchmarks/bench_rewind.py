@@ -0,0 +1,79 @@
+# benchmarks/bench_rewind.py
+"""
+Cost of lag compensation: recording every tick of a map into its RewindBuffer
+and querying the world at a past time, with the buffer's memory footprint.
+Entities move every tick and a few join and leave, as in a busy map.
+
+Run from the server directory:
+    python benchmarks/bench_rewind.py [--entities 500] [--tick-rate 30] [--seconds 1] [--ticks 3000]
+"""
+import argparse
+import math
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+
+from domain.physics.rewind_buffer import RewindBuffer
+
+
+def main(entity_count: int, tick_rate: float, seconds: float, ticks: int, churn: float):
+    rng = random.Random(3)
+    frames = max(2, math.ceil(seconds * tick_rate))
+    buffer = RewindBuffer(frames)
+    keys = [f"user:{i}" for i in range(entity_count)]
+    positions = np.random.default_rng(3).uniform(0, 200, (entity_count, 3))
+    velocity = np.random.default_rng(4).uniform(-5, 5, (entity_count, 3))
+    next_id, version = entity_count, 0
+    timestep = 1.0 / tick_rate
+
+    record_time = 0.0
+    for tick in range(ticks):
+        positions += velocity * timestep
+        if rng.random() < churn:
+            # One entity leaves, another joins.
+            gone = rng.randrange(len(keys))
+            keys[gone] = f"user:{next_id}"
+            next_id += 1
+            version += 1
+        started = time.perf_counter()
+        buffer.record(tick * timestep, keys, positions, version)
+        record_time += time.perf_counter() - started
+
+    now = (ticks - 1) * timestep
+    queries = 2000
+    query_time = 0.0
+    worst = 0.0
+    for _ in range(queries):
+        rewind = rng.uniform(0.0, seconds)
+        started = time.perf_counter()
+        past_keys, past_positions = buffer.at(now - rewind)
+        elapsed = time.perf_counter() - started
+        query_time += elapsed
+        worst = max(worst, elapsed)
+    # Sanity check: the newest frame is the current world.
+    current_keys, current_positions = buffer.at(now)
+    order = {key: i for i, key in enumerate(current_keys)}
+    error = float(np.abs(current_positions[[order[k] for k in keys]] - positions).max())
+
+    stats = buffer.get_stats()
+    print(f"{entity_count} entities at {tick_rate} Hz, {frames} frames ({stats['seconds']}s), churn {churn:.0%} of ticks")
+    print(f"memory: {stats['memory_bytes'] / 1024:.1f} KiB in {stats['slots']} slots")
+    print(f"record: {record_time / ticks * 1e6:.1f} us/tick ({record_time / ticks * tick_rate * 100:.3f}% of a core)")
+    print(f"query:  {query_time / queries * 1e6:.1f} us mean, {worst * 1e6:.1f} us worst")
+    print(f"newest frame max error vs live positions: {error:.4f} (float32 storage)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Rewind buffer overhead.")
+    parser.add_argument("--entities", type=int, default=500)
+    parser.add_argument("--tick-rate", type=float, default=30.0)
+    parser.add_argument("--seconds", type=float, default=1.0)
+    parser.add_argument("--ticks", type=int, default=3000)
+    parser.add_argument("--churn", type=float, default=0.05)
+    args = parser.parse_args()
+    main(args.entities, args.tick_rate, args.seconds, args.ticks, args.churn)
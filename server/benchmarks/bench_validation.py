@@ -0,0 +1,58 @@
+# benchmarks/bench_validation.py
+"""
+Validation throughput of the precompiled fast validators against the pydantic
+schemas they replace on the hot path (build the model, then model_dump() it back).
+Also checks that both paths produce the same normalised message.
+
+Run from the server directory:
+    python benchmarks/bench_validation.py [--iterations 200000]
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from schemas import FAST_VALIDATORS, MESSAGE_TYPE_TO_SCHEMA
+
+SAMPLES = {
+    "user_move_request": {"message_type": "user_move_request", "username": "bench", "token": "t" * 140, "direction": [1, 0.5, 0]},
+    "user_turn_request": {"message_type": "user_turn_request", "username": "bench", "token": "t" * 140, "yaw_change": 5},
+    "chat_message": {"message_type": "chat_message", "username": "bench", "token": "t" * 140, "chat_category": "map", "text": "hello there", "map_name": "Main"},
+}
+
+
+def run_pydantic(schema, sample: dict, iterations: int) -> float:
+    started = time.perf_counter()
+    for _ in range(iterations):
+        schema(**dict(sample)).model_dump()
+    return iterations / (time.perf_counter() - started)
+
+
+def run_fast(validator, sample: dict, iterations: int) -> float:
+    started = time.perf_counter()
+    for _ in range(iterations):
+        validator(dict(sample))
+    return iterations / (time.perf_counter() - started)
+
+
+def main(iterations: int):
+    print(f"{'message_type':<20} {'pydantic/s':>12} {'fast/s':>12} {'speedup':>8}")
+    for message_type, sample in SAMPLES.items():
+        schema = MESSAGE_TYPE_TO_SCHEMA[message_type]
+        validator = FAST_VALIDATORS[message_type]
+        expected = schema(**dict(sample)).model_dump()
+        actual = validator(dict(sample))
+        if expected != actual:
+            print(f"{message_type}: output differs\n  pydantic: {expected}\n  fast:     {actual}")
+        slow = run_pydantic(schema, sample, iterations)
+        fast = run_fast(validator, sample, iterations)
+        print(f"{message_type:<20} {slow:>12,.0f} {fast:>12,.0f} {fast / slow:>7.1f}x")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Message validation throughput.")
+    parser.add_argument("--iterations", type=int, default=200000)
+    args = parser.parse_args()
+    main(args.iterations)
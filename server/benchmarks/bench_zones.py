@@ -0,0 +1,108 @@
+# benchmarks/bench_zones.py
+"""
+Zone lookups through a map's ZoneIndex against testing every zone with
+Zone.contains_point, at increasing zone counts. Most positions are in no zone,
+as on a real map; some are dropped inside a random zone so overlaps and zone
+edges are exercised. Also times building the index and re-syncing it after one
+zone is moved, and counts positions where the two disagree (there should be none).
+
+Run from the server directory:
+    python benchmarks/bench_zones.py [--zones 10 100 1000] [--entities 1000] [--cell-size 8.0]
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from domain.maps.map import Map
+from domain.maps.zone import Zone
+from domain.maps.zone_index import ZoneIndex
+
+SIZE = 500.0
+
+
+def build_map(zones: int, rng: random.Random) -> Map:
+    game_map = Map("bench", (0.0, SIZE, 0.0, SIZE, 0.0, 50.0))
+    for i in range(zones):
+        x, y = rng.uniform(0, SIZE - 30), rng.uniform(0, SIZE - 30)
+        w, d = rng.uniform(2, 30), rng.uniform(2, 30)
+        if i % 5 == 0:
+            game_map.zones[f"z{i}"] = Zone(f"Door {i}", (x, x + 2.0, y, y + 2.0, 0.0, 4.0), zone_type="door",
+                                           destination_map="elsewhere", destination_coords=(1.0, 1.0, 0.0))
+        else:
+            game_map.zones[f"z{i}"] = Zone(f"Area {i}", (x, x + w, y, y + d, 0.0, rng.uniform(5, 20)), is_safe=i % 2 == 0)
+    return game_map
+
+
+def positions_for(game_map: Map, count: int, rng: random.Random) -> list:
+    zones = list(game_map.zones.values())
+    positions = []
+    for i in range(count):
+        if zones and i % 4 == 0:
+            x1, x2, y1, y2, z1, z2 = rng.choice(zones).bounds
+            positions.append((rng.uniform(x1, x2), rng.uniform(y1, y2), rng.uniform(z1, z2)))
+        else:
+            positions.append((rng.uniform(0, SIZE), rng.uniform(0, SIZE), rng.uniform(0, 10)))
+    return positions
+
+
+def scan(game_map: Map, positions: list) -> list:
+    return [
+        frozenset(key for key, zone in game_map.zones.items() if zone.contains_point(*position))
+        for position in positions
+    ]
+
+
+def timed(func, repeat: int) -> float:
+    started = time.perf_counter()
+    for _ in range(repeat):
+        func()
+    return (time.perf_counter() - started) / repeat
+
+
+def main(zone_counts, entity_count: int, cell_size: float, repeat: int):
+    print(f"{entity_count} entities on a {SIZE:g}x{SIZE:g} map, cell size {cell_size}")
+    print(f"{'zones':>6} {'scan ms':>9} {'index ms':>9} {'speedup':>8} {'build ms':>9} {'edit ms':>8} "
+          f"{'cells':>7} {'entries':>8} {'mismatches':>11}")
+    for zones in zone_counts:
+        rng = random.Random(zones)
+        game_map = build_map(zones, rng)
+        positions = positions_for(game_map, entity_count, rng)
+
+        started = time.perf_counter()
+        index = ZoneIndex(game_map, cell_size)
+        build = time.perf_counter() - started
+
+        scanned = timed(lambda: scan(game_map, positions), repeat)
+        indexed = timed(lambda: [index.zones_at(p) for p in positions], repeat)
+
+        # One zone moved and back, as a map editor would.
+        key = "z1" if zones > 1 else "z0"
+        zone = game_map.zones[key]
+        b = zone.bounds
+        moved = Zone(zone.zone_label, (b[0] + 5, b[1] + 5, b[2], b[3], b[4], b[5]), zone.is_safe, zone.is_hazard)
+        started = time.perf_counter()
+        for i in range(repeat):
+            game_map.zones[key] = moved if i % 2 == 0 else zone
+            index.sync(game_map)
+        edit = (time.perf_counter() - started) / repeat
+        game_map.zones[key] = zone
+        index.sync(game_map)
+
+        mismatches = sum(a != b for a, b in zip(scan(game_map, positions), (index.zones_at(p) for p in positions)))
+        stats = index.get_stats()
+        print(f"{zones:>6} {scanned * 1000:>9.3f} {indexed * 1000:>9.3f} {scanned / indexed:>7.1f}x {build * 1000:>9.2f} "
+              f"{edit * 1000:>8.3f} {stats['cells']:>7} {stats['entries']:>8} {mismatches:>11}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="ZoneIndex vs per-zone lookups.")
+    parser.add_argument("--zones", type=int, nargs="+", default=[10, 100, 1000])
+    parser.add_argument("--entities", type=int, default=1000)
+    parser.add_argument("--cell-size", type=float, default=8.0)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+    main(args.zones, args.entities, args.cell_size, args.repeat)
@@ -1,5 +1,5 @@
 # domain/ai/ai_entity.py
-from typing import Tuple
+from typing import Optional, Tuple
 
 class AIEntity:
     """
@@ -12,15 +12,19 @@ class AIEntity:
     - health: Current health points.
     - speed: Movement speed.
     - role: Optional role or AI type (e.g., "guard", "monster").
+    - map_name: The map the entity lives in, or None if it is not placed in a map.
+    - behavior: Name of the autonomous behavior the AI scheduler runs for it (see domain/ai/behaviors.py).
     """
 
-    def __init__(self, ai_id: str, name: str, position: Tuple[int, int, int], health: int, speed: float, role: str = "npc"):
+    def __init__(self, ai_id: str, name: str, position: Tuple[int, int, int], health: int, speed: float, role: str = "npc", map_name: Optional[str] = None, behavior: str = "idle"):
         self.ai_id = ai_id
         self.name = name
         self.position = position
         self.health = health
         self.speed = speed
         self.role = role
+        self.map_name = map_name
+        self.behavior = behavior
 
     def move(self, dx: float, dy: float, dz: float):
         """
@@ -43,7 +47,9 @@ class AIEntity:
             "position": self.position,
             "health": self.health,
             "speed": self.speed,
-            "role": self.role
+            "role": self.role,
+            "map_name": self.map_name,
+            "behavior": self.behavior
         }
 
     @classmethod
@@ -54,5 +60,7 @@ class AIEntity:
             position=tuple(data["position"]),
             health=data["health"],
             speed=data["speed"],
-            role=data.get("role", "npc")
+            role=data.get("role", "npc"),
+            map_name=data.get("map_name"),
+            behavior=data.get("behavior", "idle")
         )
@@ -0,0 +1,142 @@
+# domain/ai/behaviors.py
+import math
+import random
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from domain.ai.ai_entity import AIEntity
+
+Vector3 = Tuple[float, float, float]
+
+
+class AgentState:
+    """
+    Per-entity state kept between updates: the behavior's scratch data plus
+    what the scheduler needs (when it last ran, how often it should run and the
+    velocity it last chose).
+    """
+
+    def __init__(self, ai: AIEntity, seed: Optional[int] = None):
+        self.ai = ai
+        self.home: Vector3 = tuple(float(v) for v in ai.position)
+        self.target: Optional[Vector3] = None
+        self.path: List[Vector3] = []
+        # A path search still in progress (see BehaviorContext.plan_path).
+        self.search = None
+        self.wait = 0.0
+        self.rng = random.Random(seed if seed is not None else hash(ai.ai_id))
+        self.last_tick = 0
+        self.interval = 1
+        self.velocity: Tuple[float, float] = (0.0, 0.0)
+
+
+class BehaviorContext:
+    """
+    What a behavior may ask about the world during an update.
+
+    :param is_walkable: Returns whether an entity can stand at a position.
+    :param plan_path: Optional; starts a path search from a start to a goal position
+                      around walls. The search's advance(deadline) runs it until the
+                      deadline and returns whether it finished; its path is then the
+                      waypoints, or None if the goal can't be reached.
+    :param deadline: time.perf_counter() value by which this update's searches pause.
+    """
+
+    def __init__(
+        self,
+        is_walkable: Callable[[Vector3], bool],
+        plan_path: Optional[Callable[[Vector3, Vector3], Any]] = None,
+        deadline: float = math.inf
+    ):
+        self.is_walkable = is_walkable
+        self.plan_path = plan_path
+        self.deadline = deadline
+
+
+class Behavior:
+    """
+    A behavior decides an AI's horizontal velocity; the physics step moves it.
+    dt is the time since this entity's previous update, which grows when the
+    scheduler updates it less often.
+    """
+
+    def update(self, state: AgentState, position: Vector3, context: BehaviorContext, dt: float) -> Tuple[float, float]:
+        raise NotImplementedError
+
+
+class Idle(Behavior):
+    def update(self, state, position, context, dt):
+        return 0.0, 0.0
+
+
+class Wander(Behavior):
+    """
+    Walk to random walkable points within radius of where the entity started,
+    pausing for up to max_pause seconds between them. With pathfinding the walk
+    follows the path's waypoints; without it, it heads straight for the point.
+    The entity stands still while a search that ran out of time is resumed on
+    its next updates.
+    """
+
+    def __init__(self, radius: float = 10.0, max_pause: float = 3.0, attempts: int = 8, arrive_distance: float = 0.5):
+        self.radius = radius
+        self.max_pause = max_pause
+        self.attempts = attempts
+        self.arrive_distance = arrive_distance
+
+    def update(self, state, position, context, dt):
+        if state.wait > 0:
+            state.wait -= dt
+            return 0.0, 0.0
+        if state.target is None:
+            state.target = self._pick_target(state, context)
+            if state.target is None:
+                return 0.0, 0.0
+            if context.plan_path:
+                state.search = context.plan_path(position, state.target)
+            else:
+                state.path = [state.target]
+        if state.search is not None:
+            if not state.search.advance(context.deadline):
+                return 0.0, 0.0
+            state.path = state.search.path or []
+            state.search = None
+            if not state.path:
+                state.target = None
+                return 0.0, 0.0
+        waypoint = state.path[0]
+        dx = waypoint[0] - position[0]
+        dy = waypoint[1] - position[1]
+        distance = math.hypot(dx, dy)
+        while distance <= self.arrive_distance:
+            state.path.pop(0)
+            if not state.path:
+                state.target = None
+                state.wait = state.rng.uniform(0.0, self.max_pause)
+                return 0.0, 0.0
+            waypoint = state.path[0]
+            dx = waypoint[0] - position[0]
+            dy = waypoint[1] - position[1]
+            distance = math.hypot(dx, dy)
+        # Don't overshoot when updates are sparse; the velocity holds until the next update.
+        speed = min(state.ai.speed, distance / dt) if dt > 0 else state.ai.speed
+        return dx / distance * speed, dy / distance * speed
+
+    def _pick_target(self, state: AgentState, context: BehaviorContext) -> Optional[Vector3]:
+        hx, hy, hz = state.home
+        for _ in range(self.attempts):
+            angle = state.rng.uniform(0.0, 2 * math.pi)
+            reach = self.radius * math.sqrt(state.rng.random())
+            candidate = (hx + math.cos(angle) * reach, hy + math.sin(angle) * reach, hz)
+            if context.is_walkable(candidate):
+                return candidate
+        return None
+
+
+BEHAVIORS: Dict[str, Behavior] = {
+    "idle": Idle(),
+    "wander": Wander()
+}
+
+
+def get_behavior(name: Optional[str]) -> Behavior:
+    return BEHAVIORS.get(name or "idle", BEHAVIORS["idle"])
@@ -0,0 +1,131 @@
+# domain/maps/interest_grid.py
+import math
+from typing import Dict, Hashable, Iterable, List, Set, Tuple
+
+
+class InterestGrid:
+    """
+    Area-of-interest tracking for one map on a uniform x/y grid.
+
+    Entities are bucketed by the grid cell of their position; a move only touches
+    the buckets when the entity changes cell. Each entity's neighbours are the
+    entities within radius of it (3D distance), and the relation is kept
+    symmetric, so the neighbours of X are exactly the entities that should hear X.
+
+    To stop entities on the boundary from flickering in and out, a neighbour is
+    only dropped once it is farther than radius + leave_margin.
+    """
+
+    def __init__(self, radius: float, cell_size: float = None, leave_margin: float = 0.0):
+        if radius <= 0:
+            raise ValueError("radius must be positive.")
+        self.radius = radius
+        self.leave_radius = radius + max(0.0, leave_margin)
+        self.cell_size = cell_size or radius
+        self._cells: Dict[Tuple[int, int], Set[Hashable]] = {}
+        self._positions: Dict[Hashable, Tuple[float, float, float]] = {}
+        self._entity_cells: Dict[Hashable, Tuple[int, int]] = {}
+        self._neighbours: Dict[Hashable, Set[Hashable]] = {}
+
+    def __len__(self) -> int:
+        return len(self._positions)
+
+    def __contains__(self, entity_id: Hashable) -> bool:
+        return entity_id in self._positions
+
+    def _cell(self, position) -> Tuple[int, int]:
+        return (math.floor(position[0] / self.cell_size), math.floor(position[1] / self.cell_size))
+
+    def position_of(self, entity_id: Hashable) -> Tuple[float, float, float]:
+        return self._positions[entity_id]
+
+    def neighbours(self, entity_id: Hashable) -> Set[Hashable]:
+        return self._neighbours.get(entity_id, set())
+
+    def query(self, position, radius: float = None) -> List[Hashable]:
+        """
+        Entities within radius (default: the hearing radius) of position.
+        """
+        radius = self.radius if radius is None else radius
+        reach = math.ceil(radius / self.cell_size)
+        cx, cy = self._cell(position)
+        x, y, z = position
+        limit = radius * radius
+        found = []
+        for gx in range(cx - reach, cx + reach + 1):
+            for gy in range(cy - reach, cy + reach + 1):
+                for other in self._cells.get((gx, gy), ()):
+                    ox, oy, oz = self._positions[other]
+                    if (ox - x) ** 2 + (oy - y) ** 2 + (oz - z) ** 2 <= limit:
+                        found.append(other)
+        return found
+
+    def update(self, entity_id: Hashable, position) -> Tuple[Set[Hashable], Set[Hashable]]:
+        """
+        Insert or move an entity and refresh its neighbours.
+
+        :return: (entered, left) - entities that came into or went out of range of
+                 entity_id. The relation is symmetric, so entity_id likewise entered
+                 or left the range of each of them.
+        """
+        position = (float(position[0]), float(position[1]), float(position[2]))
+        cell = self._cell(position)
+        old_cell = self._entity_cells.get(entity_id)
+        if old_cell != cell:
+            if old_cell is not None:
+                self._discard_from_cell(entity_id, old_cell)
+            self._cells.setdefault(cell, set()).add(entity_id)
+            self._entity_cells[entity_id] = cell
+        self._positions[entity_id] = position
+
+        old = self._neighbours.get(entity_id, set())
+        near = set(self.query(position))
+        near.discard(entity_id)
+        keep_limit = self.leave_radius * self.leave_radius
+        x, y, z = position
+        for other in old - near:
+            ox, oy, oz = self._positions[other]
+            if (ox - x) ** 2 + (oy - y) ** 2 + (oz - z) ** 2 <= keep_limit:
+                near.add(other)
+
+        entered = near - old
+        left = old - near
+        for other in entered:
+            self._neighbours.setdefault(other, set()).add(entity_id)
+        for other in left:
+            self._neighbours[other].discard(entity_id)
+        self._neighbours[entity_id] = near
+        return entered, left
+
+    def remove(self, entity_id: Hashable) -> Set[Hashable]:
+        """
+        Remove an entity.
+
+        :return: The entities that had it in range.
+        """
+        if entity_id not in self._positions:
+            return set()
+        self._discard_from_cell(entity_id, self._entity_cells.pop(entity_id))
+        del self._positions[entity_id]
+        former = self._neighbours.pop(entity_id, set())
+        for other in former:
+            self._neighbours[other].discard(entity_id)
+        return former
+
+    def _discard_from_cell(self, entity_id: Hashable, cell: Tuple[int, int]) -> None:
+        bucket = self._cells.get(cell)
+        if bucket is not None:
+            bucket.discard(entity_id)
+            if not bucket:
+                del self._cells[cell]
+
+    def entities(self) -> Iterable[Hashable]:
+        return self._positions.keys()
+
+    def get_stats(self) -> dict:
+        links = sum(len(n) for n in self._neighbours.values())
+        return {
+            "entities": len(self._positions),
+            "cells": len(self._cells),
+            "average_neighbours": round(links / len(self._positions), 2) if self._positions else 0.0
+        }
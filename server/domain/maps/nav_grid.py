@@ -0,0 +1,401 @@
+# domain/maps/nav_grid.py
+import heapq
+import math
+from collections import OrderedDict
+from typing import Dict, Hashable, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+Cell = Tuple[int, int]
+# Inclusive cell rectangle: (i0, i1, j0, j1).
+Region = Tuple[int, int, int, int]
+
+SQRT2 = math.sqrt(2.0)
+
+
+class NavGrid:
+    """
+    Walkable occupancy of a map on a uniform x/y grid, for path queries.
+
+    Cell (i, j) covers x in [x1 + i * cell_size, x1 + (i + 1) * cell_size) and the
+    same for y, where (x1, y1) is the map's lower corner. A cell is blocked when
+    any wall tile overlaps it; tile bounds are inclusive, like the map size, so a
+    wall from x=10 to x=20 blocks 11 cells. Walls block at every height: this is
+    ground navigation, not flight over wall tops.
+
+    Paths are found with jump point search (A* that skips over the symmetric runs
+    of open cells) with 8-way moves that never cut a blocked corner. For each of
+    the four straight directions the grid keeps a table marking the cells where a
+    straight scan has to stop (a blocked cell or one with a forced neighbour), so
+    a straight jump is a single bytearray.find() instead of a cell-by-cell walk.
+    """
+
+    def __init__(self, game_map, cell_size: float = 1.0):
+        self.cell_size = float(cell_size)
+        x1, x2, y1, y2, z1, z2 = game_map.map_size
+        self.origin = (x1, y1)
+        self.width = max(1, int(math.floor((x2 - x1) / self.cell_size)) + 1)
+        self.height = max(1, int(math.floor((y2 - y1) / self.cell_size)) + 1)
+        self.map_size = tuple(game_map.map_size)
+        # open[j, i] is cell (i, j).
+        self.open = np.ones((self.height, self.width), dtype=bool)
+        self._walls: Dict[str, Tuple[float, ...]] = {}
+        # Counts syncs, so a search paused across one can tell the walls moved.
+        self.revision = 0
+        self.sync(game_map)
+
+    def __len__(self) -> int:
+        return self.width * self.height
+
+    # Geometry
+
+    def cell_of(self, position) -> Cell:
+        return (
+            int(math.floor((position[0] - self.origin[0]) / self.cell_size)),
+            int(math.floor((position[1] - self.origin[1]) / self.cell_size))
+        )
+
+    def centre_of(self, cell: Cell) -> Tuple[float, float]:
+        return (
+            self.origin[0] + (cell[0] + 0.5) * self.cell_size,
+            self.origin[1] + (cell[1] + 0.5) * self.cell_size
+        )
+
+    def is_open(self, i: int, j: int) -> bool:
+        return 0 <= i < self.width and 0 <= j < self.height and self.walkable[j * self.width + i] == 1
+
+    def is_walkable(self, position) -> bool:
+        return self.is_open(*self.cell_of(position))
+
+    def region_of(self, bounds) -> Optional[Region]:
+        """
+        Cells overlapped by tile bounds (x1, x2, y1, y2, ...), clipped to the grid.
+        """
+        i0, j0 = self.cell_of((bounds[0], bounds[2]))
+        i1, j1 = self.cell_of((bounds[1], bounds[3]))
+        i0, j0 = max(i0, 0), max(j0, 0)
+        i1, j1 = min(i1, self.width - 1), min(j1, self.height - 1)
+        if i0 > i1 or j0 > j1:
+            return None
+        return i0, i1, j0, j1
+
+    # Building
+
+    def sync(self, game_map) -> List[Region]:
+        """
+        Bring the grid up to date with the map's wall tiles.
+
+        Only cells under walls that were added, removed or moved since the last
+        sync are recomputed.
+
+        :return: The regions whose walkability may have changed.
+        """
+        walls = {key: tile.tile_position for key, tile in game_map.tiles.items() if tile.is_wall}
+        changed = [
+            bounds for key, bounds in walls.items() if self._walls.get(key) != bounds
+        ] + [
+            bounds for key, bounds in self._walls.items() if walls.get(key) != bounds
+        ]
+        first = not self._walls and self.open.all()
+        self._walls = walls
+        regions = [r for r in (self.region_of(b) for b in changed) if r is not None]
+        if first:
+            for i0, i1, j0, j1 in regions:
+                self.open[j0:j1 + 1, i0:i1 + 1] = False
+        else:
+            for region in regions:
+                self._rasterize(region)
+        self._derive()
+        self.revision += 1
+        return regions
+
+    def _rasterize(self, region: Region) -> None:
+        i0, i1, j0, j1 = region
+        self.open[j0:j1 + 1, i0:i1 + 1] = True
+        for bounds in self._walls.values():
+            wall = self.region_of(bounds)
+            if wall is None:
+                continue
+            a0, a1 = max(wall[0], i0), min(wall[1], i1)
+            b0, b1 = max(wall[2], j0), min(wall[3], j1)
+            if a0 <= a1 and b0 <= b1:
+                self.open[b0:b1 + 1, a0:a1 + 1] = False
+
+    def _derive(self) -> None:
+        """
+        Rebuild the flat lookup tables from self.open.
+        """
+        h, w = self.height, self.width
+        padded = np.zeros((h + 2, w + 2), dtype=bool)
+        padded[1:-1, 1:-1] = self.open
+
+        def at(di, dj):
+            # open(i + di, j + dj) for every cell, with everything off the grid blocked.
+            return padded[1 + dj:h + 1 + dj, 1 + di:w + 1 + di]
+
+        blocked = ~self.open
+        east = blocked | (at(0, -1) & ~at(-1, -1)) | (at(0, 1) & ~at(-1, 1))
+        west = blocked | (at(0, -1) & ~at(1, -1)) | (at(0, 1) & ~at(1, 1))
+        north = blocked | (at(-1, 0) & ~at(-1, -1)) | (at(1, 0) & ~at(1, -1))
+        south = blocked | (at(-1, 0) & ~at(-1, 1)) | (at(1, 0) & ~at(1, 1))
+        self.walkable = bytearray(self.open.astype(np.uint8).tobytes())
+        # Row-major for scans along x, column-major for scans along y.
+        self._stop_east = bytearray(east.astype(np.uint8).tobytes())
+        self._stop_west = bytearray(west.astype(np.uint8).tobytes())
+        self._stop_north = bytearray(north.T.astype(np.uint8).tobytes())
+        self._stop_south = bytearray(south.T.astype(np.uint8).tobytes())
+
+    # Search
+
+    def find_path(self, start: Cell, goal: Cell, max_expansions: int = 20000) -> Tuple[Optional[List[Cell]], int]:
+        """
+        :return: (path, expansions). path is the list of jump points from start to goal,
+                 both included, where consecutive points are joined by a straight or
+                 diagonal run of open cells; None when there is no path within
+                 max_expansions.
+        """
+        search = self.search(start, goal, max_expansions)
+        while True:
+            try:
+                next(search)
+            except StopIteration as done:
+                return done.value
+
+    def search(self, start: Cell, goal: Cell, max_expansions: int = 20000, slice_size: int = 64):
+        """
+        find_path() as a generator that yields after every slice_size expansions, so
+        one search can be spread over several ticks. find_path()'s result is the
+        generator's return value.
+        """
+        if not self.is_open(*start) or not self.is_open(*goal):
+            return None, 0
+        if start == goal:
+            return [start], 0
+
+        width, height, walkable = self.width, self.height, self.walkable
+        stop_east, stop_west = self._stop_east, self._stop_west
+        stop_north, stop_south = self._stop_north, self._stop_south
+        gx, gy = goal
+
+        def open_(x, y):
+            return 0 <= x < width and 0 <= y < height and walkable[y * width + x] == 1
+
+        def straight(x, y, dx, dy):
+            if not open_(x, y):
+                return None
+            if dx > 0:
+                row = y * width
+                i = stop_east.find(1, row + x, row + width)
+                end = width - 1 if i < 0 else i - row
+                if gy == y and x <= gx <= end:
+                    return gx, y
+                return (end, y) if i >= 0 and walkable[i] else None
+            if dx < 0:
+                row = y * width
+                i = stop_west.rfind(1, row, row + x + 1)
+                end = 0 if i < 0 else i - row
+                if gy == y and end <= gx <= x:
+                    return gx, y
+                return (end, y) if i >= 0 and walkable[i] else None
+            column = x * height
+            if dy > 0:
+                i = stop_north.find(1, column + y, column + height)
+                end = height - 1 if i < 0 else i - column
+                if gx == x and y <= gy <= end:
+                    return x, gy
+            else:
+                i = stop_south.rfind(1, column, column + y + 1)
+                end = 0 if i < 0 else i - column
+                if gx == x and end <= gy <= y:
+                    return x, gy
+            return (x, end) if i >= 0 and walkable[end * width + x] else None
+
+        def jump(x, y, dx, dy):
+            if not (dx and dy):
+                return straight(x, y, dx, dy)
+            while True:
+                if not open_(x, y):
+                    return None
+                if x == gx and y == gy:
+                    return x, y
+                if straight(x + dx, y, dx, 0) or straight(x, y + dy, 0, dy):
+                    return x, y
+                if open_(x + dx, y) and open_(x, y + dy):
+                    x += dx
+                    y += dy
+                else:
+                    return None
+
+        def directions(x, y, parent):
+            if parent is None:
+                found = []
+                for dx, dy in ((1, 0), (-1, 0), (0, 1), (0, -1)):
+                    if open_(x + dx, y + dy):
+                        found.append((dx, dy))
+                for dx, dy in ((1, 1), (1, -1), (-1, 1), (-1, -1)):
+                    if open_(x + dx, y) and open_(x, y + dy):
+                        found.append((dx, dy))
+                return found
+            px, py = parent
+            dx = (x > px) - (x < px)
+            dy = (y > py) - (y < py)
+            found = []
+            if dx and dy:
+                ahead_y, ahead_x = open_(x, y + dy), open_(x + dx, y)
+                if ahead_y:
+                    found.append((0, dy))
+                if ahead_x:
+                    found.append((dx, 0))
+                if ahead_x and ahead_y:
+                    found.append((dx, dy))
+            elif dx:
+                ahead, up, down = open_(x + dx, y), open_(x, y + 1), open_(x, y - 1)
+                if ahead:
+                    found.append((dx, 0))
+                    if up:
+                        found.append((dx, 1))
+                    if down:
+                        found.append((dx, -1))
+                if up:
+                    found.append((0, 1))
+                if down:
+                    found.append((0, -1))
+            else:
+                ahead, right, left = open_(x, y + dy), open_(x + 1, y), open_(x - 1, y)
+                if ahead:
+                    found.append((0, dy))
+                    if right:
+                        found.append((1, dy))
+                    if left:
+                        found.append((-1, dy))
+                if right:
+                    found.append((1, 0))
+                if left:
+                    found.append((-1, 0))
+            return found
+
+        def octile(x, y):
+            ddx, ddy = abs(x - gx), abs(y - gy)
+            return max(ddx, ddy) + (SQRT2 - 1.0) * min(ddx, ddy)
+
+        g = {start: 0.0}
+        parents: Dict[Cell, Optional[Cell]] = {start: None}
+        frontier = [(octile(*start), 0.0, start)]
+        closed = set()
+        expansions = 0
+        while frontier:
+            _, cost, node = heapq.heappop(frontier)
+            if node in closed:
+                continue
+            if node == goal:
+                path = [node]
+                while parents[path[-1]] is not None:
+                    path.append(parents[path[-1]])
+                path.reverse()
+                return path, expansions
+            closed.add(node)
+            expansions += 1
+            if expansions > max_expansions:
+                return None, expansions
+            if expansions % slice_size == 0:
+                yield
+            x, y = node
+            for dx, dy in directions(x, y, parents[node]):
+                point = jump(x + dx, y + dy, dx, dy)
+                if point is None or point in closed:
+                    continue
+                jx, jy = point
+                ddx, ddy = abs(jx - x), abs(jy - y)
+                step = max(ddx, ddy) + (SQRT2 - 1.0) * min(ddx, ddy)
+                new_cost = cost + step
+                if new_cost < g.get(point, math.inf):
+                    g[point] = new_cost
+                    parents[point] = node
+                    heapq.heappush(frontier, (new_cost + octile(jx, jy), new_cost, point))
+        return None, expansions
+
+    def get_stats(self) -> dict:
+        return {
+            "width": self.width,
+            "height": self.height,
+            "cell_size": self.cell_size,
+            "blocked": int(self.width * self.height - self.open.sum()),
+            "walls": len(self._walls)
+        }
+
+
+class PathCache:
+    """
+    LRU cache of recent path query results.
+
+    Each entry remembers the cell rectangle its path runs through, so a change
+    to some cells only evicts the paths that crossed them. Failed queries are
+    cached too and evicted on any change to their map, since opening any cell
+    might connect them. A path kept this way is still walkable, though removing
+    a wall elsewhere may have opened a shorter one.
+    """
+
+    def __init__(self, capacity: int = 1024):
+        self.capacity = capacity
+        self._entries: "OrderedDict[Hashable, Tuple[Optional[list], Optional[Region]]]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidated = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: Hashable):
+        """
+        :return: (found, path) - found is False on a miss.
+        """
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return False, None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return True, entry[0]
+
+    def put(self, key: Hashable, path: Optional[list], cells: Optional[Iterable[Cell]]) -> None:
+        bounds = None
+        if cells:
+            xs = [c[0] for c in cells]
+            ys = [c[1] for c in cells]
+            bounds = (min(xs), max(xs), min(ys), max(ys))
+        self._entries[key] = (path, bounds)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.capacity:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def invalidate(self, map_name: str, regions: List[Region] = None) -> int:
+        """
+        Drop a map's cached paths that cross any of regions, and its failed queries.
+        Without regions every entry of the map goes.
+
+        Keys are expected to start with the map name.
+        """
+        stale = []
+        for key, (path, bounds) in self._entries.items():
+            if key[0] != map_name:
+                continue
+            if regions is None or bounds is None or any(
+                bounds[0] <= r[1] and r[0] <= bounds[1] and bounds[2] <= r[3] and r[2] <= bounds[3] for r in regions
+            ):
+                stale.append(key)
+        for key in stale:
+            del self._entries[key]
+        self.invalidated += len(stale)
+        return len(stale)
+
+    def get_stats(self) -> dict:
+        return {
+            "entries": len(self._entries),
+            "capacity": self.capacity,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "invalidated": self.invalidated
+        }
@@ -4,8 +4,13 @@ from typing import Tuple, Optional
 class Zone:
     """
     Zones now use floats for their bounds.
+
+    A "door" or "travel" zone with a destination_map sends players who enter it
+    to destination_coords on that map (its start position without them).
     """
 
+    TRAVEL_TYPES = ("door", "travel")
+
     def __init__(
         self, 
         zone_label: str,
@@ -57,3 +62,7 @@ class Zone:
     def contains_point(self, x: float, y: float, z: float) -> bool:
         x_min, x_max, y_min, y_max, z_min, z_max = self.bounds
         return (x_min <= x <= x_max) and (y_min <= y <= y_max) and (z_min <= z <= z_max)
+
+    @property
+    def is_travel(self) -> bool:
+        return self.zone_type in self.TRAVEL_TYPES and bool(self.destination_map)
@@ -0,0 +1,93 @@
+# domain/maps/zone_index.py
+import math
+from typing import Dict, FrozenSet, Tuple
+
+Cell = Tuple[int, int]
+
+EMPTY: FrozenSet[str] = frozenset()
+
+
+class ZoneIndex:
+    """
+    The zones of one map bucketed on a uniform x/y grid, for finding the zones
+    around a position without testing every zone of the map.
+
+    Each cell lists the keys of the zones whose bounds overlap it; zones_at()
+    only tests those against the position, with the same inclusive bounds as
+    Zone.contains_point. Most of a map is usually in no zone at all, and there a
+    lookup is one dict miss.
+
+    sync() follows zone edits by re-bucketing only the zones that were added,
+    removed or changed.
+    """
+
+    def __init__(self, game_map, cell_size: float = 8.0):
+        if cell_size <= 0:
+            raise ValueError("cell_size must be positive.")
+        self.cell_size = float(cell_size)
+        self._cells: Dict[Cell, Tuple[str, ...]] = {}
+        self._bounds: Dict[str, Tuple[float, ...]] = {}
+        self.zones = {}
+        self.sync(game_map)
+
+    def __len__(self) -> int:
+        return len(self._bounds)
+
+    def _cell(self, x: float, y: float) -> Cell:
+        return math.floor(x / self.cell_size), math.floor(y / self.cell_size)
+
+    def _cells_of(self, bounds):
+        i0, j0 = self._cell(bounds[0], bounds[2])
+        i1, j1 = self._cell(bounds[1], bounds[3])
+        for i in range(i0, i1 + 1):
+            for j in range(j0, j1 + 1):
+                yield i, j
+
+    def sync(self, game_map) -> bool:
+        """
+        Bring the index up to date with the map's zones.
+
+        :return: True if any zone was added, removed or changed.
+        """
+        zones = dict(game_map.zones)
+        bounds = {key: zone.bounds for key, zone in zones.items()}
+        removed = [key for key, b in self._bounds.items() if bounds.get(key) != b]
+        added = [key for key, b in bounds.items() if self._bounds.get(key) != b]
+        for key in removed:
+            for cell in self._cells_of(self._bounds[key]):
+                keys = tuple(k for k in self._cells.get(cell, ()) if k != key)
+                if keys:
+                    self._cells[cell] = keys
+                else:
+                    self._cells.pop(cell, None)
+        for key in added:
+            for cell in self._cells_of(bounds[key]):
+                self._cells[cell] = self._cells.get(cell, ()) + (key,)
+        self._bounds = bounds
+        # Zone objects can be replaced without their bounds changing (label, type, destination).
+        changed = bool(removed or added) or any(self.zones.get(key) is not zone for key, zone in zones.items())
+        self.zones = zones
+        return changed
+
+    def zones_at(self, position) -> FrozenSet[str]:
+        """
+        :return: Keys of the zones containing position.
+        """
+        x, y, z = position
+        keys = self._cells.get(self._cell(x, y))
+        if not keys:
+            return EMPTY
+        bounds = self._bounds
+        return frozenset(
+            key for key in keys
+            if bounds[key][0] <= x <= bounds[key][1]
+            and bounds[key][2] <= y <= bounds[key][3]
+            and bounds[key][4] <= z <= bounds[key][5]
+        )
+
+    def get_stats(self) -> dict:
+        return {
+            "zones": len(self._bounds),
+            "cells": len(self._cells),
+            "entries": sum(len(keys) for keys in self._cells.values())
+        }
@@ -0,0 +1,209 @@
+# domain/physics/batch_physics_engine.py
+from typing import Dict, Hashable, List, Optional, Tuple
+
+import numpy as np
+
+from domain.physics.map_physics import MapPhysics
+
+
+class TileSurfaces:
+    """
+    The walkable surfaces of a map as flat arrays, for vectorized ground lookups.
+
+    Same rules as PhysicsEngine.ground_height: a floor tile supports entities at its
+    lower face (z1), a wall at its upper face (z2), air tiles support nothing, and
+    without any surface below an entity the ground is the map floor. Every lookup
+    scans all tiles; Heightfield answers the same from a precomputed grid.
+    """
+
+    # Entities per chunk are chosen so one (entities x tiles) mask stays around this many cells.
+    CHUNK_CELLS = 1 << 20
+
+    def __init__(self, game_map):
+        rows = []
+        for tile in game_map.tiles.values():
+            if tile.tile_type == "air" and not tile.is_wall:
+                continue
+            x1, x2, y1, y2, z1, z2 = tile.tile_position
+            rows.append((x1, x2, y1, y2, z2 if tile.is_wall else z1))
+        bounds = np.array(rows, dtype=np.float64).reshape(-1, 5)
+        self.x1, self.x2, self.y1, self.y2, self.surface = (np.ascontiguousarray(bounds[:, i]) for i in range(5))
+        self.floor = float(game_map.map_size[4])
+
+    def heights(self, positions: np.ndarray, epsilon: float = 1e-6) -> np.ndarray:
+        """
+        :param positions: (N, 3) array of positions.
+        :return: (N,) array with the ground height under each position.
+        """
+        count = len(positions)
+        ground = np.full(count, self.floor)
+        if count == 0 or len(self.surface) == 0:
+            return ground
+        chunk = max(1, self.CHUNK_CELLS // len(self.surface))
+        for start in range(0, count, chunk):
+            part = positions[start:start + chunk]
+            x = part[:, 0:1]
+            y = part[:, 1:2]
+            z = part[:, 2:3]
+            under = (
+                (x >= self.x1) & (x <= self.x2) & (y >= self.y1) & (y <= self.y2)
+                & (self.surface <= z + epsilon) & (self.surface > self.floor)
+            )
+            if under.any():
+                ground[start:start + chunk] = np.where(under, self.surface, self.floor).max(axis=1)
+        return ground
+
+
+class BatchPhysicsEngine:
+    """
+    Physics for all entities of one map, stored as a structure of arrays.
+
+    Positions, velocities, pending forces and masses live in contiguous NumPy arrays
+    (rows 0..count-1 are live), so step() integrates gravity, forces, air drag and
+    ground friction for every entity at once instead of one tuple at a time.
+    Entities are addressed by any hashable id; removal swaps the last row into the
+    gap, so row indices are only stable between add/remove calls.
+
+    Per step, for each entity of mass m with velocity v:
+      - a = F / m + (0, 0, gravity) - air_resistance * v / m
+      - v += a * dt, then position += v * dt (semi-implicit Euler)
+      - entities that reach the ground stop falling; on the ground, horizontal speed
+        decays by friction * |gravity| * dt and never reverses
+    Forces added with apply_force() act for one step and are then cleared.
+    """
+
+    def __init__(self, capacity: int = 64):
+        capacity = max(1, capacity)
+        self.count = 0
+        self.positions = np.zeros((capacity, 3))
+        self.velocities = np.zeros((capacity, 3))
+        self.forces = np.zeros((capacity, 3))
+        self.masses = np.ones(capacity)
+        self.on_ground = np.ones(capacity, dtype=bool)
+        self.ids: List[Hashable] = []
+        self._index: Dict[Hashable, int] = {}
+
+    def __len__(self) -> int:
+        return self.count
+
+    def __contains__(self, entity_id: Hashable) -> bool:
+        return entity_id in self._index
+
+    def index_of(self, entity_id: Hashable) -> int:
+        return self._index[entity_id]
+
+    def _grow(self) -> None:
+        capacity = len(self.masses) * 2
+        for name in ("positions", "velocities", "forces"):
+            grown = np.zeros((capacity, 3))
+            grown[:self.count] = getattr(self, name)[:self.count]
+            setattr(self, name, grown)
+        masses = np.ones(capacity)
+        masses[:self.count] = self.masses[:self.count]
+        self.masses = masses
+        on_ground = np.ones(capacity, dtype=bool)
+        on_ground[:self.count] = self.on_ground[:self.count]
+        self.on_ground = on_ground
+
+    def add(self, entity_id: Hashable, position, velocity=(0.0, 0.0, 0.0), mass: float = 1.0, on_ground: bool = True) -> int:
+        if entity_id in self._index:
+            raise ValueError(f"Entity {entity_id!r} is already simulated.")
+        if mass <= 0:
+            raise ValueError("mass must be positive.")
+        if self.count == len(self.masses):
+            self._grow()
+        i = self.count
+        self.positions[i] = position
+        self.velocities[i] = velocity
+        self.forces[i] = 0.0
+        self.masses[i] = mass
+        self.on_ground[i] = on_ground
+        self.ids.append(entity_id)
+        self._index[entity_id] = i
+        self.count += 1
+        return i
+
+    def remove(self, entity_id: Hashable) -> bool:
+        i = self._index.pop(entity_id, None)
+        if i is None:
+            return False
+        last = self.count - 1
+        if i != last:
+            for array in (self.positions, self.velocities, self.forces, self.masses, self.on_ground):
+                array[i] = array[last]
+            moved_id = self.ids[last]
+            self.ids[i] = moved_id
+            self._index[moved_id] = i
+        self.ids.pop()
+        self.count = last
+        return True
+
+    def get_position(self, entity_id: Hashable) -> Tuple[float, float, float]:
+        x, y, z = self.positions[self._index[entity_id]]
+        return (float(x), float(y), float(z))
+
+    def get_velocity(self, entity_id: Hashable) -> Tuple[float, float, float]:
+        x, y, z = self.velocities[self._index[entity_id]]
+        return (float(x), float(y), float(z))
+
+    def is_on_ground(self, entity_id: Hashable) -> bool:
+        return bool(self.on_ground[self._index[entity_id]])
+
+    def set_position(self, entity_id: Hashable, position) -> None:
+        self.positions[self._index[entity_id]] = position
+
+    def set_velocity(self, entity_id: Hashable, velocity) -> None:
+        self.velocities[self._index[entity_id]] = velocity
+
+    def apply_force(self, entity_id: Hashable, force) -> None:
+        self.forces[self._index[entity_id]] += force
+
+    def step(self, map_physics: MapPhysics, delta_time: float, ground: Optional[np.ndarray] = None, epsilon: float = 1e-9) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Advance every entity by delta_time.
+
+        :param map_physics: Gravity, air resistance and friction of the map.
+        :param delta_time: Timestep in seconds.
+        :param ground: Optional (count,) ground heights, e.g. from Heightfield.heights()
+                       evaluated before the step. Without it nothing stops a fall.
+        :return: (moved, contact_changed) row indices: rows whose position changed, and
+                 rows that landed or left the ground.
+        """
+        n = self.count
+        if n == 0:
+            empty = np.empty(0, dtype=np.intp)
+            return empty, empty
+        pos = self.positions[:n]
+        vel = self.velocities[:n]
+        forces = self.forces[:n]
+        inv_mass = (1.0 / self.masses[:n])[:, None]
+        before = pos.copy()
+        was_grounded = self.on_ground[:n].copy()
+
+        accel = forces * inv_mass
+        accel[:, 2] += map_physics.gravity
+        if map_physics.air_resistance:
+            accel -= map_physics.air_resistance * vel * inv_mass
+        vel += accel * delta_time
+
+        if ground is not None:
+            grounded = was_grounded & (pos[:, 2] <= ground + epsilon)
+            if map_physics.friction and grounded.any():
+                horizontal = vel[grounded, :2]
+                speed = np.hypot(horizontal[:, 0], horizontal[:, 1])
+                slowed = np.maximum(speed - map_physics.friction * abs(map_physics.gravity) * delta_time, 0.0)
+                scale = np.divide(slowed, speed, out=np.zeros_like(speed), where=speed > 0)
+                vel[grounded, :2] = horizontal * scale[:, None]
+
+        pos += vel * delta_time
+
+        if ground is not None:
+            landed = (pos[:, 2] <= ground) & (vel[:, 2] <= 0)
+            pos[landed, 2] = ground[landed]
+            vel[landed, 2] = 0.0
+            self.on_ground[:n] = landed
+        forces[:] = 0.0
+
+        moved = np.flatnonzero(np.any(np.abs(pos - before) > epsilon, axis=1))
+        contact_changed = np.flatnonzero(self.on_ground[:n] != was_grounded)
+        return moved, contact_changed
@@ -0,0 +1,263 @@
+# domain/physics/heightfield.py
+import math
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+# Inclusive cell rectangle: (i0, i1, j0, j1).
+Region = Tuple[int, int, int, int]
+
+
+class Heightfield:
+    """
+    The walkable surfaces of a map rasterized onto a uniform x/y grid, so the
+    ground under an entity is an array lookup instead of a scan over every tile.
+
+    Same rules as PhysicsEngine.ground_height and TileSurfaces: a floor tile
+    supports entities at its lower face (z1), a wall at its upper face (z2), air
+    tiles support nothing, and where nothing else is the ground is the map floor.
+    Cells are laid out like NavGrid's: cell (i, j) covers x in
+    [x1 + i * resolution, x1 + (i + 1) * resolution) and the same for y, and a
+    surface covers every cell its bounds overlap, so at tile edges the answer is
+    only as fine as the resolution.
+
+    Per cell the grid keeps the highest `layers` surfaces in descending order (the
+    rest filled with the map floor), the index of each one's tile type and how
+    many surfaces cover the cell. The ground under an entity is the first of its
+    cell's layers at or below it, so a bridge over a floor, or a platform over
+    another, is still O(layers). Only an entity below every stored layer of a cell
+    covered by more surfaces than that falls back to checking the surfaces over
+    the cell.
+
+    sync() applies tile edits by re-rasterizing only the cells under tiles that
+    were added, removed or changed.
+    """
+
+    # Fallback rows per chunk are chosen so one (rows x surfaces) mask stays around this many cells.
+    CHUNK_CELLS = 1 << 20
+
+    def __init__(self, game_map, resolution: float = 1.0, layers: int = 4):
+        if resolution <= 0:
+            raise ValueError("resolution must be positive.")
+        if layers < 1:
+            raise ValueError("layers must be at least 1.")
+        self.resolution = float(resolution)
+        self.layers = layers
+        # Tile types by kind index; kind 0 is the map floor.
+        self.tile_types: List[Optional[str]] = [None]
+        self._kinds: Dict[str, int] = {}
+        self.fallbacks = 0
+        self._reset(game_map)
+        self.sync(game_map)
+
+    def _reset(self, game_map) -> None:
+        x1, x2, y1, y2, z1, z2 = game_map.map_size
+        self.map_size = tuple(game_map.map_size)
+        self.origin = (float(x1), float(y1))
+        self.width = max(1, int(math.floor((x2 - x1) / self.resolution)) + 1)
+        self.height = max(1, int(math.floor((y2 - y1) / self.resolution)) + 1)
+        self.floor = float(z1)
+        # [layer, j, i] is a layer of cell (i, j); layer 0 is the top surface.
+        self.surface = np.full((self.layers, self.height, self.width), self.floor)
+        self.kind = np.zeros((self.layers, self.height, self.width), dtype=np.uint16)
+        self.count = np.zeros((self.height, self.width), dtype=np.uint16)
+        # key -> (x1, x2, y1, y2, surface, tile_type) of every surface above the map floor.
+        self._surfaces: Dict[str, Tuple[float, float, float, float, float, str]] = {}
+        self._index()
+
+    def __len__(self) -> int:
+        return self.width * self.height
+
+    # Geometry
+
+    def cell_of(self, position) -> Tuple[int, int]:
+        return (
+            int(math.floor((position[0] - self.origin[0]) / self.resolution)),
+            int(math.floor((position[1] - self.origin[1]) / self.resolution))
+        )
+
+    def region_of(self, bounds) -> Optional[Region]:
+        """
+        Cells overlapped by tile bounds (x1, x2, y1, y2, ...), clipped to the grid.
+        """
+        i0, j0 = self.cell_of((bounds[0], bounds[2]))
+        i1, j1 = self.cell_of((bounds[1], bounds[3]))
+        i0, j0 = max(i0, 0), max(j0, 0)
+        i1, j1 = min(i1, self.width - 1), min(j1, self.height - 1)
+        if i0 > i1 or j0 > j1:
+            return None
+        return i0, i1, j0, j1
+
+    # Building
+
+    def sync(self, game_map) -> List[Region]:
+        """
+        Bring the grid up to date with the map's tiles. A changed map size rebuilds it.
+
+        :return: The regions whose ground may have changed.
+        """
+        if tuple(game_map.map_size) != self.map_size:
+            self._reset(game_map)
+        surfaces = {}
+        for key, tile in game_map.tiles.items():
+            if tile.tile_type == "air" and not tile.is_wall:
+                continue
+            x1, x2, y1, y2, z1, z2 = tile.tile_position
+            surface = z2 if tile.is_wall else z1
+            # A surface at or below the map floor is never higher than the floor itself.
+            if surface > self.floor:
+                surfaces[key] = (x1, x2, y1, y2, surface, tile.tile_type)
+        changed = [
+            bounds for key, bounds in surfaces.items() if self._surfaces.get(key) != bounds
+        ] + [
+            bounds for key, bounds in self._surfaces.items() if surfaces.get(key) != bounds
+        ]
+        first = not self._surfaces
+        self._surfaces = surfaces
+        regions = [r for r in (self.region_of(b) for b in changed) if r is not None]
+        if not regions:
+            return regions
+        self._index()
+        if first:
+            for s in range(len(self._heights)):
+                self._stamp(s, self._regions[s])
+        else:
+            for region in regions:
+                self._rasterize(region)
+        return regions
+
+    def _kind_of(self, tile_type: str) -> int:
+        kind = self._kinds.get(tile_type)
+        if kind is None:
+            kind = self._kinds[tile_type] = len(self.tile_types)
+            self.tile_types.append(tile_type)
+        return kind
+
+    def _index(self) -> None:
+        """
+        Flat arrays of the surfaces that overlap the grid, for rasterizing and fallbacks.
+        """
+        rows = []
+        for bounds in self._surfaces.values():
+            region = self.region_of(bounds)
+            if region is not None:
+                rows.append((*region, bounds[4], self._kind_of(bounds[5])))
+        table = np.array(rows, dtype=np.float64).reshape(-1, 6)
+        self._regions = table[:, :4].astype(np.intp)
+        self._heights = np.ascontiguousarray(table[:, 4])
+        self._surface_kinds = table[:, 5].astype(np.uint16)
+
+    def _stamp(self, s: int, clip: Region) -> None:
+        i0, i1, j0, j1 = self._regions[s]
+        a0, a1 = max(i0, clip[0]), min(i1, clip[1])
+        b0, b1 = max(j0, clip[2]), min(j1, clip[3])
+        if a0 > a1 or b0 > b1:
+            return
+        cells = np.s_[:, b0:b1 + 1, a0:a1 + 1]
+        height, kind = self._heights[s], self._surface_kinds[s]
+        surface = self.surface[cells]
+        kinds = self.kind[cells]
+        # Insert into each cell's descending layers after the surfaces above (or level with) it;
+        # whatever is pushed past the last layer is dropped.
+        at = (surface >= height).sum(axis=0)
+        for layer in range(self.layers - 1, -1, -1):
+            shifted = at < layer
+            if layer:
+                surface[layer][shifted] = surface[layer - 1][shifted]
+                kinds[layer][shifted] = kinds[layer - 1][shifted]
+            here = at == layer
+            surface[layer][here] = height
+            kinds[layer][here] = kind
+        self.count[cells[1:]] += 1
+
+    def _rasterize(self, region: Region) -> None:
+        i0, i1, j0, j1 = region
+        cells = np.s_[:, j0:j1 + 1, i0:i1 + 1]
+        self.surface[cells] = self.floor
+        self.kind[cells] = 0
+        self.count[cells[1:]] = 0
+        r = self._regions
+        overlapping = (r[:, 0] <= i1) & (r[:, 1] >= i0) & (r[:, 2] <= j1) & (r[:, 3] >= j0)
+        for s in np.flatnonzero(overlapping).tolist():
+            self._stamp(s, region)
+
+    # Queries
+
+    def lookup(self, positions: np.ndarray, epsilon: float = 1e-6) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        :param positions: (N, 3) array of positions.
+        :return: ((N,) ground heights, (N,) kind indices into tile_types).
+        """
+        positions = np.asarray(positions, dtype=np.float64).reshape(-1, 3)
+        count = len(positions)
+        ground = np.full(count, self.floor)
+        kinds = np.zeros(count, dtype=np.uint16)
+        if count == 0 or not len(self._heights):
+            return ground, kinds
+        i = np.floor((positions[:, 0] - self.origin[0]) / self.resolution).astype(np.intp)
+        j = np.floor((positions[:, 1] - self.origin[1]) / self.resolution).astype(np.intp)
+        rows = np.flatnonzero((i >= 0) & (i < self.width) & (j >= 0) & (j < self.height))
+        i, j = i[rows], j[rows]
+        z = positions[rows, 2] + epsilon
+        # (layers, rows) columns of each row's cell.
+        surface = self.surface[:, j, i]
+        at_or_below = surface <= z
+        layer = at_or_below.argmax(axis=0)
+        found = np.flatnonzero(at_or_below[layer, np.arange(len(rows))])
+        ground[rows[found]] = surface[layer[found], found]
+        kinds[rows[found]] = self.kind[layer[found], j[found], i[found]]
+        # Below every stored layer of a cell that has more surfaces than layers.
+        under = np.flatnonzero((z < surface[-1]) & (self.count[j, i] > self.layers))
+        if len(under):
+            self._under(rows[under], i[under], j[under], z[under], ground, kinds)
+        return ground, kinds
+
+    def _under(self, rows, i, j, z, ground, kinds) -> None:
+        """
+        Exact ground for rows below the layers kept for their cell.
+        """
+        self.fallbacks += len(rows)
+        r = self._regions
+        chunk = max(1, self.CHUNK_CELLS // len(self._heights))
+        for start in range(0, len(rows), chunk):
+            part = slice(start, start + chunk)
+            below = (
+                (r[:, 0] <= i[part, None]) & (r[:, 1] >= i[part, None])
+                & (r[:, 2] <= j[part, None]) & (r[:, 3] >= j[part, None])
+                & (self._heights <= z[part, None])
+            )
+            candidates = np.where(below, self._heights, -np.inf)
+            best = candidates.argmax(axis=1)
+            found = below[np.arange(len(best)), best]
+            ground[rows[part][found]] = self._heights[best[found]]
+            kinds[rows[part][found]] = self._surface_kinds[best[found]]
+
+    def heights(self, positions: np.ndarray, epsilon: float = 1e-6) -> np.ndarray:
+        """
+        :param positions: (N, 3) array of positions.
+        :return: (N,) array with the ground height under each position.
+        """
+        return self.lookup(positions, epsilon)[0]
+
+    def surface_at(self, position, epsilon: float = 1e-6) -> Tuple[float, Optional[str]]:
+        """
+        :return: (ground height, tile type) under one position; the tile type is None over the map floor.
+        """
+        ground, kinds = self.lookup(np.array([position], dtype=np.float64), epsilon)
+        return float(ground[0]), self.tile_types[int(kinds[0])]
+
+    @property
+    def memory_bytes(self) -> int:
+        return int(self.surface.nbytes + self.kind.nbytes + self.count.nbytes)
+
+    def get_stats(self) -> dict:
+        return {
+            "resolution": self.resolution,
+            "layers": self.layers,
+            "cells": len(self),
+            "surfaces": len(self._heights),
+            "stacked_cells": int(np.count_nonzero(self.count > 1)),
+            "overflow_cells": int(np.count_nonzero(self.count > self.layers)),
+            "fallbacks": self.fallbacks,
+            "memory_bytes": self.memory_bytes
+        }
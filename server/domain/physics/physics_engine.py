@@ -1,5 +1,5 @@
 # domain/physics/physics_engine.py
-from typing import Tuple
+from typing import Optional, Tuple
 from domain.physics.map_physics import MapPhysics
 
 class PhysicsEngine:
@@ -8,18 +8,19 @@ class PhysicsEngine:
         pass
 
     def apply_gravity(self, position: Tuple[float, float, float], velocity: Tuple[float,float,float], map_physics: MapPhysics, delta_time: float = 0.016) -> Tuple[Tuple[float,float,float], Tuple[float,float,float]]:
+        # z is the vertical axis, as in map_size and tile_position (z1, z2).
         x, y, z = position
         vx, vy, vz = velocity
         # Use map_physics.gravity
-        vy += map_physics.gravity * delta_time
-        new_y = y + vy * delta_time
-        return (x, new_y, z), (vx, vy, vz)
+        vz += map_physics.gravity * delta_time
+        new_z = z + vz * delta_time
+        return (x, y, new_z), (vx, vy, vz)
 
     def jump(self, position: Tuple[float,float,float], velocity: Tuple[float,float,float], map_physics: MapPhysics, jump_speed: float = 5.0) -> Tuple[Tuple[float,float,float], Tuple[float,float,float]]:
         # map_physics could also adjust jump_speed if desired, but for now we just use given jump_speed
         x, y, z = position
         vx, vy, vz = velocity
-        vy = jump_speed
+        vz = jump_speed
         return (x, y, z), (vx, vy, vz)
 
     def apply_force(self, position: Tuple[float,float,float], velocity: Tuple[float,float,float], force: Tuple[float,float,float], map_physics: MapPhysics, mass: float = 1.0, delta_time: float = 0.016) -> Tuple[Tuple[float,float,float], Tuple[float,float,float]]:
@@ -39,5 +40,52 @@ class PhysicsEngine:
         new_z = z + vz * delta_time
         return (new_x, new_y, new_z), (vx, vy, vz)
 
-    def check_collisions_and_adjust(self, position: Tuple[float,float,float]) -> Tuple[float,float,float]:
-        return position
+    def ground_height(self, game_map, position: Tuple[float,float,float], epsilon: float = 1e-6) -> float:
+        """
+        Height of the highest surface under position, or the map floor if there is none.
+
+        Entities stand on a floor tile's lower face (z1), the way start positions like
+        (0, 0, 0) sit on the default grass tile spanning z 0..1. Walls are solid, so
+        their upper face (z2) is the surface.
+        """
+        x, y, z = position
+        ground = game_map.map_size[4]
+        for tile in game_map.tiles.values():
+            x1, x2, y1, y2, z1, z2 = tile.tile_position
+            if not (x1 <= x <= x2 and y1 <= y <= y2):
+                continue
+            if tile.is_wall:
+                surface = z2
+            elif tile.tile_type != "air":
+                surface = z1
+            else:
+                continue
+            if ground < surface <= z + epsilon:
+                ground = surface
+        return ground
+
+    def resolve_ground_contact(self, position: Tuple[float,float,float], velocity: Tuple[float,float,float], ground: float) -> Tuple[Tuple[float,float,float], Tuple[float,float,float], bool]:
+        """
+        Clamp a falling entity onto the ground and stop its vertical motion.
+
+        :return: (position, velocity, on_ground)
+        """
+        x, y, z = position
+        vx, vy, vz = velocity
+        if z <= ground and vz <= 0:
+            return (x, y, ground), (vx, vy, 0.0), True
+        return position, velocity, False
+
+    def check_collisions_and_adjust(self, position: Tuple[float,float,float], heightfield=None, previous: Optional[Tuple[float,float,float]] = None) -> Tuple[float,float,float]:
+        """
+        Keep position from ending up inside the ground.
+
+        With a Heightfield, a position below the ground that was under previous (where the
+        entity was before this update, else position itself) is put back on that ground.
+        Without one there is nothing to collide with and position is returned unchanged.
+        """
+        if heightfield is None:
+            return position
+        ground, _ = heightfield.surface_at(previous if previous is not None else position)
+        x, y, z = position
+        return (x, y, ground) if z < ground else position
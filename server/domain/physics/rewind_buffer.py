@@ -0,0 +1,155 @@
+# domain/physics/rewind_buffer.py
+import math
+from collections import deque
+from typing import Dict, Hashable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+
+class RewindBuffer:
+    """
+    Recent positions of every entity in one map, for judging a shot against the
+    world as the shooter heard it.
+
+    A ring of frames (one per recorded tick) over fixed entity slots: positions
+    are a (frames, slots, 3) float32 array and a (frames, slots) mask says which
+    slots held an entity in each frame. An entity keeps its slot while it stays;
+    a slot it leaves is only reused once every frame that still mentions it has
+    been overwritten, so rewinding never attributes one entity's past to another.
+    Recording a tick is one fancy-indexed copy; slot assignment is only redone
+    when the set of entities changes.
+
+    at() interpolates between the two frames around a time and is clamped to the
+    oldest and newest frames held.
+    """
+
+    def __init__(self, frames: int, slots: int = 64):
+        if frames < 2:
+            raise ValueError("frames must be at least 2.")
+        self.frames = frames
+        self.times = np.full(frames, -math.inf)
+        self.positions = np.zeros((frames, max(1, slots), 3), dtype=np.float32)
+        self.present = np.zeros((frames, max(1, slots)), dtype=bool)
+        self.head = 0
+        self.recorded = 0
+        self._slots: Dict[Hashable, int] = {}
+        self._owners: List[Optional[Hashable]] = [None] * max(1, slots)
+        self._unused = list(range(max(1, slots) - 1, -1, -1))
+        # (recorded count when the slot was vacated, slot), oldest first.
+        self._vacated = deque()
+        self._version = None
+        self._frame_slots = np.zeros(0, dtype=np.int64)
+
+    @property
+    def capacity(self) -> int:
+        return self.present.shape[1]
+
+    def __len__(self) -> int:
+        return min(self.recorded, self.frames)
+
+    def record(self, at: float, keys: Sequence[Hashable], positions: np.ndarray, version=None) -> None:
+        """
+        Store one frame.
+
+        :param at: Time of the frame (monotonic clock), not earlier than the last one.
+        :param keys: Entity keys, one per row of positions.
+        :param positions: (len(keys), 3) array.
+        :param version: Changes whenever keys change (their order included); pass None
+                        to have the slots looked up again for this frame.
+        """
+        if version is None or version != self._version:
+            self._assign(keys)
+            self._version = version
+        frame = self.head
+        self.present[frame] = False
+        if len(self._frame_slots):
+            self.positions[frame, self._frame_slots] = positions
+            self.present[frame, self._frame_slots] = True
+        self.times[frame] = at
+        self.head = (frame + 1) % self.frames
+        self.recorded += 1
+
+    def _assign(self, keys: Sequence[Hashable]) -> None:
+        current = set(keys)
+        for key in [k for k in self._slots if k not in current]:
+            self._vacated.append((self.recorded, self._slots.pop(key)))
+        # A vacated slot is free once the frames recorded since cover the whole ring.
+        while self._vacated and self.recorded - self._vacated[0][0] >= self.frames:
+            self._unused.append(self._vacated.popleft()[1])
+        slots = []
+        for key in keys:
+            slot = self._slots.get(key)
+            if slot is None:
+                if not self._unused:
+                    self._grow()
+                slot = self._slots[key] = self._unused.pop()
+                self._owners[slot] = key
+            slots.append(slot)
+        self._frame_slots = np.array(slots, dtype=np.int64)
+
+    def _grow(self) -> None:
+        old = self.capacity
+        capacity = old * 2
+        positions = np.zeros((self.frames, capacity, 3), dtype=np.float32)
+        positions[:, :old] = self.positions
+        present = np.zeros((self.frames, capacity), dtype=bool)
+        present[:, :old] = self.present
+        self.positions, self.present = positions, present
+        self._owners.extend([None] * old)
+        self._unused.extend(range(capacity - 1, old - 1, -1))
+
+    def _order(self) -> np.ndarray:
+        held = len(self)
+        return (np.arange(held) + self.head - held) % self.frames
+
+    @property
+    def span(self) -> Tuple[float, float]:
+        """
+        (oldest, newest) frame time held, or (-inf, -inf) before the first frame.
+        """
+        if not self.recorded:
+            return -math.inf, -math.inf
+        order = self._order()
+        return float(self.times[order[0]]), float(self.times[order[-1]])
+
+    def at(self, when: float) -> Tuple[List[Hashable], np.ndarray]:
+        """
+        :return: (keys, positions) of the entities present at time when, linearly
+                 interpolated between the frames around it. Entities that appeared
+                 after when are left out.
+        """
+        if not self.recorded:
+            return [], np.zeros((0, 3))
+        order = self._order()
+        times = self.times[order]
+        after = int(np.searchsorted(times, when, side="right"))
+        if after == 0:
+            frame = next_frame = order[0]
+        elif after == len(order):
+            frame = next_frame = order[-1]
+        else:
+            frame, next_frame = order[after - 1], order[after]
+        slots = np.flatnonzero(self.present[frame])
+        positions = self.positions[frame, slots].astype(np.float64)
+        if next_frame != frame:
+            t0, t1 = self.times[frame], self.times[next_frame]
+            alpha = (when - t0) / (t1 - t0) if t1 > t0 else 0.0
+            both = self.present[next_frame, slots]
+            positions[both] += alpha * (self.positions[next_frame, slots[both]] - positions[both])
+        owners = self._owners
+        return [owners[slot] for slot in slots.tolist()], positions
+
+    @property
+    def memory_bytes(self) -> int:
+        return int(self.positions.nbytes + self.present.nbytes + self.times.nbytes + self._frame_slots.nbytes)
+
+    def get_stats(self) -> dict:
+        oldest, newest = self.span
+        return {
+            "frames": len(self),
+            "capacity_frames": self.frames,
+            "slots": self.capacity,
+            "entities": len(self._slots),
+            "seconds": round(newest - oldest, 3) if self.recorded else 0.0,
+            "memory_bytes": self.memory_bytes
+        }
@@ -0,0 +1,155 @@
+# domain/physics/shared_body_state.py
+from multiprocessing import shared_memory
+from typing import Tuple
+
+import numpy as np
+
+
+class SharedBodyState:
+    """
+    Body state of one map in a multiprocessing.shared_memory block, so a worker
+    process can simulate the map while the server process reads the results in
+    place.
+
+    Bodies live in fixed slots handed out by the owner (the server process);
+    slots do not move when other bodies leave. The block holds, per slot, the
+    position and velocity as float64 triples and an on-ground flag, behind a
+    small header of int64 counters: [seq, tick, applied]. applied is the number of
+    the last set_position command the worker has carried out, so the owner knows
+    when its own writes are visible here.
+
+    The worker is the only writer. It brackets every publish by incrementing seq
+    before and after, so seq is odd while a write is in progress; readers retry
+    when seq was odd or changed under them (a seqlock), and never see a torn
+    position.
+    """
+
+    HEADER = 3
+
+    def __init__(self, shm: shared_memory.SharedMemory, capacity: int, owner: bool):
+        self.shm = shm
+        self.capacity = capacity
+        self.owner = owner
+        buffer = shm.buf
+        offset = 0
+        self.header = np.ndarray((self.HEADER,), dtype=np.int64, buffer=buffer, offset=offset)
+        offset += self.header.nbytes
+        self.positions = np.ndarray((capacity, 3), dtype=np.float64, buffer=buffer, offset=offset)
+        offset += self.positions.nbytes
+        self.velocities = np.ndarray((capacity, 3), dtype=np.float64, buffer=buffer, offset=offset)
+        offset += self.velocities.nbytes
+        self.on_ground = np.ndarray((capacity,), dtype=np.bool_, buffer=buffer, offset=offset)
+
+    @staticmethod
+    def size_for(capacity: int) -> int:
+        return 8 * SharedBodyState.HEADER + capacity * (3 * 8 * 2 + 1)
+
+    @classmethod
+    def create(cls, capacity: int) -> "SharedBodyState":
+        shm = shared_memory.SharedMemory(create=True, size=cls.size_for(capacity))
+        state = cls(shm, capacity, owner=True)
+        state.header[:] = 0
+        state.positions[:] = 0.0
+        state.velocities[:] = 0.0
+        state.on_ground[:] = True
+        return state
+
+    @classmethod
+    def attach(cls, name: str, capacity: int) -> "SharedBodyState":
+        return cls(shared_memory.SharedMemory(name=name), capacity, owner=False)
+
+    @property
+    def name(self) -> str:
+        return self.shm.name
+
+    @property
+    def tick(self) -> int:
+        return int(self.header[1])
+
+    @property
+    def applied(self) -> int:
+        return int(self.header[2])
+
+    # Writer (worker process)
+
+    def publish(self, slots: np.ndarray, positions: np.ndarray, velocities: np.ndarray, on_ground: np.ndarray, tick: int) -> None:
+        """
+        Write the state of the bodies in slots (row i of the arrays goes to slots[i]).
+        """
+        self.header[0] += 1
+        self.positions[slots] = positions
+        self.velocities[slots] = velocities
+        self.on_ground[slots] = on_ground
+        self.header[1] = tick
+        self.header[0] += 1
+
+    def apply_position(self, slot, position, command: int) -> None:
+        """
+        Write one body's position as soon as a set_position command is handled, and mark the command applied.
+        slot is None for a body the worker no longer simulates.
+        """
+        self.header[0] += 1
+        if slot is not None:
+            self.positions[slot] = position
+        self.header[2] = command
+        self.header[0] += 1
+
+    # Readers (server process)
+
+    def read(self, slot: int, retries: int = 100) -> Tuple[Tuple[float, float, float], Tuple[float, float, float], bool]:
+        """
+        :return: (position, velocity, on_ground) of a slot, consistent with one publish.
+        """
+        result = None
+        for _ in range(retries):
+            before = int(self.header[0])
+            if before & 1:
+                continue
+            position = self.positions[slot]
+            velocity = self.velocities[slot]
+            result = (
+                (float(position[0]), float(position[1]), float(position[2])),
+                (float(velocity[0]), float(velocity[1]), float(velocity[2])),
+                bool(self.on_ground[slot])
+            )
+            if int(self.header[0]) == before:
+                return result
+        # The writer kept us out; a slightly stale or mixed value beats stalling the event loop.
+        return result or self.read_unlocked(slot)
+
+    def read_many(self, slots: np.ndarray, retries: int = 100) -> np.ndarray:
+        """
+        :return: Copy of the positions of slots, consistent with one publish.
+        """
+        positions = None
+        for _ in range(retries):
+            before = int(self.header[0])
+            if before & 1:
+                continue
+            positions = self.positions[slots]
+            if int(self.header[0]) == before:
+                return positions
+        return positions if positions is not None else self.positions[slots]
+
+    def read_unlocked(self, slot: int):
+        position = self.positions[slot]
+        velocity = self.velocities[slot]
+        return tuple(float(v) for v in position), tuple(float(v) for v in velocity), bool(self.on_ground[slot])
+
+    def write_slot(self, slot: int, position, velocity=(0.0, 0.0, 0.0), on_ground: bool = True) -> None:
+        """
+        Seed a slot before the worker knows about it. Only for slots the worker isn't simulating.
+        """
+        self.positions[slot] = position
+        self.velocities[slot] = velocity
+        self.on_ground[slot] = on_ground
+
+    def close(self) -> None:
+        # The arrays are views into shm.buf; drop them before closing the mapping.
+        del self.header, self.positions, self.velocities, self.on_ground
+        self.shm.close()
+        if self.owner:
+            try:
+                self.shm.unlink()
+            except FileNotFoundError:
+                pass
@@ -0,0 +1,228 @@
+# domain/weapons/hitscan.py
+import math
+from typing import Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+# Stands in for 1/0 along axes the ray doesn't move on; large enough that a box the
+# ray isn't inside on that axis is pushed out of reach, small enough to stay finite.
+_FLAT = 1e30
+
+
+def aim_direction(yaw: float, pitch: float) -> Tuple[float, float, float]:
+    """
+    :param yaw: Degrees, counter-clockwise from +x in the x/y plane.
+    :param pitch: Degrees above the horizontal (z is up).
+    :return: The unit vector the shooter is looking along.
+    """
+    yaw, pitch = math.radians(yaw), math.radians(pitch)
+    horizontal = math.cos(pitch)
+    return (horizontal * math.cos(yaw), horizontal * math.sin(yaw), math.sin(pitch))
+
+
+def entity_boxes(positions: np.ndarray, radius: float, height: float) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Hit boxes of entities standing at positions (their feet): radius on either side
+    in x and y, height upwards.
+    """
+    positions = np.asarray(positions, dtype=np.float64).reshape(-1, 3)
+    extent = np.array([radius, radius, 0.0])
+    lo = positions - extent
+    hi = positions + extent
+    hi[:, 2] += height
+    return lo, hi
+
+
+def wall_boxes(game_map) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Boxes of a map's wall tiles. Tile positions are (x1, x2, y1, y2, z1, z2).
+    """
+    walls = [tile.tile_position for tile in game_map.tiles.values() if tile.is_wall]
+    if not walls:
+        return np.zeros((0, 3)), np.zeros((0, 3))
+    bounds = np.array(walls, dtype=np.float64).reshape(-1, 3, 2)
+    return bounds.min(axis=2), bounds.max(axis=2)
+
+
+class BoxGrid:
+    """
+    Axis-aligned boxes bucketed by the x/y grid cells they overlap.
+
+    Box ids are stored once per overlapped cell in one array sorted by cell, and
+    cells maps (cx, cy) to the slice of that array holding the cell's boxes, so
+    building the grid is a handful of NumPy operations and looking up a cell is
+    one dict access.
+    """
+
+    def __init__(self, lo: np.ndarray, hi: np.ndarray, cell_size: float):
+        if cell_size <= 0:
+            raise ValueError("cell_size must be positive.")
+        self.cell_size = float(cell_size)
+        self.lo = np.asarray(lo, dtype=np.float64).reshape(-1, 3)
+        self.hi = np.asarray(hi, dtype=np.float64).reshape(-1, 3)
+        self.cells = {}
+        self.ids = np.zeros(0, dtype=np.int64)
+        count = len(self.lo)
+        if not count:
+            return
+        first = np.floor(self.lo[:, :2] / self.cell_size).astype(np.int64)
+        last = np.floor(self.hi[:, :2] / self.cell_size).astype(np.int64)
+        spans = last - first + 1
+        per_box = spans[:, 0] * spans[:, 1]
+        box_ids = np.repeat(np.arange(count), per_box)
+        # Position of each entry within its box's block of cells, unrolled row by row.
+        local = np.arange(len(box_ids)) - np.repeat(np.cumsum(per_box) - per_box, per_box)
+        rows = spans[box_ids, 1]
+        cx = first[box_ids, 0] + local // rows
+        cy = first[box_ids, 1] + local % rows
+        order = np.lexsort((cy, cx))
+        cx, cy = cx[order], cy[order]
+        self.ids = box_ids[order]
+        starts = np.flatnonzero(np.r_[True, (cx[1:] != cx[:-1]) | (cy[1:] != cy[:-1])])
+        ends = np.r_[starts[1:], len(cx)]
+        self.cells = dict(zip(
+            zip(cx[starts].tolist(), cy[starts].tolist()),
+            zip(starts.tolist(), ends.tolist())
+        ))
+
+    def __len__(self) -> int:
+        return len(self.lo)
+
+    def nearest(self, slices: Sequence[Tuple[int, int]], origin: np.ndarray, inverse: np.ndarray,
+                max_distance: float, skip: int = -1) -> Tuple[int, float]:
+        """
+        Slab test of the boxes in the given cell slices against a ray.
+
+        :param inverse: 1 / direction per axis (see cast_ray()).
+        :param skip: A box id to ignore, e.g. the shooter's own hit box.
+        :return: (box id, distance) of the nearest box the ray enters within
+                 max_distance, or (-1, inf).
+        """
+        ids = self.ids[slices[0][0]:slices[0][1]] if len(slices) == 1 else \
+            np.concatenate([self.ids[start:end] for start, end in slices])
+        if skip >= 0:
+            ids = ids[ids != skip]
+        if not len(ids):
+            return -1, math.inf
+        near = (self.lo[ids] - origin) * inverse
+        far = (self.hi[ids] - origin) * inverse
+        enter = np.maximum(np.minimum(near, far).max(axis=1), 0.0)
+        leave = np.maximum(near, far).min(axis=1)
+        enter[(enter > leave) | (enter > max_distance)] = math.inf
+        best = int(enter.argmin())
+        distance = float(enter[best])
+        return (int(ids[best]), distance) if distance != math.inf else (-1, math.inf)
+
+
+def traverse(origin, direction, max_distance: float, cell_size: float) -> Iterator[Tuple[Tuple[int, int], float]]:
+    """
+    The x/y grid cells a ray passes through, in order (Amanatides & Woo).
+
+    :return: ((cx, cy), distance at which the ray leaves the cell) per cell, up to
+             the cell containing the point at max_distance.
+    """
+    x, y = origin[0] / cell_size, origin[1] / cell_size
+    dx, dy = direction[0], direction[1]
+    cx, cy = math.floor(x), math.floor(y)
+    if dx > 0:
+        step_x, delta_x, next_x = 1, cell_size / dx, (cx + 1 - x) * cell_size / dx
+    elif dx < 0:
+        step_x, delta_x, next_x = -1, -cell_size / dx, (x - cx) * cell_size / -dx
+    else:
+        step_x, delta_x, next_x = 0, math.inf, math.inf
+    if dy > 0:
+        step_y, delta_y, next_y = 1, cell_size / dy, (cy + 1 - y) * cell_size / dy
+    elif dy < 0:
+        step_y, delta_y, next_y = -1, -cell_size / dy, (y - cy) * cell_size / -dy
+    else:
+        step_y, delta_y, next_y = 0, math.inf, math.inf
+    while True:
+        leave = min(next_x, next_y)
+        yield (cx, cy), leave
+        if leave >= max_distance:
+            return
+        if next_x < next_y:
+            cx += step_x
+            next_x += delta_x
+        else:
+            cy += step_y
+            next_y += delta_y
+
+
+class RayHit:
+    """
+    Result of cast_ray(): the entity hit (its box id, or None), the distance to it or
+    to the wall that stopped the ray, and whether a wall stopped it.
+    """
+
+    __slots__ = ("entity", "distance", "blocked", "cells")
+
+    def __init__(self, entity: Optional[int], distance: float, blocked: bool, cells: int):
+        self.entity = entity
+        self.distance = distance
+        self.blocked = blocked
+        self.cells = cells
+
+
+def cast_ray(origin, direction, max_distance: float, walls: BoxGrid, entities: BoxGrid,
+             skip: int = -1, batch: int = 8) -> RayHit:
+    """
+    First entity a ray hits before any wall.
+
+    Walks the cells under the ray (both grids must share a cell size) and tests the
+    boxes in them a batch of cells at a time, stopping at the first batch whose
+    nearest hit lies inside the cells walked so far - nothing in a later cell can
+    be closer.
+
+    :param origin: (x, y, z) start of the ray.
+    :param direction: Unit vector.
+    :param max_distance: Range of the ray.
+    :param skip: Entity box id to ignore (the shooter).
+    :param batch: Cells gathered per NumPy test.
+    """
+    if walls.cell_size != entities.cell_size:
+        raise ValueError("walls and entities must be bucketed on the same grid.")
+    origin = np.asarray(origin, dtype=np.float64)
+    direction = np.asarray(direction, dtype=np.float64)
+    with np.errstate(divide="ignore"):
+        inverse = np.where(direction != 0.0, 1.0 / np.where(direction != 0.0, direction, 1.0), _FLAT)
+    wall_cells, entity_cells = walls.cells, entities.cells
+    wall_slices: List[Tuple[int, int]] = []
+    entity_slices: List[Tuple[int, int]] = []
+    wall_distance = entity_distance = math.inf
+    entity = -1
+    walked = pending = 0
+    for cell, leave in traverse(origin, direction, max_distance, walls.cell_size):
+        walked += 1
+        found = wall_cells.get(cell)
+        if found:
+            wall_slices.append(found)
+        found = entity_cells.get(cell)
+        if found:
+            entity_slices.append(found)
+        pending += 1
+        if pending < batch:
+            continue
+        pending = 0
+        if wall_slices:
+            wall_distance = min(wall_distance, walls.nearest(wall_slices, origin, inverse, max_distance)[1])
+            wall_slices.clear()
+        if entity_slices:
+            hit, distance = entities.nearest(entity_slices, origin, inverse, max_distance, skip)
+            if distance < entity_distance:
+                entity, entity_distance = hit, distance
+            entity_slices.clear()
+        if min(wall_distance, entity_distance) <= leave:
+            break
+    else:
+        if wall_slices:
+            wall_distance = min(wall_distance, walls.nearest(wall_slices, origin, inverse, max_distance)[1])
+        if entity_slices:
+            hit, distance = entities.nearest(entity_slices, origin, inverse, max_distance, skip)
+            if distance < entity_distance:
+                entity, entity_distance = hit, distance
+    if entity >= 0 and entity_distance < wall_distance:
+        return RayHit(entity, entity_distance, False, walked)
+    if wall_distance <= max_distance:
+        return RayHit(None, wall_distance, True, walked)
+    return RayHit(None, max_distance, False, walked)
@@ -0,0 +1,75 @@
+# infrastructure/network/client_connection.py
+import asyncio
+import time
+from typing import Dict, Optional
+
+
+class ClientConnection:
+    """
+    Per-connection state kept by NetworkServer: the stream pair plus liveness
+    and round-trip bookkeeping used by heartbeats and slow-consumer eviction.
+    """
+
+    # Weight of the newest sample in the smoothed RTT (same idea as TCP's SRTT).
+    RTT_SMOOTHING = 0.125
+
+    def __init__(self, client_id: str, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        self.client_id = client_id
+        self.reader = reader
+        self.writer = writer
+        now = time.monotonic()
+        self.connected_at = now
+        self.last_seen = now
+        self.rtt: Optional[float] = None
+        self.last_rtt: Optional[float] = None
+        self.pending_pings: Dict[int, float] = {}
+        self.next_ping_id = 0
+        self.messages_in = 0
+        self.messages_out = 0
+        self.bytes_out = 0
+        self.evicted_reason: Optional[str] = None
+        # The connection's FrameReader; its limit is raised during a map upload (NetworkServer.LARGE_FRAMES_OPEN).
+        self.frames = None
+
+    def touch(self) -> None:
+        self.last_seen = time.monotonic()
+
+    def idle_seconds(self) -> float:
+        return time.monotonic() - self.last_seen
+
+    def write_buffer_size(self) -> int:
+        transport = self.writer.transport
+        return transport.get_write_buffer_size() if transport else 0
+
+    def new_ping(self) -> int:
+        ping_id = self.next_ping_id
+        self.next_ping_id += 1
+        self.pending_pings[ping_id] = time.monotonic()
+        # Unanswered pings are not kept forever; the idle timeout handles dead peers.
+        if len(self.pending_pings) > 8:
+            self.pending_pings.pop(next(iter(self.pending_pings)))
+        return ping_id
+
+    def record_pong(self, ping_id) -> Optional[float]:
+        sent_at = self.pending_pings.pop(ping_id, None)
+        if sent_at is None:
+            return None
+        sample = time.monotonic() - sent_at
+        self.last_rtt = sample
+        if self.rtt is None:
+            self.rtt = sample
+        else:
+            self.rtt += self.RTT_SMOOTHING * (sample - self.rtt)
+        return sample
+
+    def to_metrics(self) -> dict:
+        return {
+            "rtt_ms": round(self.rtt * 1000, 2) if self.rtt is not None else None,
+            "last_rtt_ms": round(self.last_rtt * 1000, 2) if self.last_rtt is not None else None,
+            "idle_seconds": round(self.idle_seconds(), 2),
+            "connected_seconds": round(time.monotonic() - self.connected_at, 2),
+            "write_buffer_bytes": self.write_buffer_size(),
+            "messages_in": self.messages_in,
+            "messages_out": self.messages_out,
+            "bytes_out": self.bytes_out
+        }
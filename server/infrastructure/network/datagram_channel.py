@@ -0,0 +1,222 @@
+# infrastructure/network/datagram_channel.py
+import asyncio
+import hashlib
+import hmac
+import json
+import logging
+import os
+import struct
+from typing import Awaitable, Callable, Dict, Optional, Tuple
+
+from infrastructure.logging.custom_logger import get_logger
+
+# Datagram layout: session_id (8 bytes) | seq (uint32, big endian) | tag (16 bytes) | JSON payload
+HEADER = struct.Struct("!8sI")
+TAG_SIZE = 16
+SEQ_MODULO = 1 << 32
+
+
+def sign_datagram(key: bytes, header: bytes, payload: bytes) -> bytes:
+    """
+    Compute the truncated HMAC-SHA256 tag covering the header and payload.
+    """
+    return hmac.new(key, header + payload, hashlib.sha256).digest()[:TAG_SIZE]
+
+
+def encode_datagram(session_id: bytes, key: bytes, seq: int, message: dict) -> bytes:
+    header = HEADER.pack(session_id, seq % SEQ_MODULO)
+    payload = json.dumps(message, separators=(",", ":")).encode("utf-8")
+    return header + sign_datagram(key, header, payload) + payload
+
+
+def is_newer_seq(seq: int, last_seq: Optional[int]) -> bool:
+    """
+    Serial-number comparison (RFC 1982 style) so the counter may wrap around.
+    """
+    if last_seq is None:
+        return True
+    diff = (seq - last_seq) % SEQ_MODULO
+    return 0 < diff < SEQ_MODULO // 2
+
+
+class DatagramSession:
+    """
+    Per-client state for the unreliable channel. A session is opened when a client
+    authenticates over TCP and is bound to a UDP address by the first valid datagram.
+    """
+
+    def __init__(self, client_id: str, session_id: bytes, key: bytes):
+        self.client_id = client_id
+        self.session_id = session_id
+        self.key = key
+        self.addr: Optional[Tuple[str, int]] = None
+        self.last_recv_seq: Optional[int] = None
+        self.next_send_seq = 0
+        self.received = 0
+        self.dropped_late = 0
+
+
+class _DatagramProtocol(asyncio.DatagramProtocol):
+    def __init__(self, channel: "DatagramChannel"):
+        self.channel = channel
+
+    def datagram_received(self, data: bytes, addr: Tuple[str, int]) -> None:
+        self.channel._on_datagram(data, addr)
+
+    def error_received(self, exc: Exception) -> None:
+        self.channel.logger.debug(f"Datagram socket error: {exc}")
+
+
+class DatagramChannel:
+    """
+    DatagramChannel is an optional UDP side channel for high-frequency, loss-tolerant
+    traffic (movement input and position snapshots). Reliable messages stay on TCP.
+
+    Each datagram carries the session id issued at login, a sequence number and an
+    HMAC tag computed with the per-session key. Datagrams with a bad tag are ignored,
+    and datagrams older than the newest one already received are discarded as late.
+    """
+
+    # Inbound message types accepted over UDP; everything else must use TCP.
+    UNRELIABLE_MESSAGE_TYPES = frozenset({"user_move_request", "user_turn_request", "world_snapshot_ack"})
+    # Outbound event types that may be delivered over UDP when the client has bound a peer address.
+    UNRELIABLE_EVENT_TYPES = frozenset({"player_position_update", "player_orientation_update", "world_snapshot"})
+    # Larger messages go over TCP rather than risk IP fragmentation; this fits a typical MTU.
+    MAX_DATAGRAM_BYTES = 1400
+    BIND_MESSAGE_TYPE = "datagram_bind"
+
+    def __init__(
+        self,
+        host: str,
+        port: int,
+        message_handler: Callable[[dict, str], Awaitable[None]],
+        logger: Optional[logging.Logger] = None
+    ):
+        """
+        :param host: Host to bind the UDP socket to.
+        :param port: UDP port to listen on.
+        :param message_handler: Async callback for incoming messages, same signature as NetworkServer's.
+        :param logger: Optional custom logger.
+        """
+        self.host = host
+        self.port = port
+        self.message_handler = message_handler
+        self.logger = logger or get_logger("DatagramChannel", debug_mode=False)
+        self.transport: Optional[asyncio.DatagramTransport] = None
+        self._sessions: Dict[bytes, DatagramSession] = {}
+        self._client_sessions: Dict[str, DatagramSession] = {}
+        self._pending_tasks = set()
+
+    async def start(self) -> None:
+        loop = asyncio.get_running_loop()
+        self.transport, _ = await loop.create_datagram_endpoint(
+            lambda: _DatagramProtocol(self),
+            local_addr=(self.host, self.port)
+        )
+        self.logger.info(f"DatagramChannel listening on {self.host}:{self.port} (UDP).")
+
+    async def stop(self) -> None:
+        if self.transport is not None:
+            self.transport.close()
+            self.transport = None
+        self._sessions.clear()
+        self._client_sessions.clear()
+        self.logger.info("DatagramChannel stopped.")
+
+    def open_session(self, client_id: str) -> dict:
+        """
+        Create (or replace) the datagram session for an authenticated TCP client.
+        Returns the details the client needs to use the channel.
+        """
+        self.close_session(client_id)
+        session = DatagramSession(client_id, os.urandom(8), os.urandom(32))
+        self._sessions[session.session_id] = session
+        self._client_sessions[client_id] = session
+        self.logger.debug(f"Opened datagram session for client_id='{client_id}'.")
+        return {
+            "port": self.port,
+            "session_id": session.session_id.hex(),
+            "session_key": session.key.hex()
+        }
+
+    def close_session(self, client_id: str) -> None:
+        session = self._client_sessions.pop(client_id, None)
+        if session:
+            self._sessions.pop(session.session_id, None)
+            self.logger.debug(f"Closed datagram session for client_id='{client_id}'.")
+
+    def has_peer(self, client_id: str) -> bool:
+        session = self._client_sessions.get(client_id)
+        return bool(session and session.addr and self.transport)
+
+    def send_message(self, client_id: str, message: dict) -> bool:
+        """
+        Send a message over UDP. Returns False if the client has no bound peer address
+        or the message is too large for one datagram, in which case the caller should
+        fall back to TCP.
+        """
+        session = self._client_sessions.get(client_id)
+        if not session or not session.addr or not self.transport:
+            return False
+        data = encode_datagram(session.session_id, session.key, session.next_send_seq, message)
+        if len(data) > self.MAX_DATAGRAM_BYTES:
+            return False
+        session.next_send_seq = (session.next_send_seq + 1) % SEQ_MODULO
+        self.transport.sendto(data, session.addr)
+        return True
+
+    def _on_datagram(self, data: bytes, addr: Tuple[str, int]) -> None:
+        if len(data) < HEADER.size + TAG_SIZE:
+            return
+
+        header = data[:HEADER.size]
+        session_id, seq = HEADER.unpack(header)
+        session = self._sessions.get(session_id)
+        if not session:
+            return
+
+        tag = data[HEADER.size:HEADER.size + TAG_SIZE]
+        payload = data[HEADER.size + TAG_SIZE:]
+        if not hmac.compare_digest(tag, sign_datagram(session.key, header, payload)):
+            self.logger.debug(f"Dropping datagram with invalid tag from {addr}.")
+            return
+
+        if not is_newer_seq(seq, session.last_recv_seq):
+            session.dropped_late += 1
+            return
+        session.last_recv_seq = seq
+        session.received += 1
+        # Authenticated datagrams (re)bind the peer address, which also follows NAT rebinding.
+        session.addr = addr
+
+        try:
+            message = json.loads(payload)
+        except (json.JSONDecodeError, UnicodeDecodeError):
+            self.logger.debug(f"Invalid JSON datagram from client_id='{session.client_id}'.")
+            return
+
+        message_type = message.get("message_type") if isinstance(message, dict) else None
+        if message_type == self.BIND_MESSAGE_TYPE:
+            self.send_message(session.client_id, {
+                "client_id": session.client_id,
+                "message": {"message_type": "datagram_bind_ok"}
+            })
+            return
+        if message_type not in self.UNRELIABLE_MESSAGE_TYPES:
+            self.logger.debug(f"Message type '{message_type}' not allowed over UDP, ignoring.")
+            return
+
+        task = asyncio.ensure_future(self.message_handler({"client_id": session.client_id, "message": message}, session.client_id))
+        self._pending_tasks.add(task)
+        task.add_done_callback(self._pending_tasks.discard)
+
+    def get_stats(self) -> dict:
+        return {
+            client_id: {
+                "bound": session.addr is not None,
+                "received": session.received,
+                "dropped_late": session.dropped_late,
+                "sent": session.next_send_seq
+            }
+            for client_id, session in self._client_sessions.items()
+        }
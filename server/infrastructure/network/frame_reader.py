@@ -0,0 +1,86 @@
+# infrastructure/network/frame_reader.py
+import asyncio
+from typing import Callable, Optional
+
+
+class FrameTooLargeError(Exception):
+    """
+    Raised when an inbound frame exceeds the reader's maximum size.
+    The oversized frame has already been skipped, so reading can continue.
+    """
+
+    def __init__(self, size: int, limit: int):
+        super().__init__(f"Frame of at least {size} bytes exceeds limit of {limit} bytes.")
+        self.size = size
+        self.limit = limit
+
+
+class FrameReader:
+    """
+    Reads newline-delimited frames from a StreamReader with an explicit size bound.
+
+    Unlike StreamReader.readline(), the limit is configurable per connection and an
+    oversized frame does not poison the stream: its bytes are discarded as they arrive
+    (never buffered whole) and the reader resynchronises on the next newline.
+    """
+
+    def __init__(
+        self,
+        reader: asyncio.StreamReader,
+        max_frame_bytes: int,
+        chunk_size: int = 65536,
+        on_data: Optional[Callable[[], None]] = None
+    ):
+        """
+        :param reader: The underlying asyncio StreamReader.
+        :param max_frame_bytes: Largest frame accepted, excluding the trailing newline.
+        :param chunk_size: Bytes requested from the socket per read.
+        :param on_data: Optional callback run whenever bytes arrive, e.g. to refresh idle tracking
+                        while a large frame is still streaming in.
+        """
+        self.reader = reader
+        self.max_frame_bytes = max_frame_bytes
+        self.chunk_size = chunk_size
+        self.on_data = on_data
+        self._buffer = bytearray()
+        self._scan_from = 0
+
+    async def read_frame(self) -> Optional[bytes]:
+        """
+        Return the next frame without its newline, or None at end of stream.
+        """
+        discarded = 0
+        while True:
+            idx = self._buffer.find(b"\n", self._scan_from)
+            if idx >= 0:
+                if discarded or idx > self.max_frame_bytes:
+                    del self._buffer[:idx + 1]
+                    self._scan_from = 0
+                    raise FrameTooLargeError(discarded + idx, self.max_frame_bytes)
+                frame = bytes(self._buffer[:idx])
+                del self._buffer[:idx + 1]
+                self._scan_from = 0
+                return frame
+
+            if discarded or len(self._buffer) > self.max_frame_bytes:
+                # Drop what we have and keep skipping until the frame ends.
+                discarded += len(self._buffer)
+                self._buffer.clear()
+                self._scan_from = 0
+            else:
+                self._scan_from = len(self._buffer)
+
+            chunk = await self.reader.read(self.chunk_size)
+            if not chunk:
+                if discarded:
+                    raise FrameTooLargeError(discarded, self.max_frame_bytes)
+                if self._buffer:
+                    # Unterminated final frame, mirror readline() and hand it out.
+                    frame = bytes(self._buffer)
+                    self._buffer.clear()
+                    self._scan_from = 0
+                    return frame
+                return None
+            if self.on_data:
+                self.on_data()
+            self._buffer += chunk
@@ -2,9 +2,12 @@
 import asyncio
 import json
 import ssl
+import time
 import logging
-from typing import Callable, Awaitable, Optional
+from typing import Callable, Awaitable, Dict, Iterable, Optional
 from infrastructure.logging.custom_logger import get_logger
+from infrastructure.network.client_connection import ClientConnection
+from infrastructure.network.frame_reader import FrameReader, FrameTooLargeError
 
 class NetworkServer:
     """
@@ -12,9 +15,32 @@ class NetworkServer:
     It reads JSON lines from clients and passes them to a message_handler.
     Integrates with ConnectionManager for disconnect handling.
 
+    A background heartbeat sends application-level pings, measures per-client RTT
+    from the pongs, disconnects clients that have been silent for longer than the
+    idle timeout and evicts slow consumers whose transport write buffer grows past
+    the configured high-water mark, so one stalled socket cannot hang a broadcast.
+
+    With a SessionManager, reliable messages carry a per-session "seq" in the envelope
+    and are kept in a replay buffer. A dropped client keeps its presence for a grace
+    window and may send session_resume_request on a new connection to receive only
+    the messages it missed, without logging in again or being resent the map state.
+
+    Service events addressed to clients reach deliver() through the OutboundRouter.
+
+    Inbound frames are bounded by max_message_bytes and discarded unparsed beyond
+    that. Only a connection the server has sent map_upload_begin_ok may send frames
+    up to the largest per-type limit, until its upload is finished with
+    map_create_ok or map_create_fail (or it disconnects); the per-type limit is
+    enforced once the frame is parsed.
+
     Logging is used to track connections, disconnections, and message processing.
     """
 
+    # Replies that open and close a connection's window for frames above max_message_bytes.
+    # map_upload_fail is not among them, since a bad chunk can be retried within the same upload.
+    LARGE_FRAMES_OPEN = frozenset({"map_upload_begin_ok"})
+    LARGE_FRAMES_CLOSE = frozenset({"map_create_ok", "map_create_fail"})
+
     def __init__(
         self,
         host: str,
@@ -22,7 +48,15 @@ class NetworkServer:
         message_handler: Callable[[dict, str], Awaitable[None]],
         ssl_context: Optional[ssl.SSLContext],
         connection_manager,
-        logger: Optional[logging.Logger] = None
+        logger: Optional[logging.Logger] = None,
+        datagram_channel=None,
+        heartbeat_interval: float = 10.0,
+        idle_timeout: float = 30.0,
+        write_buffer_high_water: int = 1048576,
+        send_timeout: float = 5.0,
+        max_message_bytes: int = 65536,
+        message_size_limits: Optional[Dict[str, int]] = None,
+        session_manager=None
     ):
         """
         :param host: Host to bind to.
@@ -31,6 +65,14 @@ class NetworkServer:
         :param ssl_context: SSLContext or None for no SSL.
         :param connection_manager: ConnectionManager instance.
         :param logger: Optional custom logger.
+        :param datagram_channel: Optional DatagramChannel used for unreliable delivery.
+        :param heartbeat_interval: Seconds between pings sent to each client.
+        :param idle_timeout: Seconds without any inbound data before a client is disconnected.
+        :param write_buffer_high_water: Bytes queued in a transport's write buffer before the client is evicted.
+        :param send_timeout: Upper bound in seconds for a single drain() on a client writer.
+        :param max_message_bytes: Default size limit for an inbound message.
+        :param message_size_limits: Optional per-message_type overrides of max_message_bytes.
+        :param session_manager: Optional SessionManager enabling sequence numbers, replay and session resume.
         """
         self.host = host
         self.port = port
@@ -38,8 +80,20 @@ class NetworkServer:
         self.ssl_context = ssl_context
         self.connection_manager = connection_manager
         self.logger = logger or get_logger("NetworkServer", debug_mode=False)
+        self.datagram_channel = datagram_channel
+        self.heartbeat_interval = heartbeat_interval
+        self.idle_timeout = idle_timeout
+        self.write_buffer_high_water = write_buffer_high_water
+        self.send_timeout = send_timeout
+        self.max_message_bytes = max_message_bytes
+        self.message_size_limits = dict(message_size_limits or {})
+        # Largest frame any message type may use, allowed only during an upload.
+        self.max_frame_bytes = max([max_message_bytes, *self.message_size_limits.values()])
+        self.session_manager = session_manager
         self.server: Optional[asyncio.AbstractServer] = None
-        self.clients = {}
+        self.clients: Dict[str, ClientConnection] = {}
+        self.evictions: Dict[str, int] = {"idle_timeout": 0, "slow_consumer": 0, "send_timeout": 0}
+        self._heartbeat_task: Optional[asyncio.Task] = None
         self._shutdown_event = asyncio.Event()
 
     async def start(self) -> None:
@@ -51,19 +105,32 @@ class NetworkServer:
             self.port,
             ssl=self.ssl_context
         )
+        if self.heartbeat_interval > 0:
+            self._heartbeat_task = asyncio.create_task(self._heartbeat_loop())
         self.logger.info("NetworkServer started and accepting connections.")
 
     async def stop(self) -> None:
         self.logger.info("Stopping NetworkServer...")
+        self._shutdown_event.set()
+        if self._heartbeat_task:
+            self._heartbeat_task.cancel()
+            try:
+                await self._heartbeat_task
+            except asyncio.CancelledError:
+                pass
+
         if self.server is not None:
             self.server.close()
             await self.server.wait_closed()
 
         # Close all connected clients
-        for client_id, (_, writer) in self.clients.items():
+        for client_id, conn in list(self.clients.items()):
             self.logger.debug(f"Closing connection for '{client_id}'.")
-            writer.close()
-            await writer.wait_closed()
+            conn.writer.close()
+            try:
+                await conn.writer.wait_closed()
+            except Exception:
+                pass
 
         self.clients.clear()
         self.logger.info("NetworkServer stopped.")
@@ -78,67 +145,312 @@ class NetworkServer:
             client_id = str(uuid.uuid4())
 
         self.logger.info(f"New client connected: client_id='{client_id}'.")
-        self.clients[client_id] = (reader, writer)
+        conn = ClientConnection(client_id, reader, writer)
+        # Let drain() pause only once we are at the eviction threshold.
+        writer.transport.set_write_buffer_limits(high=self.write_buffer_high_water)
+        self.clients[client_id] = conn
 
         try:
-            await self._read_from_client(client_id, reader, writer)
+            await self._read_from_client(conn)
         except asyncio.CancelledError:
             self.logger.warning(f"Client task cancelled: client_id='{client_id}'.")
+        except (ConnectionError, ssl.SSLError) as e:
+            self.logger.info(f"Connection error for client_id='{client_id}': {e}")
         except Exception as e:
             self.logger.exception(f"Unexpected error in client task '{client_id}': {e}")
         finally:
             self.logger.info(f"Client '{client_id}' disconnected.")
-            # Notify connection_manager
-            await self.connection_manager.handle_disconnect(client_id)
+            # A resumable session keeps the username mapped until its grace window expires.
+            session = self.session_manager.detach(client_id) if self.session_manager else None
+            if session is None:
+                # Notify connection_manager
+                await self.connection_manager.handle_disconnect(client_id)
+            if self.datagram_channel:
+                self.datagram_channel.close_session(client_id)
 
-            if client_id in self.clients:
+            if self.clients.get(client_id) is conn:
                 del self.clients[client_id]
             writer.close()
-            await writer.wait_closed()
+            try:
+                await writer.wait_closed()
+            except Exception:
+                pass
 
-    async def _read_from_client(self, client_id: str, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+    async def _read_from_client(self, conn: ClientConnection) -> None:
+        client_id = conn.client_id
+        frames = conn.frames = FrameReader(conn.reader, self.max_message_bytes, on_data=conn.touch)
         while True:
-            line = await reader.readline()
-            if not line:
+            try:
+                frame = await frames.read_frame()
+            except FrameTooLargeError as e:
+                self.logger.warning(f"Dropping oversized message from client_id='{client_id}': {e}")
+                self._reject(conn, f"Message exceeds {e.limit} bytes.")
+                continue
+
+            if frame is None:
                 # Client closed connection.
                 self.logger.debug(f"No more data from client_id='{client_id}', assuming disconnect.")
                 break
 
-            line_str = line.decode('utf-8').strip()
-            if not line_str:
+            conn.touch()
+            if not frame.strip():
                 self.logger.debug(f"Empty line received from client_id='{client_id}', ignoring.")
                 continue
 
-            self.logger.debug(f"Received data from client_id='{client_id}': {line_str}")
+            if self.logger.isEnabledFor(logging.DEBUG):
+                self.logger.debug(f"Received {len(frame)} bytes from client_id='{client_id}'.")
             try:
-                message = json.loads(line_str)
+                message = json.loads(frame)
+                conn.messages_in += 1
+                if self._handle_heartbeat_message(conn, message):
+                    continue
+                if self._is_resume_request(message):
+                    await self._handle_resume_request(conn, message["message"])
+                    continue
+                if not self._within_size_limit(conn, message, len(frame)):
+                    continue
                 await self.message_handler(message, client_id)
-            except json.JSONDecodeError:
-                self.logger.warning(f"Invalid JSON from client_id='{client_id}': {line_str}")
+            except (json.JSONDecodeError, UnicodeDecodeError):
+                self.logger.warning(f"Invalid JSON from client_id='{client_id}' ({len(frame)} bytes).")
             except Exception as e:
                 self.logger.exception(f"Error handling message from client_id='{client_id}': {e}")
 
-    async def send_message(self, client_id: str, message: dict) -> bool:
-        if client_id not in self.clients:
+    def _allow_large_frames(self, conn: ClientConnection, allowed: bool) -> None:
+        # Applied to the reader directly, so it also covers a frame already being read.
+        if conn.frames is not None:
+            conn.frames.max_frame_bytes = self.max_frame_bytes if allowed else self.max_message_bytes
+
+    def _within_size_limit(self, conn: ClientConnection, message, size: int) -> bool:
+        inner = message.get("message") if isinstance(message, dict) else None
+        message_type = inner.get("message_type") if isinstance(inner, dict) else None
+        limit = self.message_size_limits.get(message_type, self.max_message_bytes)
+        if size <= limit:
+            return True
+        self.logger.warning(f"Message '{message_type}' from client_id='{conn.client_id}' is {size} bytes, limit is {limit}.")
+        self._reject(conn, f"Message '{message_type}' exceeds {limit} bytes.")
+        return False
+
+    def _reject(self, conn: ClientConnection, reason: str) -> None:
+        self._write(conn, {
+            "client_id": conn.client_id,
+            "message": {"message_type": "invalid_message", "reason": reason}
+        })
+
+    def _handle_heartbeat_message(self, conn: ClientConnection, message: dict) -> bool:
+        """
+        Consume ping/pong messages at the transport level. Returns True if handled.
+        """
+        inner = message.get("message") if isinstance(message, dict) else None
+        if not isinstance(inner, dict):
+            return False
+        message_type = inner.get("message_type")
+        if message_type == "pong":
+            sample = conn.record_pong(inner.get("ping_id"))
+            if sample is not None:
+                self.logger.debug(f"RTT for client_id='{conn.client_id}': {sample * 1000:.1f} ms.")
+            return True
+        if message_type == "ping":
+            self._write(conn, {
+                "client_id": conn.client_id,
+                "message": {"message_type": "pong", "ping_id": inner.get("ping_id")}
+            })
+            return True
+        return False
+
+    def _is_resume_request(self, message) -> bool:
+        inner = message.get("message") if isinstance(message, dict) else None
+        return (
+            self.session_manager is not None
+            and isinstance(inner, dict)
+            and inner.get("message_type") == "session_resume_request"
+        )
+
+    async def _handle_resume_request(self, conn: ClientConnection, inner: dict) -> None:
+        username = inner.get("username")
+        last_seq = inner.get("last_seq", 0)
+        session = self.session_manager.resume(username, inner.get("resume_token", ""), conn.client_id)
+        if session is None:
+            self._write(conn, {
+                "client_id": conn.client_id,
+                "message": {"message_type": "session_resume_fail", "reason": "Invalid or expired session."}
+            })
+            return
+
+        missed = session.messages_since(last_seq if isinstance(last_seq, int) else 0)
+        if missed is None:
+            # Too much was missed to replay; the client has to log in again.
+            self.session_manager.end_session(username)
+            await self.connection_manager.register_logout(username)
+            self._write(conn, {
+                "client_id": conn.client_id,
+                "message": {"message_type": "session_resume_fail", "reason": "Replay window exceeded, please log in again."}
+            })
+            return
+
+        await self.connection_manager.register_login(username, conn.client_id)
+        resume_ok = {"message_type": "session_resume_ok", "username": username, "replayed": len(missed)}
+        if self.datagram_channel:
+            resume_ok["datagram"] = self.datagram_channel.open_session(conn.client_id)
+        self._write(conn, {"client_id": conn.client_id, "message": resume_ok})
+        for seq, message in missed:
+            self._write(conn, {**message, "client_id": conn.client_id, "seq": seq})
+        self.logger.info(f"Resumed session for '{username}' on client_id='{conn.client_id}', replayed {len(missed)} messages.")
+
+    async def _heartbeat_loop(self) -> None:
+        while not self._shutdown_event.is_set():
+            await asyncio.sleep(self.heartbeat_interval)
+            for conn in list(self.clients.values()):
+                if conn.evicted_reason:
+                    continue
+                if self.idle_timeout > 0 and conn.idle_seconds() > self.idle_timeout:
+                    self._evict(conn, "idle_timeout")
+                    continue
+                self._write(conn, {
+                    "client_id": conn.client_id,
+                    "message": {"message_type": "ping", "ping_id": conn.new_ping(), "server_time": time.time()}
+                })
+
+    def _write(self, conn: ClientConnection, message: dict) -> bool:
+        """
+        Queue a message on the client's transport without waiting. Evicts the client
+        if its write buffer is past the high-water mark.
+        """
+        return self._write_raw(conn, (json.dumps(message) + "\n").encode('utf-8'))
+
+    def _write_raw(self, conn: ClientConnection, data: bytes) -> bool:
+        writer = conn.writer
+        if conn.evicted_reason or writer.is_closing():
+            return False
+        writer.write(data)
+        conn.messages_out += 1
+        conn.bytes_out += len(data)
+        if conn.write_buffer_size() > self.write_buffer_high_water:
+            self._evict(conn, "slow_consumer")
+            return False
+        return True
+
+    def _evict(self, conn: ClientConnection, reason: str) -> None:
+        """
+        Forcefully drop a connection. Aborting the transport ends the read loop,
+        which runs the normal disconnect cleanup.
+        """
+        if conn.evicted_reason:
+            return
+        conn.evicted_reason = reason
+        self.evictions[reason] = self.evictions.get(reason, 0) + 1
+        self.logger.warning(
+            f"Evicting client_id='{conn.client_id}' ({reason}): idle={conn.idle_seconds():.1f}s, "
+            f"write_buffer={conn.write_buffer_size()} bytes."
+        )
+        transport = conn.writer.transport
+        if transport:
+            transport.abort()
+
+    async def send_message(self, client_id: str, message: dict, replayable: bool = True) -> bool:
+        if self.session_manager and replayable:
+            session = self.session_manager.get_by_client(client_id)
+            if session:
+                message = {**message, "seq": session.record(message)}
+                if not session.connected:
+                    # Buffered for replay when the client resumes.
+                    return False
+
+        conn = self.clients.get(client_id)
+        if conn is None:
             self.logger.warning(f"Cannot send message to '{client_id}', not connected.")
             return False
 
-        _, writer = self.clients[client_id]
-        if writer.is_closing():
+        writer = conn.writer
+        if writer.is_closing() or conn.evicted_reason:
             self.logger.warning(f"Writer for '{client_id}' is closing, cannot send message.")
             return False
 
-        data = (json.dumps(message) + "\n").encode('utf-8')
         self.logger.debug(f"Sending data to client_id='{client_id}': {message}")
         try:
-            writer.write(data)
-            await writer.drain()
+            if not self._write(conn, message):
+                return False
+            # The buffer is below the high-water mark here, so drain() normally returns at once;
+            # the timeout only guards against a transport that never resumes writing.
+            await asyncio.wait_for(writer.drain(), timeout=self.send_timeout)
             return True
+        except asyncio.TimeoutError:
+            self._evict(conn, "send_timeout")
+            return False
         except Exception as e:
             self.logger.exception(f"Failed to send message to '{client_id}': {e}")
             return False
 
+    async def send_unreliable(self, client_id: str, message: dict) -> bool:
+        """
+        Send a loss-tolerant message over the datagram channel if the client has bound one,
+        otherwise fall back to the reliable TCP stream.
+        """
+        if self.datagram_channel and self.datagram_channel.send_message(client_id, message):
+            return True
+        # Snapshots are superseded by the next one, so they are not worth replaying.
+        return await self.send_message(client_id, message, replayable=False)
+
+    def deliver(self, client_ids: Iterable[str], message: dict, unreliable: bool = False) -> int:
+        """
+        Queue one message for a set of clients without waiting on any of them.
+
+        The message body is JSON-encoded once; each recipient only gets its own small
+        envelope prefix (client_id and, with sessions, seq). Reliable messages are
+        recorded for replay like send_message() does. Unreliable ones go over the
+        datagram channel where bound and fall back to the stream otherwise.
+        Slow recipients are handled by the write buffer high-water eviction.
+
+        :return: Number of recipients the message was queued or buffered for.
+        """
+        body = None
+        message_type = message.get("message_type")
+        replay_entry = {"message": message}
+        delivered = 0
+        for client_id in client_ids:
+            if unreliable and self.datagram_channel and self.datagram_channel.send_message(
+                client_id, {"client_id": client_id, "message": message}
+            ):
+                delivered += 1
+                continue
+
+            seq = None
+            if self.session_manager and not unreliable:
+                session = self.session_manager.get_by_client(client_id)
+                if session:
+                    seq = session.record(replay_entry)
+                    if not session.connected:
+                        delivered += 1
+                        continue
+
+            conn = self.clients.get(client_id)
+            if conn is None:
+                continue
+            if message_type in self.LARGE_FRAMES_OPEN:
+                self._allow_large_frames(conn, True)
+            elif message_type in self.LARGE_FRAMES_CLOSE:
+                self._allow_large_frames(conn, False)
+            if body is None:
+                body = json.dumps(message).encode('utf-8')
+            prefix = f'{{"client_id": {json.dumps(client_id)}, ' + (f'"seq": {seq}, ' if seq is not None else '') + '"message": '
+            if self._write_raw(conn, prefix.encode('utf-8') + body + b"}\n"):
+                delivered += 1
+        return delivered
+
     def get_connected_clients(self) -> list:
         connected = list(self.clients.keys())
         self.logger.debug(f"get_connected_clients() -> {connected}")
         return connected
+
+    def get_rtt(self, client_id: str) -> Optional[float]:
+        """
+        Smoothed round-trip time in seconds for a client, or None if not measured yet.
+        """
+        conn = self.clients.get(client_id)
+        return conn.rtt if conn else None
+
+    def get_metrics(self) -> dict:
+        return {
+            "connected": len(self.clients),
+            "evictions": dict(self.evictions),
+            "clients": {client_id: conn.to_metrics() for client_id, conn in self.clients.items()}
+        }
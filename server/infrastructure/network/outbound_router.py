@@ -0,0 +1,95 @@
+# infrastructure/network/outbound_router.py
+import logging
+from typing import Dict, Iterable, Optional
+
+from infrastructure.logging.custom_logger import get_logger
+
+RELIABLE = "reliable"
+UNRELIABLE = "unreliable"
+_UNRESOLVED = object()
+
+
+class OutboundRouter:
+    """
+    Bridges client-addressed events to client connections.
+
+    The EventDispatcher hands every dispatched event to route(). A route table maps
+    event types to a delivery mode; it is seeded from configuration, extended by
+    suffix rules (every *_ok / *_fail event goes to the client) and memoized per
+    event type, so deciding whether an event leaves the server is one dict lookup.
+
+    Routed events carry either "client_id" or "client_ids" next to "message". The
+    message body is encoded once and queued on every recipient's connection with
+    its own envelope, so a broadcast is one dispatch rather than one per recipient.
+    The event type is injected as the message's message_type.
+    """
+
+    def __init__(
+        self,
+        network_server,
+        routes: Optional[Dict[str, str]] = None,
+        route_suffixes: Iterable[str] = ("_ok", "_fail"),
+        logger: Optional[logging.Logger] = None
+    ):
+        """
+        :param network_server: NetworkServer whose deliver() queues the encoded messages.
+        :param routes: Event type -> "reliable" or "unreliable". Any other value disables routing for the type.
+        :param route_suffixes: Event types ending in one of these are routed reliably unless listed in routes.
+        :param logger: Optional logger.
+        """
+        self.network_server = network_server
+        self.routes = dict(routes or {})
+        self.route_suffixes = tuple(route_suffixes)
+        self.logger = logger or get_logger("OutboundRouter", debug_mode=False)
+        self._table: Dict[str, Optional[str]] = {}
+        self.routed: Dict[str, int] = {}
+        self.recipients = 0
+        self.delivered = 0
+
+    def add_route(self, event_type: str, mode: str) -> None:
+        self.routes[event_type] = mode
+        self._table.pop(event_type, None)
+
+    def _resolve(self, event_type: str) -> Optional[str]:
+        mode = self.routes.get(event_type)
+        if mode is None and event_type.endswith(self.route_suffixes):
+            mode = RELIABLE
+        return mode if mode in (RELIABLE, UNRELIABLE) else None
+
+    def route(self, event_type: str, event_data: dict) -> int:
+        """
+        Deliver the event to its client(s) if its type is routed.
+
+        :return: Number of recipients the message was queued or buffered for.
+        """
+        mode = self._table.get(event_type, _UNRESOLVED)
+        if mode is _UNRESOLVED:
+            mode = self._table[event_type] = self._resolve(event_type)
+        if mode is None:
+            return 0
+
+        client_ids = event_data.get("client_ids")
+        if client_ids is None:
+            client_id = event_data.get("client_id")
+            if not client_id:
+                return 0
+            client_ids = (client_id,)
+        elif not client_ids:
+            return 0
+
+        message = event_data.get("message") or {}
+        if "message_type" not in message:
+            message = {**message, "message_type": event_type}
+
+        delivered = self.network_server.deliver(client_ids, message, unreliable=(mode == UNRELIABLE))
+        self.routed[event_type] = self.routed.get(event_type, 0) + 1
+        self.recipients += len(client_ids)
+        self.delivered += delivered
+        return delivered
+
+    def get_stats(self) -> dict:
+        return {
+            "recipients": self.recipients,
+            "delivered": self.delivered,
+            "routed": dict(self.routed)
+        }
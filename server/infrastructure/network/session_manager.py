@@ -0,0 +1,121 @@
+# infrastructure/network/session_manager.py
+import hmac
+import logging
+import secrets
+import time
+from collections import deque
+from typing import Deque, Dict, List, Optional, Tuple
+
+from infrastructure.logging.custom_logger import get_logger
+
+
+class Session:
+    """
+    A logged-in user's session. It outlives the TCP connection for a grace window,
+    keeps every reliable outbound message in a bounded replay buffer and tags it
+    with a sequence number so a reconnecting client can ask for what it missed.
+    """
+
+    def __init__(self, username: str, client_id: str, resume_token: str, replay_buffer_size: int):
+        self.username = username
+        self.client_id = client_id
+        self.resume_token = resume_token
+        self.connected = True
+        self.detached_at: Optional[float] = None
+        self.next_seq = 1
+        self.replay: Deque[Tuple[int, dict]] = deque(maxlen=replay_buffer_size)
+
+    def record(self, message: dict) -> int:
+        seq = self.next_seq
+        self.next_seq += 1
+        self.replay.append((seq, message))
+        return seq
+
+    def messages_since(self, last_seq: int) -> Optional[List[Tuple[int, dict]]]:
+        """
+        Messages with seq > last_seq, or None if some of them already fell out of the buffer.
+        """
+        oldest = self.replay[0][0] if self.replay else self.next_seq
+        if last_seq + 1 < oldest:
+            return None
+        return [(seq, message) for seq, message in self.replay if seq > last_seq]
+
+
+class SessionManager:
+    """
+    Tracks resumable sessions by username and by current client_id.
+
+    - create_session() is called at login and returns the session holding the resume token.
+    - detach() is called when the connection drops; the session is kept for grace_seconds.
+    - resume() rebinds a detached session to a new client_id if the token matches.
+    - expire_detached() returns sessions whose grace window has passed, for cleanup.
+    """
+
+    def __init__(self, grace_seconds: float = 60.0, replay_buffer_size: int = 512, logger: Optional[logging.Logger] = None):
+        self.grace_seconds = grace_seconds
+        self.replay_buffer_size = replay_buffer_size
+        self.logger = logger or get_logger("SessionManager", debug_mode=False)
+        self._by_username: Dict[str, Session] = {}
+        self._by_client: Dict[str, Session] = {}
+
+    def create_session(self, username: str, client_id: str) -> Session:
+        self.end_session(username)
+        session = Session(username, client_id, secrets.token_urlsafe(32), self.replay_buffer_size)
+        self._by_username[username] = session
+        self._by_client[client_id] = session
+        self.logger.debug(f"Session created for '{username}' on client_id='{client_id}'.")
+        return session
+
+    def end_session(self, username: str) -> Optional[Session]:
+        session = self._by_username.pop(username, None)
+        if session:
+            if self._by_client.get(session.client_id) is session:
+                del self._by_client[session.client_id]
+            self.logger.debug(f"Session ended for '{username}'.")
+        return session
+
+    def get_by_client(self, client_id: str) -> Optional[Session]:
+        return self._by_client.get(client_id)
+
+    def detach(self, client_id: str) -> Optional[Session]:
+        session = self._by_client.get(client_id)
+        if session and session.connected:
+            session.connected = False
+            session.detached_at = time.monotonic()
+            self.logger.info(f"Session for '{session.username}' detached, resumable for {self.grace_seconds}s.")
+        return session
+
+    def resume(self, username: str, resume_token: str, client_id: str) -> Optional[Session]:
+        session = self._by_username.get(username)
+        if not session or not resume_token:
+            return None
+        if not hmac.compare_digest(session.resume_token, resume_token):
+            return None
+        if session.connected and session.client_id in self._by_client:
+            # The old socket has not noticed it is dead yet; the new connection wins.
+            self.logger.debug(f"Resuming still-attached session for '{username}'.")
+        if self._by_client.get(session.client_id) is session:
+            del self._by_client[session.client_id]
+        session.client_id = client_id
+        session.connected = True
+        session.detached_at = None
+        self._by_client[client_id] = session
+        self.logger.info(f"Session for '{username}' resumed on client_id='{client_id}'.")
+        return session
+
+    def expire_detached(self) -> List[Session]:
+        now = time.monotonic()
+        expired = [
+            s for s in self._by_username.values()
+            if not s.connected and s.detached_at is not None and now - s.detached_at > self.grace_seconds
+        ]
+        for session in expired:
+            self.end_session(session.username)
+            self.logger.info(f"Session for '{session.username}' expired after grace window.")
+        return expired
+
+    def get_stats(self) -> dict:
+        return {
+            "sessions": len(self._by_username),
+            "detached": sum(1 for s in self._by_username.values() if not s.connected)
+        }
@@ -3,20 +3,36 @@ import json
 import aiofiles
 import asyncio
 import logging
+import time
 from pathlib import Path
 from infrastructure.logging.custom_logger import get_logger
 from domain.maps.map import Map
 from .map_parser import MapParser
 
 class FileMapRepository:
+    """
+    Maps stored as .map files. A loaded map stays resident in memory, and every
+    load_map() returns that same instance, until release_map() drops it; the next
+    load reads the file again.
+    """
+
     def __init__(self, logger=None, maps_dir='maps_data'):
         self.logger = logger or get_logger("map_registry", debug_mode=True)
         self._maps = {}
+        # map_name -> {"loads", "hits", "loaded_at", "last_used", "load_ms"}; kept across releases.
+        self._residency = {}
         self._lock = asyncio.Lock()
         self._maps_path = Path(maps_dir)
         self._maps_path.mkdir(exist_ok=True)
 
     async def load_map(self, map_name):
+        resident = self._maps.get(map_name)
+        if resident is not None:
+            stats = self._residency[map_name]
+            stats["hits"] += 1
+            stats["last_used"] = time.time()
+            return resident
+        started = time.perf_counter()
         map_file = self._maps_path / f"{map_name}.map"
         if map_file.exists():
             async with aiofiles.open(map_file, "r") as f:
@@ -27,7 +43,11 @@ class FileMapRepository:
             try:
                 parsed_map = MapParser.parse_custom_map_format_to_dict(map_data)
                 map_instance = Map.from_dict(parsed_map)
+                # Another load may have finished while this one read the file; keep the first.
+                if map_name in self._maps:
+                    return self._maps[map_name]
                 self._maps[map_name] = map_instance
+                self._record_load(map_name, time.perf_counter() - started)
                 self.logger.info(f"Map '{map_name}' loaded successfully.")
                 return map_instance
             except Exception as e:
@@ -43,6 +63,9 @@ class FileMapRepository:
         try:
             async with aiofiles.open(map_file, "w") as f:
                 await f.write(custom_map_format)
+            if self._maps.get(map_instance.map_name) is not map_instance:
+                self._maps[map_instance.map_name] = map_instance
+                self._record_load(map_instance.map_name, 0.0)
             self.logger.info(f"Map '{map_instance.map_name}' saved successfully.")
             return True
         except Exception as e:
@@ -53,6 +76,7 @@ class FileMapRepository:
         async with self._lock:
             if map_name in self._maps:
                 del self._maps[map_name]
+            self._residency.pop(map_name, None)
             map_file = self._maps_path / f"{map_name}.map"
             if map_file.exists():
                 map_file.unlink()
@@ -61,6 +85,28 @@ class FileMapRepository:
             self.logger.warning(f"Map '{map_name}' does not exist.")
             return False
 
+    def _record_load(self, map_name: str, seconds: float) -> None:
+        now = time.time()
+        stats = self._residency.setdefault(map_name, {"loads": 0, "hits": 0, "loaded_at": now, "last_used": now, "load_ms": 0.0})
+        stats["loads"] += 1
+        stats["loaded_at"] = stats["last_used"] = now
+        stats["load_ms"] = round(seconds * 1000.0, 3)
+
+    def is_resident(self, map_name: str) -> bool:
+        return map_name in self._maps
+
+    def resident_maps(self) -> list:
+        return list(self._maps)
+
+    def release_map(self, map_name: str) -> bool:
+        """
+        Drop a resident map from memory. Its file is untouched; the next load_map() reads it again.
+        """
+        return self._maps.pop(map_name, None) is not None
+
+    def get_residency(self) -> dict:
+        return {name: dict(stats, resident=name in self._maps) for name, stats in self._residency.items()}
+
     async def map_exists(self, map_name):
         map_file = self._maps_path / f"{map_name}.map"
         return map_file.exists()
@@ -75,9 +121,8 @@ class FileMapRepository:
             return []
 
     async def save_all_maps(self):
+        # Only resident maps can differ from their files, and loading the rest would wake them.
         async with self._lock:
-            for map_name in await self.get_all_map_names():
-                map_instance = await self.load_map(map_name)
-                if map_instance:
-                    await self.save_map(map_instance)
+            for map_instance in list(self._maps.values()):
+                await self.save_map(map_instance)
             self.logger.info("All maps saved successfully.")
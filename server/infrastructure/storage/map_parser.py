@@ -25,19 +25,24 @@ class MapParser:
                     "is_wall": is_wall
                 }
             elif key == "zone":
-                # zone:x1:x2:y1:y2:z1:z2:zone_label:is_safe:is_hazard
+                # zone:x1:x2:y1:y2:z1:z2:zone_label:is_safe:is_hazard[:zone_type:destination_map[:dx:dy:dz]]
+                # Legacy lines stop after is_hazard; an empty destination_map means none.
                 zone_key = str(uuid.uuid4())
                 zone_pos = tuple(float(v) for v in parts[1:7])
                 zone_label = parts[7]
                 is_safe = parts[8].lower() == "true"
                 is_hazard = parts[9].lower() == "true"
-                # We don't have zone_type or destinations from legacy format,
-                # they can be set default later.
+                zone_type = parts[10] if len(parts) > 10 and parts[10] else "normal"
+                destination_map = parts[11] if len(parts) > 11 and parts[11] else None
+                destination_coords = tuple(float(v) for v in parts[12:15]) if len(parts) > 14 else None
                 map_dict["zones"][zone_key] = {
-                    "zone_position": zone_pos,
+                    "bounds": zone_pos,
                     "zone_label": zone_label,
                     "is_safe": is_safe,
-                    "is_hazard": is_hazard
+                    "is_hazard": is_hazard,
+                    "zone_type": zone_type,
+                    "destination_map": destination_map,
+                    "destination_coords": destination_coords
                 }
             elif key == "map_size":
                 map_dict["map_size"] = tuple(float(v) for v in parts[1:7])
@@ -63,8 +68,11 @@ class MapParser:
 
         # zones
         for zone_key, zone in map_dict.get("zones", {}).items():
-            pos_str = ":".join(str(v) for v in zone["zone_position"])
+            pos_str = ":".join(str(v) for v in zone["bounds"])
             line = f"zone:{pos_str}:{zone['zone_label']}:{zone['is_safe']}:{zone['is_hazard']}"
+            line += f":{zone.get('zone_type') or 'normal'}:{zone.get('destination_map') or ''}"
+            if zone.get("destination_coords"):
+                line += ":" + ":".join(str(v) for v in zone["destination_coords"])
             custom_format_lines.append(line)
 
         # map_size
@@ -0,0 +1,126 @@
+# infrastructure/storage/traffic_recorder.py
+import asyncio
+import gzip
+import json
+import logging
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Iterable, List, Optional
+
+from infrastructure.logging.custom_logger import get_logger
+
+RECORDING_FORMAT_VERSION = 1
+# Credentials never written to a recording; the replay tool supplies its own.
+DEFAULT_REDACT_FIELDS = ("password", "token", "resume_token")
+
+
+class TrafficRecorder:
+    """
+    Records inbound client messages to a gzip-compressed JSON-lines file for
+    offline replay with tools/replay_traffic.py.
+
+    The first line is a header {"format": 1, "started_at": <epoch>}. Each following
+    line is {"t": <seconds since start>, "c": <client_id>, "m": <inner message>}.
+    Sensitive fields (passwords, session tokens and resume tokens by default) are
+    replaced with "***", so a recording of live traffic holds no credentials.
+
+    record() only serializes the message into an in-memory buffer; a background task
+    compresses and writes the buffer in a worker thread, so recording adds no file
+    I/O to the network reader. If the writer falls behind by more than max_buffer
+    lines, further messages are counted as dropped rather than growing memory.
+    """
+
+    def __init__(
+        self,
+        directory: str = "logs/traffic",
+        flush_interval: float = 1.0,
+        redact_fields: Iterable[str] = DEFAULT_REDACT_FIELDS,
+        max_buffer: int = 100000,
+        logger: Optional[logging.Logger] = None
+    ):
+        self.directory = Path(directory)
+        self.flush_interval = flush_interval
+        self.redact_fields = frozenset(redact_fields)
+        self.max_buffer = max_buffer
+        self.logger = logger or get_logger("TrafficRecorder", debug_mode=False)
+        self.path: Optional[Path] = None
+        self.recorded = 0
+        self.dropped = 0
+        self._file = None
+        self._buffer: List[str] = []
+        self._started = 0.0
+        self._flush_task: Optional[asyncio.Task] = None
+
+    @property
+    def running(self) -> bool:
+        return self._file is not None
+
+    async def start(self) -> None:
+        if self.running:
+            return
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.path = self.directory / f"traffic-{datetime.now().strftime('%Y%m%d-%H%M%S')}.jsonl.gz"
+        self._file = gzip.open(self.path, "wt", encoding="utf-8")
+        self._started = time.monotonic()
+        self._file.write(json.dumps({"format": RECORDING_FORMAT_VERSION, "started_at": time.time()}) + "\n")
+        self._flush_task = asyncio.create_task(self._flush_loop())
+        self.logger.info(f"Recording inbound traffic to {self.path}.")
+
+    async def stop(self) -> None:
+        if not self.running:
+            return
+        if self._flush_task:
+            self._flush_task.cancel()
+            try:
+                await self._flush_task
+            except asyncio.CancelledError:
+                pass
+            self._flush_task = None
+        await self._flush()
+        file, self._file = self._file, None
+        await asyncio.to_thread(file.close)
+        self.logger.info(f"Traffic recording stopped: {self.recorded} messages recorded, {self.dropped} dropped.")
+
+    def record(self, client_id: str, message) -> None:
+        if self._file is None:
+            return
+        if len(self._buffer) >= self.max_buffer:
+            self.dropped += 1
+            return
+        inner = message.get("message") if isinstance(message, dict) else None
+        if isinstance(inner, dict) and not self.redact_fields.isdisjoint(inner):
+            inner = {k: ("***" if k in self.redact_fields else v) for k, v in inner.items()}
+        entry = {"t": round(time.monotonic() - self._started, 6), "c": client_id, "m": inner if inner is not None else message}
+        try:
+            self._buffer.append(json.dumps(entry, separators=(",", ":")))
+            self.recorded += 1
+        except (TypeError, ValueError):
+            self.dropped += 1
+
+    async def _flush_loop(self) -> None:
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            try:
+                await self._flush()
+            except Exception as e:
+                self.logger.exception(f"Failed to flush traffic recording: {e}")
+
+    async def _flush(self) -> None:
+        if not self._buffer or self._file is None:
+            return
+        lines, self._buffer = self._buffer, []
+        await asyncio.to_thread(self._write_lines, lines)
+
+    def _write_lines(self, lines: List[str]) -> None:
+        self._file.write("\n".join(lines) + "\n")
+        self._file.flush()
+
+    def get_stats(self) -> dict:
+        return {
+            "path": str(self.path) if self.path else None,
+            "running": self.running,
+            "recorded": self.recorded,
+            "dropped": self.dropped,
+            "buffered": len(self._buffer)
+        }
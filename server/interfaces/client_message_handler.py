@@ -1,6 +1,6 @@
 import logging
 from typing import Dict, Any, Optional, Callable, Awaitable
-from schemas import MESSAGE_TYPE_TO_SCHEMA
+from schemas import MESSAGE_TYPE_TO_SCHEMA, FAST_VALIDATORS, FastValidationError
 from pydantic import ValidationError
 
 class ClientMessageHandler:
@@ -18,7 +18,8 @@ class ClientMessageHandler:
         self, 
         event_dispatcher, 
         logger: Optional[logging.Logger] = None,
-        default_event_type: str = "unknown_message"
+        default_event_type: str = "unknown_message",
+        recorder=None
     ):
         """
         Initialize the ClientMessageHandler.
@@ -26,10 +27,12 @@ class ClientMessageHandler:
         :param event_dispatcher: An instance of EventDispatcher for dispatching events.
         :param logger: An optional logger. If not provided, a default logger will be created.
         :param default_event_type: The event type to use if we cannot determine one from the message.
+        :param recorder: Optional TrafficRecorder that captures every inbound message for replay.
         """
         self.logger = logger or logging.getLogger("ClientMessageHandler")
         self.event_dispatcher = event_dispatcher
         self.default_event_type = default_event_type
+        self.recorder = recorder
 
         # A registry of message_type -> event_type mappings.
         # You can populate this dictionary as your application grows.
@@ -43,6 +46,10 @@ class ClientMessageHandler:
         self.message_validators: Dict[str, Callable[[Dict[str, Any]], bool]] = {}
 
     async def handle_message(self, message: dict, client_id: str):
+        if self.recorder is not None:
+            # Recorded before validation so malformed traffic is reproduced as well.
+            self.recorder.record(client_id, message)
+
         # Check base structure first
         if "message" not in message or "client_id" not in message:
             await self.event_dispatcher.dispatch("invalid_message", {
@@ -58,22 +65,30 @@ class ClientMessageHandler:
             })
             return
 
+        # The transport's client_id is authoritative; replies are routed by it, so a
+        # client must not be able to address them to another connection.
+        message["client_id"] = client_id
+
         message_type = message["message"]["message_type"]
+        fast_validator = FAST_VALIDATORS.get(message_type)
         schema = MESSAGE_TYPE_TO_SCHEMA.get(message_type)
-        if not schema:
+        if not fast_validator and not schema:
             await self.event_dispatcher.dispatch("invalid_message", {
                 "client_id": client_id,
                 "message": {"reason": f"Unknown message_type '{message_type}'"}
             })
             return
 
-        # Validate with pydantic
         try:
-            # This validates the entire structure including message_type
-            validated = schema(**message["message"])
-            # Replace message["message"] with validated dict to ensure only valid fields
-            message["message"] = validated.dict()
-        except ValidationError as e:
+            if fast_validator:
+                # High-rate messages are checked and normalised in place, no model is built.
+                fast_validator(message["message"])
+            else:
+                # This validates the entire structure including message_type
+                validated = schema(**message["message"])
+                # Replace message["message"] with validated dict to ensure only valid fields
+                message["message"] = validated.model_dump()
+        except (ValidationError, FastValidationError) as e:
             self.logger.warning(f"Validation error for {client_id}: {e.errors()}")
             await self.event_dispatcher.dispatch("invalid_message", {
                 "client_id": client_id,
@@ -81,9 +96,14 @@ class ClientMessageHandler:
             })
             return
 
-        # If we get here, validation passed
+        # If we get here, validation passed. submit() routes the event to its lane so
+        # slow handlers run on that lane's workers instead of blocking this reader.
         event_type = message_type
-        await self.event_dispatcher.dispatch(event_type, message)
+        if not await self.event_dispatcher.submit(event_type, message):
+            await self.event_dispatcher.dispatch("invalid_message", {
+                "client_id": client_id,
+                "message": {"reason": f"Server busy, '{message_type}' was dropped. Please retry."}
+            })
 
     async def _dispatch_event(self, event_type: str, message: Dict[str, Any], client_id: str) -> None:
         """
@@ -6,11 +6,20 @@ from utils.settings_manager import global_settings
 from infrastructure.logging.custom_logger import get_logger
 
 class ConsoleInterface:
-    def __init__(self, user_repo, map_repo, event_dispatcher, shutdown_event: asyncio.Event, logger=None):
+    def __init__(self, user_repo, map_repo, event_dispatcher, shutdown_event: asyncio.Event, logger=None, network_server=None):
         self.user_repo = user_repo
         self.map_repo = map_repo
         self.event_dispatcher = event_dispatcher
         self.shutdown_event = shutdown_event
+        self.network_server = network_server
+        self.simulation_service = None
+        self.interest_service = None
+        self.replication_service = None
+        self.ai_scheduler = None
+        self.navigation_service = None
+        self.map_lifecycle_service = None
+        self.weapon_service = None
+        self.zone_service = None
         self.logger = logger or get_logger("ConsoleInterface", debug_mode=False)
         self.command_queue = asyncio.Queue()
 
@@ -86,6 +95,26 @@ class ConsoleInterface:
             self.logger.info("Users backed up successfully.")
         elif command == "help":
             self._print_help()
+        elif command == "stats network":
+            self._print_network_stats()
+        elif command == "stats simulation":
+            self._print_simulation_stats()
+        elif command == "stats interest":
+            self._print_interest_stats()
+        elif command == "stats ai":
+            self._print_ai_stats()
+        elif command == "stats navigation":
+            self._print_navigation_stats()
+        elif command == "stats maps":
+            self._print_map_stats()
+        elif command == "stats weapons":
+            self._print_weapon_stats()
+        elif command == "stats zones":
+            self._print_zone_stats()
+        elif command == "stats lanes":
+            self._print_lane_stats()
+        elif command == "stats events" or command.startswith("stats events "):
+            self._handle_event_stats(command[len("stats events"):].strip())
         elif command.startswith("server announce "):
             message_text = command[len("server announce "):].strip()
             if message_text:
@@ -130,11 +159,215 @@ class ConsoleInterface:
             "backup maps: Back up map data.\n"
             "backup users: Back up user data.\n"
             "server announce <message>: Sends a server-wide announcement.\n"
+            "stats network: Shows connected clients, RTT, write buffers and evictions.\n"
+            "stats simulation: Shows simulated maps, tick rates, tick times, overruns, dropped ticks, rewind buffers, heightfields and worker processes.\n"
+            "stats interest: Shows hearing radius, tracked entities per map, enter/leave notifications and snapshot replication.\n"
+            "stats ai: Shows scheduled AI per map, behavior updates, skipped and late updates, budget exhaustion and deferred path searches.\n"
+            "stats navigation: Shows navigation grids per map, path queries, search times and path cache hits.\n"
+            "stats maps: Shows which maps are resident or hibernated, their players, idle time, loads and hibernations.\n"
+            "stats weapons: Shows shots fired, hits, shots stopped by walls, rejected shots and ray cast times.\n"
+            "stats zones: Shows tracked entities, zone enters and exits, destination preloads and map handoffs.\n"
+            "stats lanes: Shows event lane queues, workers, shed counts, queue wait times and entity mailboxes.\n"
+            "stats events [json|reset|export <path>]: Shows per-event dispatch counts, errors and latency percentiles.\n"
             "log debug on/off: Toggle debug logging.\n"
             "exit: Shuts down the server.\n"
         )
         self.logger.info(help_text)
 
+    def _print_network_stats(self):
+        if not self.network_server:
+            self.logger.warning("Network server is not running.")
+            return
+        metrics = self.network_server.get_metrics()
+        evictions = ", ".join(f"{reason}={count}" for reason, count in metrics["evictions"].items())
+        lines = [f"Connected clients: {metrics['connected']} (evictions: {evictions})"]
+        for client_id, client in metrics["clients"].items():
+            rtt = f"{client['rtt_ms']} ms" if client["rtt_ms"] is not None else "n/a"
+            lines.append(
+                f"  {client_id}: rtt={rtt}, idle={client['idle_seconds']}s, "
+                f"write_buffer={client['write_buffer_bytes']} bytes, in={client['messages_in']}, out={client['messages_out']}"
+            )
+        router = self.event_dispatcher.outbound_router
+        if router:
+            routed = router.get_stats()
+            lines.append(f"Outbound router: recipients={routed['recipients']}, delivered={routed['delivered']}, event types={len(routed['routed'])}")
+        self.logger.info("\n".join(lines))
+
+    def _print_simulation_stats(self):
+        if not self.simulation_service:
+            self.logger.warning("Simulation is not running.")
+            return
+        maps = self.simulation_service.get_stats()["maps"]
+        if not maps:
+            self.logger.info("No maps are being simulated.")
+            return
+        lines = ["Simulated maps:"]
+        for name, sim in maps.items():
+            tick = sim["tick_time"]
+            lines.append(
+                f"  {name} @ {sim['tick_rate']} Hz: players={sim['players']}, bodies={sim['bodies']}, "
+                f"ticks={sim['ticks']}, idle={sim['idle_ticks']}, overruns={sim['overruns']}, "
+                f"dropped={sim['dropped_ticks']}, state_changes={sim['state_changes']}, "
+                f"tick p50={tick['p50_ms']}ms p95={tick['p95_ms']}ms max={tick['max_ms']}ms"
+            )
+            rewind = sim.get("rewind")
+            if rewind:
+                record = rewind["record_time"]
+                lines.append(
+                    f"    rewind {rewind['seconds']}s in {rewind['frames']}/{rewind['capacity_frames']} frames, "
+                    f"slots={rewind['slots']}, memory={rewind['memory_bytes'] / 1024:.1f}KiB, "
+                    f"record p95={record['p95_ms']}ms max={record['max_ms']}ms"
+                )
+            heightfield = sim.get("heightfield")
+            if heightfield:
+                lines.append(
+                    f"    heightfield {heightfield['cells']} cells at {heightfield['resolution']}, "
+                    f"surfaces={heightfield['surfaces']}, stacked={heightfield['stacked_cells']}, "
+                    f"fallbacks={heightfield['fallbacks']}, memory={heightfield['memory_bytes'] / 1024:.1f}KiB"
+                )
+            worker = sim.get("worker")
+            if worker:
+                lines.append(
+                    f"    worker pid={worker['pid']} alive={worker['alive']}, capacity={worker['capacity']}, rejected={worker['rejected']}"
+                )
+        self.logger.info("\n".join(lines))
+
+    def _print_interest_stats(self):
+        if not self.interest_service:
+            self.logger.warning("Interest management is disabled; updates go to whole maps.")
+            return
+        stats = self.interest_service.get_stats()
+        lines = [f"Interest: radius={stats['hearing_radius']}, tracked={stats['tracked']}, notifications={stats['notifications']}"]
+        for name, grid in stats["maps"].items():
+            lines.append(f"  {name}: entities={grid['entities']}, cells={grid['cells']}, average neighbours={grid['average_neighbours']}")
+        if self.replication_service:
+            rep = self.replication_service.get_stats()
+            lines.append(
+                f"Replication @ {rep['snapshot_rate']} Hz: clients={rep['clients']}, entities={rep['entities']}, "
+                f"snapshots={rep['snapshots_sent']} (full {rep['full_snapshots']}), entity updates={rep['entity_updates']}, acks={rep['acks']}"
+            )
+        self.logger.info("\n".join(lines))
+
+    def _print_ai_stats(self):
+        if not self.ai_scheduler:
+            self.logger.warning("The AI scheduler is disabled.")
+            return
+        stats = self.ai_scheduler.get_stats()
+        lines = [f"AI scheduler: budget={stats['budget_ms']}ms per tick, unobserved interval={stats['unobserved_interval']} ticks"]
+        for name, schedule in stats["maps"].items():
+            update = schedule["update_time"]
+            lines.append(
+                f"  {name}: agents={schedule['agents']}, ticks={schedule['ticks']}, updates={schedule['updates']}, "
+                f"skipped={schedule['skipped']}, late={schedule['late']}, budget exhausted={schedule['budget_exhausted']}, "
+                f"searches deferred={schedule['searches_deferred']}, "
+                f"update p95={update['p95_ms']}ms max={update['max_ms']}ms"
+            )
+        self.logger.info("\n".join(lines))
+
+    def _print_navigation_stats(self):
+        if not self.navigation_service:
+            self.logger.warning("Navigation is disabled.")
+            return
+        stats = self.navigation_service.get_stats()
+        search = stats["search_time"]
+        cache = stats["cache"]
+        lines = [
+            f"Navigation: queries={stats['queries']}, failed={stats['failed']}, expansions={stats['expansions']}, "
+            f"search p95={search['p95_ms']}ms max={search['max_ms']}ms",
+            f"Path cache: entries={cache['entries']}/{cache['capacity']}, hits={cache['hits']}, misses={cache['misses']}, "
+            f"evictions={cache['evictions']}, invalidated={cache['invalidated']}"
+        ]
+        for name, grid in stats["maps"].items():
+            lines.append(f"  {name}: {grid['width']}x{grid['height']} cells of {grid['cell_size']}, blocked={grid['blocked']}, walls={grid['walls']}")
+        self.logger.info("\n".join(lines))
+
+    def _print_map_stats(self):
+        if not self.map_lifecycle_service:
+            self.logger.warning("Map hibernation is disabled.")
+            return
+        stats = self.map_lifecycle_service.get_stats()
+        lines = [f"Maps: resident={stats['resident']}, hibernate after {stats['hibernate_after']}s without players"]
+        for name, m in stats["maps"].items():
+            lines.append(
+                f"  {name}: {m['state']}, players={m['players']}, empty for {m['empty_seconds']}s, "
+                f"loads={m['loads']} (last {m['load_ms']}ms), cache hits={m['hits']}, hibernations={m['hibernations']}"
+            )
+        self.logger.info("\n".join(lines))
+
+    def _print_weapon_stats(self):
+        if not self.weapon_service:
+            self.logger.warning("Weapons are disabled.")
+            return
+        stats = self.weapon_service.get_stats()
+        cast = stats["cast_time"]
+        rewind = stats["rewind_distance"]
+        lines = [
+            f"Weapons: shots={stats['shots']}, hits={stats['hits']}, blocked={stats['blocked']}, rejected={stats['rejected']}, "
+            f"reloading={stats['reloading']}, index builds={stats['index_builds']}, "
+            f"cast p95={cast['p95_ms']}ms max={cast['max_ms']}ms",
+            f"Lag compensation: rewound={stats['rewound']}, rewind p50={rewind['p50_ms']}ms p95={rewind['p95_ms']}ms max={rewind['max_ms']}ms"
+        ]
+        for name, m in stats["maps"].items():
+            lines.append(f"  {name}: walls={m['walls']}, entities={m['entities']}")
+        self.logger.info("\n".join(lines))
+
+    def _print_zone_stats(self):
+        if not self.zone_service:
+            self.logger.warning("Zones are disabled.")
+            return
+        stats = self.zone_service.get_stats()
+        wait = stats["handoff_wait"]
+        lines = [
+            f"Zones: tracked={stats['tracked']}, lookups={stats['lookups']}, enters={stats['enters']}, exits={stats['exits']}",
+            f"Travel: pending={stats['pending_travels']}, preloads={stats['preloads']} (already resident {stats['preload_hits']}), "
+            f"handoffs={stats['handoffs']}, failed={stats['failed_handoffs']}, "
+            f"preload wait p95={wait['p95_ms']}ms max={wait['max_ms']}ms"
+        ]
+        for name, m in stats["maps"].items():
+            lines.append(f"  {name}: zones={m['zones']}, cells={m['cells']}, entries={m['entries']}")
+        self.logger.info("\n".join(lines))
+
+    def _print_lane_stats(self):
+        lanes = self.event_dispatcher.get_lane_stats()
+        if not lanes:
+            self.logger.info("No event lanes configured; client events are dispatched inline.")
+            return
+        lines = ["Event lanes:"]
+        for name, lane in lanes.items():
+            wait = lane["queue_wait"]
+            lines.append(
+                f"  {name} ({lane['policy']}): queued={lane['queued']}+{lane['handed_off']}/{lane['max_queue']}, "
+                f"busy={lane['busy']}/{lane['workers']}, processed={lane['processed']}, shed={lane['shed']}, "
+                f"wait p95={wait['p95_ms']}ms max={wait['max_ms']}ms"
+            )
+        boxes = self.event_dispatcher.mailboxes.get_stats()
+        lines.append(
+            f"Entity mailboxes: active={boxes['active']}, queued={boxes['queued']}, "
+            f"max_depth={boxes['max_depth']}, processed={boxes['processed']}"
+        )
+        self.logger.info("\n".join(lines))
+
+    def _handle_event_stats(self, args: str):
+        metrics = self.event_dispatcher.metrics
+        if args == "":
+            lines = metrics.summary_lines()
+            self.logger.info("\n".join(["Event dispatch stats:"] + lines) if lines else "No events dispatched yet.")
+        elif args == "json":
+            self.logger.info(metrics.to_json(indent=2))
+        elif args == "reset":
+            metrics.reset()
+            self.logger.info("Event dispatch stats reset.")
+        elif args.startswith("export "):
+            path = args[len("export "):].strip()
+            try:
+                with open(path, "w", encoding="utf-8") as f:
+                    f.write(metrics.to_json(indent=2))
+                self.logger.info(f"Event dispatch stats exported to {path}.")
+            except OSError as e:
+                self.logger.error(f"Failed to export event stats to {path}: {e}")
+        else:
+            self.logger.warning("Usage: stats events [json|reset|export <path>]")
+
     def _reconfigure_logging(self, debug_mode: bool):
         # We reconfigure loggers at runtime by changing their level
         # This can get tricky; ideally we store references or re-init loggers.
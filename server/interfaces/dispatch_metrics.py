@@ -0,0 +1,159 @@
+# interfaces/dispatch_metrics.py
+import json
+import time
+from bisect import bisect_left
+from typing import Dict, List
+
+
+class LatencyHistogram:
+    """
+    Fixed-bucket latency histogram. Observing a value is a bisect plus a few
+    integer additions, so it is cheap enough to sit on the dispatch hot path.
+    Percentiles are reported as the upper bound of the bucket they fall in,
+    capped at the largest value observed.
+    """
+
+    # Bucket upper bounds in milliseconds; values above the last bound go to an overflow bucket.
+    BOUNDS_MS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 25.0, 50.0, 100.0, 250.0, 500.0, 1000.0, 2500.0, 5000.0)
+
+    def __init__(self):
+        self.counts: List[int] = [0] * (len(self.BOUNDS_MS) + 1)
+        self.count = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+
+    def observe(self, seconds: float) -> None:
+        ms = seconds * 1000.0
+        self.counts[bisect_left(self.BOUNDS_MS, ms)] += 1
+        self.count += 1
+        self.total_ms += ms
+        if ms > self.max_ms:
+            self.max_ms = ms
+
+    def percentile(self, p: float) -> float:
+        if not self.count:
+            return 0.0
+        rank = p / 100.0 * self.count
+        running = 0
+        for i, c in enumerate(self.counts):
+            running += c
+            if running >= rank:
+                return min(self.BOUNDS_MS[i], round(self.max_ms, 4)) if i < len(self.BOUNDS_MS) else round(self.max_ms, 4)
+        return round(self.max_ms, 4)
+
+    def to_dict(self) -> dict:
+        return {
+            "count": self.count,
+            "mean_ms": round(self.total_ms / self.count, 4) if self.count else 0.0,
+            "max_ms": round(self.max_ms, 4),
+            "p50_ms": self.percentile(50),
+            "p95_ms": self.percentile(95),
+            "p99_ms": self.percentile(99),
+            "buckets": {
+                (f"le_{bound}" if i < len(self.BOUNDS_MS) else "overflow"): c
+                for i, (bound, c) in enumerate(zip(self.BOUNDS_MS + (None,), self.counts))
+                if c
+            }
+        }
+
+
+class CallStats:
+    """
+    Counters, in-flight gauge and latency histogram for one event type or one listener.
+    """
+
+    def __init__(self):
+        self.calls = 0
+        self.errors = 0
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.latency = LatencyHistogram()
+
+    def begin(self) -> None:
+        self.calls += 1
+        self.in_flight += 1
+        if self.in_flight > self.max_in_flight:
+            self.max_in_flight = self.in_flight
+
+    def end(self, seconds: float, failed: bool = False) -> None:
+        self.in_flight -= 1
+        if failed:
+            self.errors += 1
+        self.latency.observe(seconds)
+
+    def to_dict(self) -> dict:
+        return {
+            "calls": self.calls,
+            "errors": self.errors,
+            "in_flight": self.in_flight,
+            "max_in_flight": self.max_in_flight,
+            "latency": self.latency.to_dict()
+        }
+
+
+class EventStats(CallStats):
+    def __init__(self):
+        super().__init__()
+        self.listeners: Dict[str, CallStats] = {}
+
+    def listener(self, name: str) -> CallStats:
+        stats = self.listeners.get(name)
+        if stats is None:
+            stats = self.listeners[name] = CallStats()
+        return stats
+
+    def to_dict(self) -> dict:
+        data = super().to_dict()
+        data["listeners"] = {name: stats.to_dict() for name, stats in self.listeners.items()}
+        return data
+
+
+class DispatchMetrics:
+    """
+    Per-event-type and per-listener instrumentation for the EventDispatcher.
+    Everything runs on the event loop thread, so plain counters need no locking.
+    """
+
+    def __init__(self):
+        self._events: Dict[str, EventStats] = {}
+        self.started_at = time.time()
+
+    def event(self, event_type: str) -> EventStats:
+        stats = self._events.get(event_type)
+        if stats is None:
+            stats = self._events[event_type] = EventStats()
+        return stats
+
+    def reset(self) -> None:
+        self._events.clear()
+        self.started_at = time.time()
+
+    def snapshot(self) -> dict:
+        return {
+            "since": self.started_at,
+            "uptime_seconds": round(time.time() - self.started_at, 3),
+            "events": {event_type: stats.to_dict() for event_type, stats in self._events.items()}
+        }
+
+    def to_json(self, indent: int = None) -> str:
+        return json.dumps(self.snapshot(), indent=indent)
+
+    def summary_lines(self, limit: int = 20) -> List[str]:
+        """
+        Human-readable lines for the busiest event types, for the console.
+        """
+        rows = sorted(self._events.items(), key=lambda item: item[1].calls, reverse=True)[:limit]
+        lines = []
+        for event_type, stats in rows:
+            lat = stats.latency
+            lines.append(
+                f"{event_type}: calls={stats.calls} errors={stats.errors} in_flight={stats.in_flight} "
+                f"p50={lat.percentile(50)}ms p95={lat.percentile(95)}ms p99={lat.percentile(99)}ms max={lat.max_ms:.2f}ms"
+            )
+            for name, lstats in stats.listeners.items():
+                llat = lstats.latency
+                lines.append(
+                    f"    {name}: calls={lstats.calls} errors={lstats.errors} "
+                    f"p95={llat.percentile(95)}ms max={llat.max_ms:.2f}ms"
+                )
+        return lines
@@ -0,0 +1,108 @@
+# interfaces/entity_mailboxes.py
+import asyncio
+import contextvars
+import logging
+from collections import deque
+from typing import Any, Awaitable, Callable, Deque, Dict, Optional, Tuple
+
+from infrastructure.logging.custom_logger import get_logger
+
+
+class EntityMailboxes:
+    """
+    Actor-style mailboxes keyed by entity, e.g. "user:alice", "ai:<ai_id>" or "map:Main".
+
+    Work posted for one key runs strictly in posting order on that key's drain task,
+    so two handlers can never interleave their load/modify/save of the same entity.
+    Different keys drain concurrently, and no global lock is involved. A mailbox
+    exists only while it has pending work; its drain task exits once it is empty.
+
+    Work that posts to the mailbox it is already running in is executed inline,
+    so a handler dispatching a follow-up event for its own entity cannot deadlock.
+    """
+
+    def __init__(self, logger: Optional[logging.Logger] = None):
+        self.logger = logger or get_logger("EntityMailboxes", debug_mode=False)
+        self._boxes: Dict[str, Deque[Tuple[Callable[..., Awaitable[Any]], tuple, asyncio.Future]]] = {}
+        self._tasks: Dict[str, asyncio.Task] = {}
+        self._current: contextvars.ContextVar = contextvars.ContextVar("entity_mailbox", default=None)
+        self.posted = 0
+        self.processed = 0
+        self.max_depth = 0
+
+    async def run(self, key: str, func: Callable[..., Awaitable[Any]], *args) -> Any:
+        """
+        Run func(*args) in key's mailbox and wait for its result.
+
+        :param key: Entity key whose mailbox serializes the call.
+        :param func: Coroutine function to run.
+        :return: Whatever func returns; exceptions are re-raised to the caller.
+        """
+        if self._current.get() == key:
+            return await func(*args)
+        return await self.post(key, func, *args)
+
+    def post(self, key: str, func: Callable[..., Awaitable[Any]], *args) -> asyncio.Future:
+        """
+        Queue func(*args) in key's mailbox without waiting for it.
+
+        :param key: Entity key whose mailbox serializes the call.
+        :param func: Coroutine function to run.
+        :return: A future resolved with func's result or exception once it has run.
+        """
+        future = asyncio.get_running_loop().create_future()
+        box = self._boxes.get(key)
+        if box is None:
+            box = self._boxes[key] = deque()
+            box.append((func, args, future))
+            self._tasks[key] = asyncio.create_task(self._drain(key, box), name=f"mailbox-{key}")
+        else:
+            box.append((func, args, future))
+            if len(box) > self.max_depth:
+                self.max_depth = len(box)
+        self.posted += 1
+        return future
+
+    async def _drain(self, key: str, box: Deque) -> None:
+        self._current.set(key)
+        try:
+            while box:
+                func, args, future = box[0]
+                if not future.done():
+                    try:
+                        result = await func(*args)
+                    except Exception as e:
+                        if not future.done():
+                            future.set_exception(e)
+                    else:
+                        if not future.done():
+                            future.set_result(result)
+                box.popleft()
+                self.processed += 1
+        finally:
+            if self._boxes.get(key) is box:
+                del self._boxes[key]
+                self._tasks.pop(key, None)
+            # Only reached with leftovers if the drain task was cancelled.
+            for _, _, future in box:
+                if not future.done():
+                    future.cancel()
+
+    async def stop(self) -> None:
+        tasks = list(self._tasks.values())
+        for task in tasks:
+            task.cancel()
+        for task in tasks:
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+
+    def get_stats(self) -> dict:
+        return {
+            "active": len(self._boxes),
+            "queued": sum(len(box) for box in self._boxes.values()),
+            "max_depth": self.max_depth,
+            "posted": self.posted,
+            "processed": self.processed
+        }
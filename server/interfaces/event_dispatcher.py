@@ -1,9 +1,15 @@
 # interfaces/event_dispatcher.py
 import asyncio
 import logging
-from typing import Callable, Awaitable, Dict, List, Any
+import time
+from typing import Callable, Awaitable, Dict, Optional, Tuple, Any
 
 from infrastructure.logging.custom_logger import get_logger
+from interfaces.dispatch_metrics import DispatchMetrics
+from interfaces.event_lanes import EventLane
+from interfaces.entity_mailboxes import EntityMailboxes
+
+Listener = Callable[[Dict[str, Any]], Awaitable[None]]
 
 class EventDispatcher:
     """
@@ -15,6 +21,22 @@ class EventDispatcher:
     when a message is received from the network, an event can be dispatched.
     Multiple services can listen and respond to that event without needing 
     direct references to each other.
+
+    Every dispatch is instrumented: per event type and per listener the dispatcher
+    counts calls and errors, tracks in-flight gauges and records latency histograms
+    in self.metrics (see DispatchMetrics).
+
+    Events coming from clients should go through submit() rather than dispatch().
+    With lanes configured (configure_lanes), submit() queues the event on the lane
+    its type is assigned to and returns immediately, so heavy requests are handled
+    by their own bounded worker pool instead of inline in the network reader.
+
+    Submitted events whose type has an entity key (configure_entity_keys) are also
+    serialized per entity: all events for "user:alice" run one after another in
+    arrival order, while other users, AI and maps proceed in parallel. Lane events
+    without an entity key are serialized per sending client instead ("client:<id>"),
+    so a lane with several workers still handles one client's chat messages, for
+    example, in the order they were sent.
     """
 
     def __init__(self, logger: logging.Logger = None):
@@ -24,77 +46,229 @@ class EventDispatcher:
         :param logger: Optional logger instance. If not provided, a default logger using custom_logger is created.
         """
         self.logger = logger or get_logger("EventDispatcher", debug_mode=False)
-        self._listeners: Dict[str, List[Callable[[Dict[str, Any]], Awaitable[None]]]] = {}
-        self._lock = asyncio.Lock()
+        # Each event type maps to an immutable tuple of (listener, name) pairs. subscribe and
+        # unsubscribe swap in a new tuple, so dispatch can read it without locking or copying.
+        self._listeners: Dict[str, Tuple[Tuple[Listener, str], ...]] = {}
+        self.metrics = DispatchMetrics()
+        self.lanes: Dict[str, EventLane] = {}
+        self.lane_assignments: Dict[str, str] = {}
+        self.default_lane: Optional[str] = None
+        self.mailboxes = EntityMailboxes(logger=self.logger)
+        self.entity_keys: Dict[str, Tuple[str, str]] = {}
+        # Set to an OutboundRouter to deliver client-addressed events to their connections.
+        self.outbound_router = None
         self.logger.debug("EventDispatcher initialized.")
 
-    async def subscribe(self, event_type: str, listener: Callable[[Dict[str, Any]], Awaitable[None]]) -> None:
+    def configure_entity_keys(self, entity_keys: Dict[str, Any]) -> None:
+        """
+        Declare which submitted events mutate an entity and must be serialized per entity.
+
+        :param entity_keys: Event type -> (entity kind, message field holding the entity id),
+                            e.g. {"user_move_request": ["user", "username"]}.
+        """
+        for event_type, (kind, field) in entity_keys.items():
+            self.entity_keys[event_type] = (kind, field)
+
+    def entity_key_for(self, event_type: str, event_data: Dict[str, Any]) -> Optional[str]:
+        spec = self.entity_keys.get(event_type)
+        if spec is None:
+            return None
+        message = event_data.get("message")
+        value = message.get(spec[1]) if isinstance(message, dict) else None
+        return f"{spec[0]}:{value}" if value is not None else None
+
+    async def _dispatch_serialized(self, event_type: str, event_data: Dict[str, Any]) -> None:
+        key = self.entity_key_for(event_type, event_data)
+        if key is None:
+            await self.dispatch(event_type, event_data)
+        else:
+            await self.mailboxes.run(key, self.dispatch, event_type, event_data)
+
+    async def _dispatch_from_lane(self, event_type: str, event_data: Dict[str, Any]) -> Optional[asyncio.Future]:
+        """
+        Lane worker entry point. An event is posted to its entity's mailbox, or its client's
+        if it has no entity key, and the future returned, so the worker is free again while
+        that entity or client catches up.
+        """
+        key = self.entity_key_for(event_type, event_data)
+        if key is None and event_data.get("client_id") is not None:
+            key = f"client:{event_data['client_id']}"
+        if key is None:
+            await self.dispatch(event_type, event_data)
+            return None
+        return self.mailboxes.post(key, self.dispatch, event_type, event_data)
+
+    def configure_lanes(
+        self,
+        lanes: Dict[str, Dict[str, Any]],
+        assignments: Optional[Dict[str, str]] = None,
+        default_lane: Optional[str] = None
+    ) -> None:
+        """
+        Create the named lanes used by submit().
+
+        :param lanes: Lane name -> {"max_queue": int, "workers": int, "policy": str}.
+        :param assignments: Event type -> lane name. Unassigned types go to default_lane.
+        :param default_lane: Lane for unassigned event types; if None they are dispatched inline.
+        """
+        for name, cfg in lanes.items():
+            self.lanes[name] = EventLane(
+                name,
+                self._dispatch_from_lane,
+                max_queue=cfg.get("max_queue", 1000),
+                workers=cfg.get("workers", 1),
+                policy=cfg.get("policy", "drop_newest"),
+                on_shed=self._report_shed,
+                logger=self.logger
+            )
+        for event_type, lane in (assignments or {}).items():
+            if lane not in self.lanes:
+                self.logger.warning("Event type '%s' assigned to unknown lane '%s'; it will use the default lane.", event_type, lane)
+                continue
+            self.lane_assignments[event_type] = lane
+        if default_lane is not None and default_lane not in self.lanes:
+            self.logger.warning("Default lane '%s' is not configured; unassigned events are dispatched inline.", default_lane)
+            default_lane = None
+        self.default_lane = default_lane
+
+    async def _report_shed(self, event_type: str, event_data: Dict[str, Any]) -> None:
+        """
+        Tell the sender of an event a lane evicted to make room, like a rejected submit() is reported.
+        """
+        self.logger.warning("Lane full, evicted queued '%s'.", event_type)
+        client_id = event_data.get("client_id")
+        if client_id is None:
+            return
+        await self.dispatch("invalid_message", {
+            "client_id": client_id,
+            "message": {"reason": f"Server busy, '{event_type}' was dropped. Please retry."}
+        })
+
+    async def start_lanes(self) -> None:
+        for lane in self.lanes.values():
+            await lane.start()
+
+    async def stop_lanes(self) -> None:
+        for lane in self.lanes.values():
+            await lane.stop()
+        await self.mailboxes.stop()
+
+    def lane_for(self, event_type: str) -> Optional[EventLane]:
+        name = self.lane_assignments.get(event_type, self.default_lane)
+        return self.lanes.get(name) if name else None
+
+    async def submit(self, event_type: str, event_data: Dict[str, Any]) -> bool:
+        """
+        Hand an event to its lane, or dispatch it inline if it has none.
+        Either way it runs in its entity's mailbox if the event type has an entity key.
+
+        :param event_type: The name of the event.
+        :param event_data: A dictionary containing event data.
+        :return: False if the lane shed the event.
+        """
+        lane = self.lane_for(event_type)
+        if lane is None:
+            await self._dispatch_serialized(event_type, event_data)
+            return True
+        accepted = await lane.put(event_type, event_data)
+        if not accepted:
+            self.logger.warning("Lane '%s' is full, dropped '%s'.", lane.name, event_type)
+        return accepted
+
+    def get_lane_stats(self) -> Dict[str, Any]:
+        return {name: lane.get_stats() for name, lane in self.lanes.items()}
+
+    async def subscribe(self, event_type: str, listener: Listener) -> None:
         """
         Subscribe a listener to an event type.
 
         :param event_type: The name of the event to listen for.
         :param listener: An async callable taking a single dictionary (event data) as a parameter.
         """
-        async with self._lock:
-            if event_type not in self._listeners:
-                self._listeners[event_type] = []
-            self._listeners[event_type].append(listener)
-            self.logger.debug(f"Subscribed listener '{listener.__name__}' to event '{event_type}'.")
+        name = getattr(listener, "__qualname__", listener.__name__)
+        self._listeners[event_type] = self._listeners.get(event_type, ()) + ((listener, name),)
+        self.logger.debug("Subscribed listener '%s' to event '%s'.", name, event_type)
 
-    async def unsubscribe(self, event_type: str, listener: Callable[[Dict[str, Any]], Awaitable[None]]) -> None:
+    async def unsubscribe(self, event_type: str, listener: Listener) -> None:
         """
         Unsubscribe a listener from an event type.
 
         :param event_type: The name of the event.
         :param listener: The listener function to remove.
         """
-        async with self._lock:
-            if event_type in self._listeners and listener in self._listeners[event_type]:
-                self._listeners[event_type].remove(listener)
-                self.logger.debug(f"Unsubscribed listener '{listener.__name__}' from event '{event_type}'.")
-            else:
-                self.logger.warning(
-                    f"Attempted to unsubscribe a listener '{listener.__name__}' that is not registered for event '{event_type}'."
-                )
+        current = self._listeners.get(event_type, ())
+        for i, (registered, name) in enumerate(current):
+            if registered == listener:
+                self._listeners[event_type] = current[:i] + current[i + 1:]
+                self.logger.debug("Unsubscribed listener '%s' from event '%s'.", name, event_type)
+                return
+        self.logger.warning(
+            "Attempted to unsubscribe a listener '%s' that is not registered for event '%s'.",
+            listener.__name__, event_type
+        )
 
     async def dispatch(self, event_type: str, event_data: Dict[str, Any]) -> None:
         """
         Dispatch an event to all subscribed listeners.
 
+        Client-addressed events are first handed to the outbound router, if set.
+        A single listener is awaited directly; several are run concurrently with
+        asyncio.gather. Listener errors are logged and counted, never raised.
+
         :param event_type: The name of the event to dispatch.
         :param event_data: A dictionary containing event data.
         """
-        self.logger.info(f"Dispatching event '{event_type}' with data: {event_data}")
+        if self.logger.isEnabledFor(logging.DEBUG):
+            self.logger.debug("Dispatching event '%s' with data: %s", event_type, event_data)
 
-        # Copy the listeners list to avoid modification issues during iteration.
-        async with self._lock:
-            listeners = self._listeners.get(event_type, [])[:]
+        if self.outbound_router is not None:
+            try:
+                self.outbound_router.route(event_type, event_data)
+            except Exception as e:
+                self.logger.exception("Error routing event '%s' to clients: %s", event_type, e)
 
-        # Notify listeners concurrently but handle errors individually.
-        results = await asyncio.gather(
-            *[self._notify_listener(listener, event_type, event_data) for listener in listeners],
-            return_exceptions=True
-        )
-
-        for res in results:
-            if isinstance(res, Exception):
-                self.logger.debug(f"An exception was returned for event '{event_type}', listener notification failed gracefully.")
+        listeners = self._listeners.get(event_type, ())
+        stats = self.metrics.event(event_type)
+        stats.begin()
+        started = time.perf_counter()
+        failed = False
+        try:
+            if len(listeners) == 1:
+                failed = not await self._notify_listener(listeners[0], event_type, event_data, stats)
+            elif listeners:
+                results = await asyncio.gather(
+                    *[self._notify_listener(entry, event_type, event_data, stats) for entry in listeners]
+                )
+                failed = not all(results)
+        finally:
+            stats.end(time.perf_counter() - started, failed)
 
     async def _notify_listener(
         self,
-        listener: Callable[[Dict[str, Any]], Awaitable[None]], 
-        event_type: str, 
-        event_data: Dict[str, Any]
-    ) -> None:
+        entry: Tuple[Listener, str],
+        event_type: str,
+        event_data: Dict[str, Any],
+        stats
+    ) -> bool:
         """
         Notify a single listener about an event, handling exceptions gracefully.
 
-        :param listener: The listener callback.
+        :param entry: The (listener, name) pair registered for the event.
         :param event_type: The event type being dispatched.
         :param event_data: The event data dictionary.
+        :param stats: EventStats of the event, used to record per-listener metrics.
+        :return: True if the listener completed without raising.
         """
+        listener, name = entry
+        lstats = stats.listener(name)
+        lstats.begin()
+        started = time.perf_counter()
+        ok = True
         try:
             await listener(event_data)
-            self.logger.debug(f"Listener '{listener.__name__}' handled event '{event_type}' successfully.")
         except Exception as e:
-            self.logger.exception(f"Error notifying listener '{listener.__name__}' for event '{event_type}': {e}")
+            ok = False
+            self.logger.exception("Error notifying listener '%s' for event '%s': %s", name, event_type, e)
+        finally:
+            lstats.end(time.perf_counter() - started, not ok)
+        return ok
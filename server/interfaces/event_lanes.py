@@ -0,0 +1,169 @@
+# interfaces/event_lanes.py
+import asyncio
+import logging
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from infrastructure.logging.custom_logger import get_logger
+from interfaces.dispatch_metrics import LatencyHistogram
+
+
+class EventLane:
+    """
+    A named lane of the event system: a bounded queue drained by a fixed number of
+    worker tasks. Lanes isolate classes of work from each other, so a burst of heavy
+    bulk requests cannot delay realtime movement handling.
+
+    When the queue is full the lane applies its shedding policy:
+    - "drop_oldest": discard the oldest queued event to make room. Only suitable for events that carry
+      absolute state a newer one replaces (e.g. world_snapshot_ack); a relative input such as a
+      user_move_request direction is lost when evicted. The evicted event may be another client's,
+      so it is passed to on_shed to tell its sender.
+    - "drop_newest": reject the incoming event; the caller is told so it can inform the client.
+    - "block": wait for room, which pushes back on the submitting connection's reader.
+
+    dispatch may hand an event off instead of running it, by returning a future
+    (EventDispatcher does this for events serialized in an entity mailbox). The
+    worker then moves on to the next event right away, so one busy entity never
+    holds a worker while other entities' events wait behind it. A handed-off event
+    keeps its place in the lane's capacity until the future is done, so max_queue
+    still bounds everything the lane has accepted and not finished.
+    """
+
+    POLICIES = ("drop_oldest", "drop_newest", "block")
+
+    def __init__(
+        self,
+        name: str,
+        dispatch: Callable[[str, Dict[str, Any]], Awaitable[None]],
+        max_queue: int = 1000,
+        workers: int = 1,
+        policy: str = "drop_newest",
+        on_shed: Optional[Callable[[str, Dict[str, Any]], Awaitable[None]]] = None,
+        logger: Optional[logging.Logger] = None
+    ):
+        """
+        :param name: Lane name, used in logs and stats.
+        :param dispatch: Coroutine run by the workers for each queued event. It may return a
+                         future to hand the event off; the event counts as finished once that is done.
+        :param max_queue: Maximum number of queued events.
+        :param workers: Number of concurrent worker tasks draining the queue.
+        :param policy: Shedding policy applied when the queue is full, one of POLICIES.
+        :param on_shed: Coroutine called with (event_type, event_data) of an event evicted under "drop_oldest".
+        :param logger: Optional logger.
+        """
+        if policy not in self.POLICIES:
+            raise ValueError(f"Unknown shedding policy '{policy}' for lane '{name}'.")
+        self.name = name
+        self.dispatch = dispatch
+        self.max_queue = max(1, int(max_queue))
+        self.worker_count = max(1, int(workers))
+        self.policy = policy
+        self.on_shed = on_shed
+        self.logger = logger or get_logger("EventLane", debug_mode=False)
+        self.queue: asyncio.Queue = asyncio.Queue()
+        # One slot per accepted event that is queued or handed off and not yet finished.
+        self._slots = asyncio.Semaphore(self.max_queue)
+        self._workers: List[asyncio.Task] = []
+        self.accepted = 0
+        self.shed = 0
+        self.processed = 0
+        self.busy = 0
+        self.handed_off = 0
+        self.queue_wait = LatencyHistogram()
+
+    async def start(self) -> None:
+        if self._workers:
+            return
+        self._workers = [
+            asyncio.create_task(self._worker(), name=f"lane-{self.name}-{i}")
+            for i in range(self.worker_count)
+        ]
+        self.logger.debug(f"Lane '{self.name}' started with {self.worker_count} workers, queue {self.max_queue}, policy {self.policy}.")
+
+    async def stop(self) -> None:
+        for task in self._workers:
+            task.cancel()
+        for task in self._workers:
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+        self._workers = []
+
+    async def put(self, event_type: str, event_data: Dict[str, Any]) -> bool:
+        """
+        Queue an event for the lane's workers.
+
+        :return: False if the event itself was shed: always under "drop_newest" when full, and under
+                 "drop_oldest" when every slot is taken by handed-off events.
+        """
+        item = (time.perf_counter(), event_type, event_data)
+        if self.policy == "block":
+            await self._slots.acquire()
+        elif self._slots.locked():
+            if self.policy == "drop_newest" or self.queue.empty():
+                # Under drop_oldest the lane can be full of handed-off events only; those can't be recalled.
+                self.shed += 1
+                return False
+            # The evicted event's slot is reused by the new one.
+            _, evicted_type, evicted_data = self.queue.get_nowait()
+            self.queue.task_done()
+            self.shed += 1
+            self.queue.put_nowait(item)
+            self.accepted += 1
+            if self.on_shed is not None:
+                try:
+                    await self.on_shed(evicted_type, evicted_data)
+                except Exception as e:
+                    self.logger.exception(f"Lane '{self.name}' failed to report shedding '{evicted_type}': {e}")
+            return True
+        else:
+            await self._slots.acquire()
+        self.queue.put_nowait(item)
+        self.accepted += 1
+        return True
+
+    async def _worker(self) -> None:
+        while True:
+            enqueued_at, event_type, event_data = await self.queue.get()
+            self.queue_wait.observe(time.perf_counter() - enqueued_at)
+            self.busy += 1
+            handoff = None
+            try:
+                handoff = await self.dispatch(event_type, event_data)
+            except Exception as e:
+                # dispatch already isolates listener errors; this guards the worker itself.
+                self.logger.exception(f"Lane '{self.name}' failed to dispatch '{event_type}': {e}")
+            finally:
+                self.busy -= 1
+                self.queue.task_done()
+            if isinstance(handoff, asyncio.Future) and not handoff.done():
+                self.handed_off += 1
+                handoff.add_done_callback(lambda f, event_type=event_type: self._finish_handoff(f, event_type))
+            else:
+                self._finish()
+
+    def _finish(self) -> None:
+        self.processed += 1
+        self._slots.release()
+
+    def _finish_handoff(self, future: asyncio.Future, event_type: str) -> None:
+        self.handed_off -= 1
+        if not future.cancelled() and future.exception() is not None:
+            self.logger.error(f"Lane '{self.name}' failed to dispatch '{event_type}': {future.exception()}")
+        self._finish()
+
+    def get_stats(self) -> dict:
+        return {
+            "policy": self.policy,
+            "workers": self.worker_count,
+            "busy": self.busy,
+            "queued": self.queue.qsize(),
+            "handed_off": self.handed_off,
+            "max_queue": self.max_queue,
+            "accepted": self.accepted,
+            "processed": self.processed,
+            "shed": self.shed,
+            "queue_wait": self.queue_wait.to_dict()
+        }
@@ -4,23 +4,40 @@ from .messages import (
     UserAccountLoginRequest,
     UserAccountLogoutRequest,
     MapCreateRequest,
+    MapUploadBeginRequest,
+    MapUploadChunkRequest,
+    MapUploadEndRequest,
     UserMoveRequest,
+    UserTurnRequest,
     ChatMessageRequest,
     MapJoinRequest,
     MapLeaveRequest,
     UserJumpRequest,
-    MapPhysicsUpdateRequest
+    MapPhysicsUpdateRequest,
+    WorldSnapshotAck,
+    WeaponCreateRequest,
+    WeaponFireRequest,
+    WeaponReloadRequest
 )
+from .fast_validators import FAST_VALIDATORS, FastValidationError
 
 MESSAGE_TYPE_TO_SCHEMA = {
     "user_account_create_request": UserAccountCreateRequest,
     "user_account_login_request": UserAccountLoginRequest,
     "user_account_logout_request": UserAccountLogoutRequest,
     "map_create_request": MapCreateRequest,
+    "map_upload_begin_request": MapUploadBeginRequest,
+    "map_upload_chunk_request": MapUploadChunkRequest,
+    "map_upload_end_request": MapUploadEndRequest,
     "user_move_request": UserMoveRequest,
+    "user_turn_request": UserTurnRequest,
     "chat_message": ChatMessageRequest,
     "map_join_request": MapJoinRequest,
     "map_leave_request": MapLeaveRequest,
     "user_jump_request": UserJumpRequest,
-    "map_physics_update_request": MapPhysicsUpdateRequest
+    "map_physics_update_request": MapPhysicsUpdateRequest,
+    "world_snapshot_ack": WorldSnapshotAck,
+    "weapon_create_request": WeaponCreateRequest,
+    "weapon_fire_request": WeaponFireRequest,
+    "weapon_reload_request": WeaponReloadRequest
 }
@@ -0,0 +1,160 @@
+# schemas/fast_validators.py
+"""
+Precompiled validators for the high-rate client messages.
+
+Building a pydantic model and dumping it back to a dict costs far more than the
+handlers of small, frequent messages like user_move_request. The validators here
+are compiled once, at import, from the pydantic models in schemas/messages.py
+into a plain function that checks and coerces the message dict in place, fills
+defaults and strips unknown fields, producing the same dict shape the pydantic
+path does. The models stay the only definition of each message.
+
+Each field gets a direct check for the types clients normally send (a str for a
+str, an int or float for a float, a list of three numbers for a vector). Any
+other value, such as a numeric string pydantic would coerce, goes through a
+cached TypeAdapter of the field's annotation, so the result and the error are
+the ones pydantic would give. Failures raise FastValidationError, whose errors()
+mirrors the pydantic error list.
+
+Large or rare messages (map creation, uploads, account creation) stay on the
+pydantic schemas in MESSAGE_TYPE_TO_SCHEMA.
+"""
+from typing import Any, Callable, Dict, Literal, Optional, Type, Union, get_args, get_origin
+
+from pydantic import BaseModel, TypeAdapter, ValidationError
+
+from .messages import (
+    ChatMessageRequest,
+    MapJoinRequest,
+    MapLeaveRequest,
+    UserJumpRequest,
+    UserMoveRequest,
+    UserTurnRequest,
+    WeaponFireRequest,
+    WorldSnapshotAck
+)
+
+REQUIRED = object()
+
+# Returned by a direct check that can't decide; the value then goes to the field's TypeAdapter.
+UNHANDLED = object()
+
+
+class FastValidationError(ValueError):
+    def __init__(self, errors: list):
+        super().__init__(f"{len(errors)} validation error(s)")
+        self._errors = errors
+
+    def errors(self) -> list:
+        return self._errors
+
+
+def _direct_check(annotation: Any) -> Optional[Callable[[Any], Any]]:
+    """
+    A check for the common, already well-typed values of annotation, or None if there is none.
+    """
+    if annotation is str:
+        return lambda value: value if type(value) is str else UNHANDLED
+    if annotation is float:
+        return lambda value: float(value) if type(value) in (int, float) else UNHANDLED
+    if annotation is int:
+        return lambda value: value if type(value) is int else UNHANDLED
+
+    origin, args = get_origin(annotation), get_args(annotation)
+    if origin is Literal and all(type(a) is str for a in args):
+        choices = frozenset(args)
+        return lambda value: value if type(value) is str and value in choices else UNHANDLED
+    if origin is Union and len(args) == 2 and type(None) in args:
+        inner = _direct_check(args[0] if args[1] is type(None) else args[1])
+        if inner is None:
+            return None
+        return lambda value: None if value is None else inner(value)
+    if origin is tuple and args and Ellipsis not in args and all(a is float for a in args):
+        size = len(args)
+
+        def vector(value):
+            if type(value) in (list, tuple) and len(value) == size and all(type(v) in (int, float) for v in value):
+                return tuple(float(v) for v in value)
+            return UNHANDLED
+        return vector
+    return None
+
+
+def _field_converter(annotation: Any) -> Callable[[Any], Any]:
+    """
+    Converter for one field: the direct check where it applies, the field's TypeAdapter otherwise.
+    Raises pydantic's ValidationError for invalid values.
+    """
+    adapter = TypeAdapter(annotation)
+    check = _direct_check(annotation)
+    if check is None:
+        return adapter.validate_python
+
+    def convert(value):
+        result = check(value)
+        return adapter.validate_python(value) if result is UNHANDLED else result
+    return convert
+
+
+def compile_validator(model: Type[BaseModel]) -> Callable[[dict], dict]:
+    """
+    Build an in-place validator from a message model.
+
+    :param model: A pydantic model with a Literal message_type field and only plain field annotations.
+    :return: A function that validates and normalises the message dict and returns it.
+    """
+    decorators = model.__pydantic_decorators__
+    if decorators.field_validators or decorators.model_validators:
+        raise TypeError(f"{model.__name__} has custom validators; validate it with the model instead.")
+    fields = dict(model.model_fields)
+    message_type = fields.pop("message_type").default
+    spec = tuple(
+        (name, _field_converter(field.annotation), REQUIRED if field.is_required() else field.get_default(call_default_factory=True))
+        for name, field in fields.items()
+    )
+    allowed = frozenset(fields) | {"message_type"}
+
+    def validate(message: dict) -> dict:
+        errors = None
+        for name, convert, default in spec:
+            if name in message:
+                try:
+                    message[name] = convert(message[name])
+                except ValidationError as e:
+                    errors = errors or []
+                    errors.extend(
+                        {"loc": (name, *error["loc"]), "msg": error["msg"], "type": error["type"]}
+                        for error in e.errors(include_url=False)
+                    )
+            elif default is REQUIRED:
+                errors = errors or []
+                errors.append({"loc": (name,), "msg": "Field required", "type": "missing"})
+            else:
+                message[name] = default
+        if message.get("message_type") != message_type:
+            errors = errors or []
+            errors.append({"loc": ("message_type",), "msg": f"Input should be '{message_type}'", "type": "literal_error"})
+        if errors:
+            raise FastValidationError(errors)
+        if len(message) > len(allowed):
+            for key in [k for k in message if k not in allowed]:
+                del message[key]
+        return message
+
+    validate.__name__ = f"validate_{message_type}"
+    return validate
+
+
+FAST_VALIDATORS: Dict[str, Callable[[dict], dict]] = {
+    model.model_fields["message_type"].default: compile_validator(model)
+    for model in (
+        UserMoveRequest,
+        UserTurnRequest,
+        UserJumpRequest,
+        ChatMessageRequest,
+        MapJoinRequest,
+        MapLeaveRequest,
+        WorldSnapshotAck,
+        WeaponFireRequest
+    )
+}
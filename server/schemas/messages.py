@@ -17,6 +17,7 @@ class UserAccountLoginRequest(BaseModel):
 
 class UserAccountLogoutRequest(BaseModel):
     message_type: Literal["user_account_logout_request"] = "user_account_logout_request"
+    username: Optional[str] = None
     token: str
 
 class MapCreateRequest(BaseModel):
@@ -29,11 +30,42 @@ class MapCreateRequest(BaseModel):
     is_public: bool = True
     tiles: Dict[str, Dict[str, Any]] = {}
 
+class MapUploadBeginRequest(BaseModel):
+    message_type: Literal["map_upload_begin_request"] = "map_upload_begin_request"
+    username: str
+    token: str
+    map_name: str
+    map_size: Tuple[float,float,float,float,float,float]
+    start_position: Tuple[float,float,float] = (0.0,0.0,0.0)
+    is_public: bool = True
+
+class MapUploadChunkRequest(BaseModel):
+    message_type: Literal["map_upload_chunk_request"] = "map_upload_chunk_request"
+    username: str
+    token: str
+    upload_id: str
+    chunk_index: int
+    tiles: Dict[str, Dict[str, Any]] = {}
+
+class MapUploadEndRequest(BaseModel):
+    message_type: Literal["map_upload_end_request"] = "map_upload_end_request"
+    username: str
+    token: str
+    upload_id: str
+
 class UserMoveRequest(BaseModel):
     message_type: Literal["user_move_request"] = "user_move_request"
     username: str
     token: str
     direction: Tuple[float,float,float]
+    input_seq: Optional[int] = None
+
+class UserTurnRequest(BaseModel):
+    message_type: Literal["user_turn_request"] = "user_turn_request"
+    username: str
+    token: str
+    yaw_change: float = 0.0
+    pitch_change: float = 0.0
 
 class ChatMessageRequest(BaseModel):
     message_type: Literal["chat_message"] = "chat_message"
@@ -60,6 +92,10 @@ class UserJumpRequest(BaseModel):
     username: str
     token: str
 
+class WorldSnapshotAck(BaseModel):
+    message_type: Literal["world_snapshot_ack"] = "world_snapshot_ack"
+    seq: int
+
 class MapPhysicsUpdateRequest(BaseModel):
     message_type: Literal["map_physics_update_request"] = "map_physics_update_request"
     username: str
@@ -69,6 +105,29 @@ class MapPhysicsUpdateRequest(BaseModel):
     air_resistance: Optional[float] = None
     friction: Optional[float] = None
 
+class WeaponCreateRequest(BaseModel):
+    message_type: Literal["weapon_create_request"] = "weapon_create_request"
+    username: str
+    token: str
+    name: str
+    damage: float = 10.0
+    range: float = 50.0
+    fire_rate: float = 1.0
+    reload_time: float = 2.0
+    ammo_capacity: int = 30
+
+class WeaponFireRequest(BaseModel):
+    message_type: Literal["weapon_fire_request"] = "weapon_fire_request"
+    username: str
+    token: str
+    weapon_id: str
+
+class WeaponReloadRequest(BaseModel):
+    message_type: Literal["weapon_reload_request"] = "weapon_reload_request"
+    username: str
+    token: str
+    weapon_id: str
+
 # New attributes for zone creation to handle door/travel:
 # We will add these fields to the "zone_data" in map_zone_add_request.
 # The map_zone_add_request itself is not a separate request type here; it's handled by generic logic.
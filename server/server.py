@@ -10,12 +10,17 @@ from interfaces.console_interface import ConsoleInterface
 from infrastructure.storage.file_user_repository import FileUserRepository
 from infrastructure.storage.file_map_repository import FileMapRepository
 from infrastructure.storage.file_ai_repository import FileAIRepository
+from infrastructure.storage.file_weapon_repository import FileWeaponRepository
 from infrastructure.storage.role_manager import RoleManager
 from infrastructure.storage.chat_logger import ChatLogger
+from infrastructure.storage.traffic_recorder import DEFAULT_REDACT_FIELDS, TrafficRecorder
 from infrastructure.security.security_manager import SecurityManager
 from infrastructure.security.ssl_manager import SSLManager
 from infrastructure.network.network_server import NetworkServer
 from infrastructure.network.connection_manager import ConnectionManager
+from infrastructure.network.datagram_channel import DatagramChannel
+from infrastructure.network.session_manager import SessionManager
+from infrastructure.network.outbound_router import OutboundRouter
 from infrastructure.logging.custom_logger import get_logger
 
 from utils.settings_manager import global_settings
@@ -27,6 +32,14 @@ from services.role_service import RoleService
 from services.physics_service import PhysicsService
 from services.movement_service import MovementService
 from services.chat_service import ChatService
+from services.simulation_service import SimulationService
+from services.interest_service import InterestService
+from services.replication_service import ReplicationService
+from services.ai_scheduler import AIScheduler
+from services.navigation_service import NavigationService
+from services.map_lifecycle_service import MapLifecycleService
+from services.weapon_service import WeaponService
+from services.zone_service import ZoneService
 
 from domain.physics.collision_manager import CollisionManager
 
@@ -40,6 +53,7 @@ async def main():
     user_repo = FileUserRepository(logger=get_logger("user_registry", debug_mode))
     map_repo = FileMapRepository(logger=get_logger("map_registry", debug_mode))
     ai_repo = FileAIRepository(logger=get_logger("FileAIRepository", debug_mode))
+    weapon_repo = FileWeaponRepository(logger=get_logger("FileWeaponRepository", debug_mode))
     role_mgr = RoleManager.get_instance('roles.json', 'user_roles.json')
 
     collision_manager = CollisionManager(map_repository=map_repo, user_repository=user_repo, ai_repository=ai_repo)
@@ -49,20 +63,135 @@ async def main():
 
     security_manager = SecurityManager(role_manager=role_mgr, jwt_secret=global_settings.get("security.jwt_secret", "SUPER_SECRET_KEY"), logger=get_logger("SecurityManager", debug_mode))
     connection_manager = ConnectionManager()
+    session_manager = SessionManager(
+        grace_seconds=global_settings.get("network.session_grace_seconds", 60),
+        replay_buffer_size=global_settings.get("network.replay_buffer_size", 512),
+        logger=get_logger("SessionManager", debug_mode)
+    )
 
     dispatcher = EventDispatcher(logger=get_logger("EventDispatcher", debug_mode))
+    dispatcher.configure_lanes(
+        global_settings.get("events.lanes", {}),
+        assignments=global_settings.get("events.lane_assignments", {}),
+        default_lane=global_settings.get("events.default_lane", None)
+    )
+    dispatcher.configure_entity_keys(global_settings.get("events.entity_keys", {}))
     chat_logger = ChatLogger()
 
     map_service = MapService(event_dispatcher=dispatcher, map_repository=map_repo, role_manager=role_mgr, logger=get_logger("MapService", debug_mode))
-    user_service = UserService(event_dispatcher=dispatcher, user_repository=user_repo, map_service=map_service, connection_manager=connection_manager, security_manager=security_manager, logger=get_logger("UserService", debug_mode))
+    user_service = UserService(event_dispatcher=dispatcher, user_repository=user_repo, map_service=map_service, connection_manager=connection_manager, security_manager=security_manager, logger=get_logger("UserService", debug_mode), session_manager=session_manager)
     map_service.user_service = user_service
     map_service.collision_manager = collision_manager
 
     ai_service = AIService(dispatcher, ai_repo, logger=get_logger("AIService", debug_mode))
     role_service = RoleService(dispatcher, role_mgr, logger=get_logger("RoleService", debug_mode))
     physics_service = PhysicsService(dispatcher, logger=get_logger("PhysicsService", debug_mode))
-    movement_service = MovementService(dispatcher, user_repo, map_repo, collision_manager, user_service, logger=get_logger("MovementService", debug_mode))
+    movement_service = MovementService(dispatcher, user_repo, map_repo, collision_manager, user_service, logger=get_logger("MovementService", debug_mode), connection_manager=connection_manager, map_service=map_service)
     chat_service = ChatService(dispatcher, user_service, map_service, role_mgr, chat_logger, connection_manager=connection_manager, logger=get_logger("ChatService", debug_mode))
+    simulation_service = SimulationService(
+        dispatcher, map_repo, user_repo, connection_manager,
+        ai_repository=ai_repo,
+        tick_rate=global_settings.get("simulation.tick_rate_hz", 30),
+        map_tick_rates=global_settings.get("simulation.map_tick_rates_hz", {}),
+        max_catchup_ticks=global_settings.get("simulation.max_catchup_ticks", 5),
+        idle_timeout=global_settings.get("simulation.idle_map_timeout_seconds", 30.0),
+        worker_maps=global_settings.get("simulation.worker_maps", []),
+        worker_capacity=global_settings.get("simulation.worker_capacity", 4096),
+        rewind_seconds=global_settings.get("simulation.rewind_seconds", 1.0),
+        heightfield_resolution=global_settings.get("simulation.heightfield_resolution", 1.0),
+        jump_speed=global_settings.get("simulation.jump_speed", 5.0),
+        logger=get_logger("SimulationService", debug_mode)
+    )
+    if global_settings.get("simulation.enabled", True):
+        movement_service.simulation_service = simulation_service
+        physics_service.simulation_service = simulation_service
+    interest_service = None
+    if global_settings.get("interest.enabled", True):
+        interest_service = InterestService(
+            dispatcher, user_repo, connection_manager,
+            hearing_radius=global_settings.get("interest.hearing_radius", 30.0),
+            leave_margin=global_settings.get("interest.leave_margin", 2.0),
+            cell_size=global_settings.get("interest.cell_size", None),
+            logger=get_logger("InterestService", debug_mode)
+        )
+        movement_service.interest_service = interest_service
+        simulation_service.interest_service = interest_service
+    replication_service = None
+    if global_settings.get("replication.enabled", True):
+        if interest_service:
+            replication_service = ReplicationService(
+                dispatcher, interest_service, user_repository=user_repo,
+                snapshot_rate=global_settings.get("replication.snapshot_rate_hz", 20),
+                position_scale=global_settings.get("replication.position_scale", 100),
+                angle_scale=global_settings.get("replication.angle_scale", 10),
+                history_size=global_settings.get("replication.history_size", 32),
+                logger=get_logger("ReplicationService", debug_mode)
+            )
+            movement_service.replication_service = replication_service
+            simulation_service.replication_service = replication_service
+        else:
+            logger.warning("Replication needs interest management; sending per-move updates instead.")
+    ai_scheduler = None
+    if global_settings.get("ai.enabled", True):
+        ai_scheduler = AIScheduler(
+            interest_service=interest_service,
+            budget_ms=global_settings.get("ai.budget_ms_per_tick", 2.0),
+            unobserved_interval=global_settings.get("ai.unobserved_interval_ticks", 10),
+            logger=get_logger("AIScheduler", debug_mode)
+        )
+        simulation_service.ai_scheduler = ai_scheduler
+    navigation_service = None
+    if global_settings.get("navigation.enabled", True):
+        navigation_service = NavigationService(
+            dispatcher, map_repo,
+            cell_size=global_settings.get("navigation.cell_size", 1.0),
+            cache_size=global_settings.get("navigation.path_cache_size", 1024),
+            max_expansions=global_settings.get("navigation.max_expansions", 20000),
+            logger=get_logger("NavigationService", debug_mode)
+        )
+        if ai_scheduler:
+            ai_scheduler.navigation_service = navigation_service
+    weapon_service = None
+    if global_settings.get("weapons.enabled", True):
+        weapon_service = WeaponService(
+            dispatcher, weapon_repo,
+            logger=get_logger("WeaponService", debug_mode),
+            user_service=user_service,
+            user_repository=user_repo,
+            map_repository=map_repo,
+            ai_repository=ai_repo,
+            connection_manager=connection_manager,
+            cell_size=global_settings.get("weapons.cell_size", 4.0),
+            hit_radius=global_settings.get("weapons.hit_radius", 0.4),
+            hit_height=global_settings.get("weapons.hit_height", 1.8),
+            eye_height=global_settings.get("weapons.eye_height", 1.6),
+            lag_compensation=global_settings.get("weapons.lag_compensation", True),
+            max_rewind=global_settings.get("weapons.max_rewind_ms", 1000) / 1000.0,
+            client_delay=global_settings.get("weapons.client_delay_ms", 25) / 1000.0
+        )
+        if global_settings.get("simulation.enabled", True):
+            weapon_service.simulation_service = simulation_service
+        weapon_service.interest_service = interest_service
+    zone_service = None
+    if global_settings.get("zones.enabled", True):
+        zone_service = ZoneService(
+            dispatcher, map_repo, user_repo, connection_manager,
+            cell_size=global_settings.get("zones.cell_size", 8.0),
+            travel_delay=global_settings.get("zones.travel_delay_seconds", 1.0),
+            logger=get_logger("ZoneService", debug_mode)
+        )
+        zone_service.map_service = map_service
+        zone_service.interest_service = interest_service
+        if global_settings.get("simulation.enabled", True):
+            simulation_service.zone_service = zone_service
+    map_lifecycle_service = None
+    if global_settings.get("map_lifecycle.enabled", True):
+        map_lifecycle_service = MapLifecycleService(
+            dispatcher, map_repo, user_repo, connection_manager,
+            hibernate_after=global_settings.get("map_lifecycle.hibernate_after_seconds", 300),
+            check_interval=global_settings.get("map_lifecycle.check_interval_seconds", 10),
+            logger=get_logger("MapLifecycleService", debug_mode)
+        )
 
     await chat_service.start()
     await movement_service.start()
@@ -71,6 +200,20 @@ async def main():
     await ai_service.start()
     await role_service.start()
     await physics_service.start()
+    if interest_service:
+        await interest_service.start()
+    if navigation_service:
+        await navigation_service.start()
+    if map_lifecycle_service:
+        await map_lifecycle_service.start()
+    if weapon_service:
+        await weapon_service.start()
+    if zone_service:
+        await zone_service.start()
+    if replication_service:
+        await replication_service.start()
+    if global_settings.get("simulation.enabled", True):
+        await simulation_service.start()
 
     # Check for default admin user
     all_users = await user_repo.get_all_usernames()
@@ -113,22 +256,75 @@ async def main():
 
     shutdown_event = asyncio.Event()
     console = ConsoleInterface(user_repo, map_repo, dispatcher, shutdown_event, logger=get_logger("ConsoleInterface", debug_mode))
+    console.simulation_service = simulation_service
+    console.interest_service = interest_service
+    console.replication_service = replication_service
+    console.ai_scheduler = ai_scheduler
+    console.navigation_service = navigation_service
+    console.map_lifecycle_service = map_lifecycle_service
+    console.weapon_service = weapon_service
+    console.zone_service = zone_service
     await console.start()
 
     host = global_settings.get("network.host", "localhost")
     port = global_settings.get("network.port", 33288)
 
-    msg_handler = ClientMessageHandler(dispatcher, logger=get_logger("ClientMessageHandler", debug_mode))
+    traffic_recorder = None
+    if global_settings.get("recording.enabled", False):
+        traffic_recorder = TrafficRecorder(
+            directory=global_settings.get("recording.directory", "logs/traffic"),
+            flush_interval=global_settings.get("recording.flush_interval_seconds", 1.0),
+            redact_fields=global_settings.get("recording.redact_fields", DEFAULT_REDACT_FIELDS),
+            logger=get_logger("TrafficRecorder", debug_mode)
+        )
+        await traffic_recorder.start()
+
+    msg_handler = ClientMessageHandler(dispatcher, logger=get_logger("ClientMessageHandler", debug_mode), recorder=traffic_recorder)
+
+    datagram_channel = None
+    if global_settings.get("network.udp_enabled", False):
+        datagram_channel = DatagramChannel(
+            host=host,
+            port=global_settings.get("network.udp_port", port + 1),
+            message_handler=msg_handler.handle_message,
+            logger=get_logger("DatagramChannel", debug_mode)
+        )
+        user_service.datagram_channel = datagram_channel
+
     server = NetworkServer(
         host=host,
         port=port,
         message_handler=msg_handler.handle_message,
         ssl_context=ssl_ctx,
         connection_manager=connection_manager,
-        logger=get_logger("NetworkServer", debug_mode)
+        logger=get_logger("NetworkServer", debug_mode),
+        datagram_channel=datagram_channel,
+        heartbeat_interval=global_settings.get("network.heartbeat_interval_seconds", 10.0),
+        idle_timeout=global_settings.get("network.idle_timeout_seconds", 30.0),
+        write_buffer_high_water=global_settings.get("network.write_buffer_high_water_bytes", 1048576),
+        send_timeout=global_settings.get("network.send_timeout_seconds", 5.0),
+        max_message_bytes=global_settings.get("network.max_message_bytes", 65536),
+        message_size_limits=global_settings.get("network.message_size_limits", {}),
+        session_manager=session_manager
+    )
+    console.network_server = server
+    if weapon_service:
+        weapon_service.network_server = server
+
+    outbound_router = OutboundRouter(
+        server,
+        routes=global_settings.get("network.outbound_routes", {}),
+        logger=get_logger("OutboundRouter", debug_mode)
     )
+    # Position and orientation snapshots prefer the datagram channel and fall back to TCP.
+    for event_type in DatagramChannel.UNRELIABLE_EVENT_TYPES:
+        outbound_router.add_route(event_type, "unreliable")
+    dispatcher.outbound_router = outbound_router
 
+    await dispatcher.start_lanes()
     await server.start()
+    if datagram_channel:
+        await datagram_channel.start()
     logger.info(f"{global_settings.get('server.name', 'Open-FPS Server')} version {global_settings.get('server.version', '0.1')} started.")
     logger.info(f"Server running on {host}:{port}. Type 'exit' in console to shut down.")
 
@@ -138,7 +334,23 @@ async def main():
         logger.info("Received KeyboardInterrupt, shutting down server...")
 
     await console.stop()
+    if datagram_channel:
+        await datagram_channel.stop()
     await server.stop()
+    if map_lifecycle_service:
+        await map_lifecycle_service.stop()
+    if weapon_service:
+        await weapon_service.stop()
+    if zone_service:
+        await zone_service.stop()
+    await simulation_service.stop()
+    if replication_service:
+        await replication_service.stop()
+    if interest_service:
+        await interest_service.stop()
+    if traffic_recorder:
+        await traffic_recorder.stop()
+    await dispatcher.stop_lanes()
     logger.info("Server shut down complete.")
 
 if __name__ == '__main__':
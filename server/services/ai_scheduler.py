@@ -0,0 +1,208 @@
+# services/ai_scheduler.py
+import logging
+import time
+from collections import deque
+from typing import Deque, Dict, Iterable, Optional
+
+from domain.ai.ai_entity import AIEntity
+from domain.ai.behaviors import AgentState, BehaviorContext, get_behavior
+from infrastructure.logging.custom_logger import get_logger
+from interfaces.dispatch_metrics import LatencyHistogram
+
+
+class MapSchedule:
+    """
+    The AI of one simulated map, in round-robin order, and the map's scheduling counters.
+    """
+
+    def __init__(self, map_name: str):
+        self.map_name = map_name
+        self.order: Deque[str] = deque()
+        self.agents: Dict[str, AgentState] = {}
+        self.tick = 0
+        self.updates = 0
+        self.skipped = 0
+        self.late = 0
+        self.budget_exhausted = 0
+        self.searches_deferred = 0
+        self.update_time = LatencyHistogram()
+
+    def get_stats(self) -> dict:
+        return {
+            "agents": len(self.agents),
+            "ticks": self.tick,
+            "updates": self.updates,
+            "skipped": self.skipped,
+            "late": self.late,
+            "budget_exhausted": self.budget_exhausted,
+            "searches_deferred": self.searches_deferred,
+            "update_time": self.update_time.to_dict()
+        }
+
+
+class AIScheduler:
+    """
+    Runs AI behaviors from the simulation tick instead of waiting for ai_move_request.
+
+    SimulationService calls update_map() once per tick of every active map, before
+    the physics step. Each AI's behavior (AIEntity.behavior, see
+    domain/ai/behaviors.py) sets the horizontal velocity the physics step then
+    moves it with, so AI movement reaches clients like any other simulated motion.
+
+    AI that some player can hear (the InterestService has observers for it) are
+    updated every tick; the rest only every unobserved_interval ticks. Updates
+    are time-sliced: once budget_ms of the tick is spent, the remaining due AI
+    are skipped and are the first to run next tick. Path searches share the
+    budget: one that is still running at the deadline pauses, and its AI is
+    updated again next tick to resume it. Counters per map: updates run, skipped
+    (due but out of budget), late (ran after their interval), ticks that
+    exhausted the budget and searches_deferred (updates that left a path search
+    paused for the next tick).
+    """
+
+    def __init__(
+        self,
+        interest_service=None,
+        budget_ms: float = 2.0,
+        unobserved_interval: int = 10,
+        logger: Optional[logging.Logger] = None
+    ):
+        self.interest_service = interest_service
+        self.budget = budget_ms / 1000.0
+        self.unobserved_interval = max(1, int(unobserved_interval))
+        self.logger = logger or get_logger("AIScheduler", debug_mode=False)
+        self.maps: Dict[str, MapSchedule] = {}
+        # Set to a NavigationService to walk around walls instead of straight through them.
+        self.navigation_service = None
+        self.logger.debug("AIScheduler initialized.")
+
+    # Membership
+
+    def add_map(self, map_name: str, ai_list: Iterable[AIEntity], game_map=None) -> None:
+        schedule = self.maps[map_name] = MapSchedule(map_name)
+        if game_map is not None and self.navigation_service:
+            # Build the navigation grid now rather than in the middle of a tick.
+            self.navigation_service.grid_for(game_map)
+        for ai in ai_list:
+            self._add(schedule, ai)
+
+    def remove_map(self, map_name: str) -> None:
+        self.maps.pop(map_name, None)
+
+    def add_ai(self, map_name: str, ai: AIEntity) -> None:
+        schedule = self.maps.get(map_name)
+        if schedule is not None:
+            self._add(schedule, ai)
+
+    def remove_ai(self, ai_id: str) -> None:
+        for schedule in self.maps.values():
+            if schedule.agents.pop(ai_id, None) is not None:
+                schedule.order.remove(ai_id)
+                return
+
+    def _add(self, schedule: MapSchedule, ai: AIEntity) -> None:
+        if ai.ai_id in schedule.agents:
+            return
+        state = AgentState(ai)
+        # Due on the next tick.
+        state.last_tick = schedule.tick
+        schedule.agents[ai.ai_id] = state
+        schedule.order.append(ai.ai_id)
+
+    # Tick
+
+    def update_map(self, sim, timestep: float) -> None:
+        """
+        Run the behaviors that are due this tick in a map, within the time budget.
+
+        :param sim: The MapSimulation being ticked.
+        :param timestep: The map's tick length in seconds.
+        """
+        schedule = self.maps.get(sim.map_name)
+        if schedule is None or not schedule.agents:
+            return
+        schedule.tick += 1
+        tick = schedule.tick
+        engine = sim.engine
+        deadline = time.perf_counter() + self.budget
+        context = self._context(sim.game_map, deadline)
+        first_skipped = None
+
+        for offset, ai_id in enumerate(schedule.order):
+            state = schedule.agents[ai_id]
+            waited = tick - state.last_tick
+            if waited < state.interval:
+                continue
+            started = time.perf_counter()
+            if started >= deadline:
+                schedule.skipped += 1
+                if first_skipped is None:
+                    first_skipped = offset
+                continue
+            key = f"ai:{ai_id}"
+            if key not in engine:
+                continue
+            if waited > state.interval:
+                schedule.late += 1
+            vx, vy = get_behavior(state.ai.behavior).update(state, engine.get_position(key), context, waited * timestep)
+            state.velocity = (vx, vy)
+            state.last_tick = tick
+            if state.search is not None:
+                schedule.searches_deferred += 1
+                state.interval = 1
+            else:
+                state.interval = 1 if self._observed(ai_id) else self.unobserved_interval
+            schedule.updates += 1
+            schedule.update_time.observe(time.perf_counter() - started)
+
+        if first_skipped is not None:
+            schedule.budget_exhausted += 1
+            # Whoever missed out goes first next tick.
+            schedule.order.rotate(-first_skipped)
+
+        # Friction eats into velocities between updates, so keep driving every walker.
+        for ai_id, state in schedule.agents.items():
+            vx, vy = state.velocity
+            key = f"ai:{ai_id}"
+            if (vx or vy or state.last_tick == tick) and key in engine:
+                engine.set_velocity(key, (vx, vy, engine.get_velocity(key)[2]))
+
+    def _context(self, game_map, deadline: float) -> BehaviorContext:
+        navigation = self.navigation_service
+        if navigation is None:
+            return BehaviorContext(lambda position: self.is_walkable(game_map, position), deadline=deadline)
+        return BehaviorContext(
+            lambda position: navigation.is_walkable(game_map, position),
+            lambda start, goal: navigation.start_path(game_map, start, goal),
+            deadline
+        )
+
+    def _observed(self, ai_id: str) -> bool:
+        if self.interest_service is None:
+            # Without interest management every player in the map hears every AI.
+            return True
+        return bool(self.interest_service.observers("ai", ai_id))
+
+    @staticmethod
+    def is_walkable(game_map, position) -> bool:
+        """
+        Whether an entity may stand at a position: inside the map and not inside a wall.
+        """
+        x, y, z = position
+        x1, x2, y1, y2, z1, z2 = game_map.map_size
+        if not (x1 <= x <= x2 and y1 <= y <= y2):
+            return False
+        for tile in game_map.tiles.values():
+            if not tile.is_wall:
+                continue
+            tx1, tx2, ty1, ty2, tz1, tz2 = tile.tile_position
+            if tx1 <= x <= tx2 and ty1 <= y <= ty2 and tz1 <= z < tz2:
+                return False
+        return True
+
+    def get_stats(self) -> dict:
+        return {
+            "budget_ms": round(self.budget * 1000.0, 3),
+            "unobserved_interval": self.unobserved_interval,
+            "maps": {name: schedule.get_stats() for name, schedule in self.maps.items()}
+        }
@@ -47,6 +47,8 @@ class AIService:
         health = msg.get("health", 100)
         speed = msg.get("speed", 1.0)
         role = msg.get("role", "npc")
+        map_name = msg.get("map_name")
+        behavior = msg.get("behavior", "idle")
 
         self.logger.debug(f"Handling ai_spawn_request from client_id='{client_id}', name='{name}', position={position}, health={health}, speed={speed}, role='{role}'.")
 
@@ -57,12 +59,12 @@ class AIService:
             return
 
         ai_id = str(uuid.uuid4())
-        ai_entity = AIEntity(ai_id, name, tuple(position), health, speed, role)
+        ai_entity = AIEntity(ai_id, name, tuple(position), health, speed, role, map_name=map_name, behavior=behavior)
 
         success = await self.ai_repository.save_ai(ai_entity)
         if success:
             self.logger.info(f"AI '{name}' spawned with ID {ai_id}.")
-            await self._ok("ai_spawn_ok", client_id, {"ai_id": ai_id, "name": name})
+            await self._ok("ai_spawn_ok", client_id, {"ai_id": ai_id, "name": name, "map_name": map_name, "position": ai_entity.position})
         else:
             reason = "Failed to save AI entity."
             self.logger.error(reason)
@@ -113,9 +113,9 @@ class ChatService:
             f"_send_chat_to_clients: sender='{sender}', chat_category='{chat_category}', "
             f"map_name='{map_name}', recipient='{recipient}', targets={len(client_ids)}"
         )
-        for cid in client_ids:
+        if client_ids:
             await self.event_dispatcher.dispatch("chat_receive", {
-                "client_id": cid,
+                "client_ids": client_ids,
                 "message": {
                     "chat_category": chat_category,
                     "sender": sender,
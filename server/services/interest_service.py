@@ -0,0 +1,256 @@
+# services/interest_service.py
+import asyncio
+import logging
+from typing import Dict, List, Optional, Tuple
+
+from domain.maps.interest_grid import InterestGrid
+from infrastructure.logging.custom_logger import get_logger
+
+
+class InterestService:
+    """
+    Decides who hears whom: each player only receives updates about entities
+    within the hearing radius, instead of everyone in the same map.
+
+    One InterestGrid per map tracks players (from login, map join and
+    user_move_ok) and AI (fed by the simulation). observers() gives the client_ids
+    that should receive an entity's position or orientation updates. When entities
+    cross the radius, both sides are told with entity_enter_range (carrying the
+    entities' positions) or entity_leave_range. Entities are described as
+    {"username": ...} or {"ai_id": ...}, like the position updates.
+
+    Plain disconnects raise no event, so once a second players whose connection
+    is gone are dropped and resumed sessions are followed to their new client_id.
+    """
+
+    def __init__(
+        self,
+        event_dispatcher,
+        user_repository,
+        connection_manager,
+        hearing_radius: float = 30.0,
+        leave_margin: float = 2.0,
+        cell_size: Optional[float] = None,
+        logger: Optional[logging.Logger] = None
+    ):
+        self.event_dispatcher = event_dispatcher
+        self.user_repository = user_repository
+        self.connection_manager = connection_manager
+        self.hearing_radius = hearing_radius
+        self.leave_margin = leave_margin
+        self.cell_size = cell_size
+        self.logger = logger or get_logger("InterestService", debug_mode=False)
+        self.grids: Dict[str, InterestGrid] = {}
+        # Entity key ("user:alice", "ai:<id>") -> map it is tracked in.
+        self._locations: Dict[str, str] = {}
+        # Username -> client_id, and the reverse for events that only carry the client.
+        self._client_ids: Dict[str, str] = {}
+        self._usernames: Dict[str, str] = {}
+        self._sweep_task: Optional[asyncio.Task] = None
+        self.notifications = 0
+        self.logger.debug("InterestService initialized.")
+
+    async def start(self):
+        await self.event_dispatcher.subscribe("user_account_login_ok", self.handle_login_ok)
+        await self.event_dispatcher.subscribe("map_join_ok", self.handle_map_join_ok)
+        await self.event_dispatcher.subscribe("map_leave_ok", self.handle_map_leave_ok)
+        await self.event_dispatcher.subscribe("user_account_logout_ok", self.handle_user_gone)
+        await self.event_dispatcher.subscribe("user_session_expired", self.handle_user_gone)
+        await self.event_dispatcher.subscribe("user_move_ok", self.handle_user_move_ok)
+        await self.event_dispatcher.subscribe("ai_remove_ok", self.handle_ai_remove_ok)
+        self._sweep_task = asyncio.create_task(self._sweep_loop())
+        self.logger.info(f"InterestService started with a hearing radius of {self.hearing_radius}.")
+
+    async def stop(self):
+        if self._sweep_task:
+            self._sweep_task.cancel()
+            try:
+                await self._sweep_task
+            except asyncio.CancelledError:
+                pass
+            self._sweep_task = None
+
+    # Queries
+
+    def is_tracked(self, kind: str, entity_id: str) -> bool:
+        return f"{kind}:{entity_id}" in self._locations
+
+    def observers(self, kind: str, entity_id: str) -> List[str]:
+        """
+        client_ids of the players within hearing range of an entity, not including itself.
+        """
+        key = f"{kind}:{entity_id}"
+        grid = self.grids.get(self._locations.get(key))
+        if grid is None:
+            return []
+        client_ids = []
+        for other in grid.neighbours(key):
+            if other.startswith("user:"):
+                client_id = self._client_ids.get(other[5:])
+                if client_id:
+                    client_ids.append(client_id)
+        return client_ids
+
+    def players(self) -> List[Tuple[str, str]]:
+        """
+        (username, client_id) of every connected player that is in a map.
+        """
+        return [(u, cid) for u, cid in self._client_ids.items() if f"user:{u}" in self._locations]
+
+    def visible(self, username: str) -> List[str]:
+        """
+        Entity keys a player can hear, including the player itself.
+        """
+        key = f"user:{username}"
+        grid = self.grids.get(self._locations.get(key))
+        if grid is None:
+            return []
+        return [key, *grid.neighbours(key)]
+
+    def position_of(self, key: str):
+        return self.grids[self._locations[key]].position_of(key)
+
+    # Updates
+
+    async def update(self, kind: str, entity_id: str, map_name: str, position) -> None:
+        key = f"{kind}:{entity_id}"
+        current = self._locations.get(key)
+        if current is not None and current != map_name:
+            await self.remove(kind, entity_id)
+        grid = self.grids.get(map_name)
+        if grid is None:
+            grid = self.grids[map_name] = InterestGrid(self.hearing_radius, self.cell_size, self.leave_margin)
+        self._locations[key] = map_name
+        entered, left = grid.update(key, position)
+        if entered:
+            await self._notify_pair("entity_enter_range", key, entered, grid)
+        if left:
+            await self._notify_pair("entity_leave_range", key, left, grid)
+
+    async def remove(self, kind: str, entity_id: str) -> None:
+        key = f"{kind}:{entity_id}"
+        map_name = self._locations.pop(key, None)
+        grid = self.grids.get(map_name) if map_name else None
+        if grid is None:
+            return
+        former = grid.remove(key)
+        if former:
+            await self._notify_observers("entity_leave_range", former, [self._describe(key)])
+        if not len(grid):
+            del self.grids[map_name]
+
+    async def _notify_pair(self, event_type: str, key: str, others, grid: InterestGrid) -> None:
+        with_position = event_type == "entity_enter_range"
+        # The moving entity hears about all of them at once...
+        client_id = self._client_of(key)
+        if client_id:
+            await self._send(event_type, [client_id], [self._describe(o, grid if with_position else None) for o in others])
+        # ...and all of them hear the same one-entity message about it.
+        await self._notify_observers(event_type, others, [self._describe(key, grid if with_position else None)])
+
+    async def _notify_observers(self, event_type: str, keys, entities: list) -> None:
+        client_ids = [cid for cid in (self._client_of(k) for k in keys) if cid]
+        if client_ids:
+            await self._send(event_type, client_ids, entities)
+
+    async def _send(self, event_type: str, client_ids: List[str], entities: list) -> None:
+        self.notifications += len(client_ids)
+        await self.event_dispatcher.dispatch(event_type, {
+            "client_ids": client_ids,
+            "message": {"entities": entities}
+        })
+
+    def _client_of(self, key: str) -> Optional[str]:
+        return self._client_ids.get(key[5:]) if key.startswith("user:") else None
+
+    @staticmethod
+    def _describe(key: str, grid: Optional[InterestGrid] = None) -> dict:
+        kind, entity_id = key.split(":", 1)
+        entity = {"username": entity_id} if kind == "user" else {"ai_id": entity_id}
+        if grid is not None:
+            entity["position"] = grid.position_of(key)
+        return entity
+
+    # Event handlers
+
+    async def handle_login_ok(self, event_data):
+        client_id = event_data.get("client_id")
+        username = event_data["message"].get("username")
+        if not username:
+            return
+        self._bind(username, client_id)
+        user = await self.user_repository.load_user(username)
+        if user and user.current_map:
+            await self.update("user", username, user.current_map, user.position)
+
+    async def handle_map_join_ok(self, event_data):
+        client_id = event_data.get("client_id")
+        msg = event_data["message"]
+        username = await self.connection_manager.get_username_by_client_id(client_id)
+        if username:
+            self._bind(username, client_id)
+            await self.update("user", username, msg["map_name"], msg["position"])
+
+    async def handle_map_leave_ok(self, event_data):
+        username = self._usernames.get(event_data.get("client_id"))
+        if username:
+            await self.remove("user", username)
+
+    async def handle_user_gone(self, event_data):
+        client_id = event_data.get("client_id")
+        # Logout unmaps the client before replying, so fall back to what we were told at login.
+        username = event_data["message"].get("username") or self._usernames.get(client_id)
+        if username:
+            await self.remove("user", username)
+            self._unbind(username)
+
+    async def handle_user_move_ok(self, event_data):
+        msg = event_data["message"]
+        username = msg.get("username")
+        map_name = self._locations.get(f"user:{username}")
+        if map_name:
+            await self.update("user", username, map_name, msg["position"])
+
+    async def handle_ai_remove_ok(self, event_data):
+        ai_id = event_data["message"].get("ai_id")
+        if ai_id:
+            await self.remove("ai", ai_id)
+
+    def _bind(self, username: str, client_id: Optional[str]) -> None:
+        if not client_id:
+            return
+        previous = self._client_ids.get(username)
+        if previous and previous != client_id:
+            self._usernames.pop(previous, None)
+        self._client_ids[username] = client_id
+        self._usernames[client_id] = username
+
+    def _unbind(self, username: str) -> None:
+        client_id = self._client_ids.pop(username, None)
+        if client_id:
+            self._usernames.pop(client_id, None)
+
+    async def _sweep_loop(self):
+        while True:
+            await asyncio.sleep(1.0)
+            try:
+                await self._sweep()
+            except Exception as e:
+                self.logger.exception(f"Interest sweep failed: {e}")
+
+    async def _sweep(self):
+        for username in list(self._client_ids):
+            client_id = await self.connection_manager.get_client_id_by_username(username)
+            if client_id is None:
+                await self.remove("user", username)
+                self._unbind(username)
+            elif client_id != self._client_ids.get(username):
+                self._bind(username, client_id)
+
+    def get_stats(self) -> dict:
+        return {
+            "hearing_radius": self.hearing_radius,
+            "tracked": len(self._locations),
+            "notifications": self.notifications,
+            "maps": {name: grid.get_stats() for name, grid in self.grids.items()}
+        }
@@ -0,0 +1,171 @@
+# services/map_lifecycle_service.py
+import asyncio
+import logging
+import time
+from typing import Dict, Optional
+
+from infrastructure.logging.custom_logger import get_logger
+
+
+class MapLifecycleService:
+    """
+    Hibernates maps nobody is in, so they cost nothing but their files.
+
+    The map repository keeps every map it loaded resident in memory. This service
+    follows which maps players are in (login, map join and leave, logout and
+    session expiry, plus a sweep for dropped connections) and checks the resident
+    maps every check_interval seconds. Once a resident map has had no players for
+    hibernate_after seconds it is hibernated:
+
+        1. map_hibernate {"map_name"} is dispatched; services holding per-map state
+           (the simulation, which also saves its AI, and navigation) drop it.
+        2. The repository releases the map from memory.
+
+    Waking needs nothing special: the next load_map() of a hibernated map, from a
+    map_join_request or anything else, reads it from its file again.
+    """
+
+    def __init__(
+        self,
+        event_dispatcher,
+        map_repository,
+        user_repository,
+        connection_manager,
+        hibernate_after: float = 300.0,
+        check_interval: float = 10.0,
+        logger: Optional[logging.Logger] = None
+    ):
+        self.event_dispatcher = event_dispatcher
+        self.map_repository = map_repository
+        self.user_repository = user_repository
+        self.connection_manager = connection_manager
+        self.hibernate_after = hibernate_after
+        self.check_interval = check_interval
+        self.logger = logger or get_logger("MapLifecycleService", debug_mode=False)
+        # username -> map the player is in; client_id -> username for events that only carry the client.
+        self._players: Dict[str, str] = {}
+        self._usernames: Dict[str, str] = {}
+        self._empty_since: Dict[str, float] = {}
+        self.hibernations: Dict[str, int] = {}
+        self._task: Optional[asyncio.Task] = None
+        self.logger.debug("MapLifecycleService initialized.")
+
+    async def start(self):
+        await self.event_dispatcher.subscribe("user_account_login_ok", self.handle_login_ok)
+        await self.event_dispatcher.subscribe("map_join_ok", self.handle_map_join_ok)
+        await self.event_dispatcher.subscribe("map_leave_ok", self.handle_user_gone)
+        await self.event_dispatcher.subscribe("user_account_logout_ok", self.handle_user_gone)
+        await self.event_dispatcher.subscribe("user_session_expired", self.handle_user_gone)
+        await self.event_dispatcher.subscribe("map_remove_ok", self.handle_map_removed)
+        self._task = asyncio.create_task(self._run())
+        self.logger.info(f"MapLifecycleService started; maps hibernate after {self.hibernate_after}s without players.")
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    # Occupancy
+
+    async def handle_login_ok(self, event_data):
+        client_id = event_data.get("client_id")
+        username = event_data["message"].get("username")
+        if not username:
+            return
+        if client_id:
+            self._usernames[client_id] = username
+        user = await self.user_repository.load_user(username)
+        if user and user.current_map:
+            self._enter(username, user.current_map)
+
+    async def handle_map_join_ok(self, event_data):
+        client_id = event_data.get("client_id")
+        username = await self.connection_manager.get_username_by_client_id(client_id)
+        if username:
+            self._usernames[client_id] = username
+            self._enter(username, event_data["message"]["map_name"])
+
+    async def handle_user_gone(self, event_data):
+        client_id = event_data.get("client_id")
+        username = event_data["message"].get("username") or self._usernames.get(client_id)
+        if username:
+            self._leave(username)
+
+    async def handle_map_removed(self, event_data):
+        map_name = event_data["message"].get("map_name")
+        self._empty_since.pop(map_name, None)
+        self.hibernations.pop(map_name, None)
+
+    def _enter(self, username: str, map_name: str) -> None:
+        self._players[username] = map_name
+        self._empty_since.pop(map_name, None)
+
+    def _leave(self, username: str) -> None:
+        map_name = self._players.pop(username, None)
+        if map_name and not self.players_in(map_name):
+            self._empty_since[map_name] = time.monotonic()
+
+    def players_in(self, map_name: str) -> int:
+        return sum(1 for name in self._players.values() if name == map_name)
+
+    # Hibernation
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(self.check_interval)
+            try:
+                await self.check()
+            except Exception as e:
+                self.logger.exception(f"Map lifecycle check failed: {e}")
+
+    async def check(self):
+        """
+        Drop players whose connection is gone and hibernate maps that have been empty long enough.
+        """
+        for username in list(self._players):
+            if await self.connection_manager.get_client_id_by_username(username) is None:
+                self._leave(username)
+        now = time.monotonic()
+        for map_name in self.map_repository.resident_maps():
+            if self.players_in(map_name):
+                continue
+            empty_since = self._empty_since.setdefault(map_name, now)
+            if now - empty_since >= self.hibernate_after:
+                await self.hibernate(map_name)
+
+    async def hibernate(self, map_name: str) -> bool:
+        await self.event_dispatcher.dispatch("map_hibernate", {"message": {"map_name": map_name}})
+        # Someone may have joined while the map's state was being saved.
+        if self.players_in(map_name):
+            return False
+        if not self.map_repository.release_map(map_name):
+            return False
+        self._empty_since.pop(map_name, None)
+        self.hibernations[map_name] = self.hibernations.get(map_name, 0) + 1
+        self.logger.info(f"Map '{map_name}' hibernated.")
+        return True
+
+    def get_stats(self) -> dict:
+        now = time.monotonic()
+        residency = self.map_repository.get_residency()
+        maps = {}
+        for map_name, stats in residency.items():
+            empty_since = self._empty_since.get(map_name)
+            maps[map_name] = {
+                "state": "resident" if stats["resident"] else "hibernated",
+                "players": self.players_in(map_name),
+                "empty_seconds": round(now - empty_since, 1) if stats["resident"] and empty_since is not None else 0.0,
+                "loads": stats["loads"],
+                "hits": stats["hits"],
+                "load_ms": stats["load_ms"],
+                "hibernations": self.hibernations.get(map_name, 0)
+            }
+        return {
+            "hibernate_after": self.hibernate_after,
+            "resident": sum(1 for m in maps.values() if m["state"] == "resident"),
+            "maps": maps
+        }
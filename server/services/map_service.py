@@ -1,6 +1,8 @@
 # services/map_service.py
 import logging
-from typing import Optional
+import time
+import uuid
+from typing import Dict, Optional
 
 from domain.maps.map import Map
 from infrastructure.storage.map_repository_interface import MapRepositoryInterface
@@ -8,7 +10,25 @@ from infrastructure.storage.role_manager import RoleManager
 from interfaces.event_dispatcher import EventDispatcher
 from infrastructure.logging.custom_logger import get_logger
 
+class MapUpload:
+    """
+    An in-progress chunked map upload. Tiles from each chunk are converted into
+    Tile objects on the pending Map as they arrive, so raw chunk payloads are not retained.
+    """
+
+    def __init__(self, upload_id: str, username: str, client_id: str, game_map: Map):
+        self.upload_id = upload_id
+        self.username = username
+        self.client_id = client_id
+        self.game_map = game_map
+        self.next_chunk_index = 0
+        self.last_activity = time.monotonic()
+
+
 class MapService:
+    # Uploads that receive no chunk for this long are discarded.
+    UPLOAD_TIMEOUT_SECONDS = 300
+
     def __init__(self, 
                  event_dispatcher: EventDispatcher, 
                  map_repository: MapRepositoryInterface, 
@@ -22,6 +42,7 @@ class MapService:
         self.user_service = user_service
         self.collision_manager = collision_manager
         self.logger = logger or get_logger("MapService", debug_mode=False)
+        self._uploads: Dict[str, MapUpload] = {}
         self.logger.debug("MapService initialized.")
 
     async def start(self):
@@ -34,6 +55,9 @@ class MapService:
         await self.event_dispatcher.subscribe("map_join_request", self.handle_map_join_request)
         await self.event_dispatcher.subscribe("map_leave_request", self.handle_map_leave_request)
         await self.event_dispatcher.subscribe("map_physics_update_request", self.handle_map_physics_update_request)
+        await self.event_dispatcher.subscribe("map_upload_begin_request", self.handle_map_upload_begin_request)
+        await self.event_dispatcher.subscribe("map_upload_chunk_request", self.handle_map_upload_chunk_request)
+        await self.event_dispatcher.subscribe("map_upload_end_request", self.handle_map_upload_end_request)
         self.logger.info("MapService subscribed to map-related events.")
 
     async def _ok(self, event_type: str, client_id: str, data: dict):
@@ -89,6 +113,9 @@ class MapService:
             await self._fail(permission + "_fail", client_id, "No permission to perform this operation.")
             return False
 
+    async def get_users_in_map(self, map_name: str) -> list:
+        return await self.user_service.user_repository.get_users_in_map(map_name)
+
     async def send_map_state_to_user(self, map_name: str, username: str):
         self.logger.debug(f"Sending map state of '{map_name}' to user '{username}'.")
         game_map = await self.map_repository.load_map(map_name)
@@ -130,15 +157,18 @@ class MapService:
     async def broadcast_to_map(self, map_name: str, event_type: str, data: dict, exclude_username: Optional[str] = None):
         self.logger.debug(f"Broadcasting event '{event_type}' to all users in map '{map_name}', exclude_username='{exclude_username}'.")
         users_in_map = await self.user_service.user_repository.get_users_in_map(map_name)
+        client_ids = []
         for u in users_in_map:
             if exclude_username and u.username == exclude_username:
                 continue
             cid = self.user_service.get_client_id_by_username(u.username)
             if cid:
-                await self.event_dispatcher.dispatch(event_type, {
-                    "client_id": cid,
-                    "message": data
-                })
+                client_ids.append(cid)
+        if client_ids:
+            await self.event_dispatcher.dispatch(event_type, {
+                "client_ids": client_ids,
+                "message": data
+            })
 
     async def handle_map_create_request(self, event_data):
         msg = event_data["message"]
@@ -167,21 +197,12 @@ class MapService:
             await self._fail("map_create_fail", client_id, f"Map '{map_name}' already exists.")
             return
 
-        from domain.maps.tile import Tile
         new_map = Map(map_name=map_name, map_size=tuple(map_size), start_position=tuple(start_position), is_public=is_public)
 
-        for k, tile_data in tiles.items():
-            tile_position = tile_data["tile_position"]
-            tile_type = tile_data["tile_type"]
-            is_wall = tile_data["is_wall"]
-            if not new_map.is_tile_within_bounds(tile_position):
-                self.logger.debug(f"Tile {k} out of map bounds.")
-                await self._fail("map_create_fail", client_id, f"Tile {k} is out of map bounds.")
-                return
-            tile = Tile(tile_type, tile_position, is_wall)
-            added = await new_map.add_tile(k, tile)
-            if added:
-                self.logger.debug(f"Tile '{tile_type}' added to map '{map_name}' at {tile_position}.")
+        bad_tile = await self._add_tiles_to_map(new_map, tiles)
+        if bad_tile is not None:
+            await self._fail("map_create_fail", client_id, f"Tile {bad_tile} is out of map bounds.")
+            return
 
         if username:
             await new_map.add_owner(username)
@@ -196,6 +217,122 @@ class MapService:
             self.logger.warning(f"Failed to save map '{map_name}'.")
             await self._fail("map_create_fail", client_id, "Failed to save map.")
 
+    async def _add_tiles_to_map(self, game_map: Map, tiles: dict) -> Optional[str]:
+        """
+        Add tile definitions to a map. Returns the key of the first out-of-bounds tile, or None.
+        """
+        from domain.maps.tile import Tile
+        for k, tile_data in tiles.items():
+            tile_position = tile_data["tile_position"]
+            if not game_map.is_tile_within_bounds(tile_position):
+                self.logger.debug(f"Tile {k} out of map bounds.")
+                return k
+            tile = Tile(tile_data["tile_type"], tile_position, tile_data["is_wall"])
+            if await game_map.add_tile(k, tile):
+                self.logger.debug(f"Tile '{tile.tile_type}' added to map '{game_map.map_name}' at {tile.tile_position}.")
+        return None
+
+    def _expire_uploads(self):
+        now = time.monotonic()
+        for upload_id, upload in list(self._uploads.items()):
+            if now - upload.last_activity > self.UPLOAD_TIMEOUT_SECONDS:
+                self.logger.info(f"Discarding stale upload '{upload_id}' of map '{upload.game_map.map_name}'.")
+                del self._uploads[upload_id]
+
+    async def handle_map_upload_begin_request(self, event_data):
+        msg = event_data["message"]
+        client_id = event_data["client_id"]
+        username = msg.get("username")
+        token = msg.get("token")
+        map_name = msg.get("map_name")
+        map_size = msg.get("map_size")
+        start_position = msg.get("start_position")
+        is_public = msg.get("is_public", True)
+
+        self.logger.debug(f"Map upload begin by client_id='{client_id}', username='{username}', map='{map_name}'.")
+
+        if not await self._check_auth_and_permission(client_id, username, token, "create_map"):
+            return
+
+        if not map_name or not map_size or not start_position:
+            await self._fail("map_upload_fail", client_id, "Missing required fields.")
+            return
+
+        self._expire_uploads()
+        if await self.map_repository.map_exists(map_name) or any(
+            u.game_map.map_name == map_name for u in self._uploads.values()
+        ):
+            await self._fail("map_upload_fail", client_id, f"Map '{map_name}' already exists or is being uploaded.")
+            return
+
+        upload_id = str(uuid.uuid4())
+        new_map = Map(map_name=map_name, map_size=tuple(map_size), start_position=tuple(start_position), is_public=is_public)
+        self._uploads[upload_id] = MapUpload(upload_id, username, client_id, new_map)
+        self.logger.info(f"Started chunked upload '{upload_id}' for map '{map_name}'.")
+        await self._ok("map_upload_begin_ok", client_id, {"map_name": map_name, "upload_id": upload_id})
+
+    def _get_upload(self, upload_id: Optional[str], username: Optional[str], token: Optional[str]) -> Optional[MapUpload]:
+        upload = self._uploads.get(upload_id) if upload_id else None
+        if not upload or upload.username != username:
+            return None
+        if not self.user_service.is_authenticated(username, token):
+            return None
+        return upload
+
+    async def handle_map_upload_chunk_request(self, event_data):
+        msg = event_data["message"]
+        client_id = event_data["client_id"]
+        upload_id = msg.get("upload_id")
+        chunk_index = msg.get("chunk_index")
+        tiles = msg.get("tiles", {})
+
+        upload = self._get_upload(upload_id, msg.get("username"), msg.get("token"))
+        if not upload:
+            await self._fail("map_upload_fail", client_id, "Unknown upload or not authorized.")
+            return
+
+        if chunk_index != upload.next_chunk_index:
+            await self._fail("map_upload_fail", client_id, f"Expected chunk {upload.next_chunk_index}, got {chunk_index}.")
+            return
+
+        bad_tile = await self._add_tiles_to_map(upload.game_map, tiles)
+        if bad_tile is not None:
+            del self._uploads[upload_id]
+            await self._fail("map_upload_fail", client_id, f"Tile {bad_tile} is out of map bounds, upload aborted.")
+            return
+
+        upload.next_chunk_index += 1
+        upload.last_activity = time.monotonic()
+        self.logger.debug(f"Upload '{upload_id}': chunk {chunk_index} added {len(tiles)} tiles, {len(upload.game_map.tiles)} total.")
+        await self._ok("map_upload_chunk_ok", client_id, {"upload_id": upload_id, "chunk_index": chunk_index})
+
+    async def handle_map_upload_end_request(self, event_data):
+        msg = event_data["message"]
+        client_id = event_data["client_id"]
+        upload_id = msg.get("upload_id")
+        username = msg.get("username")
+
+        upload = self._get_upload(upload_id, username, msg.get("token"))
+        if not upload:
+            await self._fail("map_upload_fail", client_id, "Unknown upload or not authorized.")
+            return
+        del self._uploads[upload_id]
+
+        new_map = upload.game_map
+        if await self.map_repository.map_exists(new_map.map_name):
+            await self._fail("map_create_fail", client_id, f"Map '{new_map.map_name}' already exists.")
+            return
+
+        await new_map.add_owner(username)
+        await new_map.join_map(username)
+
+        if await self.map_repository.save_map(new_map):
+            self.logger.info(f"Map '{new_map.map_name}' created from {upload.next_chunk_index} chunks ({len(new_map.tiles)} tiles).")
+            await self._ok("map_create_ok", client_id, {"map_name": new_map.map_name})
+        else:
+            self.logger.warning(f"Failed to save uploaded map '{new_map.map_name}'.")
+            await self._fail("map_create_fail", client_id, "Failed to save map.")
+
     async def handle_map_remove_request(self, event_data):
         msg = event_data["message"]
         client_id = event_data["client_id"]
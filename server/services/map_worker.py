@@ -0,0 +1,428 @@
+# services/map_worker.py
+import logging
+import multiprocessing
+import queue
+import time
+from collections import deque
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from domain.physics.heightfield import Heightfield
+from domain.physics.shared_body_state import SharedBodyState
+from infrastructure.logging.custom_logger import get_logger
+from interfaces.dispatch_metrics import LatencyHistogram
+
+
+class ObservedAI:
+    """
+    Stands in for the InterestService inside a worker: the server sends which AI
+    some player can hear, and the AIScheduler asks observers() as usual.
+    """
+
+    def __init__(self):
+        # None means every AI counts as observed.
+        self.ai_ids: Optional[set] = None
+
+    def observers(self, kind: str, entity_id: str) -> list:
+        return [True] if self.ai_ids is None or entity_id in self.ai_ids else []
+
+
+class MapWorker:
+    """
+    The simulation of one map inside a worker process: the same MapSimulation,
+    BatchPhysicsEngine step and AIScheduler the server runs in-process, driven
+    by commands from the server and publishing body state to shared memory.
+
+    Commands (tuples on the command queue):
+        ("add", key, slot, position, ai_dict or None)   ("remove", key)
+        ("set_position", key, position, command)        ("set_velocity", key, velocity)
+        ("map", map_dict)        ("observed", [ai_id, ...] or None)
+        ("active", bool)         ("stop",)
+
+    Results (tuples on the result queue):
+        ("tick", tick, moved_slots, changed_slots, changed_on_ground)  - int32/bool arrays
+        ("stats", {...})                                               - once a second
+    """
+
+    def __init__(self, map_name: str, map_data: dict, tick_rate: float, state: SharedBodyState,
+                 commands, results, settings: dict, logger: logging.Logger):
+        # Imported here: the server side of this module is imported by simulation_service itself.
+        from domain.maps.map import Map
+        from services.ai_scheduler import AIScheduler
+        from services.navigation_service import NavigationService
+        from services.simulation_service import MapSimulation
+
+        self._map_type = Map
+        self.map_name = map_name
+        self.state = state
+        self.commands = commands
+        self.results = results
+        self.logger = logger
+        self.sim = MapSimulation(map_name, Map.from_dict(map_data), tick_rate, settings.get("heightfield_resolution", 1.0))
+        self.tick_time = LatencyHistogram()
+        self.max_catchup_ticks = settings.get("max_catchup_ticks", 5)
+        self.observed = ObservedAI()
+        self.scheduler = None
+        self.navigation = None
+        ai = settings.get("ai")
+        if ai is not None:
+            self.scheduler = AIScheduler(
+                interest_service=self.observed,
+                budget_ms=ai.get("budget_ms", 2.0),
+                unobserved_interval=ai.get("unobserved_interval", 10),
+                logger=logger
+            )
+            self.scheduler.add_map(map_name, [])
+            navigation = settings.get("navigation")
+            if navigation is not None:
+                self.navigation = NavigationService(
+                    None, None,
+                    cell_size=navigation.get("cell_size", 1.0),
+                    cache_size=navigation.get("cache_size", 1024),
+                    max_expansions=navigation.get("max_expansions", 20000),
+                    logger=logger
+                )
+                self.scheduler.navigation_service = self.navigation
+                self.navigation.build(self.sim.game_map)
+        self.slots: Dict[str, int] = {}
+        self._row_slots = np.empty(0, dtype=np.int32)
+        self._rows_dirty = False
+        self.active = False
+        self.running = True
+
+    # Commands
+
+    def handle(self, command: tuple) -> None:
+        kind = command[0]
+        engine = self.sim.engine
+        if kind == "add":
+            from domain.ai.ai_entity import AIEntity
+            from services.simulation_service import Body
+            _, key, slot, position, ai_data = command
+            body_kind, entity_id = key.split(":", 1)
+            if key in engine:
+                self._remove(key)
+            self.sim.add(Body(body_kind, entity_id), position)
+            self.slots[key] = slot
+            self._rows_dirty = True
+            if ai_data and self.scheduler:
+                self.scheduler.add_ai(self.map_name, AIEntity.from_dict(ai_data))
+        elif kind == "remove":
+            self._remove(command[1])
+        elif kind == "set_position":
+            _, key, position, number = command
+            if key in engine:
+                engine.set_position(key, position)
+            # Published right away, so the server doesn't have to wait for the next tick to read it back.
+            self.state.apply_position(self.slots.get(key), position, number)
+        elif kind == "set_velocity":
+            if command[1] in engine:
+                engine.set_velocity(command[1], command[2])
+        elif kind == "map":
+            game_map = self._map_type.from_dict(command[1])
+            self.sim.set_map(game_map)
+            if self.navigation:
+                self.navigation.build(game_map)
+        elif kind == "observed":
+            self.observed.ai_ids = None if command[1] is None else set(command[1])
+        elif kind == "active":
+            self.active = command[1]
+        elif kind == "stop":
+            self.running = False
+
+    def _remove(self, key: str) -> None:
+        self.sim.remove(key)
+        self.slots.pop(key, None)
+        self._rows_dirty = True
+        if key.startswith("ai:") and self.scheduler:
+            self.scheduler.remove_ai(key[3:])
+
+    def _drain(self, timeout: float) -> None:
+        """
+        Handle commands until timeout seconds have passed, returning early once stopped.
+        """
+        deadline = time.monotonic() + timeout
+        while self.running:
+            remaining = deadline - time.monotonic()
+            try:
+                command = self.commands.get(timeout=remaining) if remaining > 0 else self.commands.get_nowait()
+            except queue.Empty:
+                return
+            self.handle(command)
+
+    # Ticking
+
+    def run(self) -> None:
+        timestep = 1.0 / self.sim.tick_rate
+        next_tick = time.monotonic() + timestep
+        next_stats = time.monotonic() + 1.0
+        while self.running:
+            self._drain(next_tick - time.monotonic())
+            if not self.running:
+                break
+            if self.active:
+                started = time.perf_counter()
+                try:
+                    self.tick(timestep)
+                except Exception as e:
+                    self.logger.exception(f"Worker tick failed on map '{self.map_name}': {e}")
+                elapsed = time.perf_counter() - started
+                self.sim.ticks += 1
+                self.tick_time.observe(elapsed)
+                if elapsed > timestep:
+                    self.sim.overruns += 1
+            else:
+                self.sim.idle_ticks += 1
+
+            next_tick += timestep
+            behind = int((time.monotonic() - next_tick) / timestep)
+            if behind > self.max_catchup_ticks:
+                dropped = behind - self.max_catchup_ticks
+                self.sim.dropped_ticks += dropped
+                next_tick += dropped * timestep
+            if time.monotonic() >= next_stats:
+                next_stats = time.monotonic() + 1.0
+                self.results.put(("stats", self.get_stats()))
+
+    def tick(self, timestep: float) -> None:
+        sim = self.sim
+        engine = sim.engine
+        if self.scheduler:
+            self.scheduler.update_map(sim, timestep)
+        count = engine.count
+        ground = sim.heightfield.heights(engine.positions[:count])
+        moved, contact_changed = engine.step(sim.game_map.physics, timestep, ground)
+        if self._rows_dirty:
+            self._row_slots = np.fromiter((self.slots[key] for key in engine.ids[:count]), dtype=np.int32, count=count)
+            self._rows_dirty = False
+        if count:
+            self.state.publish(
+                self._row_slots, engine.positions[:count], engine.velocities[:count], engine.on_ground[:count], sim.ticks + 1
+            )
+        if len(moved) or len(contact_changed):
+            sim.state_changes += len(contact_changed)
+            self.results.put((
+                "tick",
+                sim.ticks + 1,
+                self._row_slots[moved],
+                self._row_slots[contact_changed],
+                engine.on_ground[contact_changed].copy()
+            ))
+
+    def get_stats(self) -> dict:
+        stats = self.sim.get_stats()
+        stats["tick_time"] = self.tick_time.to_dict()
+        if self.scheduler:
+            stats["ai"] = self.scheduler.get_stats()["maps"].get(self.map_name)
+        return stats
+
+
+def run_map_worker(map_name: str, map_data: dict, tick_rate: float, shm_name: str, capacity: int,
+                   commands, results, settings: dict, debug_mode: bool = False) -> None:
+    """
+    Entry point of a worker process.
+    """
+    logger = get_logger(f"MapWorker-{map_name}", debug_mode)
+    state = SharedBodyState.attach(shm_name, capacity)
+    try:
+        worker = MapWorker(map_name, map_data, tick_rate, state, commands, results, settings, logger)
+        logger.info(f"Worker for map '{map_name}' started at {tick_rate} Hz.")
+        worker.run()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        state.close()
+
+
+class WorkerEngineView:
+    """
+    What SimulationService needs of a map's engine, for a map simulated by a
+    worker: reads come straight from shared memory, writes become commands.
+
+    A position written here is read back as written until the worker reports the
+    command applied (SharedBodyState.applied), so two moves handled before the
+    worker catches up don't both start from the old position.
+    """
+
+    def __init__(self, sim: "WorkerMapSimulation"):
+        self._sim = sim
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._sim.slots
+
+    def get_position(self, key: str):
+        pending = self._sim.pending_positions.get(key)
+        if pending is not None:
+            if pending[0] > self._sim.state.applied:
+                return pending[1]
+            del self._sim.pending_positions[key]
+        return self._sim.state.read(self._sim.slots[key])[0]
+
+    def get_velocity(self, key: str):
+        return self._sim.state.read(self._sim.slots[key])[1]
+
+    def is_on_ground(self, key: str) -> bool:
+        return self._sim.state.read(self._sim.slots[key])[2]
+
+    def set_position(self, key: str, position) -> None:
+        if key in self._sim.slots:
+            position = tuple(float(v) for v in position)
+            self._sim.commands_sent += 1
+            self._sim.pending_positions[key] = (self._sim.commands_sent, position)
+            self._sim.send("set_position", key, position, self._sim.commands_sent)
+
+    def set_velocity(self, key: str, velocity) -> None:
+        if key in self._sim.slots:
+            self._sim.send("set_velocity", key, tuple(float(v) for v in velocity))
+
+
+class WorkerMapSimulation:
+    """
+    Server-side handle of a map simulated in a worker process.
+
+    Mirrors MapSimulation for SimulationService: bodies, add/remove, set_map, a
+    Heightfield of its own, an engine with get/set_position, counters and get_stats. Each body gets a fixed
+    slot in the map's SharedBodyState; the worker publishes every tick there and
+    sends the slots that moved or touched/left the ground on the result queue.
+    """
+
+    remote = True
+
+    def __init__(self, map_name: str, game_map, tick_rate: float, capacity: int, settings: dict,
+                 debug_mode: bool = False, logger: Optional[logging.Logger] = None):
+        self.map_name = map_name
+        self.game_map = game_map
+        self.heightfield = Heightfield(game_map, settings.get("heightfield_resolution", 1.0))
+        self.tick_rate = tick_rate
+        self.capacity = capacity
+        self.logger = logger or get_logger("SimulationService", debug_mode=False)
+        self.bodies: Dict[str, object] = {}
+        self.slots: Dict[str, int] = {}
+        self.slot_bodies: Dict[int, object] = {}
+        # Freed slots are reused last, so results about a body that just left can't hit its successor.
+        self._free = deque(range(capacity))
+        self.state = SharedBodyState.create(capacity)
+        self.engine = WorkerEngineView(self)
+        self.task = None
+        self.empty_since: Optional[float] = None
+        self.worker_stats: dict = {}
+        self.sent_active: Optional[bool] = None
+        self.rejected = 0
+        self.membership = 0
+        self.rewind = None
+        self.rewind_time = LatencyHistogram()
+        # Numbers set_position commands; key -> (number, position) until the worker has applied it.
+        self.commands_sent = 0
+        self.pending_positions: Dict[str, tuple] = {}
+        context = multiprocessing.get_context("spawn")
+        self.commands = context.Queue()
+        self.results = context.Queue()
+        self.process = context.Process(
+            target=run_map_worker,
+            args=(map_name, game_map.to_dict(), tick_rate, self.state.name, capacity,
+                  self.commands, self.results, settings, debug_mode),
+            name=f"map-worker-{map_name}",
+            daemon=True
+        )
+
+    def start(self) -> None:
+        self.process.start()
+
+    def send(self, *command) -> None:
+        self.commands.put(command)
+
+    def set_map(self, game_map) -> None:
+        self.game_map = game_map
+        self.heightfield.sync(game_map)
+        self.send("map", game_map.to_dict())
+
+    def add(self, body, position, ai=None) -> bool:
+        if body.key in self.bodies:
+            self.remove(body.key)
+        if not self._free:
+            self.rejected += 1
+            self.logger.warning(f"Worker map '{self.map_name}' is full ({self.capacity} bodies); '{body.key}' is not simulated.")
+            return False
+        slot = self._free.popleft()
+        position = tuple(float(v) for v in position)
+        self.state.write_slot(slot, position)
+        self.bodies[body.key] = body
+        self.slots[body.key] = slot
+        self.slot_bodies[slot] = body
+        self.send("add", body.key, slot, position, ai.to_dict() if ai is not None else None)
+        self.membership += 1
+        return True
+
+    def remove(self, key: str):
+        body = self.bodies.pop(key, None)
+        slot = self.slots.pop(key, None)
+        self.pending_positions.pop(key, None)
+        if slot is not None:
+            del self.slot_bodies[slot]
+            self._free.append(slot)
+            self.send("remove", key)
+            self.membership += 1
+        return body
+
+    def snapshot(self):
+        """
+        :return: (version, body keys, their positions) as last published by the worker.
+        """
+        keys = list(self.slots)
+        positions = self.state.read_many(np.fromiter(self.slots.values(), dtype=np.int64, count=len(keys)))
+        if self.pending_positions:
+            applied = self.state.applied
+            for row, key in enumerate(keys):
+                pending = self.pending_positions.get(key)
+                if pending is not None and pending[0] > applied:
+                    positions[row] = pending[1]
+        return (self.state.tick, self.membership), keys, positions
+
+    @property
+    def players(self) -> int:
+        return sum(1 for body in self.bodies.values() if body.kind == "user")
+
+    def poll(self) -> List[tuple]:
+        drained = []
+        while True:
+            try:
+                drained.append(self.results.get_nowait())
+            except queue.Empty:
+                return drained
+
+    async def stop(self, loop, timeout: float = 2.0) -> None:
+        if self.process.is_alive():
+            self.send("stop")
+            await loop.run_in_executor(None, self.process.join, timeout)
+            if self.process.is_alive():
+                self.logger.warning(f"Worker for map '{self.map_name}' did not stop in time; terminating it.")
+                self.process.terminate()
+                await loop.run_in_executor(None, self.process.join, timeout)
+        for q in (self.commands, self.results):
+            q.close()
+            q.cancel_join_thread()
+        self.state.close()
+
+    @property
+    def ticks(self) -> int:
+        return self.worker_stats.get("ticks", 0)
+
+    def get_stats(self) -> dict:
+        stats = self.worker_stats
+        return {
+            "tick_rate": self.tick_rate,
+            "players": self.players,
+            "bodies": len(self.bodies),
+            "ticks": stats.get("ticks", 0),
+            "idle_ticks": stats.get("idle_ticks", 0),
+            "overruns": stats.get("overruns", 0),
+            "dropped_ticks": stats.get("dropped_ticks", 0),
+            "state_changes": stats.get("state_changes", 0),
+            "tick_time": stats.get("tick_time") or {"p50_ms": 0.0, "p95_ms": 0.0, "max_ms": 0.0},
+            "rewind": {**self.rewind.get_stats(), "record_time": self.rewind_time.to_dict()} if self.rewind else None,
+            # The worker's copy is the one the ticks query.
+            "heightfield": stats.get("heightfield") or self.heightfield.get_stats(),
+            "worker": {"pid": self.process.pid, "alive": self.process.is_alive(), "capacity": self.capacity,
+                       "rejected": self.rejected, "ai": stats.get("ai")}
+        }
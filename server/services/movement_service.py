@@ -1,8 +1,24 @@
 # services/movement_service.py
 import logging
-from typing import Optional
+from typing import Dict, Optional
 
 class MovementService:
+    """
+    Handles user_move_request, user_turn_request and user_jump_request.
+
+    Clients that predict their own movement tag each move with an increasing
+    input_seq. Every user_move_ok and user_move_fail for such a move echoes it
+    as last_processed_seq together with the authoritative position, so the client
+    can drop the inputs the server has seen and replay the rest on top of it.
+    Moves arrive over the datagram channel too, so a move whose input_seq is not
+    newer than the last one processed for that user (a duplicate or a packet that
+    was overtaken) is dropped. The sequence starts over at login.
+
+    In a simulated map, user_move_ok also names the tile type under the new
+    position (for footstep sounds), and a jump launches the player's body from the
+    ground; the simulation brings it down again.
+    """
+
     def __init__(self, event_dispatcher, user_repository, map_repository, collision_manager, user_service, logger: Optional[logging.Logger] = None, connection_manager=None, map_service=None):
         self.event_dispatcher = event_dispatcher
         self.user_repository = user_repository
@@ -12,11 +28,24 @@ class MovementService:
         self.logger = logger or logging.getLogger("MovementService")
         self.connection_manager = connection_manager
         self.map_service = map_service
+        # Set to an InterestService to send updates only to players within hearing range.
+        self.interest_service = None
+        # Set to a ReplicationService when positions and orientations reach clients in world snapshots.
+        self.replication_service = None
+        # Set to the SimulationService for jumping and surface lookups.
+        self.simulation_service = None
+        # username -> input_seq of the last move processed. Clients number moves from 1 after each login.
+        self._last_input_seq: Dict[str, int] = {}
+        # client_id -> username, since logout unmaps the client before replying.
+        self._client_users: Dict[str, str] = {}
 
     async def start(self):
         await self.event_dispatcher.subscribe("user_move_request", self.handle_user_move_request)
         await self.event_dispatcher.subscribe("user_turn_request", self.handle_user_turn_request)
-        # If we add a user_jump_request or other movement events, subscribe similarly.
+        await self.event_dispatcher.subscribe("user_jump_request", self.handle_user_jump_request)
+        await self.event_dispatcher.subscribe("user_account_login_ok", self.handle_login_ok)
+        await self.event_dispatcher.subscribe("user_account_logout_ok", self.handle_user_gone)
+        await self.event_dispatcher.subscribe("user_session_expired", self.handle_user_gone)
 
     async def handle_user_move_request(self, event_data):
         msg = event_data["message"]
@@ -24,6 +53,7 @@ class MovementService:
         username = msg.get("username")
         token = msg.get("token")
         direction = msg.get("direction", (0,0,0))
+        input_seq = msg.get("input_seq")
 
         if not username or not token:
             await self._fail("user_move_fail", client_id, "Missing username or token.")
@@ -33,27 +63,63 @@ class MovementService:
             await self._fail("user_move_fail", client_id, "Not authenticated.")
             return
 
+        if input_seq is not None:
+            last_seq = self._last_input_seq.get(username)
+            if last_seq is not None and input_seq <= last_seq:
+                self.logger.debug(f"Dropping move {input_seq} of '{username}', already processed up to {last_seq}.")
+                return
+            self._last_input_seq[username] = input_seq
+
         user = await self.user_repository.load_user(username)
         if not user:
             await self._fail("user_move_fail", client_id, "User not found.")
             return
 
-        old_pos = user.position
-        new_x = old_pos[0] + direction[0]
-        new_y = old_pos[1] + direction[1]
-        new_z = old_pos[2] + direction[2]
+        map_name, old_pos = user.current_map, user.position
+        # The simulation only saves a position on landing, so mid-jump or mid-fall the stored one is stale.
+        located = self.simulation_service.locate("user", username) if self.simulation_service else None
+        if located:
+            map_name, old_pos = located
+        new_x = float(old_pos[0]) + direction[0]
+        new_y = float(old_pos[1]) + direction[1]
+        new_z = float(old_pos[2]) + direction[2]
         new_pos = (new_x, new_y, new_z)
 
-        if not await self.collision_manager.is_valid_position(user.current_map, new_pos):
-            await self._fail("user_move_fail", client_id, "Cannot move there, collision or out of bounds.")
+        if not await self.collision_manager.is_valid_position(map_name, new_pos):
+            reason = "Cannot move there, collision or out of bounds."
+            if input_seq is None:
+                await self._fail("user_move_fail", client_id, reason)
+            else:
+                await self.event_dispatcher.dispatch("user_move_fail", {
+                    "client_id": client_id,
+                    "message": {"reason": reason, "position": tuple(float(v) for v in old_pos), "last_processed_seq": input_seq}
+                })
             return
 
         user.position = new_pos
         await self.user_repository.save_user(user)
-        await self._ok("user_move_ok", client_id, {"username": username, "position": new_pos})
+        result = {"username": username, "position": new_pos}
+        if input_seq is not None:
+            result["last_processed_seq"] = input_seq
+        heightfield = self.simulation_service.heightfield(map_name) if self.simulation_service else None
+        if heightfield:
+            result["surface"] = heightfield.surface_at(new_pos)[1]
+        await self._ok("user_move_ok", client_id, result)
+        if self.replication_service:
+            return
 
         # Broadcast the player's new position to others on the same map
-        if self.map_service and self.connection_manager:
+        if self.interest_service and self.interest_service.is_tracked("user", username):
+            client_ids = self.interest_service.observers("user", username)
+            if client_ids:
+                await self.event_dispatcher.dispatch("player_position_update", {
+                    "client_ids": client_ids,
+                    "message": {
+                        "username": username,
+                        "position": new_pos
+                    }
+                })
+        elif self.map_service and self.connection_manager:
             # Get all users in the map
             map_users = await self.map_service.get_users_in_map(user.current_map)
             client_ids = []
@@ -62,16 +128,53 @@ class MovementService:
                     cid = await self.connection_manager.get_client_id_by_username(u.username)
                     if cid:
                         client_ids.append(cid)
-            # Dispatch an event or directly call network to inform others
-            for cid in client_ids:
+            # One event for all recipients; the outbound router fans it out.
+            if client_ids:
                 await self.event_dispatcher.dispatch("player_position_update", {
-                    "client_id": cid,
+                    "client_ids": client_ids,
                     "message": {
                         "username": username,
                         "position": new_pos
                     }
                 })
 
+    async def handle_user_jump_request(self, event_data):
+        msg = event_data["message"]
+        client_id = event_data["client_id"]
+        username = msg.get("username")
+        token = msg.get("token")
+
+        if not username or not token:
+            await self._fail("user_jump_fail", client_id, "Missing username or token.")
+            return
+
+        if not self.user_service.is_authenticated(username, token):
+            await self._fail("user_jump_fail", client_id, "Not authenticated.")
+            return
+
+        if self.simulation_service is None or self.simulation_service.locate("user", username) is None:
+            await self._fail("user_jump_fail", client_id, "Not in a simulated map.")
+            return
+
+        jumped = self.simulation_service.jump("user", username)
+        if jumped is None:
+            await self._fail("user_jump_fail", client_id, "Already in the air.")
+            return
+        position, velocity = jumped
+        # Others hear the take-off as player_ground_contact from the next tick.
+        await self._ok("user_jump_ok", client_id, {"username": username, "position": position, "velocity": velocity})
+
+    async def handle_login_ok(self, event_data):
+        username = event_data["message"].get("username")
+        self._client_users[event_data.get("client_id")] = username
+        self._last_input_seq.pop(username, None)
+
+    async def handle_user_gone(self, event_data):
+        client_id = event_data.get("client_id")
+        username = event_data["message"].get("username") or self._client_users.get(client_id)
+        self._client_users.pop(client_id, None)
+        self._last_input_seq.pop(username, None)
+
     async def handle_user_turn_request(self, event_data):
         msg = event_data["message"]
         client_id = event_data["client_id"]
@@ -97,10 +200,23 @@ class MovementService:
         user.pitch += pitch_change
         await self.user_repository.save_user(user)
         await self._ok("user_turn_ok", client_id, {"username": username, "yaw": user.yaw, "pitch": user.pitch})
+        if self.replication_service:
+            return
 
         # Optionally notify others of orientation change
         # Similar to movement, if needed:
-        if self.map_service and self.connection_manager:
+        if self.interest_service and self.interest_service.is_tracked("user", username):
+            client_ids = self.interest_service.observers("user", username)
+            if client_ids:
+                await self.event_dispatcher.dispatch("player_orientation_update", {
+                    "client_ids": client_ids,
+                    "message": {
+                        "username": username,
+                        "yaw": user.yaw,
+                        "pitch": user.pitch
+                    }
+                })
+        elif self.map_service and self.connection_manager:
             map_users = await self.map_service.get_users_in_map(user.current_map)
             client_ids = []
             for u in map_users:
@@ -108,9 +224,9 @@ class MovementService:
                     cid = await self.connection_manager.get_client_id_by_username(u.username)
                     if cid:
                         client_ids.append(cid)
-            for cid in client_ids:
+            if client_ids:
                 await self.event_dispatcher.dispatch("player_orientation_update", {
-                    "client_id": cid,
+                    "client_ids": client_ids,
                     "message": {
                         "username": username,
                         "yaw": user.yaw,
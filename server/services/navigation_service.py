@@ -0,0 +1,212 @@
+# services/navigation_service.py
+import logging
+import time
+from typing import Dict, List, Optional, Tuple
+
+from domain.maps.nav_grid import NavGrid, PathCache
+from infrastructure.logging.custom_logger import get_logger
+from interfaces.dispatch_metrics import LatencyHistogram
+
+
+class PathQuery:
+    """
+    A path search spread over several ticks. advance() runs it until a deadline
+    (at least one slice of the search, whatever the deadline) and returns
+    whether it has finished; path then holds the waypoints, or None when the goal
+    is unreachable. A search paused while its map's walls changed starts over.
+    """
+
+    def __init__(self, navigation: "NavigationService", game_map, start, goal):
+        self.navigation = navigation
+        self.game_map = game_map
+        self.start = start
+        self.goal = goal
+        self.done = False
+        self.path: Optional[List[Tuple[float, float, float]]] = None
+        self.grid: Optional[NavGrid] = None
+        self.revision = -1
+        self.search = None
+        self.elapsed = 0.0
+
+    def advance(self, deadline: float) -> bool:
+        """
+        :param deadline: time.perf_counter() value to pause at.
+        """
+        if not self.done:
+            self.navigation.advance(self, deadline)
+        return self.done
+
+
+class NavigationService:
+    """
+    Path queries for AI against each map's walls.
+
+    A NavGrid is built for a map the first time it is loaded for navigation
+    (build(), or lazily by find_path()) and rebuilt when a map is created or
+    uploaded. Tile and physics changes only re-rasterize the cells under the
+    walls that changed, and evict the cached paths that ran through those cells.
+    Removed and hibernated maps lose their grid and cached paths.
+
+    find_path() answers in world coordinates and caches recent results in an LRU
+    keyed by map and start/goal cells. start_path() is the same query for callers
+    with a time budget, such as the AI tick: the search runs in slices through
+    PathQuery.advance() and may take several ticks to answer.
+    """
+
+    def __init__(
+        self,
+        event_dispatcher,
+        map_repository,
+        cell_size: float = 1.0,
+        cache_size: int = 1024,
+        max_expansions: int = 20000,
+        logger: Optional[logging.Logger] = None
+    ):
+        self.event_dispatcher = event_dispatcher
+        self.map_repository = map_repository
+        self.cell_size = cell_size
+        self.max_expansions = max_expansions
+        self.logger = logger or get_logger("NavigationService", debug_mode=False)
+        self.grids: Dict[str, NavGrid] = {}
+        self.cache = PathCache(cache_size)
+        self.queries = 0
+        self.failed = 0
+        self.expansions = 0
+        self.search_time = LatencyHistogram()
+        self.logger.debug("NavigationService initialized.")
+
+    async def start(self):
+        await self.event_dispatcher.subscribe("map_create_ok", self.handle_map_saved)
+        for event_type in ("map_tile_add_ok", "map_tile_remove_ok", "map_physics_update_ok"):
+            await self.event_dispatcher.subscribe(event_type, self.handle_map_changed)
+        await self.event_dispatcher.subscribe("map_remove_ok", self.handle_map_unloaded)
+        await self.event_dispatcher.subscribe("map_hibernate", self.handle_map_unloaded)
+        self.logger.info(f"NavigationService started with {self.cell_size} unit cells.")
+
+    # Grids
+
+    def build(self, game_map) -> NavGrid:
+        started = time.perf_counter()
+        grid = self.grids[game_map.map_name] = NavGrid(game_map, self.cell_size)
+        self.cache.invalidate(game_map.map_name)
+        self.logger.debug(
+            f"Built a {grid.width}x{grid.height} navigation grid for map '{game_map.map_name}' "
+            f"in {(time.perf_counter() - started) * 1000:.1f}ms."
+        )
+        return grid
+
+    def grid_for(self, game_map) -> NavGrid:
+        grid = self.grids.get(game_map.map_name)
+        if grid is None or grid.map_size != tuple(game_map.map_size):
+            grid = self.build(game_map)
+        return grid
+
+    async def handle_map_saved(self, event_data):
+        map_name = event_data["message"].get("map_name")
+        game_map = await self.map_repository.load_map(map_name) if map_name else None
+        if game_map:
+            self.build(game_map)
+
+    async def handle_map_changed(self, event_data):
+        map_name = event_data["message"].get("map_name")
+        grid = self.grids.get(map_name)
+        if grid is None:
+            return
+        game_map = await self.map_repository.load_map(map_name)
+        if game_map is None:
+            return
+        if grid.map_size != tuple(game_map.map_size):
+            self.build(game_map)
+            return
+        regions = grid.sync(game_map)
+        if regions:
+            dropped = self.cache.invalidate(map_name, regions)
+            self.logger.debug(f"Map '{map_name}' changed in {len(regions)} region(s); dropped {dropped} cached path(s).")
+
+    async def handle_map_unloaded(self, event_data):
+        map_name = event_data["message"].get("map_name")
+        self.grids.pop(map_name, None)
+        self.cache.invalidate(map_name)
+
+    # Queries
+
+    def find_path(self, game_map, start, goal) -> Optional[List[Tuple[float, float, float]]]:
+        """
+        :param game_map: The map to search; its grid is built on first use.
+        :param start: (x, y, z) start position.
+        :param goal: (x, y, z) goal position.
+        :return: Waypoints from start towards goal, ending at goal itself, each at the
+                 start's height; moving straight from one to the next stays on open
+                 cells. None when goal is unreachable.
+        """
+        grid = self.grid_for(game_map)
+        start_cell, goal_cell = grid.cell_of(start), grid.cell_of(goal)
+        self.queries += 1
+        key = (game_map.map_name, start_cell, goal_cell)
+        found, cells = self.cache.get(key)
+        if not found:
+            started = time.perf_counter()
+            cells, expansions = grid.find_path(start_cell, goal_cell, self.max_expansions)
+            self.search_time.observe(time.perf_counter() - started)
+            self.expansions += expansions
+            self.cache.put(key, cells, cells)
+        return self._waypoints(grid, cells, start, goal)
+
+    def start_path(self, game_map, start, goal) -> PathQuery:
+        """
+        find_path() in slices: the returned PathQuery is already done when the path
+        was cached, and otherwise searches as its advance() is called.
+        """
+        query = PathQuery(self, game_map, start, goal)
+        grid = self.grid_for(game_map)
+        self.queries += 1
+        found, cells = self.cache.get((game_map.map_name, grid.cell_of(start), grid.cell_of(goal)))
+        if found:
+            query.done = True
+            query.path = self._waypoints(grid, cells, start, goal)
+        return query
+
+    def advance(self, query: PathQuery, deadline: float) -> None:
+        grid = self.grid_for(query.game_map)
+        start_cell, goal_cell = grid.cell_of(query.start), grid.cell_of(query.goal)
+        if query.search is None or grid is not query.grid or grid.revision != query.revision:
+            query.grid, query.revision = grid, grid.revision
+            query.search = grid.search(start_cell, goal_cell, self.max_expansions)
+        started = time.perf_counter()
+        try:
+            while True:
+                next(query.search)
+                if time.perf_counter() >= deadline:
+                    query.elapsed += time.perf_counter() - started
+                    return
+        except StopIteration as done:
+            cells, expansions = done.value
+        query.elapsed += time.perf_counter() - started
+        self.search_time.observe(query.elapsed)
+        self.expansions += expansions
+        self.cache.put((query.game_map.map_name, start_cell, goal_cell), cells, cells)
+        query.search = None
+        query.done = True
+        query.path = self._waypoints(grid, cells, query.start, query.goal)
+
+    def _waypoints(self, grid: NavGrid, cells, start, goal) -> Optional[List[Tuple[float, float, float]]]:
+        if cells is None:
+            self.failed += 1
+            return None
+        z = float(start[2])
+        waypoints = [(*grid.centre_of(cell), z) for cell in cells[1:-1]]
+        waypoints.append((float(goal[0]), float(goal[1]), z))
+        return waypoints
+
+    def is_walkable(self, game_map, position) -> bool:
+        return self.grid_for(game_map).is_walkable(position)
+
+    def get_stats(self) -> dict:
+        return {
+            "queries": self.queries,
+            "failed": self.failed,
+            "expansions": self.expansions,
+            "search_time": self.search_time.to_dict(),
+            "cache": self.cache.get_stats(),
+            "maps": {name: grid.get_stats() for name, grid in self.grids.items()}
+        }
@@ -2,6 +2,7 @@
 import logging
 from typing import Optional
 from domain.physics.physics_engine import PhysicsEngine
+from domain.physics.map_physics import MapPhysics
 from infrastructure.logging.custom_logger import get_logger
 
 class PhysicsService:
@@ -17,12 +18,15 @@ class PhysicsService:
     Each event should specify which entity to apply physics to, their current state,
     and parameters for the action. The PhysicsService will then use PhysicsEngine to 
     compute the new state, and dispatch a success event with the updated state.
+    An event that names a simulated map_name is also kept out of that map's ground.
     """
 
     def __init__(self, event_dispatcher, logger: Optional[logging.Logger] = None):
         self.event_dispatcher = event_dispatcher
         self.physics_engine = PhysicsEngine()
         self.logger = logger or get_logger("PhysicsService", debug_mode=False)
+        # Set to the SimulationService to collide with the heightfields of simulated maps.
+        self.simulation_service = None
         self.logger.debug("PhysicsService initialized.")
 
     async def start(self):
@@ -39,10 +43,14 @@ class PhysicsService:
         position = tuple(msg.get("position", [0,0,0]))
         velocity = tuple(msg.get("velocity", [0,0,0]))
         delta_time = msg.get("delta_time", 0.016)
+        map_physics = MapPhysics.from_dict(msg.get("physics", {}))
 
-        new_pos, new_vel = self.physics_engine.apply_gravity(position, velocity, delta_time)
+        new_pos, new_vel = self.physics_engine.apply_gravity(position, velocity, map_physics, delta_time)
         self.logger.debug(f"Applied gravity: old_pos={position}, old_vel={velocity}, new_pos={new_pos}, new_vel={new_vel}")
-        new_pos = self.physics_engine.check_collisions_and_adjust(new_pos)
+        adjusted = self.physics_engine.check_collisions_and_adjust(new_pos, self._heightfield(msg), position)
+        if adjusted != new_pos:
+            # Landed: the fall stops with it.
+            new_pos, new_vel = adjusted, (new_vel[0], new_vel[1], 0.0)
         self.logger.debug(f"Position after collision adjustment: {new_pos}")
 
         await self._ok("physics_apply_gravity_ok", client_id, {"position": new_pos, "velocity": new_vel})
@@ -56,10 +64,11 @@ class PhysicsService:
         position = tuple(msg.get("position", [0,0,0]))
         velocity = tuple(msg.get("velocity", [0,0,0]))
         jump_speed = msg.get("jump_speed", 5.0)
+        map_physics = MapPhysics.from_dict(msg.get("physics", {}))
 
-        new_pos, new_vel = self.physics_engine.jump(position, velocity, jump_speed)
+        new_pos, new_vel = self.physics_engine.jump(position, velocity, map_physics, jump_speed)
         self.logger.debug(f"Applied jump: old_pos={position}, old_vel={velocity}, new_pos={new_pos}, new_vel={new_vel}")
-        new_pos = self.physics_engine.check_collisions_and_adjust(new_pos)
+        new_pos = self.physics_engine.check_collisions_and_adjust(new_pos, self._heightfield(msg))
         self.logger.debug(f"Position after collision adjustment: {new_pos}")
 
         await self._ok("physics_jump_ok", client_id, {"position": new_pos, "velocity": new_vel})
@@ -75,15 +84,21 @@ class PhysicsService:
         force = tuple(msg.get("force", [0,0,0]))
         mass = msg.get("mass", 1.0)
         delta_time = msg.get("delta_time", 0.016)
+        map_physics = MapPhysics.from_dict(msg.get("physics", {}))
 
-        new_pos, new_vel = self.physics_engine.apply_force(position, velocity, force, mass, delta_time)
+        new_pos, new_vel = self.physics_engine.apply_force(position, velocity, force, map_physics, mass, delta_time)
         self.logger.debug(f"Applied force: old_pos={position}, old_vel={velocity}, force={force}, new_pos={new_pos}, new_vel={new_vel}")
-        new_pos = self.physics_engine.check_collisions_and_adjust(new_pos)
+        new_pos = self.physics_engine.check_collisions_and_adjust(new_pos, self._heightfield(msg), position)
         self.logger.debug(f"Position after collision adjustment: {new_pos}")
 
         await self._ok("physics_apply_force_ok", client_id, {"position": new_pos, "velocity": new_vel})
         self.logger.info("Force applied successfully and result dispatched.")
 
+    def _heightfield(self, msg):
+        if self.simulation_service is None or not msg.get("map_name"):
+            return None
+        return self.simulation_service.heightfield(msg["map_name"])
+
     async def _ok(self, event_type: str, client_id: str, data: dict):
         self.logger.debug(f"Dispatching OK event '{event_type}' to client_id='{client_id}' with data={data}")
         await self.event_dispatcher.dispatch(event_type, {
@@ -0,0 +1,232 @@
+# services/replication_service.py
+import asyncio
+import logging
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+
+from infrastructure.logging.custom_logger import get_logger
+
+# Quantized entity state: ((x, y, z), (yaw, pitch)) as integers.
+EntityState = Tuple[Tuple[int, int, int], Tuple[int, int]]
+
+
+class ClientReplication:
+    """
+    Replication state of one client: the snapshots it may still acknowledge and
+    the newest one it did.
+    """
+
+    def __init__(self, history_size: int):
+        self.history_size = history_size
+        self.history: "OrderedDict[int, Dict[int, EntityState]]" = OrderedDict()
+        self.acked = 0
+        self.last_sent: Optional[Dict[int, EntityState]] = None
+        self.last_sent_seq = 0
+
+    def baseline(self) -> Tuple[int, Dict[int, EntityState]]:
+        if self.acked and self.acked in self.history:
+            return self.acked, self.history[self.acked]
+        return 0, {}
+
+    def remember(self, seq: int, state: Dict[int, EntityState]) -> None:
+        self.history[seq] = state
+        self.last_sent = state
+        self.last_sent_seq = seq
+        while len(self.history) > self.history_size:
+            evicted, _ = self.history.popitem(last=False)
+            if evicted == self.acked:
+                # Everything still held is newer than the ack; the next snapshot is a full one.
+                self.acked = 0
+
+    def ack(self, seq: int) -> bool:
+        if seq <= self.acked or seq not in self.history:
+            return False
+        self.acked = seq
+        for old in [s for s in self.history if s < seq]:
+            del self.history[old]
+        return True
+
+
+class ReplicationService:
+    """
+    Replicates the world to clients as delta-encoded snapshots instead of one
+    full-state message per move.
+
+    At snapshot_rate per second, every player in a map gets a world_snapshot of the
+    entities it can hear (from the InterestService), encoded against the newest
+    snapshot it acknowledged with world_snapshot_ack:
+
+        {"seq": 18, "base": 15, "q": [100, 10],
+         "entities": [{"i": 3, "p": [1250, 400, 0]}, {"i": 9, "u": "bob", "p": [...], "o": [900, 0]}],
+         "removed": [4]}
+
+    Snapshot numbers increase across the whole server run, not per client, so a
+    client that leaves a map and joins another never sees them go backwards.
+    Entities are numbered once per server run and referred to by id; the name
+    ("u" for players, "a" for AI) is only sent when an entity is new to the
+    baseline. Only fields that differ from the baseline are sent: "p" is the
+    position times q[0], "o" is (yaw, pitch) times q[1], both rounded to integers.
+    base 0 means a full snapshot. Because deltas are always against an
+    acknowledged baseline, lost snapshots need no resend, so they can travel
+    over the datagram channel. Once a client has acknowledged the current state,
+    nothing is sent to it until something changes.
+    """
+
+    def __init__(
+        self,
+        event_dispatcher,
+        interest_service,
+        user_repository=None,
+        snapshot_rate: float = 20.0,
+        position_scale: int = 100,
+        angle_scale: int = 10,
+        history_size: int = 32,
+        logger: Optional[logging.Logger] = None
+    ):
+        self.event_dispatcher = event_dispatcher
+        self.interest_service = interest_service
+        self.user_repository = user_repository
+        self.snapshot_rate = snapshot_rate
+        self.position_scale = position_scale
+        self.angle_scale = angle_scale
+        self.history_size = history_size
+        self.logger = logger or get_logger("ReplicationService", debug_mode=False)
+        self.clients: Dict[str, ClientReplication] = {}
+        self._entity_ids: Dict[str, int] = {}
+        self._next_seq = 1
+        self._orientations: Dict[str, Tuple[int, int]] = {}
+        self._task: Optional[asyncio.Task] = None
+        self.snapshots_sent = 0
+        self.full_snapshots = 0
+        self.acks = 0
+        self.entity_updates = 0
+        self.logger.debug("ReplicationService initialized.")
+
+    async def start(self):
+        await self.event_dispatcher.subscribe("world_snapshot_ack", self.handle_snapshot_ack)
+        await self.event_dispatcher.subscribe("user_turn_ok", self.handle_user_turn_ok)
+        if self.user_repository:
+            await self.event_dispatcher.subscribe("user_account_login_ok", self.handle_login_ok)
+        self._task = asyncio.create_task(self._run())
+        self.logger.info(f"ReplicationService started at {self.snapshot_rate} snapshots per second.")
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def handle_login_ok(self, event_data):
+        username = event_data["message"].get("username")
+        user = await self.user_repository.load_user(username) if username else None
+        if user:
+            self._set_orientation(username, user.yaw, user.pitch)
+
+    async def handle_user_turn_ok(self, event_data):
+        msg = event_data["message"]
+        self._set_orientation(msg["username"], msg.get("yaw", 0.0), msg.get("pitch", 0.0))
+
+    def _set_orientation(self, username: str, yaw: float, pitch: float) -> None:
+        self._orientations[f"user:{username}"] = (round(yaw * self.angle_scale), round(pitch * self.angle_scale))
+
+    async def handle_snapshot_ack(self, event_data):
+        client = self.clients.get(event_data["client_id"])
+        seq = event_data["message"].get("seq")
+        if client and isinstance(seq, int) and client.ack(seq):
+            self.acks += 1
+
+    def _entity_id(self, key: str) -> int:
+        entity_id = self._entity_ids.get(key)
+        if entity_id is None:
+            entity_id = self._entity_ids[key] = len(self._entity_ids) + 1
+        return entity_id
+
+    def _state_of(self, key: str) -> EntityState:
+        x, y, z = self.interest_service.position_of(key)
+        scale = self.position_scale
+        return (round(x * scale), round(y * scale), round(z * scale)), self._orientations.get(key, (0, 0))
+
+    async def _run(self):
+        interval = 1.0 / self.snapshot_rate
+        loop = asyncio.get_running_loop()
+        next_run = loop.time()
+        while True:
+            next_run += interval
+            try:
+                await self.replicate()
+            except Exception as e:
+                self.logger.exception(f"Replication pass failed: {e}")
+            await asyncio.sleep(max(0.0, next_run - loop.time()))
+
+    async def replicate(self):
+        """
+        Build and send one snapshot per player.
+        """
+        players = self.interest_service.players()
+        active = set()
+        for username, client_id in players:
+            active.add(client_id)
+            client = self.clients.get(client_id)
+            if client is None:
+                client = self.clients[client_id] = ClientReplication(self.history_size)
+            message = self._build_snapshot(client, self.interest_service.visible(username))
+            if message is not None:
+                await self.event_dispatcher.dispatch("world_snapshot", {"client_id": client_id, "message": message})
+        for gone in [cid for cid in self.clients if cid not in active]:
+            del self.clients[gone]
+
+    def _build_snapshot(self, client: ClientReplication, keys) -> Optional[dict]:
+        current: Dict[int, EntityState] = {}
+        names: Dict[int, str] = {}
+        for key in keys:
+            entity_id = self._entity_id(key)
+            current[entity_id] = self._state_of(key)
+            names[entity_id] = key
+        # Until the client acknowledges the latest state it may not have it, so keep sending.
+        if current == client.last_sent and client.acked == client.last_sent_seq:
+            return None
+
+        base, baseline = client.baseline()
+        entities = []
+        for entity_id, (position, orientation) in current.items():
+            known = baseline.get(entity_id)
+            entry = {"i": entity_id}
+            if known is None:
+                kind, name = names[entity_id].split(":", 1)
+                entry["u" if kind == "user" else "a"] = name
+            if known is None or known[0] != position:
+                entry["p"] = position
+            if known is None or known[1] != orientation:
+                entry["o"] = orientation
+            if len(entry) > 1:
+                entities.append(entry)
+        removed = [entity_id for entity_id in baseline if entity_id not in current]
+
+        seq = self._next_seq
+        self._next_seq += 1
+        client.remember(seq, current)
+        self.snapshots_sent += 1
+        self.entity_updates += len(entities)
+        if base == 0:
+            self.full_snapshots += 1
+        return {
+            "seq": seq,
+            "base": base,
+            "q": [self.position_scale, self.angle_scale],
+            "entities": entities,
+            "removed": removed
+        }
+
+    def get_stats(self) -> dict:
+        return {
+            "snapshot_rate": self.snapshot_rate,
+            "clients": len(self.clients),
+            "entities": len(self._entity_ids),
+            "snapshots_sent": self.snapshots_sent,
+            "full_snapshots": self.full_snapshots,
+            "entity_updates": self.entity_updates,
+            "acks": self.acks
+        }
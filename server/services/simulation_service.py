@@ -0,0 +1,671 @@
+# services/simulation_service.py
+import asyncio
+import logging
+import math
+import time
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from domain.physics.batch_physics_engine import BatchPhysicsEngine
+from domain.physics.heightfield import Heightfield
+from domain.physics.rewind_buffer import RewindBuffer
+from infrastructure.logging.custom_logger import get_logger
+from interfaces.dispatch_metrics import LatencyHistogram
+from services.map_worker import WorkerMapSimulation
+
+
+class Body:
+    """
+    One entity (a player or an AI) in an active map. Its physical state lives in
+    the map's BatchPhysicsEngine under key.
+    """
+
+    def __init__(self, kind: str, entity_id: str, client_id: Optional[str] = None):
+        self.kind = kind
+        self.entity_id = entity_id
+        self.key = f"{kind}:{entity_id}"
+        self.client_id = client_id
+
+
+class MapSimulation:
+    """
+    One active map: its loaded Map and Heightfield, the bodies in it, their physics
+    and its tick counters.
+    """
+
+    # Simulated in this process; see WorkerMapSimulation for maps run by a worker.
+    remote = False
+
+    def __init__(self, map_name: str, game_map, tick_rate: float, heightfield_resolution: float = 1.0):
+        self.map_name = map_name
+        self.tick_rate = tick_rate
+        self.bodies: Dict[str, Body] = {}
+        self.engine = BatchPhysicsEngine()
+        self.heightfield_resolution = heightfield_resolution
+        self.heightfield: Optional[Heightfield] = None
+        self.set_map(game_map)
+        self.task: Optional[asyncio.Task] = None
+        self.ticks = 0
+        self.idle_ticks = 0
+        self.overruns = 0
+        self.dropped_ticks = 0
+        self.state_changes = 0
+        # Bumped whenever a body enters or leaves, so snapshots of the same tick can tell.
+        self.membership = 0
+        self.empty_since: Optional[float] = None
+        self.tick_time = LatencyHistogram()
+        # Recent positions for lag compensation, set by SimulationService.
+        self.rewind: Optional[RewindBuffer] = None
+        self.rewind_time = LatencyHistogram()
+
+    def set_map(self, game_map) -> None:
+        self.game_map = game_map
+        if self.heightfield is None:
+            self.heightfield = Heightfield(game_map, self.heightfield_resolution)
+        else:
+            # Tile edits only touch the cells under the edited tiles.
+            self.heightfield.sync(game_map)
+
+    def add(self, body: Body, position) -> bool:
+        self.bodies[body.key] = body
+        self.engine.add(body.key, tuple(float(v) for v in position))
+        self.membership += 1
+        return True
+
+    def remove(self, key: str) -> Optional[Body]:
+        self.engine.remove(key)
+        self.membership += 1
+        return self.bodies.pop(key, None)
+
+    def snapshot(self) -> Tuple[tuple, List[str], np.ndarray]:
+        """
+        :return: (version, body keys, their positions). The version changes with every
+                 tick and every body entering or leaving.
+        """
+        engine = self.engine
+        return (self.ticks, self.membership), list(engine.ids), engine.positions[:engine.count].copy()
+
+    @property
+    def players(self) -> int:
+        return sum(1 for body in self.bodies.values() if body.kind == "user")
+
+    def get_stats(self) -> dict:
+        return {
+            "tick_rate": self.tick_rate,
+            "players": self.players,
+            "bodies": len(self.bodies),
+            "ticks": self.ticks,
+            "idle_ticks": self.idle_ticks,
+            "overruns": self.overruns,
+            "dropped_ticks": self.dropped_ticks,
+            "state_changes": self.state_changes,
+            "tick_time": self.tick_time.to_dict(),
+            "rewind": {**self.rewind.get_stats(), "record_time": self.rewind_time.to_dict()} if self.rewind else None,
+            "heightfield": self.heightfield.get_stats()
+        }
+
+
+class SimulationService:
+    """
+    Runs a fixed-timestep tick loop for every map that has players in it.
+
+    Each tick advances all bodies of the map in one vectorized BatchPhysicsEngine
+    step with the map's MapPhysics: airborne bodies fall under gravity until they touch the ground
+    (a floor tile or a wall top under them, else the map floor), looked up in the
+    map's Heightfield. jump() launches a grounded body at jump_speed. Their positions
+    are broadcast as player_position_update (to players within hearing range
+    when an interest_service is set, else to the whole map), and each landing or
+    take-off is broadcast as player_ground_contact (ai_position_update and
+    ai_ground_contact for AI), with the tile type of the surface under the body. Landed positions are saved
+    through the entity's mailbox, so they cannot interleave with a move request.
+    With an ai_scheduler set, AI behaviors run at the start of every tick; AI
+    spawned into an active map join it right away.
+
+    Membership follows map_join_ok / user_account_login_ok / map_leave_ok /
+    logout / session expiry, and positions follow user_move_ok and ai_move_ok.
+    Once a second each map also drops players that are no longer connected.
+    A map with no players skips its ticks; after idle_timeout seconds empty, its
+    loop stops and the map state is dropped until a player returns. The same
+    happens right away on map_remove_ok and map_hibernate.
+
+    Ticks are scheduled against the loop clock. A tick that takes longer than
+    its timestep counts as an overrun; if the loop falls more than
+    max_catchup_ticks behind, the missed ticks are dropped rather than replayed.
+
+    With rewind_seconds set, every map also keeps that much of its recent
+    positions in a RewindBuffer, recorded after each tick, so hits can be judged
+    against the world as a lagging shooter heard it (rewind()).
+
+    Maps listed in worker_maps are simulated in a worker process each instead
+    (see services/map_worker.py), with their own physics and AI scheduler; this
+    process only relays commands and turns the worker's results into the same
+    events, reading positions from shared memory.
+    """
+
+    def __init__(
+        self,
+        event_dispatcher,
+        map_repository,
+        user_repository,
+        connection_manager,
+        ai_repository=None,
+        tick_rate: float = 30.0,
+        map_tick_rates: Optional[Dict[str, float]] = None,
+        max_catchup_ticks: int = 5,
+        idle_timeout: float = 30.0,
+        worker_maps: Optional[List[str]] = None,
+        worker_capacity: int = 4096,
+        rewind_seconds: float = 1.0,
+        heightfield_resolution: float = 1.0,
+        jump_speed: float = 5.0,
+        logger: Optional[logging.Logger] = None
+    ):
+        self.event_dispatcher = event_dispatcher
+        self.map_repository = map_repository
+        self.user_repository = user_repository
+        self.connection_manager = connection_manager
+        self.ai_repository = ai_repository
+        self.tick_rate = tick_rate
+        self.map_tick_rates = dict(map_tick_rates or {})
+        self.max_catchup_ticks = max_catchup_ticks
+        self.idle_timeout = idle_timeout
+        self.worker_maps = set(worker_maps or ())
+        self.worker_capacity = worker_capacity
+        self.rewind_seconds = rewind_seconds
+        self.heightfield_resolution = heightfield_resolution
+        self.jump_speed = jump_speed
+        self.logger = logger or get_logger("SimulationService", debug_mode=False)
+        self.maps: Dict[str, MapSimulation] = {}
+        # (kind, entity_id) -> map_name, to find a body without scanning every map.
+        self._locations: Dict[Tuple[str, str], str] = {}
+        self._client_users: Dict[str, str] = {}
+        self._pending_saves = set()
+        # Set to an InterestService to send each update only to players within hearing range.
+        self.interest_service = None
+        # Set to a ReplicationService when positions reach clients in world snapshots.
+        self.replication_service = None
+        # Set to an AIScheduler to run AI behaviors from the tick.
+        self.ai_scheduler = None
+        # Set to a ZoneService to fire zone triggers as bodies move.
+        self.zone_service = None
+        self.logger.debug("SimulationService initialized.")
+
+    async def start(self):
+        await self.event_dispatcher.subscribe("user_account_login_ok", self.handle_login_ok)
+        await self.event_dispatcher.subscribe("map_join_ok", self.handle_map_join_ok)
+        await self.event_dispatcher.subscribe("map_leave_ok", self.handle_user_gone)
+        await self.event_dispatcher.subscribe("user_account_logout_ok", self.handle_user_gone)
+        await self.event_dispatcher.subscribe("user_session_expired", self.handle_user_gone)
+        await self.event_dispatcher.subscribe("user_move_ok", self.handle_user_move_ok)
+        await self.event_dispatcher.subscribe("ai_move_ok", self.handle_ai_move_ok)
+        await self.event_dispatcher.subscribe("ai_spawn_ok", self.handle_ai_spawn_ok)
+        await self.event_dispatcher.subscribe("ai_remove_ok", self.handle_ai_remove_ok)
+        for event_type in ("map_physics_update_ok", "map_tile_add_ok", "map_tile_remove_ok"):
+            await self.event_dispatcher.subscribe(event_type, self.handle_map_changed)
+        await self.event_dispatcher.subscribe("map_remove_ok", self.handle_map_unloaded)
+        await self.event_dispatcher.subscribe("map_hibernate", self.handle_map_unloaded)
+        self.logger.info(f"SimulationService started at {self.tick_rate} Hz (overrides: {self.map_tick_rates or 'none'}).")
+
+    async def stop(self):
+        for sim in list(self.maps.values()):
+            await self._deactivate(sim)
+        if self._pending_saves:
+            await asyncio.gather(*self._pending_saves, return_exceptions=True)
+        self.logger.info("SimulationService stopped.")
+
+    def tick_rate_for(self, map_name: str) -> float:
+        return float(self.map_tick_rates.get(map_name, self.tick_rate))
+
+    # Membership
+
+    async def handle_login_ok(self, event_data):
+        client_id = event_data.get("client_id")
+        username = event_data["message"].get("username")
+        if not username:
+            return
+        user = await self.user_repository.load_user(username)
+        if user and user.current_map:
+            await self._place("user", username, user.current_map, user.position, client_id)
+
+    async def handle_map_join_ok(self, event_data):
+        client_id = event_data.get("client_id")
+        msg = event_data["message"]
+        username = await self.connection_manager.get_username_by_client_id(client_id)
+        if username:
+            await self._place("user", username, msg["map_name"], msg["position"], client_id)
+
+    async def handle_user_gone(self, event_data):
+        client_id = event_data.get("client_id")
+        # Logout unmaps the client before replying, so fall back to what the join told us.
+        username = event_data["message"].get("username") or self._client_users.get(client_id)
+        if username:
+            self._remove("user", username)
+
+    async def handle_user_move_ok(self, event_data):
+        msg = event_data["message"]
+        body = self._find("user", msg.get("username"))
+        if body:
+            # The next tick notices if this walked the body off a ledge.
+            self.maps[self._locations[("user", body.entity_id)]].engine.set_position(body.key, msg["position"])
+
+    async def handle_ai_move_ok(self, event_data):
+        msg = event_data["message"]
+        body = self._find("ai", msg.get("ai_id"))
+        if body:
+            self.maps[self._locations[("ai", body.entity_id)]].engine.set_position(body.key, msg["position"])
+
+    async def handle_ai_spawn_ok(self, event_data):
+        msg = event_data["message"]
+        sim = self.maps.get(msg.get("map_name"))
+        if sim is None or self.ai_repository is None:
+            return
+        ai = await self.ai_repository.load_ai(msg["ai_id"])
+        if ai:
+            await self._add_ai(sim, ai)
+
+    async def handle_ai_remove_ok(self, event_data):
+        ai_id = event_data["message"].get("ai_id")
+        self._remove("ai", ai_id)
+        if self.ai_scheduler:
+            self.ai_scheduler.remove_ai(ai_id)
+
+    async def handle_map_changed(self, event_data):
+        map_name = event_data["message"].get("map_name")
+        sim = self.maps.get(map_name)
+        if sim is None:
+            return
+        game_map = await self.map_repository.load_map(map_name)
+        if game_map:
+            sim.set_map(game_map)
+            self.logger.debug(f"Reloaded map '{map_name}' into the simulation.")
+
+    async def handle_map_unloaded(self, event_data):
+        sim = self.maps.get(event_data["message"].get("map_name"))
+        if sim:
+            await self._deactivate(sim)
+        # A hibernating map's AI must be on disk before the map is released.
+        if self._pending_saves:
+            await asyncio.gather(*self._pending_saves, return_exceptions=True)
+
+    def locate(self, kind: str, entity_id: str) -> Optional[Tuple[str, Tuple[float, float, float]]]:
+        """
+        :return: (map_name, position) of a simulated entity, or None.
+        """
+        body = self._find(kind, entity_id)
+        if body is None:
+            return None
+        map_name = self._locations[(kind, entity_id)]
+        return map_name, self.maps[map_name].engine.get_position(body.key)
+
+    def snapshot(self, map_name: str) -> Optional[Tuple[tuple, List[str], np.ndarray]]:
+        """
+        Every body of an active map; see MapSimulation.snapshot(). None if the map isn't simulated.
+        """
+        sim = self.maps.get(map_name)
+        return sim.snapshot() if sim else None
+
+    def rewind(self, map_name: str, when: float) -> Optional[Tuple[List[str], np.ndarray]]:
+        """
+        Bodies of an active map as they were at time.monotonic() value when; see
+        RewindBuffer.at(). None if the map isn't simulated or keeps no history.
+        """
+        sim = self.maps.get(map_name)
+        if sim is None or sim.rewind is None:
+            return None
+        return sim.rewind.at(when)
+
+    def heightfield(self, map_name: str) -> Optional[Heightfield]:
+        """
+        Ground of an active map, kept up to date with its tiles. None if the map isn't simulated.
+        """
+        sim = self.maps.get(map_name)
+        return sim.heightfield if sim else None
+
+    def jump(self, kind: str, entity_id: str) -> Optional[Tuple[Tuple[float, float, float], Tuple[float, float, float]]]:
+        """
+        Launch a grounded body upwards at jump_speed. The next tick takes it off the
+        ground and it comes down again like any other fall.
+
+        :return: (position, velocity) after the jump, or None if the body isn't
+                 simulated or is already in the air.
+        """
+        body = self._find(kind, entity_id)
+        if body is None:
+            return None
+        engine = self.maps[self._locations[(kind, entity_id)]].engine
+        if not engine.is_on_ground(body.key):
+            return None
+        vx, vy, _ = engine.get_velocity(body.key)
+        velocity = (vx, vy, float(self.jump_speed))
+        engine.set_velocity(body.key, velocity)
+        return engine.get_position(body.key), velocity
+
+    def _find(self, kind: str, entity_id: Optional[str]) -> Optional[Body]:
+        map_name = self._locations.get((kind, entity_id))
+        sim = self.maps.get(map_name) if map_name else None
+        return sim.bodies.get(f"{kind}:{entity_id}") if sim else None
+
+    async def _place(self, kind: str, entity_id: str, map_name: str, position, client_id: Optional[str] = None):
+        self._remove(kind, entity_id)
+        sim = self.maps.get(map_name) or await self._activate(map_name)
+        if sim is None:
+            return
+        body = Body(kind, entity_id, client_id)
+        if not sim.add(body, position):
+            return
+        sim.empty_since = None
+        self._locations[(kind, entity_id)] = map_name
+        if kind == "user" and client_id:
+            self._client_users[client_id] = entity_id
+        self.logger.debug(f"{kind} '{entity_id}' entered the simulation of map '{map_name}' at {tuple(position)}.")
+
+    def _remove(self, kind: str, entity_id: Optional[str]):
+        map_name = self._locations.pop((kind, entity_id), None)
+        sim = self.maps.get(map_name) if map_name else None
+        if sim is None:
+            return
+        body = sim.remove(f"{kind}:{entity_id}")
+        if body and body.client_id:
+            self._client_users.pop(body.client_id, None)
+        if sim.players == 0 and sim.empty_since is None:
+            sim.empty_since = time.monotonic()
+
+    async def _activate(self, map_name: str) -> Optional[MapSimulation]:
+        game_map = await self.map_repository.load_map(map_name)
+        if not game_map:
+            self.logger.debug(f"Map '{map_name}' not found, not simulating it.")
+            return None
+        # Another join may have activated the map while it was loading.
+        if map_name in self.maps:
+            return self.maps[map_name]
+        if map_name in self.worker_maps:
+            sim = WorkerMapSimulation(
+                map_name, game_map, self.tick_rate_for(map_name), self.worker_capacity,
+                self._worker_settings(), debug_mode=self.logger.isEnabledFor(logging.DEBUG), logger=self.logger
+            )
+            sim.start()
+        else:
+            sim = MapSimulation(map_name, game_map, self.tick_rate_for(map_name), self.heightfield_resolution)
+            if self.ai_scheduler:
+                self.ai_scheduler.add_map(map_name, [], game_map)
+        if self.rewind_seconds > 0:
+            sim.rewind = RewindBuffer(max(2, math.ceil(self.rewind_seconds * sim.tick_rate)))
+        self.maps[map_name] = sim
+        if self.ai_repository:
+            for ai in await self.ai_repository.get_ai_by_map(map_name):
+                await self._add_ai(sim, ai)
+        run = self._run_remote if sim.remote else self._run
+        sim.task = asyncio.create_task(run(sim), name=f"simulation-{map_name}")
+        where = f"in worker process {sim.process.pid}" if sim.remote else "in-process"
+        self.logger.info(f"Map '{map_name}' is now simulated {where} at {sim.tick_rate} Hz.")
+        return sim
+
+    def _worker_settings(self) -> dict:
+        settings = {"max_catchup_ticks": self.max_catchup_ticks, "heightfield_resolution": self.heightfield_resolution}
+        scheduler = self.ai_scheduler
+        if scheduler:
+            settings["ai"] = {"budget_ms": scheduler.budget * 1000.0, "unobserved_interval": scheduler.unobserved_interval}
+            navigation = scheduler.navigation_service
+            if navigation:
+                settings["navigation"] = {
+                    "cell_size": navigation.cell_size,
+                    "cache_size": navigation.cache.capacity,
+                    "max_expansions": navigation.max_expansions
+                }
+        return settings
+
+    async def _add_ai(self, sim, ai):
+        if sim.remote:
+            # The worker runs this AI's behavior with its own scheduler.
+            if not sim.add(Body("ai", ai.ai_id), ai.position, ai):
+                return
+        else:
+            sim.add(Body("ai", ai.ai_id), ai.position)
+            if self.ai_scheduler:
+                self.ai_scheduler.add_ai(sim.map_name, ai)
+        self._locations[("ai", ai.ai_id)] = sim.map_name
+        if self.interest_service:
+            await self.interest_service.update("ai", ai.ai_id, sim.map_name, ai.position)
+
+    async def _deactivate(self, sim: MapSimulation):
+        if self.maps.get(sim.map_name) is sim:
+            del self.maps[sim.map_name]
+        if self.ai_scheduler:
+            self.ai_scheduler.remove_map(sim.map_name)
+        for body in sim.bodies.values():
+            self._locations.pop((body.kind, body.entity_id), None)
+            if body.client_id:
+                self._client_users.pop(body.client_id, None)
+            elif body.kind == "ai":
+                # Scheduled AI may have wandered off mid-air or without landing since the last save.
+                self._save_position(body, sim.engine.get_position(body.key))
+                if self.interest_service:
+                    await self.interest_service.remove("ai", body.entity_id)
+        if sim.task and sim.task is not asyncio.current_task():
+            sim.task.cancel()
+            try:
+                await sim.task
+            except asyncio.CancelledError:
+                pass
+        if sim.remote:
+            await sim.stop(asyncio.get_running_loop())
+        self.logger.info(f"Map '{sim.map_name}' is no longer simulated after {sim.ticks} ticks.")
+
+    # Tick loop
+
+    async def _run(self, sim: MapSimulation):
+        loop = asyncio.get_running_loop()
+        timestep = 1.0 / sim.tick_rate
+        next_tick = loop.time() + timestep
+        next_refresh = loop.time() + 1.0
+        while True:
+            delay = next_tick - loop.time()
+            # Yield even when behind, so a slow map cannot starve the rest of the server.
+            await asyncio.sleep(max(0.0, delay))
+
+            if loop.time() >= next_refresh:
+                next_refresh = loop.time() + 1.0
+                await self._refresh_players(sim)
+
+            if sim.players == 0:
+                sim.idle_ticks += 1
+                if sim.empty_since is not None and time.monotonic() - sim.empty_since >= self.idle_timeout:
+                    await self._deactivate(sim)
+                    return
+            else:
+                started = time.perf_counter()
+                try:
+                    await self._tick(sim, timestep)
+                except Exception as e:
+                    self.logger.exception(f"Simulation tick failed on map '{sim.map_name}': {e}")
+                elapsed = time.perf_counter() - started
+                sim.ticks += 1
+                sim.tick_time.observe(elapsed)
+                if elapsed > timestep:
+                    sim.overruns += 1
+                self._record(sim)
+
+            next_tick += timestep
+            behind = int((loop.time() - next_tick) / timestep)
+            if behind > self.max_catchup_ticks:
+                dropped = behind - self.max_catchup_ticks
+                sim.dropped_ticks += dropped
+                next_tick += dropped * timestep
+                self.logger.warning(f"Simulation of map '{sim.map_name}' fell behind, dropped {dropped} ticks.")
+
+    async def _refresh_players(self, sim: MapSimulation):
+        """
+        Drop players whose connection is gone and follow resumed sessions to their new client_id.
+        """
+        for body in [b for b in sim.bodies.values() if b.kind == "user"]:
+            client_id = await self.connection_manager.get_client_id_by_username(body.entity_id)
+            if client_id is None:
+                self._remove("user", body.entity_id)
+            elif client_id != body.client_id:
+                self._client_users.pop(body.client_id, None)
+                self._client_users[client_id] = body.entity_id
+                body.client_id = client_id
+
+    async def _tick(self, sim: MapSimulation, timestep: float):
+        engine = sim.engine
+        if self.ai_scheduler:
+            self.ai_scheduler.update_map(sim, timestep)
+        # Surfaces at or below each body before it falls, so a fast fall still lands on them.
+        ground = sim.heightfield.heights(engine.positions[:engine.count])
+        moved, contact_changed = engine.step(sim.game_map.physics, timestep, ground)
+        if not len(moved) and not len(contact_changed):
+            return
+        sim.state_changes += len(contact_changed)
+        await self._broadcast(
+            sim,
+            [sim.bodies[engine.ids[i]] for i in moved],
+            [(sim.bodies[engine.ids[i]], bool(engine.on_ground[i])) for i in contact_changed]
+        )
+
+    async def _broadcast(self, sim, moved: list, contact_changed: list):
+        """
+        Send the results of a tick.
+
+        :param moved: Bodies whose position changed.
+        :param contact_changed: (body, on_ground) of bodies that landed or left the ground.
+        """
+        # Read everything from the engine before the first await: a body can be
+        # removed (logout, AI death) while an update below is being sent.
+        engine = sim.engine
+        everyone = [body.client_id for body in sim.bodies.values() if body.client_id]
+        moved = [(body, engine.get_position(body.key)) for body in moved if body.key in engine]
+        contact_changed = [
+            (body, on_ground, engine.get_position(body.key), engine.get_velocity(body.key))
+            for body, on_ground in contact_changed if body.key in engine
+        ]
+        for body, position in moved:
+            if self.interest_service:
+                await self.interest_service.update(body.kind, body.entity_id, sim.map_name, position)
+            if self.zone_service:
+                await self.zone_service.update(body.kind, body.entity_id, sim.map_name, position)
+            client_ids = [] if self.replication_service else self._recipients(body, everyone)
+            if client_ids:
+                await self.event_dispatcher.dispatch(f"{self._prefix(body)}_position_update", {
+                    "client_ids": client_ids,
+                    "message": {self._id_field(body): body.entity_id, "position": position}
+                })
+        for body, on_ground, position, velocity in contact_changed:
+            client_ids = self._recipients(body, everyone)
+            if client_ids:
+                await self.event_dispatcher.dispatch(f"{self._prefix(body)}_ground_contact", {
+                    "client_ids": client_ids,
+                    "message": {
+                        self._id_field(body): body.entity_id,
+                        "on_ground": on_ground,
+                        "position": position,
+                        "velocity": velocity,
+                        # What it landed on or took off from, for landing and footstep sounds.
+                        "surface": sim.heightfield.surface_at(position)[1]
+                    }
+                })
+            if on_ground:
+                self._save_position(body, position)
+
+    async def _run_remote(self, sim):
+        """
+        Relay loop of a map simulated by a worker: forward activity and observed
+        AI, and publish the worker's tick results.
+        """
+        loop = asyncio.get_running_loop()
+        interval = min(1.0 / sim.tick_rate, 0.05)
+        next_refresh = loop.time()
+        while True:
+            await asyncio.sleep(interval)
+            if not sim.process.is_alive():
+                self.logger.error(f"Worker for map '{sim.map_name}' exited with code {sim.process.exitcode}.")
+                await self._deactivate(sim)
+                return
+            if loop.time() >= next_refresh:
+                next_refresh = loop.time() + 1.0
+                await self._refresh_players(sim)
+                sim.send("observed", self._observed_ai(sim))
+
+            active = sim.players > 0
+            if active != sim.sent_active:
+                sim.sent_active = active
+                sim.send("active", active)
+            if not active and sim.empty_since is not None and time.monotonic() - sim.empty_since >= self.idle_timeout:
+                await self._deactivate(sim)
+                return
+
+            ticked = False
+            for result in sim.poll():
+                if result[0] == "stats":
+                    sim.worker_stats = result[1]
+                    continue
+                ticked = True
+                _, tick, moved_slots, changed_slots, changed_on_ground = result
+                bodies = sim.slot_bodies
+                try:
+                    await self._broadcast(
+                        sim,
+                        [bodies[slot] for slot in moved_slots.tolist() if slot in bodies],
+                        [(bodies[slot], on_ground) for slot, on_ground in zip(changed_slots.tolist(), changed_on_ground.tolist()) if slot in bodies]
+                    )
+                except Exception as e:
+                    self.logger.exception(f"Publishing tick {tick} of map '{sim.map_name}' failed: {e}")
+            # Shared memory only holds the latest tick, so one frame per batch of results.
+            if ticked:
+                self._record(sim)
+
+    def _record(self, sim):
+        if sim.rewind is None:
+            return
+        started = time.perf_counter()
+        version, keys, positions = sim.snapshot()
+        sim.rewind.record(time.monotonic(), keys, positions, version[1])
+        sim.rewind_time.observe(time.perf_counter() - started)
+
+    def _observed_ai(self, sim) -> Optional[list]:
+        if self.interest_service is None:
+            return None
+        return [
+            body.entity_id for body in sim.bodies.values()
+            if body.kind == "ai" and self.interest_service.observers("ai", body.entity_id)
+        ]
+
+    def _recipients(self, body: Body, everyone: list) -> list:
+        if self.interest_service is None:
+            return everyone
+        # A falling player also needs its own position; observers() leaves the entity out.
+        observers = self.interest_service.observers(body.kind, body.entity_id)
+        return observers + [body.client_id] if body.client_id else observers
+
+    @staticmethod
+    def _prefix(body: Body) -> str:
+        return "player" if body.kind == "user" else "ai"
+
+    @staticmethod
+    def _id_field(body: Body) -> str:
+        return "username" if body.kind == "user" else "ai_id"
+
+    def _save_position(self, body: Body, position):
+        task = asyncio.create_task(self.event_dispatcher.mailboxes.run(
+            body.key, self._persist_position, body.kind, body.entity_id, position
+        ))
+        self._pending_saves.add(task)
+        task.add_done_callback(self._pending_saves.discard)
+
+    async def _persist_position(self, kind: str, entity_id: str, position):
+        if kind == "user":
+            user = await self.user_repository.load_user(entity_id)
+            if user:
+                user.position = position
+                await self.user_repository.save_user(user)
+        elif self.ai_repository:
+            ai = await self.ai_repository.load_ai(entity_id)
+            if ai:
+                ai.position = position
+                await self.ai_repository.save_ai(ai)
+
+    def get_stats(self) -> dict:
+        return {
+            "tick_rate": self.tick_rate,
+            "maps": {name: sim.get_stats() for name, sim in self.maps.items()}
+        }
@@ -1,4 +1,5 @@
 # services/user_service.py
+import asyncio
 import logging
 from typing import Optional
 
@@ -18,13 +19,18 @@ class UserService:
         map_service: MapService,
         connection_manager: ConnectionManager,
         security_manager: SecurityManager,
-        logger: Optional[logging.Logger] = None
+        logger: Optional[logging.Logger] = None,
+        datagram_channel=None,
+        session_manager=None
     ):
         self.event_dispatcher = event_dispatcher
         self.user_repository = user_repository
         self.map_service = map_service
         self.connection_manager = connection_manager
         self.security_manager = security_manager
+        self.datagram_channel = datagram_channel
+        self.session_manager = session_manager
+        self._session_reaper_task: Optional[asyncio.Task] = None
         self.logger = logger or get_logger("UserService", debug_mode=False)
         self.logger.debug("UserService initialized.")
 
@@ -32,8 +38,26 @@ class UserService:
         await self.event_dispatcher.subscribe("user_account_create_request", self.handle_create_account)
         await self.event_dispatcher.subscribe("user_account_login_request", self.handle_login_request)
         await self.event_dispatcher.subscribe("user_account_logout_request", self.handle_logout_request)
+        if self.session_manager:
+            self._session_reaper_task = asyncio.create_task(self._reap_expired_sessions())
         self.logger.info("UserService subscribed to user account events.")
 
+    async def _reap_expired_sessions(self):
+        """
+        Periodically drop sessions whose resume grace window has passed.
+        """
+        interval = max(1.0, self.session_manager.grace_seconds / 4)
+        while True:
+            await asyncio.sleep(interval)
+            for session in self.session_manager.expire_detached():
+                await self.connection_manager.handle_disconnect(session.client_id)
+                await self.user_repository.deauthenticate_user(session.username)
+                self.logger.info(f"Session for '{session.username}' expired, user is now offline.")
+                await self.event_dispatcher.dispatch("user_session_expired", {
+                    "client_id": session.client_id,
+                    "message": {"username": session.username}
+                })
+
     async def handle_create_account(self, event_data):
         msg = event_data["message"]
         client_id = event_data["client_id"]
@@ -112,7 +136,16 @@ class UserService:
             await self.connection_manager.register_login(username, client_id)
             self.logger.debug(f"Username '{username}' mapped to client_id='{client_id}'.")
 
-            await self._ok("user_account_login_ok", client_id, {"username": username, "token": token})
+            login_data = {"username": username, "token": token}
+            if self.datagram_channel:
+                # Keyed to this authenticated TCP session; movement can then go over UDP.
+                login_data["datagram"] = self.datagram_channel.open_session(client_id)
+                self.logger.debug(f"Datagram session opened for '{username}' on client_id='{client_id}'.")
+            if self.session_manager:
+                # Lets the client reconnect within the grace window without a new login.
+                login_data["resume_token"] = self.session_manager.create_session(username, client_id).resume_token
+
+            await self._ok("user_account_login_ok", client_id, login_data)
         else:
             self.logger.warning(f"Invalid login attempt for username='{username}'.")
             await self._fail("user_account_login_fail", client_id, "Invalid username or password.")
@@ -126,12 +159,21 @@ class UserService:
         self.logger.debug(f"Logout request from client_id='{client_id}', username='{username}'.")
 
         # If username was provided, we could unmap it. Otherwise just return success.
+        if username and not self.is_authenticated(username, token):
+            self.logger.debug(f"User '{username}' not authenticated for logout.")
+            await self._fail("user_account_logout_fail", client_id, "Not authenticated.")
+            return
         if username:
             await self.connection_manager.register_logout(username)
+            if self.session_manager:
+                self.session_manager.end_session(username)
             self.logger.info(f"User '{username}' logged out and mapping removed.")
         else:
             self.logger.debug("No username provided in logout request.")
 
+        if self.datagram_channel:
+            self.datagram_channel.close_session(client_id)
+
         await self._ok("user_account_logout_ok", client_id, {"message": "Logout successful. Discard the token."})
 
     def is_authenticated(self, username: str, token: str) -> bool:
@@ -1,9 +1,15 @@
 # services/weapon_service.py
+import asyncio
 import logging
-from typing import Optional
+import time
+from typing import Dict, List, Optional, Tuple
 import uuid
 
+import numpy as np
+
+from domain.weapons.hitscan import BoxGrid, aim_direction, cast_ray, entity_boxes, wall_boxes
 from domain.weapons.weapon import Weapon
+from interfaces.dispatch_metrics import LatencyHistogram
 
 class WeaponService:
     """
@@ -13,18 +19,96 @@ class WeaponService:
     - "weapon_reload_request" (reload weapon)
     - "weapon_equip_request" (equip a weapon to a user or AI)
     - "weapon_unequip_request" (unequip a weapon)
+
+    Shots are hitscan: a ray from the shooter's eye along its yaw/pitch, up to the
+    weapon's range, hits the first user or AI whose hit box it enters before any
+    wall tile. Walls and entities are bucketed on the same x/y grid (BoxGrid) and
+    the ray only tests the boxes in the cells it crosses. The wall grid of a map is
+    built once and dropped when its tiles change; the entity grid is rebuilt from
+    the simulation's positions at most once per tick (or from the interest grids
+    when the map isn't simulated).
+
+    With lag compensation on and a network_server set, a shot is judged against
+    the simulation's rewind buffer at the shooter's estimated client time: now
+    minus its smoothed RTT (the update it heard took half, its shot the other
+    half) and client_delay, capped at max_rewind. The shooter still fires from
+    where the server has it now.
+
+    A weapon fires at most fire_rate times a second, not while it reloads and not
+    without ammo. Hits take damage off the target's health and are announced as
+    weapon_hit to the target and the players within hearing range of it.
     """
 
-    def __init__(self, event_dispatcher, weapon_repository, logger: Optional[logging.Logger] = None):
+    def __init__(
+        self,
+        event_dispatcher,
+        weapon_repository,
+        logger: Optional[logging.Logger] = None,
+        user_service=None,
+        user_repository=None,
+        map_repository=None,
+        ai_repository=None,
+        connection_manager=None,
+        cell_size: float = 4.0,
+        hit_radius: float = 0.4,
+        hit_height: float = 1.8,
+        eye_height: float = 1.6,
+        lag_compensation: bool = True,
+        max_rewind: float = 1.0,
+        client_delay: float = 0.025
+    ):
         self.event_dispatcher = event_dispatcher
         self.weapon_repository = weapon_repository
         self.logger = logger or logging.getLogger("WeaponService")
+        self.user_service = user_service
+        self.user_repository = user_repository
+        self.map_repository = map_repository
+        self.ai_repository = ai_repository
+        self.connection_manager = connection_manager
+        self.cell_size = cell_size
+        self.hit_radius = hit_radius
+        self.hit_height = hit_height
+        self.eye_height = eye_height
+        self.lag_compensation = lag_compensation
+        self.max_rewind = max_rewind
+        self.client_delay = client_delay
+        # Set to a SimulationService to aim from, and hit, the simulated positions.
+        self.simulation_service = None
+        # Set to an InterestService to tell nearby players about hits.
+        self.interest_service = None
+        # Set to the NetworkServer to read shooters' RTT for lag compensation.
+        self.network_server = None
+        self._weapons: Dict[str, Weapon] = {}
+        self._ready_at: Dict[str, float] = {}
+        self._reloads: Dict[str, asyncio.Task] = {}
+        self._walls: Dict[str, BoxGrid] = {}
+        # map_name -> (snapshot version, entity keys, key -> box id, grid)
+        self._entities: Dict[str, Tuple[Optional[tuple], List[str], Dict[str, int], BoxGrid]] = {}
+        self.shots = 0
+        self.hits = 0
+        self.blocked = 0
+        self.rejected = 0
+        self.index_builds = 0
+        self.rewound = 0
+        self.cast_time = LatencyHistogram()
+        # How far back shots were judged; a histogram of seconds, like the latencies.
+        self.rewind_distance = LatencyHistogram()
 
     async def start(self):
         await self.event_dispatcher.subscribe("weapon_create_request", self.handle_weapon_create_request)
         await self.event_dispatcher.subscribe("weapon_fire_request", self.handle_weapon_fire_request)
         await self.event_dispatcher.subscribe("weapon_reload_request", self.handle_weapon_reload_request)
         # Add equip/unequip events as needed
+        for event_type in ("map_create_ok", "map_tile_add_ok", "map_tile_remove_ok"):
+            await self.event_dispatcher.subscribe(event_type, self.handle_map_changed)
+        await self.event_dispatcher.subscribe("map_remove_ok", self.handle_map_unloaded)
+        await self.event_dispatcher.subscribe("map_hibernate", self.handle_map_unloaded)
+
+    async def stop(self):
+        for task in list(self._reloads.values()):
+            task.cancel()
+        if self._reloads:
+            await asyncio.gather(*self._reloads.values(), return_exceptions=True)
 
     async def handle_weapon_create_request(self, event_data):
         """
@@ -32,6 +116,8 @@ class WeaponService:
           "client_id": <str>,
           "message": {
             "message_type": "weapon_create_request",
+            "username": <str>,
+            "token": <str>,
             "name": <str>,
             "damage": <float>,
             "range": <float>,
@@ -44,6 +130,10 @@ class WeaponService:
         msg = event_data["message"]
         client_id = event_data["client_id"]
 
+        if not self._authenticated(msg):
+            await self._fail("weapon_create_fail", client_id, "Not authenticated.")
+            return
+
         name = msg.get("name")
         damage = msg.get("damage", 10.0)
         range_ = msg.get("range", 50.0)
@@ -60,18 +150,269 @@ class WeaponService:
 
         success = await self.weapon_repository.save_weapon(weapon)
         if success:
+            self._weapons[weapon_id] = weapon
             self.logger.info(f"Weapon '{name}' created with ID {weapon_id}.")
             await self._ok("weapon_create_ok", client_id, {"weapon_id": weapon_id, "name": name})
         else:
             await self._fail("weapon_create_fail", client_id, "Failed to save weapon.")
 
     async def handle_weapon_fire_request(self, event_data):
-        # Implement firing logic: check if weapon exists, ammo > 0, decrement ammo, handle cooldown, etc.
-        pass
+        """
+        event_data = {
+          "client_id": <str>,
+          "message": {
+            "message_type": "weapon_fire_request",
+            "username": <str>,
+            "token": <str>,
+            "weapon_id": <str>
+          }
+        }
+        """
+        msg = event_data["message"]
+        client_id = event_data["client_id"]
+        username = msg.get("username")
+        weapon_id = msg.get("weapon_id")
+
+        if not self._authenticated(msg):
+            await self._reject(client_id, "Not authenticated.")
+            return
+        weapon = await self._load_weapon(weapon_id) if weapon_id else None
+        if not weapon:
+            await self._reject(client_id, f"Weapon '{weapon_id}' not found.")
+            return
+        user = await self.user_repository.load_user(username)
+        if not user:
+            await self._reject(client_id, "User not found.")
+            return
+
+        # Checked and claimed without awaiting in between, so two requests can't spend the same round.
+        now = time.monotonic()
+        if weapon_id in self._reloads:
+            await self._reject(client_id, "Weapon is reloading.")
+            return
+        if now < self._ready_at.get(weapon_id, 0.0):
+            await self._reject(client_id, "Weapon is not ready to fire yet.")
+            return
+        if weapon.current_ammo <= 0:
+            await self._reject(client_id, "Out of ammo.")
+            return
+        weapon.current_ammo -= 1
+        if weapon.fire_rate > 0:
+            self._ready_at[weapon_id] = now + 1.0 / weapon.fire_rate
+
+        map_name, position = user.current_map, user.position
+        located = self.simulation_service.locate("user", username) if self.simulation_service else None
+        if located:
+            map_name, position = located
+        origin = (float(position[0]), float(position[1]), float(position[2]) + self.eye_height)
+        direction = aim_direction(user.yaw, user.pitch)
+        shooter = f"user:{username}"
+        target, distance, blocked = await self._cast(
+            map_name, origin, direction, float(weapon.range), shooter, self._shot_time(client_id)
+        )
+
+        self.shots += 1
+        if not await self.weapon_repository.save_weapon(weapon):
+            self.logger.error(f"Failed to save ammo of weapon '{weapon_id}'.")
+        result = {
+            "weapon_id": weapon_id,
+            "current_ammo": weapon.current_ammo,
+            "distance": round(distance, 3),
+            "blocked": blocked,
+            "hit": None
+        }
+        if target:
+            hit = await self.event_dispatcher.mailboxes.run(target, self._damage, target, float(weapon.damage))
+            if hit:
+                self.hits += 1
+                result["hit"] = hit
+                await self._announce_hit(target, username, weapon_id, hit)
+        elif blocked:
+            self.blocked += 1
+        await self._ok("weapon_fire_ok", client_id, result)
 
     async def handle_weapon_reload_request(self, event_data):
-        # Implement reload logic: set current_ammo to ammo_capacity after reload_time
-        pass
+        """
+        event_data = {
+          "client_id": <str>,
+          "message": {
+            "message_type": "weapon_reload_request",
+            "username": <str>,
+            "token": <str>,
+            "weapon_id": <str>
+          }
+        }
+
+        Answers weapon_reload_ok with the reload time right away; the magazine is
+        full, and weapon_reload_done is sent, once it has passed.
+        """
+        msg = event_data["message"]
+        client_id = event_data["client_id"]
+        weapon_id = msg.get("weapon_id")
+
+        if not self._authenticated(msg):
+            await self._fail("weapon_reload_fail", client_id, "Not authenticated.")
+            return
+        weapon = await self._load_weapon(weapon_id) if weapon_id else None
+        if not weapon:
+            await self._fail("weapon_reload_fail", client_id, f"Weapon '{weapon_id}' not found.")
+            return
+        if weapon_id in self._reloads:
+            await self._fail("weapon_reload_fail", client_id, "Weapon is already reloading.")
+            return
+        if weapon.current_ammo >= weapon.ammo_capacity:
+            await self._fail("weapon_reload_fail", client_id, "Weapon is fully loaded.")
+            return
+        task = asyncio.create_task(self._reload(weapon, client_id))
+        self._reloads[weapon_id] = task
+        task.add_done_callback(lambda _: self._reloads.pop(weapon_id, None))
+        await self._ok("weapon_reload_ok", client_id, {"weapon_id": weapon_id, "reload_time": weapon.reload_time})
+
+    async def _reload(self, weapon: Weapon, client_id: str):
+        await asyncio.sleep(max(0.0, float(weapon.reload_time)))
+        weapon.current_ammo = weapon.ammo_capacity
+        if not await self.weapon_repository.save_weapon(weapon):
+            self.logger.error(f"Failed to save reloaded weapon '{weapon.weapon_id}'.")
+        await self.event_dispatcher.dispatch("weapon_reload_done", {
+            "client_id": client_id,
+            "message": {"weapon_id": weapon.weapon_id, "current_ammo": weapon.current_ammo}
+        })
+
+    async def handle_map_changed(self, event_data):
+        self._walls.pop(event_data["message"].get("map_name"), None)
+
+    async def handle_map_unloaded(self, event_data):
+        map_name = event_data["message"].get("map_name")
+        self._walls.pop(map_name, None)
+        self._entities.pop(map_name, None)
+
+    # Hit resolution
+
+    def _shot_time(self, client_id: str) -> Optional[float]:
+        """
+        time.monotonic() value of the world the shooter was hearing, or None to judge against now.
+        """
+        if not self.lag_compensation or self.network_server is None:
+            return None
+        rtt = self.network_server.get_rtt(client_id)
+        if rtt is None:
+            return None
+        rewind = min(rtt + self.client_delay, self.max_rewind)
+        self.rewind_distance.observe(rewind)
+        return time.monotonic() - rewind
+
+    async def _cast(self, map_name: str, origin, direction, max_distance: float, shooter: str,
+                    when: Optional[float] = None) -> Tuple[Optional[str], float, bool]:
+        """
+        :param when: time.monotonic() value to rewind the entities to, or None for their current positions.
+        :return: (key of the entity hit or None, distance of the hit or obstruction, whether a wall stopped the shot)
+        """
+        walls = self._walls.get(map_name)
+        if walls is None:
+            game_map = await self.map_repository.load_map(map_name) if self.map_repository else None
+            walls = BoxGrid(*wall_boxes(game_map), self.cell_size) if game_map else BoxGrid((), (), self.cell_size)
+            if game_map:
+                self._walls[map_name] = walls
+        past = self.simulation_service.rewind(map_name, when) if when is not None and self.simulation_service else None
+        if past is not None:
+            keys, positions = past
+            index = {key: i for i, key in enumerate(keys)}
+            entities = BoxGrid(*entity_boxes(positions, self.hit_radius, self.hit_height), self.cell_size)
+            self.rewound += 1
+        else:
+            _, keys, index, entities = self._entity_grid(map_name)
+        started = time.perf_counter()
+        hit = cast_ray(origin, direction, max_distance, walls, entities, skip=index.get(shooter, -1))
+        self.cast_time.observe(time.perf_counter() - started)
+        target = keys[hit.entity] if hit.entity is not None else None
+        return target, hit.distance, hit.blocked
+
+    def _entity_grid(self, map_name: str):
+        snapshot = self.simulation_service.snapshot(map_name) if self.simulation_service else None
+        if snapshot is None:
+            snapshot = self._interest_snapshot(map_name)
+        version, keys, positions = snapshot
+        cached = self._entities.get(map_name)
+        if cached and version is not None and cached[0] == version:
+            return cached
+        grid = BoxGrid(*entity_boxes(positions, self.hit_radius, self.hit_height), self.cell_size)
+        self.index_builds += 1
+        cached = self._entities[map_name] = (version, keys, {key: i for i, key in enumerate(keys)}, grid)
+        return cached
+
+    def _interest_snapshot(self, map_name: str):
+        grid = self.interest_service.grids.get(map_name) if self.interest_service else None
+        keys = list(grid.entities()) if grid else []
+        positions = np.array([grid.position_of(key) for key in keys], dtype=np.float64).reshape(-1, 3)
+        # No version: the interest grids move between ticks, so their index is rebuilt per shot.
+        return None, keys, positions
+
+    async def _damage(self, key: str, damage: float) -> Optional[dict]:
+        kind, entity_id = key.split(":", 1)
+        if kind == "user":
+            user = await self.user_repository.load_user(entity_id)
+            if not user:
+                return None
+            user.health = max(user.health - damage, 0)
+            await self.user_repository.save_user(user)
+            return {"username": entity_id, "damage": damage, "health": user.health}
+        ai = await self.ai_repository.load_ai(entity_id) if self.ai_repository else None
+        if not ai:
+            return None
+        ai.update_health(-damage)
+        await self.ai_repository.save_ai(ai)
+        return {"ai_id": entity_id, "damage": damage, "health": ai.health}
+
+    async def _announce_hit(self, target: str, shooter: str, weapon_id: str, hit: dict):
+        kind, entity_id = target.split(":", 1)
+        client_ids = self.interest_service.observers(kind, entity_id) if self.interest_service else []
+        if kind == "user" and self.connection_manager:
+            client_id = await self.connection_manager.get_client_id_by_username(entity_id)
+            if client_id and client_id not in client_ids:
+                client_ids.append(client_id)
+        if client_ids:
+            await self.event_dispatcher.dispatch("weapon_hit", {
+                "client_ids": client_ids,
+                "message": {"shooter": shooter, "weapon_id": weapon_id, **hit}
+            })
+
+    # Helpers
+
+    def _authenticated(self, msg: dict) -> bool:
+        username, token = msg.get("username"), msg.get("token")
+        return bool(username and token and self.user_service and self.user_service.is_authenticated(username, token))
+
+    async def _load_weapon(self, weapon_id: str) -> Optional[Weapon]:
+        weapon = self._weapons.get(weapon_id)
+        if weapon is None:
+            weapon = await self.weapon_repository.load_weapon(weapon_id)
+            if weapon:
+                weapon = self._weapons.setdefault(weapon_id, weapon)
+        return weapon
+
+    async def _reject(self, client_id: str, reason: str):
+        self.rejected += 1
+        await self._fail("weapon_fire_fail", client_id, reason)
+
+    def get_stats(self) -> dict:
+        return {
+            "shots": self.shots,
+            "hits": self.hits,
+            "blocked": self.blocked,
+            "rejected": self.rejected,
+            "reloading": len(self._reloads),
+            "index_builds": self.index_builds,
+            "rewound": self.rewound,
+            "rewind_distance": self.rewind_distance.to_dict(),
+            "cast_time": self.cast_time.to_dict(),
+            "maps": {
+                name: {
+                    "walls": len(self._walls[name]) if name in self._walls else 0,
+                    "entities": len(self._entities[name][1]) if name in self._entities else 0
+                }
+                for name in sorted(set(self._walls) | set(self._entities))
+            }
+        }
 
     async def _ok(self, event_type: str, client_id: str, data: dict):
         await self.event_dispatcher.dispatch(event_type, {
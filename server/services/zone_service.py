@@ -0,0 +1,330 @@
+# services/zone_service.py
+import asyncio
+import logging
+import time
+from typing import Dict, FrozenSet, Optional, Tuple
+
+from domain.maps.zone_index import EMPTY, ZoneIndex
+from infrastructure.logging.custom_logger import get_logger
+from interfaces.dispatch_metrics import LatencyHistogram
+
+
+class ZoneService:
+    """
+    Turns movement into zone triggers.
+
+    Every tracked entity keeps the set of zones it is in. When it moves (player
+    moves from user_move_ok, everything else from the simulation through
+    update()), the new set comes from the map's ZoneIndex and is compared with
+    the previous one; each zone left is dispatched as zone_exit and each zone
+    entered as zone_enter, with the zone's label, type and flags. A player is told
+    about their own triggers, and players within hearing range about AI ones when
+    an interest_service is set.
+
+    Entering a travel zone (Zone.is_travel) starts loading its destination map in
+    the background right away. If the player is still in the zone travel_delay
+    seconds later they are handed off to the destination: the same map_join_ok and
+    map_state as a map_join_request, at the zone's destination_coords. The handoff
+    runs in the player's mailbox and only waits for whatever is left of the
+    preload. Arriving (login, map join, handoff) sets an entity's zones without
+    triggering them, so nobody is bounced straight back through a return door.
+
+    Zone edits re-check everyone in the map; a map that is removed or hibernates
+    drops its index and entities.
+    """
+
+    def __init__(
+        self,
+        event_dispatcher,
+        map_repository,
+        user_repository,
+        connection_manager,
+        cell_size: float = 8.0,
+        travel_delay: float = 1.0,
+        logger: Optional[logging.Logger] = None
+    ):
+        self.event_dispatcher = event_dispatcher
+        self.map_repository = map_repository
+        self.user_repository = user_repository
+        self.connection_manager = connection_manager
+        self.cell_size = cell_size
+        self.travel_delay = travel_delay
+        self.logger = logger or get_logger("ZoneService", debug_mode=False)
+        self.indexes: Dict[str, ZoneIndex] = {}
+        # Entity key ("user:alice", "ai:<id>") -> (map_name, zones it is in).
+        self._entities: Dict[str, Tuple[str, FrozenSet[str]]] = {}
+        # client_id -> username, for events that only carry the client.
+        self._usernames: Dict[str, str] = {}
+        self._preloads: Dict[str, asyncio.Task] = {}
+        # Entity key -> (zone key, pending handoff).
+        self._travels: Dict[str, Tuple[str, asyncio.Task]] = {}
+        # Set to the MapService to send map_state and player_left_map on handoff.
+        self.map_service = None
+        # Set to an InterestService to tell nearby players about AI triggers.
+        self.interest_service = None
+        self.lookups = 0
+        self.enters = 0
+        self.exits = 0
+        self.preloads = 0
+        self.preload_hits = 0
+        self.handoffs = 0
+        self.failed_handoffs = 0
+        self.handoff_wait = LatencyHistogram()
+        self.logger.debug("ZoneService initialized.")
+
+    async def start(self):
+        await self.event_dispatcher.subscribe("user_account_login_ok", self.handle_login_ok)
+        await self.event_dispatcher.subscribe("map_join_ok", self.handle_map_join_ok)
+        await self.event_dispatcher.subscribe("map_leave_ok", self.handle_user_gone)
+        await self.event_dispatcher.subscribe("user_account_logout_ok", self.handle_user_gone)
+        await self.event_dispatcher.subscribe("user_session_expired", self.handle_user_gone)
+        await self.event_dispatcher.subscribe("user_move_ok", self.handle_user_move_ok)
+        await self.event_dispatcher.subscribe("ai_remove_ok", self.handle_ai_remove_ok)
+        for event_type in ("map_zone_add_ok", "map_zone_remove_ok", "map_create_ok"):
+            await self.event_dispatcher.subscribe(event_type, self.handle_map_changed)
+        await self.event_dispatcher.subscribe("map_remove_ok", self.handle_map_unloaded)
+        await self.event_dispatcher.subscribe("map_hibernate", self.handle_map_unloaded)
+        self.logger.info(f"ZoneService started (travel delay {self.travel_delay}s).")
+
+    async def stop(self):
+        pending = [task for _, task in self._travels.values()] + list(self._preloads.values())
+        for task in pending:
+            task.cancel()
+        if pending:
+            await asyncio.gather(*pending, return_exceptions=True)
+        self._travels.clear()
+        self._preloads.clear()
+
+    # Tracking
+
+    async def update(self, kind: str, entity_id: str, map_name: str, position) -> None:
+        """
+        Follow an entity to position and fire the triggers of the zones it entered or left.
+        Its first position in a map only records where it is.
+        """
+        key = f"{kind}:{entity_id}"
+        previous = self._entities.get(key)
+        if previous is None or previous[0] != map_name:
+            await self._arrive(key, map_name, position)
+            return
+        index = self.indexes.get(map_name)
+        if index is None:
+            return
+        self.lookups += 1
+        current = index.zones_at(position)
+        if current == previous[1]:
+            return
+        self._entities[key] = (map_name, current)
+        await self._trigger(key, map_name, index, previous[1], current)
+
+    async def _arrive(self, key: str, map_name: str, position) -> None:
+        self._cancel_travel(key)
+        index = await self._index(map_name)
+        self._entities[key] = (map_name, index.zones_at(position) if index else EMPTY)
+
+    def remove(self, key: str) -> None:
+        self._cancel_travel(key)
+        self._entities.pop(key, None)
+
+    async def _index(self, map_name: str) -> Optional[ZoneIndex]:
+        index = self.indexes.get(map_name)
+        if index is None:
+            game_map = await self.map_repository.load_map(map_name)
+            if game_map is None:
+                return None
+            index = self.indexes[map_name] = ZoneIndex(game_map, self.cell_size)
+        return index
+
+    async def _trigger(self, key: str, map_name: str, index: ZoneIndex, before: FrozenSet[str], after: FrozenSet[str]) -> None:
+        kind, entity_id = key.split(":", 1)
+        client_ids = await self._recipients(kind, entity_id)
+        for zone_key in before - after:
+            self.exits += 1
+            if self._travels.get(key, (None,))[0] == zone_key:
+                self._cancel_travel(key)
+            zone = index.zones.get(zone_key)
+            await self._send("zone_exit", client_ids, kind, entity_id, map_name, zone_key, zone)
+        for zone_key in after - before:
+            self.enters += 1
+            zone = index.zones[zone_key]
+            if kind == "user" and zone.is_travel:
+                self._preload(zone.destination_map)
+                self._cancel_travel(key)
+                task = asyncio.create_task(self._travel(key, map_name, zone_key))
+                self._travels[key] = (zone_key, task)
+            await self._send("zone_enter", client_ids, kind, entity_id, map_name, zone_key, zone)
+
+    async def _recipients(self, kind: str, entity_id: str) -> list:
+        if kind == "user":
+            client_id = await self.connection_manager.get_client_id_by_username(entity_id)
+            return [client_id] if client_id else []
+        if self.interest_service:
+            return self.interest_service.observers(kind, entity_id)
+        return []
+
+    async def _send(self, event_type: str, client_ids: list, kind: str, entity_id: str, map_name: str, zone_key: str, zone) -> None:
+        message = {
+            "username" if kind == "user" else "ai_id": entity_id,
+            "map_name": map_name,
+            "zone_key": zone_key
+        }
+        if zone is not None:
+            message.update({
+                "zone_label": zone.zone_label,
+                "zone_type": zone.zone_type,
+                "is_safe": zone.is_safe,
+                "is_hazard": zone.is_hazard,
+                "destination_map": zone.destination_map
+            })
+        await self.event_dispatcher.dispatch(event_type, {"client_ids": client_ids, "message": message})
+
+    # Travel
+
+    def _preload(self, map_name: str) -> None:
+        """
+        Start loading map_name in the background unless it is resident or already loading.
+        """
+        is_resident = getattr(self.map_repository, "is_resident", None)
+        if (is_resident and is_resident(map_name)) or map_name in self._preloads:
+            self.preload_hits += 1
+            return
+        self.preloads += 1
+        task = asyncio.create_task(self.map_repository.load_map(map_name), name=f"preload-{map_name}")
+        self._preloads[map_name] = task
+        task.add_done_callback(lambda _: self._preloads.pop(map_name, None))
+        self.logger.debug(f"Preloading map '{map_name}' for a handoff.")
+
+    def _cancel_travel(self, key: str) -> None:
+        pending = self._travels.pop(key, None)
+        if pending and pending[1] is not asyncio.current_task():
+            pending[1].cancel()
+
+    async def _travel(self, key: str, map_name: str, zone_key: str) -> None:
+        await asyncio.sleep(self.travel_delay)
+        # Serialized with the player's moves; by then they may have stepped out again.
+        await self.event_dispatcher.mailboxes.run(key, self._handoff, key, map_name, zone_key)
+
+    async def _handoff(self, key: str, map_name: str, zone_key: str) -> None:
+        if self._travels.get(key, (None,))[0] != zone_key:
+            return
+        self._travels.pop(key, None)
+        username = key.split(":", 1)[1]
+        zone = self.indexes[map_name].zones.get(zone_key) if map_name in self.indexes else None
+        if zone is None or not zone.is_travel:
+            return
+        destination = zone.destination_map
+        started = time.perf_counter()
+        preload = self._preloads.get(destination)
+        game_map = await (asyncio.shield(preload) if preload else self.map_repository.load_map(destination))
+        self.handoff_wait.observe(time.perf_counter() - started)
+        user = await self.user_repository.load_user(username)
+        client_id = await self.connection_manager.get_client_id_by_username(username)
+        if game_map is None or user is None or client_id is None:
+            self.failed_handoffs += 1
+            self.logger.warning(f"Handoff of '{username}' through zone '{zone.zone_label}' to map '{destination}' failed.")
+            return
+
+        position = zone.destination_coords or game_map.start_position
+        user.current_map = destination
+        user.position = position
+        await self.user_repository.save_user(user)
+        self.handoffs += 1
+        self.logger.debug(f"User '{username}' travelled from '{map_name}' to '{destination}' at {position}.")
+        if self.map_service:
+            await self.map_service.broadcast_to_map(map_name, "player_left_map", {"username": username}, exclude_username=username)
+        await self.event_dispatcher.dispatch("map_join_ok", {
+            "client_id": client_id,
+            "message": {"map_name": destination, "position": position}
+        })
+        if self.map_service:
+            await self.map_service.send_map_state_to_user(destination, username)
+
+    # Events
+
+    async def handle_login_ok(self, event_data):
+        username = event_data["message"].get("username")
+        user = await self.user_repository.load_user(username) if username else None
+        if user is None:
+            return
+        self._usernames[event_data.get("client_id")] = username
+        if user.current_map:
+            await self._arrive(f"user:{username}", user.current_map, user.position)
+
+    async def handle_map_join_ok(self, event_data):
+        client_id = event_data.get("client_id")
+        msg = event_data["message"]
+        username = await self.connection_manager.get_username_by_client_id(client_id)
+        if username:
+            self._usernames[client_id] = username
+            await self._arrive(f"user:{username}", msg["map_name"], msg["position"])
+
+    async def handle_user_gone(self, event_data):
+        # Logout unmaps the client before replying, so fall back to what login and join told us.
+        username = event_data["message"].get("username") or self._usernames.pop(event_data.get("client_id"), None)
+        if username:
+            self.remove(f"user:{username}")
+
+    async def handle_user_move_ok(self, event_data):
+        msg = event_data["message"]
+        username = msg.get("username")
+        tracked = self._entities.get(f"user:{username}")
+        if tracked:
+            map_name = tracked[0]
+        else:
+            user = await self.user_repository.load_user(username) if username else None
+            map_name = user.current_map if user else None
+        if map_name:
+            await self.update("user", username, map_name, msg["position"])
+
+    async def handle_ai_remove_ok(self, event_data):
+        self.remove(f"ai:{event_data['message'].get('ai_id')}")
+
+    async def handle_map_changed(self, event_data):
+        map_name = event_data["message"].get("map_name")
+        index = self.indexes.get(map_name)
+        if index is None:
+            return
+        game_map = await self.map_repository.load_map(map_name)
+        if game_map is None or not index.sync(game_map):
+            return
+        # Entities standing where a zone appeared or vanished trigger it without moving.
+        for key, (entity_map, before) in list(self._entities.items()):
+            if entity_map != map_name:
+                continue
+            kind, entity_id = key.split(":", 1)
+            position = await self._position_of(kind, entity_id)
+            if position is None:
+                continue
+            after = index.zones_at(position)
+            if after != before:
+                self._entities[key] = (map_name, after)
+                await self._trigger(key, map_name, index, before, after)
+
+    async def _position_of(self, kind: str, entity_id: str):
+        if self.interest_service and self.interest_service.is_tracked(kind, entity_id):
+            return self.interest_service.position_of(f"{kind}:{entity_id}")
+        if kind == "user":
+            user = await self.user_repository.load_user(entity_id)
+            return user.position if user else None
+        return None
+
+    async def handle_map_unloaded(self, event_data):
+        map_name = event_data["message"].get("map_name")
+        self.indexes.pop(map_name, None)
+        for key in [k for k, (entity_map, _) in self._entities.items() if entity_map == map_name]:
+            self.remove(key)
+
+    def get_stats(self) -> dict:
+        return {
+            "tracked": len(self._entities),
+            "lookups": self.lookups,
+            "enters": self.enters,
+            "exits": self.exits,
+            "pending_travels": len(self._travels),
+            "preloads": self.preloads,
+            "preload_hits": self.preload_hits,
+            "handoffs": self.handoffs,
+            "failed_handoffs": self.failed_handoffs,
+            "handoff_wait": self.handoff_wait.to_dict(),
+            "maps": {name: index.get_stats() for name, index in self.indexes.items()}
+        }
@@ -0,0 +1,271 @@
+# tools/replay_traffic.py
+"""
+Replays a traffic recording made by TrafficRecorder against a test server and
+reports throughput and response latency percentiles.
+
+Each recorded client_id gets its own connection and its messages are sent in
+recorded order. Tokens are taken from the replayed logins. Account creation and
+login are causal, so a connection waits for their response before sending its next
+message, even at max speed, as a real client would. Responses
+are matched to requests by type: user_move_request is answered by user_move_ok
+or user_move_fail.
+
+Examples, run from the server directory:
+    python tools/replay_traffic.py logs/traffic/traffic-20250101-120000.jsonl.gz
+    python tools/replay_traffic.py rec.jsonl.gz --speed 10 --max-gap 0.5
+    python tools/replay_traffic.py rec.jsonl.gz --speed 0 --user-prefix replay_ --create-accounts
+"""
+import argparse
+import asyncio
+import gzip
+import json
+import ssl
+import time
+from collections import defaultdict, deque
+from typing import Deque, Dict, List, Optional, Tuple
+
+USERNAME_FIELDS = ("username", "recipient")
+# Password of accounts made by --create-accounts when --password isn't given.
+DEFAULT_PASSWORD = "replay"
+
+
+def load_recording(path: str) -> Tuple[dict, List[Tuple[float, str, dict]]]:
+    opener = gzip.open if path.endswith(".gz") else open
+    with opener(path, "rt", encoding="utf-8") as f:
+        header = json.loads(f.readline())
+        entries = []
+        try:
+            for line in f:
+                if line.strip():
+                    entry = json.loads(line)
+                    entries.append((entry["t"], entry["c"], entry["m"]))
+        except (EOFError, json.JSONDecodeError):
+            # A server that was killed leaves an unterminated file; keep what was flushed.
+            pass
+    return header, entries
+
+
+def build_schedule(entries, speed: float, max_gap: Optional[float]) -> List[float]:
+    """
+    Send offsets in seconds for each entry. speed=0 means as fast as possible;
+    max_gap caps idle stretches in the recording (before the speed factor).
+    """
+    offsets = []
+    previous = None
+    elapsed = 0.0
+    for t, _, _ in entries:
+        gap = 0.0 if previous is None else t - previous
+        if max_gap is not None:
+            gap = min(gap, max_gap)
+        elapsed += gap
+        previous = t
+        offsets.append(0.0 if speed <= 0 else elapsed / speed)
+    return offsets
+
+
+def percentile(sorted_values: List[float], p: float) -> float:
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, max(0, int(round(p / 100.0 * len(sorted_values))) - 1))
+    return sorted_values[index]
+
+
+class ReplayStats:
+    def __init__(self):
+        self.sent = 0
+        self.responses = 0
+        self.failures: Dict[str, int] = defaultdict(int)
+        self.latencies: Dict[str, List[float]] = defaultdict(list)
+        self.unanswered = 0
+
+    def report(self, duration: float) -> str:
+        lines = [
+            f"Sent {self.sent} messages in {duration:.2f}s ({self.sent / duration if duration else 0:.1f} msg/s), "
+            f"{self.responses} matched responses, {self.unanswered} unanswered."
+        ]
+        all_latencies = sorted(v for values in self.latencies.values() for v in values)
+        lines.append(self._latency_line("all", all_latencies))
+        for request_type in sorted(self.latencies):
+            lines.append(self._latency_line(request_type, sorted(self.latencies[request_type])))
+        for request_type, count in sorted(self.failures.items()):
+            lines.append(f"  {request_type}: {count} *_fail responses")
+        return "\n".join(lines)
+
+    @staticmethod
+    def _latency_line(name: str, values: List[float]) -> str:
+        ms = [v * 1000 for v in values]
+        return (
+            f"  {name}: n={len(ms)} p50={percentile(ms, 50):.2f}ms p95={percentile(ms, 95):.2f}ms "
+            f"p99={percentile(ms, 99):.2f}ms max={(ms[-1] if ms else 0):.2f}ms"
+        )
+
+
+class ReplayConnection:
+    """
+    One connection standing in for one recorded client.
+    """
+
+    def __init__(self, recorded_client_id: str, stats: ReplayStats, password: Optional[str], user_prefix: str):
+        self.recorded_client_id = recorded_client_id
+        self.stats = stats
+        self.password = password
+        self.user_prefix = user_prefix
+        self.reader: Optional[asyncio.StreamReader] = None
+        self.writer: Optional[asyncio.StreamWriter] = None
+        self.outbox: asyncio.Queue = asyncio.Queue()
+        self.pending: Dict[str, Deque[float]] = defaultdict(deque)
+        self.token: Optional[str] = None
+        self.account_gate = asyncio.Event()
+        self.account_gate.set()
+        self.tasks: List[asyncio.Task] = []
+
+    async def open(self, host: str, port: int, ssl_ctx: Optional[ssl.SSLContext]) -> None:
+        self.reader, self.writer = await asyncio.open_connection(host, port, ssl=ssl_ctx, limit=8 * 1024 * 1024)
+        self.tasks = [asyncio.create_task(self._read_loop()), asyncio.create_task(self._send_loop())]
+
+    def rewrite(self, message: dict) -> dict:
+        message = dict(message)
+        if self.user_prefix:
+            for field in USERNAME_FIELDS:
+                if isinstance(message.get(field), str):
+                    message[field] = self.user_prefix + message[field]
+        if self.password is not None and "password" in message:
+            message["password"] = self.password
+        return message
+
+    async def _send_loop(self) -> None:
+        while True:
+            message = await self.outbox.get()
+            if message is None:
+                return
+            message_type = message.get("message_type", "")
+            await self.account_gate.wait()
+            if self.token and "token" in message:
+                message["token"] = self.token
+            if message_type in ("user_account_create_request", "user_account_login_request"):
+                self.account_gate.clear()
+            if message_type.endswith("_request"):
+                self.pending[message_type[:-len("_request")]].append(time.perf_counter())
+            self.writer.write((json.dumps({"client_id": "", "message": message}) + "\n").encode("utf-8"))
+            self.stats.sent += 1
+            await self.writer.drain()
+
+    async def _read_loop(self) -> None:
+        while True:
+            line = await self.reader.readline()
+            if not line:
+                self.account_gate.set()
+                return
+            if not line.strip():
+                continue
+            inner = json.loads(line).get("message", {})
+            message_type = inner.get("message_type", "")
+            if message_type == "ping":
+                self.writer.write((json.dumps({"client_id": "", "message": {"message_type": "pong", "ping_id": inner.get("ping_id")}}) + "\n").encode("utf-8"))
+                continue
+            if message_type == "user_account_login_ok":
+                self.token = inner.get("token")
+            if message_type.startswith(("user_account_create_", "user_account_login_")):
+                self.account_gate.set()
+            for suffix in ("_ok", "_fail"):
+                if message_type.endswith(suffix):
+                    base = message_type[:-len(suffix)]
+                    waiting = self.pending.get(base)
+                    if waiting:
+                        self.stats.latencies[base + "_request"].append(time.perf_counter() - waiting.popleft())
+                        self.stats.responses += 1
+                    if suffix == "_fail":
+                        self.stats.failures[base + "_request"] += 1
+
+    async def close(self, drain_timeout: float) -> None:
+        await self.outbox.put(None)
+        deadline = time.perf_counter() + drain_timeout
+        while any(self.pending.values()) and time.perf_counter() < deadline:
+            await asyncio.sleep(0.05)
+        self.stats.unanswered += sum(len(q) for q in self.pending.values())
+        for task in self.tasks:
+            task.cancel()
+        if self.writer:
+            self.writer.close()
+
+
+async def create_accounts(usernames, host, port, ssl_ctx, password: str) -> None:
+    reader, writer = await asyncio.open_connection(host, port, ssl=ssl_ctx)
+    for username in usernames:
+        writer.write((json.dumps({"client_id": "", "message": {
+            "message_type": "user_account_create_request", "username": username, "password": password
+        }}) + "\n").encode("utf-8"))
+    await writer.drain()
+    remaining = len(usernames)
+    while remaining:
+        line = await asyncio.wait_for(reader.readline(), 30)
+        if not line:
+            break
+        message_type = json.loads(line).get("message", {}).get("message_type", "")
+        if message_type.startswith("user_account_create_"):
+            remaining -= 1
+    writer.close()
+
+
+async def replay(args) -> None:
+    header, entries = load_recording(args.recording)
+    print(f"Loaded {len(entries)} messages from {len(set(c for _, c, _ in entries))} clients (format {header.get('format')}).")
+
+    ssl_ctx = None
+    if not args.no_ssl:
+        ssl_ctx = ssl.create_default_context()
+        ssl_ctx.check_hostname = False
+        ssl_ctx.verify_mode = ssl.CERT_NONE
+
+    # Accounts created here must be logged into with the same password.
+    password = args.password
+    if password is None and args.create_accounts:
+        password = DEFAULT_PASSWORD
+
+    stats = ReplayStats()
+    connections: Dict[str, ReplayConnection] = {}
+    for _, client_id, _ in entries:
+        if client_id not in connections:
+            connections[client_id] = ReplayConnection(client_id, stats, password, args.user_prefix)
+
+    if args.create_accounts:
+        usernames = sorted({
+            args.user_prefix + m["username"] for _, _, m in entries
+            if isinstance(m, dict) and m.get("message_type") == "user_account_login_request" and isinstance(m.get("username"), str)
+        })
+        await create_accounts(usernames, args.host, args.port, ssl_ctx, password)
+        print(f"Ensured {len(usernames)} accounts exist.")
+
+    await asyncio.gather(*(conn.open(args.host, args.port, ssl_ctx) for conn in connections.values()))
+
+    offsets = build_schedule(entries, args.speed, args.max_gap)
+    started = time.perf_counter()
+    for offset, (_, client_id, message) in zip(offsets, entries):
+        delay = started + offset - time.perf_counter()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        if isinstance(message, dict):
+            connections[client_id].outbox.put_nowait(connections[client_id].rewrite(message))
+
+    await asyncio.gather(*(conn.close(args.drain_timeout) for conn in connections.values()))
+    print(stats.report(time.perf_counter() - started))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay recorded client traffic against a server.")
+    parser.add_argument("recording", help="Path to a traffic-*.jsonl.gz recording.")
+    parser.add_argument("--host", default="localhost")
+    parser.add_argument("--port", type=int, default=33288)
+    parser.add_argument("--no-ssl", action="store_true", help="Connect without TLS.")
+    parser.add_argument("--speed", type=float, default=1.0, help="Playback speed factor; 0 sends as fast as possible.")
+    parser.add_argument("--max-gap", type=float, default=None, help="Compress idle gaps in the recording to at most this many seconds.")
+    parser.add_argument("--user-prefix", default="", help="Prefix added to every username, to replay against a shared server.")
+    parser.add_argument("--password", default=None, help=f"Password substituted for the redacted passwords in the recording (default with --create-accounts: '{DEFAULT_PASSWORD}').")
+    parser.add_argument("--create-accounts", action="store_true", help="Create an account for every username that logs in before replaying.")
+    parser.add_argument("--drain-timeout", type=float, default=5.0, help="Seconds to wait for outstanding responses at the end.")
+    args = parser.parse_args()
+    asyncio.run(replay(args))
+
+
+if __name__ == "__main__":
+    main()